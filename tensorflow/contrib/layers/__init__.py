@@ -20,6 +20,7 @@ This package provides several ops that take care of creating variables that are
 used internally in a consistent way and provide the building blocks for many
 common machine learning algorithms.
 
+@@EmbeddingCache
 @@avg_pool2d
 @@batch_norm
 @@convolution2d
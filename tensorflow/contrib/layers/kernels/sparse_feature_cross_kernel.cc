@@ -128,6 +128,33 @@ class DenseTensorColumn : public ColumnInterface<InternalType> {
   const Tensor& tensor_;
 };
 
+// A column whose features have been fingerprinted ahead of time, so that
+// several crosses can share the fingerprints of the same input.
+class FingerprintColumn : public ColumnInterface<int64> {
+ public:
+  FingerprintColumn(const std::vector<int64>& fingerprints,
+                    const std::vector<int64>& feature_counts,
+                    const std::vector<int64>& feature_start_indices)
+      : fingerprints_(fingerprints),
+        feature_counts_(feature_counts),
+        feature_start_indices_(feature_start_indices) {}
+
+  int64 FeatureCount(int64 batch) const override {
+    return feature_counts_[batch];
+  }
+
+  int64 DoFeature(int64 batch, int64 n, int64 not_used) const override {
+    return fingerprints_[feature_start_indices_[batch] + n];
+  }
+
+  ~FingerprintColumn() override {}
+
+ private:
+  const std::vector<int64>& fingerprints_;
+  const std::vector<int64>& feature_counts_;
+  const std::vector<int64>& feature_start_indices_;
+};
+
 // Updates Output tensors with sparse crosses.
 template <typename OutType>
 class OutputUpdater {
@@ -587,6 +614,250 @@ class SparseFeatureCrossOp : public OpKernel {
   uint64 hash_key_;
 };
 
+// Computes several hashed crosses of one list of inputs. Each input is
+// fingerprinted, and its features are located in the batch, once for all the
+// crosses that use it. The crosses are identical to those of
+// SparseFeatureCross (hash_key == 0) and SparseFeatureCrossV2 with
+// hashed_output.
+class SparseFeatureCrossMultiOp : public OpKernel {
+ public:
+  explicit SparseFeatureCrossMultiOp(OpKernelConstruction* context)
+      : OpKernel(context) {
+    OP_REQUIRES_OK(context, context->GetAttr("cross_inputs", &cross_inputs_));
+    OP_REQUIRES_OK(context, context->GetAttr("cross_sizes", &cross_sizes_));
+    OP_REQUIRES_OK(context, context->GetAttr("num_buckets", &num_buckets_));
+    // Read the hash keys as int64 since uint64 attributes are not supported
+    // by REGISTER_OP.
+    std::vector<int64> signed_hash_keys;
+    OP_REQUIRES_OK(context, context->GetAttr("hash_keys", &signed_hash_keys));
+    int num_crosses;
+    OP_REQUIRES_OK(context, context->GetAttr("num_crosses", &num_crosses));
+    OP_REQUIRES(
+        context, cross_sizes_.size() == num_crosses &&
+                     num_buckets_.size() == num_crosses &&
+                     signed_hash_keys.size() == num_crosses,
+        errors::InvalidArgument(
+            "cross_sizes, num_buckets and hash_keys must have num_crosses=",
+            num_crosses, " elements, got ", cross_sizes_.size(), ", ",
+            num_buckets_.size(), " and ", signed_hash_keys.size()));
+    int64 total_size = 0;
+    for (const int64 size : cross_sizes_) {
+      OP_REQUIRES(context, size > 0,
+                  errors::InvalidArgument("Cross sizes must be positive"));
+      total_size += size;
+    }
+    OP_REQUIRES(context, total_size == cross_inputs_.size(),
+                errors::InvalidArgument(
+                    "cross_inputs should have ", total_size,
+                    " elements, got ", cross_inputs_.size()));
+    for (const int64 hash_key : signed_hash_keys) {
+      hash_keys_.push_back(static_cast<uint64>(hash_key));
+    }
+  }
+
+  void Compute(OpKernelContext* context) override {
+    OpInputList indices_list_in;
+    OP_REQUIRES_OK(context, context->input_list("indices", &indices_list_in));
+    OpInputList values_list_in;
+    OP_REQUIRES_OK(context, context->input_list("values", &values_list_in));
+    OpInputList shapes_list_in;
+    OP_REQUIRES_OK(context, context->input_list("shapes", &shapes_list_in));
+    OpInputList dense_list_in;
+    OP_REQUIRES_OK(context, context->input_list("dense", &dense_list_in));
+
+    const int64 num_sparse = indices_list_in.size();
+    const int64 num_inputs = num_sparse + dense_list_in.size();
+    int64 batch_size = 0;
+    if (num_sparse > 0) {
+      OP_REQUIRES(context,
+                  TensorShapeUtils::IsVector(shapes_list_in[0].shape()) &&
+                      shapes_list_in[0].NumElements() == 2,
+                  errors::InvalidArgument(
+                      "shape should imply a 2D tensor, but got ",
+                      shapes_list_in[0].shape().DebugString()));
+      batch_size = shapes_list_in[0].vec<int64>()(0);
+    } else if (num_inputs > 0) {
+      OP_REQUIRES(context, TensorShapeUtils::IsMatrix(dense_list_in[0].shape()),
+                  errors::InvalidArgument(
+                      "Dense inputs should be a matrix but received shape ",
+                      dense_list_in[0].shape().DebugString()));
+      batch_size = dense_list_in[0].dim_size(0);
+    }
+    for (const int64 input : cross_inputs_) {
+      OP_REQUIRES(context, input >= 0 && input < num_inputs,
+                  errors::InvalidArgument("Cross input ", input,
+                                          " out of range [0, ", num_inputs,
+                                          ")"));
+    }
+
+    // Fingerprints and locates the features of every input once.
+    std::vector<std::vector<int64>> fingerprints(num_inputs);
+    std::vector<std::vector<int64>> feature_counts(
+        num_inputs, std::vector<int64>(batch_size));
+    std::vector<std::vector<int64>> feature_start_indices(
+        num_inputs, std::vector<int64>(batch_size));
+    for (int i = 0; i < num_sparse; ++i) {
+      const Tensor& indices_in = indices_list_in[i];
+      OP_REQUIRES(
+          context, TensorShapeUtils::IsMatrix(indices_in.shape()) &&
+                       indices_in.dim_size(1) == 2,
+          errors::InvalidArgument(
+              "Input indices should be a matrix with 2 columns but received "
+              "shape ", indices_in.shape().DebugString(), " at position ", i));
+      OP_REQUIRES(
+          context, TensorShapeUtils::IsVector(values_list_in[i].shape()) &&
+                       values_list_in[i].dim_size(0) == indices_in.dim_size(0),
+          errors::InvalidArgument(
+              "Expected ", indices_in.dim_size(0), " input values, got shape ",
+              values_list_in[i].shape().DebugString(), " at position ", i));
+      OP_REQUIRES(
+          context, TensorShapeUtils::IsVector(shapes_list_in[i].shape()) &&
+                       shapes_list_in[i].NumElements() == 2 &&
+                       shapes_list_in[i].vec<int64>()(0) == batch_size,
+          errors::InvalidArgument("Expected a 2D shape with batch size ",
+                                  batch_size, " at position ", i));
+      FingerprintValues(values_list_in[i], &fingerprints[i]);
+      const auto indices = indices_in.matrix<int64>();
+      int64 row = 0;
+      for (int64 b = 0; b < batch_size; ++b) {
+        feature_start_indices[i][b] = row;
+        while (row < indices_in.dim_size(0) && indices(row, 0) == b) {
+          ++row;
+        }
+        feature_counts[i][b] = row - feature_start_indices[i][b];
+      }
+    }
+    for (int j = 0; j < dense_list_in.size(); ++j) {
+      const Tensor& dense_in = dense_list_in[j];
+      OP_REQUIRES(context, TensorShapeUtils::IsMatrix(dense_in.shape()) &&
+                               dense_in.dim_size(0) == batch_size,
+                  errors::InvalidArgument(
+                      "Expected a dense matrix with batch size ", batch_size,
+                      " but received shape ", dense_in.shape().DebugString(),
+                      " at dense tensor ", j));
+      const int64 i = num_sparse + j;
+      FingerprintValues(dense_in, &fingerprints[i]);
+      for (int64 b = 0; b < batch_size; ++b) {
+        feature_counts[i][b] = dense_in.dim_size(1);
+        feature_start_indices[i][b] = b * dense_in.dim_size(1);
+      }
+    }
+
+    OpOutputList indices_list_out;
+    OP_REQUIRES_OK(context,
+                   context->output_list("output_indices", &indices_list_out));
+    OpOutputList values_list_out;
+    OP_REQUIRES_OK(context,
+                   context->output_list("output_values", &values_list_out));
+    OpOutputList shape_list_out;
+    OP_REQUIRES_OK(context,
+                   context->output_list("output_shape", &shape_list_out));
+
+    int64 offset = 0;
+    for (int c = 0; c < cross_sizes_.size(); ++c) {
+      std::vector<std::unique_ptr<ColumnInterface<int64>>> columns;
+      for (int64 k = offset; k < offset + cross_sizes_[c]; ++k) {
+        const int64 input = cross_inputs_[k];
+        columns.emplace_back(new FingerprintColumn(
+            fingerprints[input], feature_counts[input],
+            feature_start_indices[input]));
+      }
+      offset += cross_sizes_[c];
+
+      // Calculates the output size and where each batch starts in it.
+      std::vector<int64> output_start_indices(batch_size);
+      int64 cross_count_total = 0;
+      int64 max_cross_count = 0;
+      for (int64 b = 0; b < batch_size; ++b) {
+        output_start_indices[b] = cross_count_total;
+        int64 cross_count = 1;
+        for (const auto& column : columns) {
+          cross_count *= column->FeatureCount(b);
+        }
+        max_cross_count = std::max(max_cross_count, cross_count);
+        cross_count_total += cross_count;
+      }
+
+      Tensor* indices_out;
+      OP_REQUIRES_OK(context, indices_list_out.allocate(
+                                  c, TensorShape({cross_count_total, 2}),
+                                  &indices_out));
+      Tensor* values_out;
+      OP_REQUIRES_OK(context,
+                     values_list_out.allocate(
+                         c, TensorShape({cross_count_total}), &values_out));
+      Tensor* shape_out;
+      OP_REQUIRES_OK(context,
+                     shape_list_out.allocate(c, TensorShape({2}), &shape_out));
+      auto shape_vec = shape_out->vec<int64>();
+      shape_vec(0) = batch_size;
+      shape_vec(1) = max_cross_count;
+
+      OutputUpdater<int64> updater(output_start_indices, indices_out,
+                                   values_out);
+      if (hash_keys_[c] != 0) {
+        GenerateCrosses(
+            context, columns,
+            HashCrosserV2(columns, num_buckets_[c], hash_keys_[c]), updater,
+            batch_size);
+      } else {
+        GenerateCrosses(context, columns,
+                        HashCrosser(columns, num_buckets_[c], hash_keys_[c]),
+                        updater, batch_size);
+      }
+    }
+  }
+
+ private:
+  // Sets `fingerprints` to the fingerprints of string `values`, or to the
+  // values themselves if they are int64, like the SparseFeatureCross columns.
+  static void FingerprintValues(const Tensor& values,
+                                std::vector<int64>* fingerprints) {
+    const int64 size = values.NumElements();
+    fingerprints->resize(size);
+    if (values.dtype() == DT_STRING) {
+      const auto flat = values.flat<string>();
+      for (int64 i = 0; i < size; ++i) {
+        (*fingerprints)[i] = Fingerprint64(flat(i));
+      }
+    } else {
+      const auto flat = values.flat<int64>();
+      for (int64 i = 0; i < size; ++i) {
+        (*fingerprints)[i] = flat(i);
+      }
+    }
+  }
+
+  template <typename Crosser>
+  static void GenerateCrosses(
+      OpKernelContext* context,
+      const std::vector<std::unique_ptr<ColumnInterface<int64>>>& columns,
+      const Crosser& crosser, const OutputUpdater<int64>& updater,
+      int64 batch_size) {
+    auto do_work = [&columns, &crosser, &updater](int64 begin, int64 end) {
+      for (int64 b = begin; b < end; b++) {
+        ProductIterator<int64> product_iterator(columns, b);
+        int64 cross_count = 0;
+        while (product_iterator.HasNext()) {
+          const auto permutation = product_iterator.Next();
+          updater.Update(b, cross_count, crosser.Generate(b, permutation));
+          cross_count++;
+        }
+      }
+    };
+
+    auto* worker_threads = context->device()->tensorflow_cpu_worker_threads();
+    const int kCostPerUnit = 5000 * columns.size();
+    Shard(worker_threads->num_threads, worker_threads->workers, batch_size,
+          kCostPerUnit, do_work);
+  }
+
+  std::vector<int64> cross_inputs_;
+  std::vector<int64> cross_sizes_;
+  std::vector<int64> num_buckets_;
+  std::vector<uint64> hash_keys_;
+};
+
 REGISTER_KERNEL_BUILDER(Name("SparseFeatureCross")
                             .Device(DEVICE_CPU)
                             .TypeConstraint<string>("out_type")
@@ -637,4 +908,7 @@ REGISTER_KERNEL_BUILDER(Name("SparseFeatureCrossV2")
                             .TypeConstraint<int64>("internal_type"),
                         SparseFeatureCrossOp<true, int64, true>);
 
+REGISTER_KERNEL_BUILDER(Name("SparseFeatureCrossMulti").Device(DEVICE_CPU),
+                        SparseFeatureCrossMultiOp);
+
 }  // namespace tensorflow
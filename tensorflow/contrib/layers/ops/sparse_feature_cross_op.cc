@@ -159,4 +159,55 @@ output_values: 1-D.  Non-empty values of the concatenated or hashed
   `SparseTensor`.
 output_shape: 1-D.  Shape of the concatenated `SparseTensor`.
 )doc");
+
+REGISTER_OP("SparseFeatureCrossMulti")
+    .Input("indices: N * int64")
+    .Input("values: sparse_types")
+    .Input("shapes: N * int64")
+    .Input("dense: dense_types")
+    .Output("output_indices: num_crosses * int64")
+    .Output("output_values: num_crosses * int64")
+    .Output("output_shape: num_crosses * int64")
+    .Attr("N: int >= 0")
+    .Attr("num_crosses: int >= 1")
+    .Attr("cross_inputs: list(int)")
+    .Attr("cross_sizes: list(int)")
+    .Attr("num_buckets: list(int)")
+    .Attr("hash_keys: list(int)")
+    .Attr("sparse_types: list({int64, string}) >= 0")
+    .Attr("dense_types: list({int64, string}) >= 0")
+    .SetShapeFn([](shape_inference::InferenceContext* c) {
+      int num_crosses;
+      TF_RETURN_IF_ERROR(c->GetAttr("num_crosses", &num_crosses));
+      for (int i = 0; i < num_crosses; ++i) {
+        c->set_output(i, c->Matrix(c->UnknownDim(), 2));
+        c->set_output(num_crosses + i, c->Vector(c->UnknownDim()));
+        c->set_output(2 * num_crosses + i, c->Vector(2));
+      }
+      return Status::OK();
+    })
+    .Doc(R"doc(
+Generates several hashed sparse crosses of one list of sparse and dense inputs.
+
+Inputs are numbered with the sparse inputs first, followed by the dense
+inputs. Cross `i` crosses the `cross_sizes[i]` inputs listed next in
+`cross_inputs`, in that order, and is identical to the hashed output of
+`SparseFeatureCrossV2` on the same inputs with `num_buckets[i]` and
+`hash_keys[i]`, or of `SparseFeatureCross` if `hash_keys[i]` is 0.
+
+Each input is fingerprinted, and its features located in the batch, only once
+however many crosses use it.
+
+indices: 2-D.  Indices of each input `SparseTensor`.
+values: 1-D.   values of each `SparseTensor`.
+shapes: 1-D.   Shapes of each `SparseTensor`.
+dense: 2-D.    Columns represented by dense `Tensor`.
+output_indices: 2-D.  Indices of each crossed `SparseTensor`.
+output_values: 1-D.  Hashed values of each crossed `SparseTensor`.
+output_shape: 1-D.  Shape of each crossed `SparseTensor`.
+cross_inputs: Input numbers of all crosses, concatenated.
+cross_sizes: Number of inputs of each cross.
+num_buckets: Number of hash buckets of each cross, 0 for no bucketing.
+hash_keys: `FingerprintCat64` hash key of each cross, 0 for the legacy hash.
+)doc");
 }  // namespace tensorflow
@@ -17,6 +17,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import time
+
 import numpy
 import tensorflow as tf
 
@@ -416,6 +418,62 @@ class SparseCrossOpTest(tf.test.TestCase):
       all_values_are_different = len(out.values) == len(set(out.values))
       self.assertTrue(all_values_are_different)
 
+  def test_multi_matches_single_crosses(self):
+    """Tests batched crosses are identical to crossing one by one.
+    """
+    inputs = [
+        self._sparse_tensor([['batch1-FC1-F1', 'batch1-FC1-F2'],
+                             ['batch2-FC1-F1']]),
+        tf.constant([[11, 12], [21, 22]], tf.int64),
+        self._sparse_tensor([['batch1-FC3-F1'], []]),
+        self._sparse_tensor([[3], [4, 5]]),
+    ]
+    crosses = [[0, 1], [1, 3, 0], [0, 2], [3, 0]]
+    num_buckets = [0, 100, 1000, 10]
+    hash_keys = [None, tf.contrib.layers.SPARSE_FEATURE_CROSS_DEFAULT_HASH_KEY,
+                 None, 123]
+    multi = tf.contrib.layers.sparse_feature_cross_multi(
+        inputs, crosses, num_buckets, hash_keys)
+    self.assertEqual(4, len(multi))
+    with self.test_session() as sess:
+      for cross, buckets, hash_key, crossed in zip(
+          crosses, num_buckets, hash_keys, multi):
+        single = tf.contrib.layers.sparse_feature_cross(
+            [inputs[i] for i in cross], hashed_output=True,
+            num_buckets=buckets, hash_key=hash_key)
+        self._assert_sparse_tensor_equals(single, sess.run(crossed))
+
+  def test_multi_hashed_output_zero_bucket(self):
+    """Tests the legacy and v2 hashes of the same cross in one op.
+    """
+    inputs = [
+        self._sparse_tensor([['batch1-FC1-F1']]),
+        self._sparse_tensor([['batch1-FC2-F1']]),
+        self._sparse_tensor([['batch1-FC3-F1']])
+    ]
+    v1, v2 = tf.contrib.layers.sparse_feature_cross_multi(
+        inputs, [[0, 1, 2], [0, 1, 2]], num_buckets=[0, 0],
+        hash_keys=[None,
+                   tf.contrib.layers.SPARSE_FEATURE_CROSS_DEFAULT_HASH_KEY])
+    # Check actual hashed output to prevent unintentional hashing changes.
+    with self.test_session() as sess:
+      self._assert_sparse_tensor_equals(
+          self._sparse_tensor([[3735511728867393167]]), sess.run(v1))
+      self._assert_sparse_tensor_equals(
+          self._sparse_tensor([[1971693436396284976]]), sess.run(v2))
+
+  def test_multi_invalid_args(self):
+    inputs = [self._sparse_tensor([['a']]), self._sparse_tensor([['b']])]
+    with self.assertRaisesRegexp(ValueError, 'same length'):
+      tf.contrib.layers.sparse_feature_cross_multi(
+          inputs, [[0, 1]], num_buckets=[10, 10])
+    with self.assertRaisesRegexp(ValueError, 'Invalid cross'):
+      tf.contrib.layers.sparse_feature_cross_multi(
+          inputs, [[0, 2]], num_buckets=[10])
+    with self.assertRaisesRegexp(ValueError, 'Invalid cross'):
+      tf.contrib.layers.sparse_feature_cross_multi(
+          inputs, [[]], num_buckets=[10])
+
   def _assert_sparse_tensor_empty(self, sp):
     self.assertEquals(0, sp.indices.size)
     self.assertEquals(0, sp.values.size)
@@ -456,5 +514,61 @@ class SparseCrossOpTest(tf.test.TestCase):
         tf.constant(values, value_type, [len(indices)]),
         tf.constant(shape, tf.int64))
 
+
+class SparseFeatureCrossBenchmark(tf.test.Benchmark):
+  """Throughput of 30 hashed crosses of 10 shared string features."""
+
+  def _inputs(self, batch_size=512, num_features=10, features_per_example=3):
+    inputs = []
+    for i in range(num_features):
+      indices = [[b, j] for b in range(batch_size)
+                 for j in range(features_per_example)]
+      values = ['f%d_%d' % (i, numpy.random.randint(1000))
+                for _ in range(len(indices))]
+      inputs.append(tf.SparseTensor(
+          tf.constant(indices, tf.int64), tf.constant(values),
+          tf.constant([batch_size, features_per_example], tf.int64)))
+    return inputs
+
+  def _crosses(self, num_features=10, num_crosses=30):
+    crosses = []
+    for i in range(num_crosses):
+      cross = [i % num_features, (i + 1 + i // num_features) % num_features]
+      if i % 3 == 0:
+        cross.append((i + 5) % num_features)
+      crosses.append(cross)
+    return crosses
+
+  def _run(self, name, batched, num_iters=50, batch_size=512):
+    with tf.Graph().as_default():
+      inputs = self._inputs(batch_size=batch_size)
+      crosses = self._crosses()
+      hash_key = tf.contrib.layers.SPARSE_FEATURE_CROSS_DEFAULT_HASH_KEY
+      if batched:
+        crossed = tf.contrib.layers.sparse_feature_cross_multi(
+            inputs, crosses, num_buckets=[10000] * len(crosses),
+            hash_keys=[hash_key] * len(crosses))
+      else:
+        crossed = [tf.contrib.layers.sparse_feature_cross(
+            [inputs[i] for i in cross], hashed_output=True,
+            num_buckets=10000, hash_key=hash_key) for cross in crosses]
+      fetches = [sp.values.op for sp in crossed]
+      with tf.Session() as sess:
+        sess.run(fetches)
+        start = time.time()
+        for _ in range(num_iters):
+          sess.run(fetches)
+        wall_time = (time.time() - start) / num_iters
+    self.report_benchmark(
+        name=name, iters=num_iters, wall_time=wall_time,
+        extras={'examples_per_sec': batch_size / wall_time})
+
+  def benchmarkIndividualCrosses(self):
+    self._run('individual_crosses', batched=False)
+
+  def benchmarkBatchedCrosses(self):
+    self._run('batched_crosses', batched=True)
+
+
 if __name__ == '__main__':
   tf.test.main()
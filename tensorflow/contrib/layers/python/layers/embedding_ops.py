@@ -20,20 +20,28 @@ from __future__ import print_function
 from tensorflow.contrib.framework.python.framework import tensor_util as contrib_tensor_util
 from tensorflow.contrib.layers.python.ops import sparse_feature_cross_op
 
+from tensorflow.python import summary
+from tensorflow.python.framework import constant_op
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
 from tensorflow.python.framework import sparse_tensor
 from tensorflow.python.framework import tensor_shape
 from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import control_flow_ops
+from tensorflow.python.ops import data_flow_ops
 from tensorflow.python.ops import embedding_ops
+from tensorflow.python.ops import gen_data_flow_ops
 from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import nn_ops
 from tensorflow.python.ops import sparse_ops
+from tensorflow.python.ops import state_ops
 from tensorflow.python.ops import variables
 from tensorflow.python.platform import tf_logging as logging
 
 __all__ = [
     "safe_embedding_lookup_sparse", "scattered_embedding_lookup",
-    "scattered_embedding_lookup_sparse", "embedding_lookup_unique"
+    "scattered_embedding_lookup_sparse", "embedding_lookup_unique",
+    "EmbeddingCache"
 ]
 
 
@@ -391,3 +399,378 @@ def embedding_lookup_unique(params, ids, name=None):
     embeds.set_shape(ids.get_shape().concatenate(
         unique_embeddings.get_shape()[1:]))
     return embeds
+
+
+@ops.RegisterGradient("EmbeddingCacheAnchor")
+def _EmbeddingCacheAnchorGrad(unused_op, grad):
+  """Passes the gradient of the cache hits on to the gathered rows."""
+  return [grad, None, None]
+
+
+@ops.RegisterGradient("EmbeddingCacheHits")
+def _EmbeddingCacheHitsGrad(op, grad):
+  """Gradient for the `ConcatV2` anchoring cache hits to their partitions.
+
+  The inputs are laid out as built by `EmbeddingCache.lookup`: for each
+  partition, the hits of the partition read from the cache followed by the
+  empty anchor of the partition. Both receive the gradient of the hits, so
+  that it reaches the rows gathered by the anchor and training updates the
+  parameters of cached rows like those of fetched ones.
+
+  Args:
+    op: The `ConcatV2` operation.
+    grad: The gradient with respect to the concatenated hits.
+
+  Returns:
+    The gradients with respect to the inputs of `op`.
+  """
+  values = op.inputs[:-1]
+  grads = []
+  offset = constant_op.constant(0)
+  for hits in values[::2]:
+    size = array_ops.shape(hits)[0]
+    hits_grad = array_ops.gather(grad, math_ops.range(offset, offset + size))
+    grads.extend([hits_grad, hits_grad])
+    offset += size
+  return grads + [None]
+
+
+class EmbeddingCache(object):
+  """Worker-local cache of the most frequently looked-up embedding rows.
+
+  `lookup` serves ids found in the cache from worker-local variables and
+  fetches only the misses from the (typically remote) embedding partitions
+  with `embedding_lookup`. Rows fetched more than `max_staleness_steps` lookups
+  ago are fetched again. Misses replace the cached rows with the lowest score:
+  the access count, decayed by `lfu_decay` every lookup, for `"lfu"`, or the
+  step of the last access for `"lru"`. Under `"lfu"`, a miss is only admitted
+  if it was looked up more often in the batch than the score of the row it
+  replaces.
+
+  The gradient of cached rows flows to the embedding partitions exactly as for
+  fetched rows, so the cache can be used for training: it only trades the
+  freshness of the forward values for less network traffic.
+
+  The cache variables are local variables: they are not saved in checkpoints
+  and must be initialized with `tf.local_variables_initializer()`. They are
+  created on `cache_device`, regardless of the enclosing device scope, since
+  e.g. `replica_device_setter` would otherwise place them on the ps.
+
+  Example usage:
+
+  ```python
+  embeddings = tf.get_variable("embeddings", [vocab_size, dim],
+                               partitioner=partitioner)
+  cache = tf.contrib.layers.EmbeddingCache(
+      embeddings, capacity=10000, max_staleness_steps=50,
+      cache_device="/job:worker/task:%d" % task_index)
+  net = cache.lookup(ids)
+  cache.summary()
+  ```
+  """
+
+  def __init__(self,
+               params,
+               capacity,
+               max_staleness_steps=100,
+               eviction_policy="lfu",
+               lfu_decay=0.99,
+               partition_strategy="mod",
+               cache_device=None,
+               name=None):
+    """Creates the cache variables.
+
+    Args:
+      params: A list of variables or tensors, or a `PartitionedVariable`, as
+        accepted by `embedding_lookup`. The shape of the rows must be fully
+        defined.
+      capacity: Number of rows to cache.
+      max_staleness_steps: Maximum number of lookups a cached row is used for
+        before it is fetched again. 0 fetches every row on every lookup.
+      eviction_policy: `"lfu"` (least frequently used) or `"lru"` (least
+        recently used).
+      lfu_decay: Factor applied to the access counts on every lookup under
+        `"lfu"`, so that rows which are no longer accessed can be evicted.
+      partition_strategy: The partition strategy of `params`, see
+        `embedding_lookup`.
+      cache_device: The device holding the cache, typically the local worker.
+        If `None`, enclosing device scopes are ignored and the cache is placed
+        on the device of the session's master.
+      name: A name for the variable scope of the cache (optional).
+
+    Raises:
+      ValueError: If an argument is invalid, or the shape of the rows of
+        `params` is not fully defined.
+    """
+    if capacity < 1:
+      raise ValueError("capacity must be positive, got %d." % capacity)
+    if max_staleness_steps < 0:
+      raise ValueError("max_staleness_steps must not be negative, got %d." %
+                       max_staleness_steps)
+    if eviction_policy not in ("lfu", "lru"):
+      raise ValueError("eviction_policy must be 'lfu' or 'lru', got %s." %
+                       eviction_policy)
+    if isinstance(params, variables.PartitionedVariable):
+      params = list(params)
+    if not isinstance(params, list):
+      params = [params]
+    row_shape = params[0].get_shape()[1:]
+    for p in params[1:]:
+      row_shape = row_shape.merge_with(p.get_shape()[1:])
+    if not row_shape.is_fully_defined():
+      raise ValueError("The shape of the rows of params must be fully "
+                       "defined, got %s." % row_shape)
+    self._params = params
+    self._capacity = capacity
+    self._max_staleness_steps = max_staleness_steps
+    self._eviction_policy = eviction_policy
+    self._lfu_decay = lfu_decay
+    self._partition_strategy = partition_strategy
+    self._cache_device = cache_device
+    dtype = params[0].dtype.base_dtype
+
+    def _local_variable(initial_value, var_name):
+      return variables.Variable(
+          initial_value, trainable=False, name=var_name,
+          collections=[ops.GraphKeys.LOCAL_VARIABLES])
+
+    with ops.name_scope(name, "embedding_cache", params) as scope:
+      self._name = scope
+      with ops.device(cache_device):
+        self._ids = _local_variable(
+            array_ops.fill([capacity], constant_op.constant(-1, dtypes.int64)),
+            "ids")
+        self._values = _local_variable(
+            array_ops.zeros([capacity] + row_shape.as_list(), dtype=dtype),
+            "values")
+        self._fetch_steps = _local_variable(
+            array_ops.zeros([capacity], dtype=dtypes.int64), "fetch_steps")
+        # -1 marks empty rows, which are always evicted first.
+        self._scores = _local_variable(
+            -array_ops.ones([capacity], dtype=dtypes.float32), "scores")
+        self._step = _local_variable(
+            constant_op.constant(0, dtypes.int64), "step")
+        self._num_lookups = _local_variable(
+            constant_op.constant(0, dtypes.int64), "num_lookups")
+        self._num_hits = _local_variable(
+            constant_op.constant(0, dtypes.int64), "num_hits")
+        # Maps ids to rows of the cache. Evicted ids are only removed when the
+        # table is rebuilt from `self._ids` (see `_update`), so a row is only
+        # valid if `self._ids` still holds the id.
+        # pylint: disable=protected-access
+        self._slots = gen_data_flow_ops._mutable_hash_table(
+            key_dtype=dtypes.int64, value_dtype=dtypes.int64, name="slots")
+        # pylint: enable=protected-access
+
+  @property
+  def num_lookups(self):
+    """A local variable counting the distinct ids looked up in each batch."""
+    return self._num_lookups
+
+  @property
+  def num_hits(self):
+    """A local variable counting the distinct ids served from the cache."""
+    return self._num_hits
+
+  def hit_rate(self):
+    """Returns the fraction of looked-up ids served from the cache."""
+    return math_ops.truediv(self._num_hits,
+                            math_ops.maximum(self._num_lookups, 1))
+
+  def summary(self, name=None):
+    """Adds a scalar summary of the hit rate and returns it."""
+    return summary.scalar(name or self._name + "hit_rate", self.hit_rate())
+
+  def lookup(self, ids, name=None):
+    """Looks up `ids`, fetching only the rows missing from the cache.
+
+    Every call updates the cache, so each training step should call the
+    returned tensor exactly once.
+
+    Args:
+      ids: A `Tensor` of `int32` or `int64` ids.
+      name: A name for the operation (optional).
+
+    Returns:
+      A `Tensor` of shape `shape(ids) + shape(params)[1:]`.
+    """
+    with ops.name_scope(name, "embedding_cache_lookup", [ids]) as name:
+      ids = ops.convert_to_tensor(ids, name="ids")
+      unique_ids, idx = array_ops.unique(
+          math_ops.to_int64(array_ops.reshape(ids, [-1])))
+      params = ops.convert_n_to_tensor_or_indexed_slices(self._params)
+
+      with ops.device(self._cache_device):
+        # pylint: disable=protected-access
+        slots = gen_data_flow_ops._lookup_table_find(
+            self._slots, unique_ids, constant_op.constant(-1, dtypes.int64))
+        # pylint: enable=protected-access
+        valid_slots = math_ops.maximum(slots, 0)
+        present = math_ops.logical_and(
+            slots >= 0,
+            math_ops.equal(array_ops.gather(self._ids, valid_slots),
+                           unique_ids))
+        age = self._step - array_ops.gather(self._fetch_steps, valid_slots)
+        hit = math_ops.logical_and(present, age <= self._max_staleness_steps)
+        hit_pos = math_ops.to_int32(array_ops.reshape(
+            array_ops.where(hit), [-1]))
+        miss_pos = math_ops.to_int32(array_ops.reshape(
+            array_ops.where(math_ops.logical_not(hit)), [-1]))
+        hit_slots = array_ops.gather(slots, hit_pos)
+
+      miss_ids = array_ops.gather(unique_ids, miss_pos)
+      miss_values = embedding_ops.embedding_lookup(
+          params, miss_ids, partition_strategy=self._partition_strategy)
+
+      # Anchor the hits to their partitions, so that their gradient reaches
+      # the parameters. The anchors gather the hit rows next to the
+      # partitions and slice them to empty tensors, so they do not transfer
+      # any rows.
+      # pylint: disable=protected-access
+      p_assignments, local_ids = embedding_ops._partition_ids(
+          params, array_ops.gather(unique_ids, hit_pos),
+          self._partition_strategy)
+      # pylint: enable=protected-access
+      p_assignments = math_ops.to_int32(p_assignments)
+      hit_pos_parts = data_flow_ops.dynamic_partition(
+          hit_pos, p_assignments, len(params))
+      local_ids_parts = data_flow_ops.dynamic_partition(
+          local_ids, p_assignments, len(params))
+      with ops.device(self._cache_device):
+        hit_values_parts = [
+            array_ops.gather(self._values, hit_slots_part)
+            for hit_slots_part in data_flow_ops.dynamic_partition(
+                hit_slots, p_assignments, len(params))]
+      hits = []
+      graph = ops.get_default_graph()
+      for p, hit_values_part, local_ids_part in zip(
+          params, hit_values_parts, local_ids_parts):
+        rank = p.get_shape().ndims
+        with ops.colocate_with(p):
+          with graph.gradient_override_map({"Slice": "EmbeddingCacheAnchor"}):
+            anchor = array_ops.slice(array_ops.gather(p, local_ids_part),
+                                     [0] * rank, [0] + [-1] * (rank - 1))
+        hits.extend([hit_values_part, anchor])
+      with graph.gradient_override_map({"ConcatV2": "EmbeddingCacheHits"}):
+        hit_values = array_ops.concat_v2(hits, 0)
+
+      unique_values = data_flow_ops.dynamic_stitch(
+          [miss_pos, array_ops.concat_v2(hit_pos_parts, 0)],
+          [miss_values, hit_values])
+
+      with ops.device(self._cache_device):
+        update = self._update(unique_ids, idx, slots, present, hit_pos,
+                              miss_pos, hit_slots, miss_values,
+                              hit_values_parts)
+
+      with graph.gradient_override_map(
+          {"Gather": "EmbeddingLookupUniqueGather"}):
+        ret = array_ops.gather(unique_values, idx)
+      ret = control_flow_ops.with_dependencies([update], ret)
+      ret = array_ops.reshape(
+          ret,
+          array_ops.concat_v2([array_ops.shape(ids),
+                               array_ops.shape(unique_values)[1:]], 0),
+          name=name)
+      ret.set_shape(ids.get_shape().concatenate(
+          unique_values.get_shape()[1:]))
+      return ret
+
+  def _update(self, unique_ids, idx, slots, present, hit_pos, miss_pos,
+              hit_slots, miss_values, hit_values_parts):
+    """Returns an op updating the cache after a lookup."""
+    step = self._step.value()
+    counts = math_ops.unsorted_segment_sum(
+        array_ops.ones_like(idx, dtype=dtypes.float32), idx,
+        array_ops.size(unique_ids))
+    # Update the cache only after it has been read.
+    with ops.control_dependencies([slots] + hit_values_parts):
+      if self._eviction_policy == "lfu":
+        decayed = state_ops.assign(self._scores,
+                                   self._scores * self._lfu_decay)
+        with ops.control_dependencies([decayed]):
+          scores = state_ops.scatter_add(
+              self._scores, hit_slots, array_ops.gather(counts, hit_pos))
+      else:
+        scores = state_ops.scatter_update(
+            self._scores, hit_slots,
+            array_ops.fill(array_ops.shape(hit_slots),
+                           math_ops.to_float(step)))
+
+      # Refresh the stale rows in place.
+      miss_slots = array_ops.gather(slots, miss_pos)
+      stale = array_ops.reshape(
+          array_ops.where(array_ops.gather(present, miss_pos)), [-1])
+      stale_slots = array_ops.gather(miss_slots, stale)
+      refreshed = [
+          state_ops.scatter_update(self._values, stale_slots,
+                                   array_ops.gather(miss_values, stale)),
+          state_ops.scatter_update(
+              self._fetch_steps, stale_slots,
+              array_ops.fill(array_ops.shape(stale_slots), step))]
+
+    # Replace the lowest-scored rows with the most frequent new ids.
+    with ops.control_dependencies(refreshed):
+      new = array_ops.reshape(array_ops.where(math_ops.logical_not(
+          array_ops.gather(present, miss_pos))), [-1])
+      new_counts = array_ops.gather(counts, array_ops.gather(miss_pos, new))
+      num_new = math_ops.minimum(array_ops.size(new), self._capacity)
+      new_counts, top_new = nn_ops.top_k(new_counts, num_new)
+      top_new = array_ops.gather(new, top_new)
+      negated_scores, victims = nn_ops.top_k(-scores, num_new)
+      if self._eviction_policy == "lfu":
+        admitted = array_ops.reshape(
+            array_ops.where(new_counts > -negated_scores), [-1])
+        new_scores = array_ops.gather(new_counts, admitted)
+      else:
+        admitted = math_ops.to_int64(math_ops.range(num_new))
+        new_scores = array_ops.fill(array_ops.shape(admitted),
+                                    math_ops.to_float(step))
+      victims = math_ops.to_int64(array_ops.gather(victims, admitted))
+      admitted = array_ops.gather(top_new, admitted)
+      admitted_ids = array_ops.gather(
+          unique_ids, array_ops.gather(miss_pos, admitted))
+      # pylint: disable=protected-access
+      inserted = gen_data_flow_ops._lookup_table_insert(
+          self._slots, admitted_ids, victims)
+      # pylint: enable=protected-access
+      admitted_updates = [
+          inserted,
+          state_ops.scatter_update(self._ids, victims, admitted_ids),
+          state_ops.scatter_update(self._values, victims,
+                                   array_ops.gather(miss_values, admitted)),
+          state_ops.scatter_update(
+              self._fetch_steps, victims,
+              array_ops.fill(array_ops.shape(victims), step)),
+          state_ops.scatter_update(self._scores, victims, new_scores)]
+
+    # Evicted ids are left in the slot table, so rebuild it from the ids of the
+    # cached rows whenever it grows to twice the capacity. Importing replaces
+    # the content of the table, which bounds its size at an amortized cost of
+    # O(1) per admitted id.
+    with ops.control_dependencies(admitted_updates):
+      cached_ids = array_ops.identity(self._ids)
+      # pylint: disable=protected-access
+      table_size = gen_data_flow_ops._lookup_table_size(self._slots)
+      # pylint: enable=protected-access
+
+    def _rebuild_slots():
+      cached = array_ops.reshape(array_ops.where(cached_ids >= 0), [-1])
+      # pylint: disable=protected-access
+      imported = gen_data_flow_ops._lookup_table_import(
+          self._slots, array_ops.gather(cached_ids, cached), cached)
+      # pylint: enable=protected-access
+      return control_flow_ops.with_dependencies(
+          [imported], constant_op.constant(True))
+
+    pruned = control_flow_ops.cond(
+        table_size > 2 * self._capacity, _rebuild_slots,
+        lambda: constant_op.constant(False))
+
+    with ops.control_dependencies(admitted_updates + [pruned]):
+      return control_flow_ops.group(
+          state_ops.assign_add(self._step, 1),
+          state_ops.assign_add(self._num_lookups, math_ops.to_int64(
+              array_ops.size(unique_ids))),
+          state_ops.assign_add(self._num_hits, math_ops.to_int64(
+              array_ops.size(hit_pos))))
@@ -23,8 +23,11 @@ import itertools
 import math
 
 import numpy as np
+import portpicker
 import tensorflow as tf
 
+from tensorflow.python.ops import gen_data_flow_ops
+
 
 class SafeEmbeddingLookupSparseTest(tf.test.TestCase):
 
@@ -394,5 +397,139 @@ class ScatteredEmbeddingLookupTest(tf.test.TestCase):
     np.testing.assert_almost_equal(embedded_np2d, embedded_tf2d)
 
 
+class EmbeddingCacheTest(tf.test.TestCase):
+
+  def _params(self, vocab_size=10, dim=3, num_shards=2):
+    values = np.random.randn(vocab_size, dim).astype(np.float32)
+    params = [tf.Variable(values[i::num_shards]) for i in range(num_shards)]
+    return params, values
+
+  def test_lookup(self):
+    np.random.seed(0)
+    with self.test_session() as sess:
+      params, values = self._params()
+      cache = tf.contrib.layers.EmbeddingCache(params, capacity=4)
+      ids = tf.placeholder(tf.int64, [None, 2])
+      embedded = cache.lookup(ids)
+      self.assertEqual([None, 2, 3], embedded.get_shape().as_list())
+      sess.run([tf.global_variables_initializer(),
+                tf.local_variables_initializer()])
+      for id_vals in [[[1, 2], [1, 3]], [[1, 2], [4, 1]], [[5, 1], [2, 2]]]:
+        self.assertAllClose(values[id_vals],
+                            sess.run(embedded, {ids: id_vals}))
+      # Ids 1 and 2 are cached after the first lookup.
+      self.assertEqual(9, cache.num_lookups.eval())
+      self.assertEqual(4, cache.num_hits.eval())
+      self.assertAllClose(4.0 / 9, cache.hit_rate().eval())
+
+  def test_staleness(self):
+    with self.test_session() as sess:
+      params = [tf.Variable([[0.0], [1.0]])]
+      cache = tf.contrib.layers.EmbeddingCache(
+          params, capacity=2, max_staleness_steps=1)
+      embedded = cache.lookup(tf.constant([1]))
+      assign = params[0].assign([[0.0], [2.0]])
+      sess.run([tf.global_variables_initializer(),
+                tf.local_variables_initializer()])
+      self.assertAllClose([[1.0]], embedded.eval())
+      assign.eval()
+      # Served from the cache, then fetched again.
+      self.assertAllClose([[1.0]], embedded.eval())
+      self.assertAllClose([[2.0]], embedded.eval())
+      self.assertEqual(1, cache.num_hits.eval())
+
+  def test_lru_eviction(self):
+    with self.test_session() as sess:
+      params, values = self._params()
+      cache = tf.contrib.layers.EmbeddingCache(
+          params, capacity=2, eviction_policy="lru")
+      ids = tf.placeholder(tf.int64, [None])
+      embedded = cache.lookup(ids)
+      sess.run([tf.global_variables_initializer(),
+                tf.local_variables_initializer()])
+      for id_vals in [[1, 2], [1], [3], [1, 3, 2]]:
+        self.assertAllClose(values[id_vals],
+                            sess.run(embedded, {ids: id_vals}))
+      # 2 was least recently used when 3 was admitted.
+      self.assertEqual(3, cache.num_hits.eval())
+
+  def test_slot_table_is_pruned(self):
+    with self.test_session() as sess:
+      params, values = self._params(vocab_size=20)
+      cache = tf.contrib.layers.EmbeddingCache(
+          params, capacity=2, eviction_policy="lru")
+      ids = tf.placeholder(tf.int64, [None])
+      embedded = cache.lookup(ids)
+      # pylint: disable=protected-access
+      table_size = gen_data_flow_ops._lookup_table_size(cache._slots)
+      # pylint: enable=protected-access
+      sess.run([tf.global_variables_initializer(),
+                tf.local_variables_initializer()])
+      for i in range(20):
+        self.assertAllClose(values[[i, 0]],
+                            sess.run(embedded, {ids: [i, 0]}))
+        self.assertLessEqual(table_size.eval(), 4)
+      # 0 stays cached across the rebuilds of the table.
+      self.assertEqual(19, cache.num_hits.eval())
+
+  def test_gradients(self):
+    np.random.seed(0)
+    with self.test_session() as sess:
+      params, _ = self._params(num_shards=3)
+      cache = tf.contrib.layers.EmbeddingCache(params, capacity=4)
+      ids = tf.constant([1, 2, 2, 7, 1])
+      weights = tf.constant(np.random.randn(5, 3).astype(np.float32))
+      cached = tf.reduce_sum(cache.lookup(ids) * weights)
+      direct = tf.reduce_sum(tf.nn.embedding_lookup(params, ids) * weights)
+      cached_grads = [tf.convert_to_tensor(g)
+                      for g in tf.gradients(cached, params)]
+      direct_grads = [tf.convert_to_tensor(g)
+                      for g in tf.gradients(direct, params)]
+      sess.run([tf.global_variables_initializer(),
+                tf.local_variables_initializer()])
+      sess.run(cached)
+      # All ids are now served from the cache.
+      direct_grad_vals, cached_grad_vals, _ = sess.run(
+          [direct_grads, cached_grads, cached])
+      self.assertEqual(3, cache.num_hits.eval())
+      self.assertAllClose(direct_grad_vals, cached_grad_vals)
+
+  def test_invalid_args(self):
+    params = [tf.Variable(tf.zeros([4, 2]))]
+    with self.assertRaisesRegexp(ValueError, "capacity"):
+      tf.contrib.layers.EmbeddingCache(params, capacity=0)
+    with self.assertRaisesRegexp(ValueError, "eviction_policy"):
+      tf.contrib.layers.EmbeddingCache(params, capacity=1,
+                                       eviction_policy="fifo")
+    with self.assertRaisesRegexp(ValueError, "fully defined"):
+      tf.contrib.layers.EmbeddingCache(
+          [tf.placeholder(tf.float32, [4, None])], capacity=1)
+
+  def test_in_process_cluster(self):
+    ports = [portpicker.pick_unused_port() for _ in range(2)]
+    cluster = tf.train.ClusterSpec({"ps": ["localhost:%d" % ports[0]],
+                                    "worker": ["localhost:%d" % ports[1]]})
+    servers = [tf.train.Server(cluster, job_name=job_name, task_index=0)
+               for job_name in ["ps", "worker"]]
+    values = np.random.randn(10, 3).astype(np.float32)
+    with tf.Graph().as_default():
+      with tf.device(tf.train.replica_device_setter(cluster=cluster)):
+        params = [tf.Variable(values[i::2]) for i in range(2)]
+        cache = tf.contrib.layers.EmbeddingCache(
+            params, capacity=4, cache_device="/job:worker/task:0")
+        ids = tf.placeholder(tf.int64, [None])
+        embedded = cache.lookup(ids)
+      self.assertDeviceEqual("/job:ps/task:0", params[0].device)
+      self.assertDeviceEqual("/job:worker/task:0",
+                             cache.num_lookups.device)
+      with tf.Session(servers[1].target) as sess:
+        sess.run([tf.global_variables_initializer(),
+                  tf.local_variables_initializer()])
+        for id_vals in [[1, 2, 3], [2, 3], [3, 9]]:
+          self.assertAllClose(values[id_vals],
+                              sess.run(embedded, {ids: id_vals}))
+        self.assertEqual(3, sess.run(cache.num_hits))
+
+
 if __name__ == "__main__":
   tf.test.main()
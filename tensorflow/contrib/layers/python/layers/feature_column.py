@@ -171,6 +171,27 @@ class _DeepEmbeddingLookupArguments(
   pass
 
 
+class _DerivedTensorKey(
+    collections.namedtuple("_DerivedTensorKey", ["source", "transformation"])):
+  """Key of an intermediate tensor shared by several column transformations.
+
+  Some transformations need the same intermediate tensor, e.g. every cross of a
+  bucketized column needs the bucketized ids as a `SparseTensor`. Such tensors
+  are stored in `columns_to_tensors` under a `_DerivedTensorKey` of their
+  source (a feature name or column) and the transformation applied to it, so
+  that they are built once per `columns_to_tensors`.
+  """
+  pass
+
+
+def _get_derived_tensor(columns_to_tensors, source, transformation, build_fn):
+  """Returns the derived tensor for `source`, calling `build_fn` if needed."""
+  key = _DerivedTensorKey(source, transformation)
+  if key not in columns_to_tensors:
+    columns_to_tensors[key] = build_fn()
+  return columns_to_tensors[key]
+
+
 class _FeatureColumn(object):
   """Represents a feature column abstraction.
 
@@ -414,8 +435,11 @@ class _SparseColumn(_FeatureColumn,
         ignore_value = ""
       else:
         ignore_value = -1
-      input_tensor = contrib_sparse_ops.dense_to_sparse_tensor(
-          input_tensor, ignore_value=ignore_value)
+      dense_tensor = input_tensor
+      input_tensor = _get_derived_tensor(
+          columns_to_tensors, self.name, "dense_to_sparse",
+          lambda: contrib_sparse_ops.dense_to_sparse_tensor(
+              dense_tensor, ignore_value=ignore_value))
 
     return input_tensor
 
@@ -662,7 +686,11 @@ class _WeightedSparseColumn(_FeatureColumn, collections.namedtuple(
     weight_tensor = columns_to_tensors[self.weight_column_name]
     if not isinstance(weight_tensor, sparse_tensor_py.SparseTensor):
       # The weight tensor can be a regular Tensor. In such case, sparsify it.
-      weight_tensor = contrib_sparse_ops.dense_to_sparse_tensor(weight_tensor)
+      dense_weight_tensor = weight_tensor
+      weight_tensor = _get_derived_tensor(
+          columns_to_tensors, self.weight_column_name, "sparse_weights",
+          lambda: contrib_sparse_ops.dense_to_sparse_tensor(
+              dense_weight_tensor))
     columns_to_tensors[self] = tuple([
         columns_to_tensors[self.sparse_id_column],
         weight_tensor
@@ -1719,8 +1747,8 @@ class _CrossedColumn(_FeatureColumn,
     """Returns the weight tensor from the given transformed input_tensor."""
     return None
 
-  def insert_transformed_feature(self, columns_to_tensors):
-    """Handles cross transformation."""
+  def _get_cross_input_tensors(self, columns_to_tensors):
+    """Returns the tensors of the base columns crossed by this column."""
 
     def _collect_leaf_level_columns(cross):
       """Collects base columns contained in the cross."""
@@ -1740,11 +1768,17 @@ class _CrossedColumn(_FeatureColumn,
         if c not in columns_to_tensors:
           c.insert_transformed_feature(columns_to_tensors)
         if isinstance(c, _BucketizedColumn):
-          feature_tensors.append(c.to_sparse_tensor(columns_to_tensors[c]))
+          feature_tensors.append(_get_derived_tensor(
+              columns_to_tensors, c, "to_sparse_tensor",
+              lambda c=c: c.to_sparse_tensor(columns_to_tensors[c])))
         else:
           feature_tensors.append(columns_to_tensors[c])
+    return feature_tensors
+
+  def insert_transformed_feature(self, columns_to_tensors):
+    """Handles cross transformation."""
     columns_to_tensors[self] = sparse_feature_cross_op.sparse_feature_cross(
-        feature_tensors,
+        self._get_cross_input_tensors(columns_to_tensors),
         hashed_output=True,
         num_buckets=self.hash_bucket_size,
         hash_key=self.hash_key,
@@ -1773,6 +1807,45 @@ class _CrossedColumn(_FeatureColumn,
         combiner=self.combiner)
 
 
+def _insert_transformed_crosses(crossed_columns, columns_to_tensors):
+  """Transforms several `_CrossedColumn`s with a single batched cross op.
+
+  Produces the same crosses as transforming each column on its own, but base
+  features shared by several crosses are fingerprinted only once. Columns
+  already in `columns_to_tensors` are skipped.
+
+  Args:
+    crossed_columns: An iterable of `_CrossedColumn`s.
+    columns_to_tensors: A mapping from feature columns to tensors. The crosses
+      are inserted into it.
+  """
+  crossed_columns = [column for column in crossed_columns
+                     if column not in columns_to_tensors]
+  if not crossed_columns:
+    return
+  inputs = []
+  input_positions = {}
+  crosses = []
+  # pylint: disable=protected-access
+  for column in crossed_columns:
+    cross = []
+    for tensor in column._get_cross_input_tensors(columns_to_tensors):
+      if id(tensor) not in input_positions:
+        input_positions[id(tensor)] = len(inputs)
+        inputs.append(tensor)
+      cross.append(input_positions[id(tensor)])
+    crosses.append(cross)
+  # pylint: enable=protected-access
+  crossed_tensors = sparse_feature_cross_op.sparse_feature_cross_multi(
+      inputs,
+      crosses,
+      num_buckets=[column.hash_bucket_size for column in crossed_columns],
+      hash_keys=[column.hash_key for column in crossed_columns],
+      name="crosses")
+  for column, crossed_tensor in zip(crossed_columns, crossed_tensors):
+    columns_to_tensors[column] = crossed_tensor
+
+
 def crossed_column(columns, hash_bucket_size, combiner=None,
                    ckpt_to_load_from=None,
                    tensor_name_in_ckpt=None,
@@ -1899,7 +1972,7 @@ def _get_feature_config(feature_column):
                   "Given column is {}".format(feature_column))
 
 
-def create_feature_spec_for_parsing(feature_columns):
+def create_feature_spec_for_parsing(feature_columns, compiled=False):
   """Helper that prepares features config from input feature_columns.
 
   The returned feature config can be used as arg 'features' in tf.parse_example.
@@ -1933,8 +2006,12 @@ def create_feature_spec_for_parsing(feature_columns):
       should be instances of classes derived from _FeatureColumn, unless
       feature_columns is a dict -- in which case, this should be true of all
       values in the dict.
+    compiled: If `True`, returns a `tf.CompiledFeatureSpec`, which is validated
+      once and parsed faster by `tf.parse_example` and `read_batch_features`
+      when it is used repeatedly, e.g. for wide models with many columns.
   Returns:
-    A dict mapping feature keys to FixedLenFeature or VarLenFeature values.
+    A dict mapping feature keys to FixedLenFeature or VarLenFeature values, or
+    a `CompiledFeatureSpec` of them if `compiled` is `True`.
   """
   if isinstance(feature_columns, dict):
     feature_columns = feature_columns.values()
@@ -1942,6 +2019,8 @@ def create_feature_spec_for_parsing(feature_columns):
   features_config = {}
   for column in feature_columns:
     features_config.update(_get_feature_config(column))
+  if compiled:
+    return parsing_ops.CompiledFeatureSpec(features_config)
   return features_config
 
 
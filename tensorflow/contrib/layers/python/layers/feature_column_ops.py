@@ -150,6 +150,8 @@ def _input_from_feature_columns(columns_to_tensors,
                                      values=columns_to_tensors.values()):
     output_tensors = []
     transformer = _Transformer(columns_to_tensors)
+    transformer.transform_all(feature_columns)
+    _remove_derived_tensors(columns_to_tensors)
     if weight_collections:
       weight_collections = list(set(list(weight_collections) +
                                     [ops.GraphKeys.GLOBAL_VARIABLES]))
@@ -436,6 +438,8 @@ def joint_weighted_sum_from_feature_columns(columns_to_tensors,
       default_name='joint_weighted_sum_from_feature_columns',
       values=columns_to_tensors.values()):
     transformer = _Transformer(columns_to_tensors)
+    transformer.transform_all(feature_columns)
+    _remove_derived_tensors(columns_to_tensors)
     embedding_lookup_arguments = []
     for column in sorted(set(feature_columns), key=lambda x: x.key):
       transformed_tensor = transformer.transform(column)
@@ -525,6 +529,8 @@ def weighted_sum_from_feature_columns(columns_to_tensors,
     output_tensors = []
     column_to_variable = dict()
     transformer = _Transformer(columns_to_tensors)
+    transformer.transform_all(feature_columns)
+    _remove_derived_tensors(columns_to_tensors)
     # pylint: disable=protected-access
     for column in sorted(set(feature_columns), key=lambda x: x.key):
       transformed_tensor = transformer.transform(column)
@@ -631,13 +637,12 @@ def parse_feature_columns_from_examples(serialized,
       name=name,
       example_names=example_names)
 
-  transformer = _Transformer(columns_to_tensors)
-  for column in sorted(set(feature_columns), key=lambda x: x.key):
-    transformer.transform(column)
+  _Transformer(columns_to_tensors).transform_all(feature_columns)
+  _remove_derived_tensors(columns_to_tensors)
   return columns_to_tensors
 
 
-def transform_features(features, feature_columns):
+def transform_features(features, feature_columns, batch_crosses=False):
   """Returns transformed features based on features columns passed in.
 
   Example:
@@ -676,15 +681,18 @@ def transform_features(features, feature_columns):
     features: A dictionary of features.
     feature_columns: An iterable containing all the feature columns. All items
       should be instances of classes derived from _FeatureColumn.
+    batch_crosses: If True, all crossed columns are computed by a single
+      `SparseFeatureCrossMulti` op, which fingerprints base features shared by
+      several crosses once. The crosses are the same, but the graph needs the
+      op to be available wherever it runs.
 
   Returns:
     A `dict` mapping FeatureColumn to `Tensor` and `SparseTensor` values.
   """
   check_feature_columns(feature_columns)
   columns_to_tensor = features.copy()
-  transformer = _Transformer(columns_to_tensor)
-  for column in sorted(set(feature_columns), key=lambda x: x.key):
-    transformer.transform(column)
+  _Transformer(columns_to_tensor).transform_all(feature_columns,
+                                                batch_crosses=batch_crosses)
   keys = list(columns_to_tensor.keys())
   for k in keys:
     if k not in feature_columns:
@@ -880,6 +888,45 @@ class _Transformer(object):
 
     return self._columns_to_tensors[feature_column]
 
+  def transform_all(self, feature_columns, batch_crosses=False):
+    """Transforms `feature_columns` and every column they are built from.
+
+    Plans the transformations of all `feature_columns` as one DAG (see
+    `_plan_transformations`) and builds it parents first. Every column, and
+    every intermediate tensor shared between columns (e.g. the sparse form of a
+    bucketized column crossed with several others), is built exactly once,
+    however many of `feature_columns` depend on it.
+
+    Args:
+      feature_columns: An iterable of `FeatureColumn`s.
+      batch_crosses: If True, all crossed columns are computed by one batched
+        `SparseFeatureCrossMulti` op, which fingerprints shared bases once.
+        Otherwise each crossed column gets its own `SparseFeatureCross` op.
+
+    Returns:
+      A `dict` mapping each of `feature_columns` to its transformed tensor.
+
+    Raises:
+      ValueError: if a FeatureColumn cannot be handled by this Transformer.
+    """
+    plan = _plan_transformations(feature_columns, self._columns_to_tensors)
+    # pylint: disable=protected-access
+    crossed_columns = [column for column in plan
+                       if isinstance(column, fc._CrossedColumn)]
+    if batch_crosses and len(crossed_columns) > 1:
+      # Crosses only read base columns, so once those are transformed all the
+      # crosses can be built by a single batched op.
+      for column in _plan_transformations(crossed_columns,
+                                          self._columns_to_tensors):
+        if not isinstance(column, fc._CrossedColumn):
+          self.transform(column)
+      fc._insert_transformed_crosses(crossed_columns, self._columns_to_tensors)
+    # pylint: enable=protected-access
+    for column in plan:
+      self.transform(column)
+    return dict((column, self._columns_to_tensors[column])
+                for column in feature_columns)
+
 
 def _add_variable_collection(weight_collections):
   if weight_collections:
@@ -943,3 +990,66 @@ def _check_forbidden_sequence_columns(feature_columns):
           'Column {} is of type {}, which is not currently supported for '
           'sequences.'.format(feature_column.name,
                               type(feature_column).__name__))
+
+
+def _get_transformation_inputs(feature_column):
+  """Returns the columns whose transformations `feature_column` reads."""
+  if isinstance(feature_column, (fc._WeightedSparseColumn,
+                                 fc._OneHotColumn,
+                                 fc._EmbeddingColumn,)):
+    return (feature_column.sparse_id_column,)
+  if isinstance(feature_column, (fc._BucketizedColumn,)):
+    return (feature_column.source_column,)
+  if isinstance(feature_column, (fc._CrossedColumn,)):
+    # Crosses read sparse columns from their raw features and flatten nested
+    # crosses, so only the other leaves are transformed before the cross.
+    inputs = []
+    for column in feature_column.columns:
+      if isinstance(column, fc._CrossedColumn):
+        inputs.extend(_get_transformation_inputs(column))
+      elif not isinstance(column, fc._SparseColumn):
+        inputs.append(column)
+    return tuple(inputs)
+  return tuple()
+
+
+def _plan_transformations(feature_columns, columns_to_tensors):
+  """Returns the columns to transform for `feature_columns`, parents first.
+
+  The plan is a topological order of the DAG formed by `feature_columns` and
+  the columns their transformations read. Columns reachable from several
+  `feature_columns` appear once. Columns already in `columns_to_tensors` are
+  not expanded any further.
+
+  Args:
+    feature_columns: An iterable of `FeatureColumn`s.
+    columns_to_tensors: A mapping from feature columns to tensors, as passed to
+      `_Transformer`.
+
+  Returns:
+    A list of `FeatureColumn`s.
+  """
+  plan = []
+  visited = set()
+
+  def _visit(column):
+    if column in visited:
+      return
+    visited.add(column)
+    if column in columns_to_tensors:
+      return
+    for parent in sorted(_get_transformation_inputs(column),
+                         key=lambda x: x.key):
+      _visit(parent)
+    plan.append(column)
+
+  for column in sorted(set(feature_columns), key=lambda x: x.key):
+    _visit(column)
+  return plan
+
+
+def _remove_derived_tensors(columns_to_tensors):
+  """Removes the intermediate tensors shared between column transformations."""
+  for key in list(columns_to_tensors.keys()):
+    if isinstance(key, fc._DerivedTensorKey):
+      del columns_to_tensors[key]
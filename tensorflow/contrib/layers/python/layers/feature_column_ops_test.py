@@ -18,6 +18,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import time
+
 import numpy as np
 import tensorflow as tf
 
@@ -376,6 +378,113 @@ class TransformerTest(tf.test.TestCase):
           all(x < 15 and x >= 0 for x in output[wire_country_price].values.eval(
           )))
 
+  def testCrossesShareTransformationsOfTheirSources(self):
+    price_bucket = tf.contrib.layers.bucketized_column(
+        tf.contrib.layers.real_valued_column("price"),
+        boundaries=[0., 10., 100.])
+    country = tf.contrib.layers.sparse_column_with_hash_bucket(
+        "country", hash_bucket_size=5)
+    wire = tf.contrib.layers.sparse_column_with_hash_bucket("wire", 10)
+    country_price = tf.contrib.layers.crossed_column(
+        [country, price_bucket], hash_bucket_size=15)
+    wire_price = tf.contrib.layers.crossed_column(
+        [wire, price_bucket], hash_bucket_size=15)
+
+    def _build(transform):
+      with tf.Graph().as_default() as g:
+        features = {
+            "price": tf.constant([[20.]]),
+            "country": tf.SparseTensor(values=["US", "SV"],
+                                       indices=[[0, 0], [0, 1]],
+                                       dense_shape=[1, 2]),
+            "wire": tf.SparseTensor(values=["omar"], indices=[[0, 0]],
+                                    dense_shape=[1, 1])
+        }
+        transform(features, [country_price, wire_price, price_bucket])
+        return g.get_operations()
+
+    def _transform_per_column(features, feature_columns):
+      transformer = feature_column_ops._Transformer(dict(features))
+      for column in feature_columns:
+        transformer.transform(column)
+
+    def _transform_batched(features, feature_columns):
+      tf.contrib.layers.transform_features(features, feature_columns,
+                                           batch_crosses=True)
+
+    per_column_ops = _build(_transform_per_column)
+    default_ops = _build(tf.contrib.layers.transform_features)
+    batched_ops = _build(_transform_batched)
+
+    # By default, each cross has its own op, as when transforming the columns
+    # one by one.
+    op_types = [op.type for op in default_ops]
+    self.assertEqual(sorted(op.type for op in per_column_ops),
+                     sorted(op_types))
+    self.assertEqual(
+        sorted(op.name for op in per_column_ops
+               if op.type == "SparseFeatureCross"),
+        sorted(op.name for op in default_ops
+               if op.type == "SparseFeatureCross"))
+    self.assertEqual(2, op_types.count("SparseFeatureCross"))
+    self.assertEqual(1, op_types.count("Bucketize"))
+    # The sparse form of the bucketized ids is built once for both crosses.
+    self.assertEqual(1, op_types.count("Transpose"))
+
+    # With batch_crosses, both crosses are computed by a single batched op.
+    op_types = [op.type for op in batched_ops]
+    self.assertEqual(0, op_types.count("SparseFeatureCross"))
+    self.assertEqual(1, op_types.count("SparseFeatureCrossMulti"))
+    self.assertEqual(1, op_types.count("Transpose"))
+
+  def testDerivedTensorsAreNotReturned(self):
+    price_bucket = tf.contrib.layers.bucketized_column(
+        tf.contrib.layers.real_valued_column("price"),
+        boundaries=[0., 10., 100.])
+    country = tf.contrib.layers.sparse_column_with_hash_bucket(
+        "country", hash_bucket_size=5)
+    country_price = tf.contrib.layers.crossed_column(
+        [country, price_bucket], hash_bucket_size=15)
+    with tf.Graph().as_default():
+      features = {
+          "price": tf.constant([[20.]]),
+          "country": tf.SparseTensor(values=["US", "SV"],
+                                     indices=[[0, 0], [0, 1]],
+                                     dense_shape=[1, 2])
+      }
+      tf.contrib.layers.weighted_sum_from_feature_columns(
+          features, [country_price, price_bucket], num_outputs=1)
+      tf.contrib.layers.joint_weighted_sum_from_feature_columns(
+          features, [country_price, price_bucket], num_outputs=1)
+      tf.contrib.layers.input_from_feature_columns(
+          features,
+          [tf.contrib.layers.embedding_column(country_price, 2),
+           price_bucket])
+      # pylint: disable=protected-access
+      self.assertFalse([
+          key for key in features
+          if isinstance(key, feature_column_ops.fc._DerivedTensorKey)])
+      # pylint: enable=protected-access
+
+  def testPlanTransformations(self):
+    price = tf.contrib.layers.real_valued_column("price")
+    price_bucket = tf.contrib.layers.bucketized_column(
+        price, boundaries=[0., 10., 100.])
+    country = tf.contrib.layers.sparse_column_with_hash_bucket(
+        "country", hash_bucket_size=5)
+    country_price = tf.contrib.layers.crossed_column(
+        [country, price_bucket], hash_bucket_size=15)
+    country_embedding = tf.contrib.layers.embedding_column(country, 2)
+    plan = feature_column_ops._plan_transformations(
+        [country_price, country_embedding, price_bucket], {})
+    # Crosses read sparse columns from their raw features, so only the
+    # embedding depends on the transformed country column.
+    self.assertEqual(
+        [price, price_bucket, country_price, country, country_embedding], plan)
+    plan = feature_column_ops._plan_transformations(
+        [country_price], {price_bucket: "already-transformed"})
+    self.assertEqual([country_price], plan)
+
   def testIfFeatureTableContainsTransformationReturnIt(self):
     any_column = tf.contrib.layers.sparse_column_with_hash_bucket("sparse", 10)
     features = {any_column: "any-thing-even-not-a-tensor"}
@@ -2198,5 +2307,84 @@ class InferRealValuedColumnTest(tf.test.TestCase):
           tf.SparseTensor(indices=[[0, 0]], values=["a"], dense_shape=[1, 1]))
 
 
+class WideAndDeepTransformationBenchmark(tf.test.Benchmark):
+  """Graph size and step time of a 200-column wide-and-deep input layer.
+
+  Compares the transformations built before planning, where each half of the
+  model transformed its columns one by one with a `_Transformer` over its own
+  copy of the features, and rebuilt the intermediate tensors of every column
+  (e.g. the sparse form of a bucketized column, once per cross), with
+  transforming all columns of both halves as one planned DAG.
+  """
+
+  def _columns(self, num_groups=40, num_shared_buckets=10):
+    real = [tf.contrib.layers.real_valued_column("real_%d" % i)
+            for i in range(num_groups)]
+    buckets = [tf.contrib.layers.bucketized_column(
+        column, boundaries=[-1., 0., 1.]) for column in real]
+    sparse = [tf.contrib.layers.sparse_column_with_hash_bucket(
+        "sparse_%d" % i, hash_bucket_size=1000) for i in range(num_groups)]
+    crosses = [tf.contrib.layers.crossed_column(
+        [sparse[i], buckets[i % num_shared_buckets]], hash_bucket_size=10000)
+               for i in range(num_groups)]
+    embeddings = [tf.contrib.layers.embedding_column(column, dimension=8)
+                  for column in sparse]
+    return real + buckets + sparse + crosses, embeddings + real
+
+  def _features(self, num_groups=40, batch_size=256):
+    features = {}
+    for i in range(num_groups):
+      features["real_%d" % i] = tf.constant(
+          np.random.randn(batch_size, 1).astype(np.float32))
+      features["sparse_%d" % i] = tf.SparseTensor(
+          indices=[[j, 0] for j in range(batch_size)],
+          values=["v%d" % np.random.randint(100) for _ in range(batch_size)],
+          dense_shape=[batch_size, 1])
+    return features
+
+  def _transform_per_column(self, features, feature_columns):
+    transformed = dict(features)
+    transformer = feature_column_ops._Transformer(transformed)
+    for column in sorted(set(feature_columns), key=lambda x: x.key):
+      transformer.transform(column)
+      # Intermediate tensors were not shared between columns.
+      feature_column_ops._remove_derived_tensors(transformed)
+    return transformed
+
+  def _run(self, name, planned, num_iters=20):
+    with tf.Graph().as_default() as g:
+      linear_columns, dnn_columns = self._columns()
+      features = self._features()
+      num_input_ops = len(g.get_operations())
+      if planned:
+        features.update(tf.contrib.layers.transform_features(
+            features, set(linear_columns) | set(dnn_columns)))
+        linear_features = dnn_features = features
+      else:
+        linear_features = self._transform_per_column(features, linear_columns)
+        dnn_features = self._transform_per_column(features, dnn_columns)
+      net = tf.contrib.layers.input_from_feature_columns(
+          dnn_features, dnn_columns)
+      linear_logits, _, _ = tf.contrib.layers.weighted_sum_from_feature_columns(
+          linear_features, linear_columns, num_outputs=1)
+      logits = tf.contrib.layers.fully_connected(net, 1) + linear_logits
+      num_ops = len(g.get_operations()) - num_input_ops
+      with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        sess.run(logits)
+        start = time.time()
+        for _ in range(num_iters):
+          sess.run(logits)
+        wall_time = (time.time() - start) / num_iters
+    self.report_benchmark(name=name, iters=num_iters, wall_time=wall_time,
+                          extras={"num_ops": num_ops})
+
+  def benchmarkPerColumnTransformations(self):
+    self._run("per_column_transformations", planned=False)
+
+  def benchmarkPlannedTransformations(self):
+    self._run("planned_transformations", planned=True)
+
+
 if __name__ == "__main__":
   tf.test.main()
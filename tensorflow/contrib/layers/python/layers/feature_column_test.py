@@ -498,6 +498,11 @@ class FeatureColumnTest(tf.test.TestCase):
         feature_columns_dict)
     self.assertDictEqual(expected_config, config)
 
+    config = tf.contrib.layers.create_feature_spec_for_parsing(
+        feature_columns, compiled=True)
+    self.assertIsInstance(config, tf.CompiledFeatureSpec)
+    self.assertDictEqual(expected_config, dict(config))
+
   def testCreateFeatureSpec_RealValuedColumnWithDefaultValue(self):
     real_valued_col1 = tf.contrib.layers.real_valued_column(
         "real_valued_column1", default_value=2)
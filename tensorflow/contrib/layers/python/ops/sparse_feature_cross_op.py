@@ -123,7 +123,94 @@ def sparse_feature_cross(inputs, hashed_output=False, num_buckets=0,
   return sparse_tensor.SparseTensor(indices_out, values_out, shape_out)
 
 
+def sparse_feature_cross_multi(inputs, crosses, num_buckets, hash_keys=None,
+                               name=None):
+  """Computes several hashed crosses of a list of Tensors or SparseTensors.
+
+  Equivalent to calling `sparse_feature_cross` with `hashed_output=True` for
+  each cross, but runs a single op in which every input is fingerprinted only
+  once, however many crosses use it. Use it for many crosses that share base
+  features.
+
+  Args:
+    inputs: List of `SparseTensor` or `Tensor` the crosses are built from.
+    crosses: List of crosses, each a list of indices into `inputs` of the
+      features to cross.
+    num_buckets: List with the number of hash buckets of each cross, see
+      `sparse_feature_cross`.
+    hash_keys: Optional list with the `hash_key` of each cross, see
+      `sparse_feature_cross`. A `None` list or entry uses the legacy hash.
+    name: A name prefix for the returned tensors (optional).
+
+  Returns:
+    A list with a `SparseTensor` of int64 crossed features for each cross.
+
+  Raises:
+    TypeError: If the inputs aren't either SparseTensor or Tensor.
+    ValueError: If `crosses`, `num_buckets` and `hash_keys` have different
+      lengths, or a cross is empty or refers to an unknown input.
+  """
+  if not isinstance(inputs, list):
+    raise TypeError("Inputs must be a list")
+  if not all(isinstance(i, sparse_tensor.SparseTensor) or
+             isinstance(i, ops.Tensor) for i in inputs):
+    raise TypeError("All inputs must be SparseTensors")
+  if hash_keys is None:
+    hash_keys = [None] * len(crosses)
+  if not crosses or not len(crosses) == len(num_buckets) == len(hash_keys):
+    raise ValueError("crosses, num_buckets and hash_keys must be non-empty "
+                     "and have the same length, got %d, %d and %d." %
+                     (len(crosses), len(num_buckets), len(hash_keys)))
+
+  sparse_positions = [i for i, x in enumerate(inputs)
+                      if isinstance(x, sparse_tensor.SparseTensor)]
+  dense_positions = [i for i, x in enumerate(inputs)
+                     if not isinstance(x, sparse_tensor.SparseTensor)]
+  # The op numbers the sparse inputs first, followed by the dense inputs.
+  op_inputs = dict((position, i) for i, position in enumerate(
+      sparse_positions + dense_positions))
+
+  cross_inputs = []
+  cross_sizes = []
+  for cross in crosses:
+    if not cross or not all(0 <= i < len(inputs) for i in cross):
+      raise ValueError("Invalid cross %s of %d inputs." % (cross, len(inputs)))
+    # Like sparse_feature_cross, crosses the sparse inputs before the dense.
+    cross_inputs.extend(op_inputs[i] for i in cross if i in sparse_positions)
+    cross_inputs.extend(op_inputs[i] for i in cross if i in dense_positions)
+    cross_sizes.append(len(cross))
+
+  indices = [inputs[i].indices for i in sparse_positions]
+  values = [inputs[i].values for i in sparse_positions]
+  shapes = [inputs[i].dense_shape for i in sparse_positions]
+  dense_inputs = [inputs[i] for i in dense_positions]
+  for i in range(len(values)):
+    if values[i].dtype != dtypes.string:
+      values[i] = math_ops.to_int64(values[i])
+  for i in range(len(dense_inputs)):
+    if dense_inputs[i].dtype != dtypes.string:
+      dense_inputs[i] = math_ops.to_int64(dense_inputs[i])
+
+  indices_out, values_out, shapes_out = (
+      _sparse_feature_cross_op.sparse_feature_cross_multi(
+          indices,
+          values,
+          shapes,
+          dense_inputs,
+          num_crosses=len(crosses),
+          cross_inputs=cross_inputs,
+          cross_sizes=cross_sizes,
+          num_buckets=list(num_buckets),
+          hash_keys=[hash_key or 0 for hash_key in hash_keys],
+          name=name))
+  return [sparse_tensor.SparseTensor(i, v, s)
+          for i, v, s in zip(indices_out, values_out, shapes_out)]
+
+
 ops.NotDifferentiable("SparseFeatureCross")
 
 
 ops.NotDifferentiable("SparseFeatureCrossV2")
+
+
+ops.NotDifferentiable("SparseFeatureCrossMulti")
@@ -468,6 +468,11 @@ def _dnn_linear_combined_model_fn(features, labels, mode, params, config=None):
         "Either linear_feature_columns or dnn_feature_columns must be defined.")
 
   features = _get_feature_dict(features)
+  # Transform the columns of both halves together, so that sources and
+  # intermediate tensors they share are only built once.
+  features.update(feature_column_ops.transform_features(
+      features,
+      set(linear_feature_columns or []) | set(dnn_feature_columns or [])))
 
   # Build DNN Logits.
   dnn_parent_scope = "dnn"
@@ -282,6 +282,49 @@ def _make_metrics_ops(metrics, features, labels, predictions):
   return result
 
 
+class PersistentEstimatorEvaluator(object):
+  """Evaluates checkpoints of an estimator reusing one graph and session.
+
+  Created by `BaseEstimator.make_persistent_evaluator`.
+  """
+
+  def __init__(self, estimator, evaluator):
+    self._estimator = estimator
+    self._evaluator = evaluator
+
+  @property
+  def timings(self):
+    """See `graph_actions.PersistentEvaluator.timings`."""
+    return self._evaluator.timings
+
+  def evaluate(self, checkpoint_path=None):
+    """Evaluates `checkpoint_path`, or the latest checkpoint of the estimator.
+
+    Args:
+      checkpoint_path: Path of a specific checkpoint to evaluate. If `None`,
+        the latest checkpoint in the estimator's `model_dir` is used.
+
+    Returns:
+      Returns `dict` with evaluation results, as `Estimator.evaluate` does.
+
+    Raises:
+      NotFittedError: If no checkpoint is found.
+    """
+    if not checkpoint_path:
+      checkpoint_path = saver.latest_checkpoint(self._estimator.model_dir)
+      if not checkpoint_path:
+        raise NotFittedError("Couldn't find trained model at %s."
+                             % self._estimator.model_dir)
+    eval_results, global_step = self._evaluator.evaluate(checkpoint_path)
+    if eval_results is not None:
+      eval_results.update({'global_step': global_step})
+    return eval_results
+
+  def close(self):
+    """Releases the session of the evaluator."""
+    self._evaluator.close()
+
+
 class BaseEstimator(
     sklearn.BaseEstimator, evaluable.Evaluable, trainable.Trainable):
   """Abstract BaseEstimator class to train and evaluate TensorFlow models.
@@ -796,6 +839,28 @@ class BaseEstimator(
     eval_dir = os.path.join(self._model_dir, 'eval' if not name else
                             'eval_' + name)
 
+    g, global_step, eval_dict, update_op = self._build_eval_graph(input_fn,
+                                                                  metrics)
+    with g.as_default():
+      eval_results, current_global_step = graph_actions.evaluate(
+          graph=g,
+          output_dir=eval_dir,
+          checkpoint_path=checkpoint_path,
+          eval_dict=eval_dict,
+          update_op=update_op,
+          global_step_tensor=global_step,
+          supervisor_master=self._config.evaluation_master,
+          feed_fn=feed_fn,
+          max_steps=steps)
+
+      return eval_results, current_global_step
+
+  def _build_eval_graph(self, input_fn, metrics):
+    """Builds a new eval graph.
+
+    Returns:
+      A tuple `(graph, global_step, eval_dict, update_op)`.
+    """
     with ops.Graph().as_default() as g:
       random_seed.set_random_seed(self._config.tf_random_seed)
       global_step = contrib_framework.create_global_step(g)
@@ -815,18 +880,50 @@ class BaseEstimator(
         eval_dict = eval_ops
 
       update_op, eval_dict = self._extract_metric_update_ops(eval_dict)
-      eval_results, current_global_step = graph_actions.evaluate(
-          graph=g,
-          output_dir=eval_dir,
-          checkpoint_path=checkpoint_path,
-          eval_dict=eval_dict,
-          update_op=update_op,
-          global_step_tensor=global_step,
-          supervisor_master=self._config.evaluation_master,
-          feed_fn=feed_fn,
-          max_steps=steps)
+    return g, global_step, eval_dict, update_op
 
-      return eval_results, current_global_step
+  def make_persistent_evaluator(self, input_fn, steps, feed_fn=None,
+                                metrics=None, name=None):
+    """Returns an evaluator that reuses its graph and session across calls.
+
+    Unlike `evaluate`, which builds a new graph and session for every call, the
+    returned evaluator builds them once. Each call of its `evaluate` method only
+    restores the given checkpoint and resets the metric variables. This is
+    useful for continuous evaluation of large models, see `Experiment`.
+
+    Args:
+      input_fn: Input function, see `evaluate`. Its input pipeline is shared
+        between evaluations, so it should not be bounded by `num_epochs`.
+      steps: Number of steps for which to evaluate each checkpoint. Required.
+      feed_fn: Function creating a feed dict every time it is called. Optional.
+      metrics: Dict of metric ops to run, see `evaluate`.
+      name: Name of the evaluation, see `evaluate`.
+
+    Returns:
+      A `PersistentEstimatorEvaluator`.
+
+    Raises:
+      ValueError: If `metrics` is not `None` or `dict`.
+    """
+    if metrics is not None and not isinstance(metrics, dict):
+      raise ValueError('Metrics argument should be None or dict. '
+                       'Got %s.' % metrics)
+    eval_dir = os.path.join(self._model_dir, 'eval' if not name else
+                            'eval_' + name)
+    start_time = time.time()
+    g, global_step, eval_dict, update_op = self._build_eval_graph(input_fn,
+                                                                  metrics)
+    evaluator = graph_actions.PersistentEvaluator(
+        graph=g,
+        output_dir=eval_dir,
+        eval_dict=eval_dict,
+        update_op=update_op,
+        global_step_tensor=global_step,
+        supervisor_master=self._config.evaluation_master,
+        feed_fn=feed_fn,
+        max_steps=steps,
+        build_secs=time.time() - start_time)
+    return PersistentEstimatorEvaluator(self, evaluator)
 
   def _get_features_from_input_fn(self, input_fn):
     result = input_fn()
@@ -588,6 +588,27 @@ class EstimatorTest(tf.test.TestCase):
     est.fit(input_fn=boston_input_fn, max_steps=15)
     self.assertEqual(15, est.get_variable_value('global_step'))
 
+  def testPersistentEvaluator(self):
+    est = tf.contrib.learn.Estimator(model_fn=linear_model_fn)
+    evaluator = est.make_persistent_evaluator(
+        input_fn=boston_input_fn, steps=1,
+        metrics={'MSE': tf.contrib.metrics.streaming_mean_squared_error})
+    with self.assertRaises(tf.contrib.learn.NotFittedError):
+      evaluator.evaluate()
+    est.fit(input_fn=boston_input_fn, steps=5)
+    scores = evaluator.evaluate()
+    self.assertEqual(5, scores['global_step'])
+    self.assertAllClose(
+        est.evaluate(input_fn=boston_input_fn, steps=1,
+                     metrics={'MSE':
+                              tf.contrib.metrics.streaming_mean_squared_error}
+                    )['MSE'],
+        scores['MSE'])
+    est.fit(input_fn=boston_input_fn, steps=5)
+    self.assertEqual(10, evaluator.evaluate()['global_step'])
+    self.assertIn('restore_secs', evaluator.timings)
+    evaluator.close()
+
   def testPredict(self):
     est = tf.contrib.learn.Estimator(model_fn=linear_model_fn)
     boston = tf.contrib.learn.datasets.load_boston()
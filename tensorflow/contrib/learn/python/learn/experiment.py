@@ -73,7 +73,8 @@ class Experiment(object):
                continuous_eval_throttle_secs=60,
                min_eval_frequency=1,
                delay_workers_by_global_step=False,
-               export_strategies=None):
+               export_strategies=None,
+               persistent_continuous_eval=False):
     """Constructor for `Experiment`.
 
     Creates an Experiment instance. None of the functions passed to this
@@ -107,10 +108,16 @@ class Experiment(object):
       delay_workers_by_global_step: if `True` delays training workers
         based on global step instead of time.
       export_strategies: A list of `ExportStrategy`s, or a single one, or None.
+      persistent_continuous_eval: if `True`, continuous eval builds the eval
+        graph and session once and reuses them for every new checkpoint,
+        instead of rebuilding them for each evaluation. Requires `eval_steps`
+        and an `estimator` providing `make_persistent_evaluator`.
 
     Raises:
       ValueError: if `estimator` does not implement `Evaluable` and `Trainable`,
-        or if export_strategies has the wrong type.
+        or if export_strategies has the wrong type, or if
+        `persistent_continuous_eval` is set without `eval_steps` or for an
+        estimator that does not support it.
     """
     if not isinstance(estimator, evaluable.Evaluable):
       raise ValueError("`estimator` must implement `Evaluable`.")
@@ -129,6 +136,13 @@ class Experiment(object):
     self._continuous_eval_throttle_secs = continuous_eval_throttle_secs
     self._min_eval_frequency = min_eval_frequency
     self._delay_workers_by_global_step = delay_workers_by_global_step
+    if persistent_continuous_eval:
+      if eval_steps is None:
+        raise ValueError("`persistent_continuous_eval` requires `eval_steps`.")
+      if not hasattr(estimator, "make_persistent_evaluator"):
+        raise ValueError("`persistent_continuous_eval` requires an estimator "
+                         "implementing `make_persistent_evaluator`.")
+    self._persistent_continuous_eval = persistent_continuous_eval
 
     if export_strategies is None:
       self._export_strategies = []
@@ -265,42 +279,58 @@ class Experiment(object):
 
     previous_path = None
     last_warning_time = 0
-    while True:
-      start = time.time()
-
-      error_msg = None
-      latest_path = saver.latest_checkpoint(self._estimator.model_dir)
-      if not latest_path:
-        error_msg = ("Estimator is not fitted yet. "
-                     "Will start an evaluation when a checkpoint is ready.")
-      elif evaluate_checkpoint_only_once and latest_path == previous_path:
-        error_msg = "No new checkpoint ready for evaluation."
-
-      if error_msg:
-        # Print warning message every 10 mins.
-        if time.time() - last_warning_time > 600:
-          logging.warning(error_msg)
-          last_warning_time = time.time()
-      else:
-        eval_result = self._estimator.evaluate(input_fn=input_fn,
-                                               steps=self._eval_steps,
-                                               metrics=self._eval_metrics,
-                                               name=name,
-                                               checkpoint_path=latest_path)
-
-        # TODO(soergel): further throttle how often export happens?
-        self._maybe_export(eval_result)
-
-        # Clear warning timer and update last evaluated checkpoint
-        last_warning_time = 0
-        previous_path = latest_path
-
-      duration = time.time() - start
-      if duration < throttle_delay_secs:
-        difference = throttle_delay_secs - duration
-        logging.info("Waiting %f secs before starting next eval run.",
-                     difference)
-        time.sleep(difference)
+    evaluator = None
+    # The persistent evaluator owns a session and its input threads.
+    try:
+      while True:
+        start = time.time()
+
+        error_msg = None
+        latest_path = saver.latest_checkpoint(self._estimator.model_dir)
+        if not latest_path:
+          error_msg = ("Estimator is not fitted yet. "
+                       "Will start an evaluation when a checkpoint is ready.")
+        elif evaluate_checkpoint_only_once and latest_path == previous_path:
+          error_msg = "No new checkpoint ready for evaluation."
+
+        if error_msg:
+          # Print warning message every 10 mins.
+          if time.time() - last_warning_time > 600:
+            logging.warning(error_msg)
+            last_warning_time = time.time()
+        elif self._persistent_continuous_eval:
+          if evaluator is None:
+            evaluator = self._estimator.make_persistent_evaluator(
+                input_fn=input_fn,
+                steps=self._eval_steps,
+                metrics=self._eval_metrics,
+                name=name)
+          eval_result = evaluator.evaluate(checkpoint_path=latest_path)
+          logging.info("Eval timings: %s", evaluator.timings)
+        else:
+          eval_result = self._estimator.evaluate(input_fn=input_fn,
+                                                 steps=self._eval_steps,
+                                                 metrics=self._eval_metrics,
+                                                 name=name,
+                                                 checkpoint_path=latest_path)
+
+        if not error_msg:
+          # TODO(soergel): further throttle how often export happens?
+          self._maybe_export(eval_result)
+
+          # Clear warning timer and update last evaluated checkpoint
+          last_warning_time = 0
+          previous_path = latest_path
+
+        duration = time.time() - start
+        if duration < throttle_delay_secs:
+          difference = throttle_delay_secs - duration
+          logging.info("Waiting %f secs before starting next eval run.",
+                       difference)
+          time.sleep(difference)
+    finally:
+      if evaluator is not None:
+        evaluator.close()
 
   def continuous_eval(self, delay_secs=None, throttle_delay_secs=None,
                       evaluate_checkpoint_only_once=True):
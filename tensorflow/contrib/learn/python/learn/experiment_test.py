@@ -102,6 +102,34 @@ class TestEstimator(tf.contrib.learn.Evaluable, tf.contrib.learn.Trainable):
                         compat.as_bytes('bogus_timestamp'))
 
 
+class _FakePersistentEvaluator(object):
+
+  def __init__(self, estimator):
+    self._estimator = estimator
+    self.timings = {}
+    self.close_count = 0
+
+  def evaluate(self, checkpoint_path=None):
+    return self._estimator.evaluate(checkpoint_path=checkpoint_path)
+
+  def close(self):
+    self.close_count += 1
+
+
+class TestPersistentEvalEstimator(TestEstimator):
+
+  def __init__(self, *args, **kwargs):
+    super(TestPersistentEvalEstimator, self).__init__(*args, **kwargs)
+    self.make_evaluator_count = 0
+    self.evaluator = None
+
+  def make_persistent_evaluator(self, **kwargs):
+    tf.logging.info('make_persistent_evaluator called with args: %s' % kwargs)
+    self.make_evaluator_count += 1
+    self.evaluator = _FakePersistentEvaluator(self)
+    return self.evaluator
+
+
 class ExperimentTest(tf.test.TestCase):
 
   def setUp(self):
@@ -276,6 +304,35 @@ class ExperimentTest(tf.test.TestCase):
     self.assertEquals(6, est.eval_count)
     self.assertEquals(0, est.fit_count)
 
+  def test_continuous_eval_persistent(self):
+    est = TestPersistentEvalEstimator()
+    est.fake_checkpoint()
+    ex = tf.contrib.learn.Experiment(
+        est,
+        train_input_fn='train_input',
+        eval_input_fn='eval_input',
+        eval_metrics='eval_metrics',
+        eval_delay_secs=0,
+        continuous_eval_throttle_secs=0,
+        persistent_continuous_eval=True)
+    self.assertRaises(StopIteration, ex.continuous_eval,
+                      evaluate_checkpoint_only_once=False)
+    self.assertEquals(6, est.eval_count)
+    self.assertEquals(1, est.make_evaluator_count)
+    # The evaluator is closed when the loop exits with an exception.
+    self.assertEquals(1, est.evaluator.close_count)
+
+  def test_persistent_continuous_eval_invalid_args(self):
+    with self.assertRaisesRegexp(ValueError, 'make_persistent_evaluator'):
+      tf.contrib.learn.Experiment(
+          TestEstimator(), train_input_fn='train_input',
+          eval_input_fn='eval_input', persistent_continuous_eval=True)
+    with self.assertRaisesRegexp(ValueError, 'eval_steps'):
+      tf.contrib.learn.Experiment(
+          TestPersistentEvalEstimator(), train_input_fn='train_input',
+          eval_input_fn='eval_input', eval_steps=None,
+          persistent_continuous_eval=True)
+
   def test_continuous_eval_throttle_delay(self):
     for delay in [0, 1, 2]:
       est = TestEstimator()
@@ -20,6 +20,7 @@ from __future__ import division
 from __future__ import print_function
 
 import itertools
+import os
 import sys
 import threading
 import time
@@ -649,6 +650,60 @@ def _write_summary_results(output_dir, eval_results, current_global_step):
   summary_writer.flush()
 
 
+def _run_eval_loop(session, eval_dict, update_op, feed_fn, max_steps,
+                   log_every_steps, current_global_step):
+  """Runs the eval loop in `session` and returns the final `eval_dict` values.
+
+  The loop stops after `max_steps` steps, or when the input raises an
+  end-of-input signal (`OutOfRangeError` or `StopIteration`).
+  """
+  eval_results = None
+  # TODO(amodei): Fix this to run through the eval set exactly once.
+  step = 0
+  eval_step = None
+  feed_dict = None
+  logging.info('Eval steps [%d,%s) for training step %d.', step,
+               'inf' if max_steps is None
+               else str(max_steps), current_global_step)
+  try:
+    while (max_steps is None) or (step < max_steps):
+      step += 1
+      start_time = time.time()
+      feed_dict = feed_fn() if feed_fn is not None else None
+      if update_op is not None:
+        session.run(update_op, feed_dict=feed_dict)
+      else:
+        eval_results = session.run(eval_dict, feed_dict=feed_dict)
+        eval_step = step
+
+      # TODO(wicke): We should assert that the global step hasn't changed.
+      if step % log_every_steps == 0:
+        if eval_step is None or step != eval_step:
+          eval_results = session.run(eval_dict, feed_dict=feed_dict)
+          eval_step = step
+        duration = time.time() - start_time
+        logging.info('Results after %d steps (%.3f sec/batch): %s.',
+                     step, float(duration),
+                     _eval_results_to_str(eval_results))
+  # catch OutOfRangeError which is thrown when queue is out of data (and for
+  # other reasons as well).
+  except errors.OutOfRangeError as e:
+    if max_steps is None:
+      logging.info('Input queue is exhausted.')
+    else:
+      logging.warn('Input queue is exhausted: %s.', e)
+  # catch StopIteration which is thrown is DataReader is out of data.
+  except StopIteration as e:
+    if max_steps is None:
+      logging.info('Input iterator is exhausted.')
+    else:
+      logging.warn('Input iterator is exhausted: %s.', e)
+
+  if eval_results is None or step != eval_step:
+    eval_results = session.run(eval_dict, feed_dict=feed_dict)
+  return eval_results
+
+
 def evaluate(graph,
              output_dir,
              checkpoint_path,
@@ -736,62 +791,20 @@ def evaluate(graph,
         _restore_from_checkpoint(session, graph, checkpoint_path, saver)
 
     current_global_step = session.run(global_step_tensor)
-    eval_results = None
-    # TODO(amodei): Fix this to run through the eval set exactly once.
-    step = 0
-    eval_step = None
-    feed_dict = None
-    logging.info('Eval steps [%d,%s) for training step %d.', step,
-                 'inf' if max_steps is None
-                 else str(max_steps), current_global_step)
     try:
-      try:
-        while (max_steps is None) or (step < max_steps):
-          step += 1
-          start_time = time.time()
-          feed_dict = feed_fn() if feed_fn is not None else None
-          if update_op is not None:
-            session.run(update_op, feed_dict=feed_dict)
-          else:
-            eval_results = session.run(eval_dict, feed_dict=feed_dict)
-            eval_step = step
-
-          # TODO(wicke): We should assert that the global step hasn't changed.
-          if step % log_every_steps == 0:
-            if eval_step is None or step != eval_step:
-              eval_results = session.run(eval_dict, feed_dict=feed_dict)
-              eval_step = step
-            duration = time.time() - start_time
-            logging.info('Results after %d steps (%.3f sec/batch): %s.',
-                         step, float(duration),
-                         _eval_results_to_str(eval_results))
-      finally:
-        if eval_results is None or step != eval_step:
-          eval_results = session.run(eval_dict, feed_dict=feed_dict)
-          eval_step = step
-        # Stop session first, before queue runners.
-        session.close()
-
-        # Stop queue runners.
-        try:
-          coord.request_stop()
-          coord.join(threads, stop_grace_period_secs=120)
-        except (RuntimeError, errors.CancelledError) as e:
-          logging.warning('Coordinator didn\'t stop cleanly: %s', e)
+      eval_results = _run_eval_loop(session, eval_dict, update_op, feed_fn,
+                                    max_steps, log_every_steps,
+                                    current_global_step)
+    finally:
+      # Stop session first, before queue runners.
+      session.close()
 
-    # catch OutOfRangeError which is thrown when queue is out of data (and for
-    # other reasons as well).
-    except errors.OutOfRangeError as e:
-      if max_steps is None:
-        logging.info('Input queue is exhausted.')
-      else:
-        logging.warn('Input queue is exhausted: %s.', e)
-    # catch StopIteration which is thrown is DataReader is out of data.
-    except StopIteration as e:
-      if max_steps is None:
-        logging.info('Input iterator is exhausted.')
-      else:
-        logging.warn('Input iterator is exhausted: %s.', e)
+      # Stop queue runners.
+      try:
+        coord.request_stop()
+        coord.join(threads, stop_grace_period_secs=120)
+      except (RuntimeError, errors.CancelledError) as e:
+        logging.warning('Coordinator didn\'t stop cleanly: %s', e)
 
   # Save summaries for this evaluation.
   _write_summary_results(output_dir, eval_results, current_global_step)
@@ -799,6 +812,178 @@ def evaluate(graph,
   return eval_results, current_global_step
 
 
+class PersistentEvaluator(object):
+  """Evaluates a graph against a sequence of checkpoints with one session.
+
+  `evaluate` builds a new session, starts queue runners and restores the
+  checkpoint every time it is called. For continuous evaluation this setup
+  often costs more than the eval loop itself. `PersistentEvaluator` creates
+  the session and starts the queue runners once; each call to `evaluate` only
+  restores the given checkpoint and resets the local (metric) variables before
+  running the eval loop.
+
+  Since the input pipeline is shared between evaluations, `max_steps` is
+  required: an input that signals end-of-input closes its queues and can not be
+  used for subsequent evaluations.
+
+  Example:
+
+  ```python
+  evaluator = PersistentEvaluator(graph, output_dir, eval_dict,
+                                  update_op=update_op, max_steps=100)
+  for checkpoint_path in checkpoints:
+    eval_results, global_step = evaluator.evaluate(checkpoint_path)
+    logging.info('%s', evaluator.timings)
+  evaluator.close()
+  ```
+  """
+
+  def __init__(self,
+               graph,
+               output_dir,
+               eval_dict,
+               update_op=None,
+               global_step_tensor=None,
+               supervisor_master='',
+               log_every_steps=10,
+               feed_fn=None,
+               max_steps=None,
+               build_secs=0.0):
+    """Creates the evaluator. See `evaluate` for the meaning of the arguments.
+
+    Args:
+      graph: A `Graph` to evaluate. It is expected that this graph is not in
+        use elsewhere and is not modified after the evaluator is created.
+      output_dir: A string containing the directory to write summaries to.
+      eval_dict: A `dict` mapping string names to tensors to evaluate.
+      update_op: A `Tensor` which is run in every step.
+      global_step_tensor: A `Variable` containing the global step.
+      supervisor_master: The master string to use when creating the session.
+      log_every_steps: Integer. Output logs every `log_every_steps` evaluation
+        steps.
+      feed_fn: A function that is called every iteration to produce a
+        `feed_dict` passed to `session.run` calls. Optional.
+      max_steps: Integer. Evaluate `eval_dict` this many times per checkpoint.
+      build_secs: Time in seconds spent building `graph`, reported in
+        `timings`.
+
+    Raises:
+      ValueError: if `output_dir` is empty or `max_steps` is `None`.
+    """
+    if not output_dir:
+      raise ValueError('Output directory should be non-empty %s.' % output_dir)
+    if max_steps is None:
+      raise ValueError('max_steps is required for persistent evaluation.')
+    self._graph = graph
+    self._output_dir = output_dir
+    self._eval_dict = eval_dict
+    self._update_op = update_op
+    self._supervisor_master = supervisor_master
+    self._log_every_steps = log_every_steps
+    self._feed_fn = feed_fn
+    self._max_steps = max_steps
+    self._session = None
+    self._coord = None
+    self._threads = None
+    self._timings = {'build_secs': build_secs}
+
+    start_time = time.time()
+    with graph.as_default():
+      self._global_step_tensor = contrib_variables.assert_or_get_global_step(
+          graph, global_step_tensor)
+      self._saver = _get_saver()
+      self._local_init_op = _get_local_init_op()
+      self._resources_init_op = resources.initialize_resources(
+          resources.shared_resources() + resources.local_resources())
+      self._global_init_op = variables.global_variables_initializer()
+      # Table initializers in `local_init_op` can only run once per session,
+      # so between checkpoints only the local variables are re-initialized.
+      self._reset_op = variables.variables_initializer(
+          variables.local_variables())
+    graph.finalize()
+    self._timings['build_secs'] += time.time() - start_time
+
+  @property
+  def timings(self):
+    """A `dict` with timings in seconds of the last evaluation.
+
+    Keys are `build_secs` (building the graph, paid once), `session_secs`
+    (creating the session and starting queue runners, paid once),
+    `restore_secs` (restoring the checkpoint and resetting local variables) and
+    `eval_secs` (running the eval loop).
+    """
+    return dict(self._timings)
+
+  def _create_session(self):
+    start_time = time.time()
+    self._session = tf_session.Session(self._supervisor_master,
+                                       graph=self._graph)
+    self._session.run(self._resources_init_op)
+    if self._local_init_op is not None:
+      self._session.run(self._local_init_op)
+    self._coord = coordinator.Coordinator()
+    self._threads = queue_runner.start_queue_runners(self._session,
+                                                     self._coord)
+    self._timings['session_secs'] = time.time() - start_time
+
+  def evaluate(self, checkpoint_path):
+    """Restores `checkpoint_path` and runs the eval loop.
+
+    Args:
+      checkpoint_path: A string containing the path to a checkpoint, or a
+        directory containing checkpoints, to restore. Can be `None` if the
+        graph doesn't require loading any variables.
+
+    Returns:
+      A tuple `(eval_results, global_step)`, see `evaluate`.
+
+    Raises:
+      ValueError: if `checkpoint_path` is a directory without checkpoints.
+      RuntimeError: if the evaluator has been closed.
+    """
+    if self._coord is not None and self._coord.should_stop():
+      raise RuntimeError('Evaluator has been closed.')
+    if self._session is None:
+      self._create_session()
+
+    start_time = time.time()
+    if checkpoint_path and os.path.isdir(checkpoint_path):
+      latest_path = tf_saver.latest_checkpoint(checkpoint_path)
+      if not latest_path:
+        raise ValueError('No checkpoint found in %s.' % checkpoint_path)
+      checkpoint_path = latest_path
+    if checkpoint_path:
+      _restore_from_checkpoint(self._session, self._graph, checkpoint_path,
+                               self._saver)
+    else:
+      self._session.run(self._global_init_op)
+    self._session.run(self._reset_op)
+    current_global_step = self._session.run(self._global_step_tensor)
+    self._timings['restore_secs'] = time.time() - start_time
+
+    start_time = time.time()
+    eval_results = _run_eval_loop(self._session, self._eval_dict,
+                                  self._update_op, self._feed_fn,
+                                  self._max_steps, self._log_every_steps,
+                                  current_global_step)
+    self._timings['eval_secs'] = time.time() - start_time
+
+    _write_summary_results(self._output_dir, eval_results, current_global_step)
+    return eval_results, current_global_step
+
+  def close(self):
+    """Closes the session and stops the queue runners."""
+    if self._session is None:
+      return
+    # Stop session first, before queue runners.
+    self._session.close()
+    try:
+      self._coord.request_stop()
+      self._coord.join(self._threads, stop_grace_period_secs=120)
+    except (RuntimeError, errors.CancelledError) as e:
+      logging.warning('Coordinator didn\'t stop cleanly: %s', e)
+
+
 def run_n(output_dict, feed_dict=None, restore_checkpoint_path=None, n=1):
   """Run `output_dict` tensors `n` times, with the same `feed_dict` each run.
 
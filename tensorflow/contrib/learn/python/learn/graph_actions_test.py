@@ -313,6 +313,54 @@ class GraphActionsTest(tf.test.TestCase):
           self._output_dir, writer, expected_summaries={0: {'a': 6.0}},
           expected_session_logs=[])
 
+  def test_persistent_evaluator_invalid_args(self):
+    with tf.Graph().as_default() as g, self.test_session(g):
+      _, _, out = self._build_inference_graph()
+      with self.assertRaisesRegexp(ValueError, 'utput directory'):
+        learn.graph_actions.PersistentEvaluator(
+            g, output_dir='', eval_dict={'a': out}, max_steps=1)
+      with self.assertRaisesRegexp(ValueError, 'max_steps'):
+        learn.graph_actions.PersistentEvaluator(
+            g, output_dir=self._output_dir, eval_dict={'a': out})
+
+  def test_persistent_evaluator(self):
+    with tf.Graph().as_default() as g, self.test_session(g) as sess:
+      in0, in1, out = self._build_inference_graph()
+      global_step = tf.contrib.framework.get_global_step()
+      saver = tf.train.Saver()
+      sess.run(tf.global_variables_initializer())
+      ckpt_1 = saver.save(sess, '%s/model.ckpt' % self._output_dir,
+                          global_step=1)
+      sess.run([in0.assign(5.0), global_step.assign(2)])
+      ckpt_2 = saver.save(sess, '%s/model.ckpt' % self._output_dir,
+                          global_step=2)
+      count = tf.contrib.framework.local_variable(0.0)
+      update_op = tf.assign_add(count, in1)
+
+      writer = learn.graph_actions.get_summary_writer(self._output_dir)
+      evaluator = learn.graph_actions.PersistentEvaluator(
+          g, output_dir=self._output_dir,
+          eval_dict={'a': out, 'count': count}, update_op=update_op,
+          max_steps=3)
+      self.assertEqual(({'a': 6.0, 'count': 6.0}, 1),
+                       evaluator.evaluate(ckpt_1))
+      # Local variables are reset between checkpoints.
+      self.assertEqual(({'a': 10.0, 'count': 6.0}, 2),
+                       evaluator.evaluate(ckpt_2))
+      self.assertEqual(({'a': 10.0, 'count': 6.0}, 2),
+                       evaluator.evaluate(self._output_dir))
+      self.assertItemsEqual(
+          ['build_secs', 'session_secs', 'restore_secs', 'eval_secs'],
+          evaluator.timings.keys())
+      evaluator.close()
+      self._assert_summaries(
+          self._output_dir, writer,
+          expected_summaries={1: {'a': 6.0, 'count': 6.0},
+                              2: {'a': 10.0, 'count': 6.0}},
+          expected_session_logs=[])
+      with self.assertRaisesRegexp(RuntimeError, 'closed'):
+        evaluator.evaluate(ckpt_2)
+
   def test_train_invalid_args(self):
     with tf.Graph().as_default() as g, self.test_session(g):
       train_op = tf.constant(1.0)
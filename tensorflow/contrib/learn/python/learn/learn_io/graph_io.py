@@ -431,7 +431,7 @@ def read_keyed_batch_features(file_pattern,
         `Example` records. See `tf.gfile.Glob` for pattern rules.
     batch_size: An int or scalar `Tensor` specifying the batch size to use.
     features: A `dict` mapping feature keys to `FixedLenFeature` or
-      `VarLenFeature` values.
+      `VarLenFeature` values, or a `CompiledFeatureSpec` of them.
     reader: A function or class that returns an object with
       `read` method, (filename tensor) -> (example tensor).
     randomize_input: Whether the input should be randomized.
@@ -505,7 +505,7 @@ def _read_keyed_batch_features_shared_queue(file_pattern,
         `Example` records. See `tf.gfile.Glob` for pattern rules.
     batch_size: An int or scalar `Tensor` specifying the batch size to use.
     features: A `dict` mapping feature keys to `FixedLenFeature` or
-      `VarLenFeature` values.
+      `VarLenFeature` values, or a `CompiledFeatureSpec` of them.
     reader: A function or class that returns an object with
       `read` method, (filename tensor) -> (example tensor).
     randomize_input: Whether the input should be randomized.
@@ -694,7 +694,7 @@ def read_batch_features(file_pattern,
         `Example` records. See `tf.gfile.Glob` for pattern rules.
     batch_size: An int or scalar `Tensor` specifying the batch size to use.
     features: A `dict` mapping feature keys to `FixedLenFeature` or
-      `VarLenFeature` values.
+      `VarLenFeature` values, or a `CompiledFeatureSpec` of them.
     reader: A function or class that returns an object with
       `read` method, (filename tensor) -> (example tensor).
     randomize_input: Whether the input should be randomized.
@@ -739,7 +739,7 @@ def read_batch_record_features(file_pattern, batch_size, features,
         `Example` records. See `tf.gfile.Glob` for pattern rules.
     batch_size: An int or scalar `Tensor` specifying the batch size to use.
     features: A `dict` mapping feature keys to `FixedLenFeature` or
-      `VarLenFeature` values.
+      `VarLenFeature` values, or a `CompiledFeatureSpec` of them.
     randomize_input: Whether the input should be randomized.
     num_epochs: Integer specifying the number of times to read through the
       dataset. If None, cycles through the dataset forever. NOTE - If specified,
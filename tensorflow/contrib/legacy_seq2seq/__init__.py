@@ -16,14 +16,17 @@
 
 @@attention_decoder
 @@basic_rnn_seq2seq
+@@embedding_attention_beam_search_decoder
 @@embedding_attention_decoder
 @@embedding_attention_seq2seq
+@@embedding_attention_seq2seq_beam_search
 @@embedding_rnn_decoder
 @@embedding_rnn_seq2seq
 @@embedding_tied_rnn_seq2seq
 @@model_with_buckets
 @@one2many_rnn_seq2seq
 @@rnn_decoder
+@@sampled_softmax_loss_function
 @@sequence_loss
 @@sequence_loss_by_example
 @@tied_rnn_seq2seq
@@ -35,14 +38,19 @@ from __future__ import print_function
 
 from tensorflow.python.ops.seq2seq import attention_decoder
 from tensorflow.python.ops.seq2seq import basic_rnn_seq2seq
+from tensorflow.python.ops.seq2seq import (
+    embedding_attention_beam_search_decoder)
 from tensorflow.python.ops.seq2seq import embedding_attention_decoder
 from tensorflow.python.ops.seq2seq import embedding_attention_seq2seq
+from tensorflow.python.ops.seq2seq import (
+    embedding_attention_seq2seq_beam_search)
 from tensorflow.python.ops.seq2seq import embedding_rnn_decoder
 from tensorflow.python.ops.seq2seq import embedding_rnn_seq2seq
 from tensorflow.python.ops.seq2seq import embedding_tied_rnn_seq2seq
 from tensorflow.python.ops.seq2seq import model_with_buckets
 from tensorflow.python.ops.seq2seq import one2many_rnn_seq2seq
 from tensorflow.python.ops.seq2seq import rnn_decoder
+from tensorflow.python.ops.seq2seq import sampled_softmax_loss_function
 from tensorflow.python.ops.seq2seq import sequence_loss
 from tensorflow.python.ops.seq2seq import sequence_loss_by_example
 from tensorflow.python.ops.seq2seq import tied_rnn_seq2seq
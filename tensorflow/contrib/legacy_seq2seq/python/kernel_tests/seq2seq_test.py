@@ -20,6 +20,7 @@ from __future__ import print_function
 
 import math
 import random
+import time
 
 import numpy as np
 import tensorflow as tf
@@ -444,6 +445,123 @@ class Seq2SeqTest(tf.test.TestCase):
         self.assertAllClose(res1, res2)
         self.assertAllClose(res1, res3)
 
+  def testEmbeddingAttentionSeq2SeqBeamSearch(self):
+    with self.test_session() as sess:
+      with tf.variable_scope("root", initializer=tf.random_uniform_initializer(
+          -1.0, 1.0, seed=1)):
+        enc_inp = [tf.constant([1, 2, 3], tf.int32) for _ in range(4)]
+        dec_inp = [tf.constant(0, tf.int32, shape=[3]) for _ in range(5)]
+        cell = tf.contrib.rnn.BasicLSTMCell(4, state_is_tuple=True)
+        greedy, _ = tf.contrib.legacy_seq2seq.embedding_attention_seq2seq(
+            enc_inp, dec_inp, cell, num_encoder_symbols=4,
+            num_decoder_symbols=6, embedding_size=3, feed_previous=True)
+        tf.get_variable_scope().reuse_variables()
+        # With a single hypothesis and no eos_symbol, beam search is greedy.
+        symbols, scores, lengths = (
+            tf.contrib.legacy_seq2seq.embedding_attention_seq2seq_beam_search(
+                enc_inp, cell, num_encoder_symbols=4, num_decoder_symbols=6,
+                embedding_size=3, beam_size=1, go_symbol=0, eos_symbol=-1,
+                max_length=5))
+        sess.run([tf.global_variables_initializer()])
+        greedy_res, symbols_res, lengths_res = sess.run(
+            [greedy, symbols, lengths])
+        self.assertEqual((3, 1, 5), symbols_res.shape)
+        self.assertAllEqual(np.argmax(greedy_res, 2).T, symbols_res[:, 0, :])
+        self.assertAllEqual([[5]] * 3, lengths_res)
+
+        symbols, scores, lengths = (
+            tf.contrib.legacy_seq2seq.embedding_attention_seq2seq_beam_search(
+                enc_inp, cell, num_encoder_symbols=4, num_decoder_symbols=6,
+                embedding_size=3, beam_size=3, go_symbol=0, eos_symbol=2,
+                max_length=5, length_penalty_weight=0.6))
+        symbols_res, scores_res, lengths_res = sess.run(
+            [symbols, scores, lengths])
+        self.assertEqual((3, 3), scores_res.shape)
+        for batch in range(3):
+          # Hypotheses are sorted, and end with eos_symbol or at max_length.
+          self.assertAllEqual(sorted(scores_res[batch], reverse=True),
+                              scores_res[batch])
+          for beam in range(3):
+            length = lengths_res[batch, beam]
+            hypothesis = list(symbols_res[batch, beam])
+            if length < 5:
+              self.assertEqual(2, hypothesis[length - 1])
+              self.assertNotIn(2, hypothesis[:length - 1])
+
+  def testBeamSearchEarlyStopping(self):
+    with self.test_session() as sess:
+      attention_states = tf.constant(0.5, shape=[2, 3, 2])
+      initial_state = tf.constant(0.5, shape=[2, 2])
+      # A projection making eos_symbol by far the most likely output.
+      w = tf.zeros([2, 5])
+      b = tf.constant([0.0, 0.0, 0.0, 100.0, 0.0])
+      symbols, scores, lengths = (
+          tf.contrib.legacy_seq2seq.embedding_attention_beam_search_decoder(
+              initial_state, attention_states, tf.contrib.rnn.GRUCell(2),
+              num_symbols=5, embedding_size=2, beam_size=2, go_symbol=0,
+              eos_symbol=3, max_length=10, output_projection=(w, b)))
+      sess.run([tf.global_variables_initializer()])
+      symbols_res, scores_res, lengths_res = sess.run(
+          [symbols, scores, lengths])
+      # The best hypotheses stop at the first step, the others at the second.
+      self.assertEqual((2, 2, 2), symbols_res.shape)
+      self.assertAllEqual([[3, 3], [3, 3]], symbols_res[:, 0, :])
+      self.assertAllEqual([[1, 2], [1, 2]], lengths_res)
+      self.assertAllClose([0.0, 0.0], scores_res[:, 0], atol=1e-3)
+
+  def testEmbeddingAttentionSeq2SeqShortlist(self):
+    with self.test_session() as sess:
+      with tf.variable_scope("root", initializer=tf.random_uniform_initializer(
+          -1.0, 1.0, seed=1)):
+        enc_inp = [tf.constant([1, 2, 3], tf.int32) for _ in range(4)]
+        dec_inp = [tf.constant(0, tf.int32, shape=[3]) for _ in range(5)]
+        cell = tf.contrib.rnn.BasicLSTMCell(4, state_is_tuple=True)
+        w = tf.get_variable("proj_w", [4, 6])
+        b = tf.get_variable("proj_b", [6])
+        greedy, _ = tf.contrib.legacy_seq2seq.embedding_attention_seq2seq(
+            enc_inp, dec_inp, cell, num_encoder_symbols=4,
+            num_decoder_symbols=6, embedding_size=3, output_projection=(w, b),
+            feed_previous=True)
+        tf.get_variable_scope().reuse_variables()
+        # A shortlist of all the symbols, in any order, decodes the same.
+        all_symbols = [5, 4, 3, 2, 1, 0]
+        greedy_shortlist, _ = (
+            tf.contrib.legacy_seq2seq.embedding_attention_seq2seq(
+                enc_inp, dec_inp, cell, num_encoder_symbols=4,
+                num_decoder_symbols=6, embedding_size=3,
+                output_projection=(w, b), feed_previous=True,
+                output_shortlist=all_symbols))
+        beam_args = dict(num_encoder_symbols=4, num_decoder_symbols=6,
+                         embedding_size=3, beam_size=2, go_symbol=0,
+                         eos_symbol=2, max_length=5, output_projection=(w, b))
+        beam, _, _ = (
+            tf.contrib.legacy_seq2seq.embedding_attention_seq2seq_beam_search(
+                enc_inp, cell, **beam_args))
+        beam_shortlist, _, _ = (
+            tf.contrib.legacy_seq2seq.embedding_attention_seq2seq_beam_search(
+                enc_inp, cell, output_shortlist=all_symbols, **beam_args))
+        beam_partial, _, _ = (
+            tf.contrib.legacy_seq2seq.embedding_attention_seq2seq_beam_search(
+                enc_inp, cell, output_shortlist=[2, 4, 5], **beam_args))
+        sess.run([tf.global_variables_initializer()])
+        (greedy_res, greedy_shortlist_res, beam_res, beam_shortlist_res,
+         beam_partial_res) = sess.run(
+             [greedy, greedy_shortlist, beam, beam_shortlist, beam_partial])
+        self.assertAllClose(greedy_res, greedy_shortlist_res)
+        self.assertAllEqual(beam_res, beam_shortlist_res)
+        self.assertTrue(np.all(np.in1d(beam_partial_res, [2, 4, 5])))
+
+        with self.assertRaisesRegexp(ValueError, "output_projection"):
+          tf.contrib.legacy_seq2seq.embedding_attention_seq2seq(
+              enc_inp, dec_inp, cell, num_encoder_symbols=4,
+              num_decoder_symbols=6, embedding_size=3, feed_previous=True,
+              output_shortlist=all_symbols)
+        with self.assertRaisesRegexp(ValueError, "output_projection"):
+          tf.contrib.legacy_seq2seq.embedding_attention_seq2seq(
+              enc_inp, dec_inp, cell, num_encoder_symbols=4,
+              num_decoder_symbols=6, embedding_size=3, feed_previous=False,
+              output_shortlist=all_symbols)
+
   def testOne2ManyRNNSeq2Seq(self):
     with self.test_session() as sess:
       with tf.variable_scope("root", initializer=tf.constant_initializer(0.5)):
@@ -548,6 +666,31 @@ class Seq2SeqTest(tf.test.TestCase):
       res = sess.run(loss_per_sequence)
       self.assertAllClose(np.asarray([4.828314, 4.828314]), res)
 
+  def testSampledSoftmaxLossFunction(self):
+    with self.test_session() as sess:
+      num_symbols = 20
+      outputs = [tf.constant(i + 0.5, shape=[2, 3]) for i in range(3)]
+      targets = [tf.constant(i, tf.int32, shape=[2]) for i in range(3)]
+      weights = [tf.constant(1.0, shape=[2]) for i in range(3)]
+      proj_w_t = tf.Variable(tf.random_normal([num_symbols, 3], seed=1))
+      proj_b = tf.Variable(tf.zeros([num_symbols]))
+      loss_function = tf.contrib.legacy_seq2seq.sampled_softmax_loss_function(
+          proj_w_t, proj_b, num_symbols, num_samples=5)
+      loss = tf.contrib.legacy_seq2seq.sequence_loss_by_example(
+          outputs, targets, weights, softmax_loss_function=loss_function)
+      # Only the rows of the targets and sampled symbols are updated.
+      grad_w_t, = tf.gradients(loss, [proj_w_t])
+      self.assertTrue(isinstance(grad_w_t, tf.IndexedSlices))
+      sess.run(tf.global_variables_initializer())
+      loss_res = sess.run(loss)
+      self.assertEqual((2,), loss_res.shape)
+      self.assertTrue(np.all(np.isfinite(loss_res)))
+      self.assertTrue(np.all(loss_res > 0.0))
+
+      with self.assertRaisesRegexp(ValueError, "num_samples"):
+        tf.contrib.legacy_seq2seq.sampled_softmax_loss_function(
+            proj_w_t, proj_b, num_symbols, num_samples=num_symbols)
+
   def testModelWithBucketsScopeAndLoss(self):
     """Test that variable scope reuse is not reset after model_with_buckets."""
     classes = 10
@@ -778,5 +921,148 @@ class Seq2SeqTest(tf.test.TestCase):
       TestModel(model)
 
 
+class BeamSearchBenchmark(tf.test.Benchmark):
+  """Sentences per second of in-graph and Python-loop beam search."""
+
+  def _model_args(self):
+    return dict(num_encoder_symbols=1000, num_decoder_symbols=1000,
+                embedding_size=64)
+
+  def _report(self, name, wall_time, num_sentences):
+    self.report_benchmark(
+        name=name,
+        iters=num_sentences,
+        wall_time=wall_time / num_sentences,
+        extras={"sentences_per_sec": num_sentences / wall_time})
+
+  def benchmarkInGraphBeamSearch(self, batch_size=16, num_batches=4,
+                                 beam_size=4, max_length=15):
+    with tf.Graph().as_default():
+      enc_inp = [tf.placeholder(tf.int32, [None]) for _ in range(10)]
+      symbols, _, _ = (
+          tf.contrib.legacy_seq2seq.embedding_attention_seq2seq_beam_search(
+              enc_inp, tf.contrib.rnn.GRUCell(128), beam_size=beam_size,
+              go_symbol=0, eos_symbol=1, max_length=max_length,
+              **self._model_args()))
+      with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        feed = dict((p, np.random.randint(2, 1000, size=[batch_size]))
+                    for p in enc_inp)
+        sess.run(symbols, feed)
+        start = time.time()
+        for _ in range(num_batches):
+          sess.run(symbols, feed)
+        self._report("in_graph_beam_%d" % beam_size, time.time() - start,
+                     batch_size * num_batches)
+
+  def benchmarkPythonBeamSearch(self, num_sentences=4, beam_size=4,
+                                max_length=15):
+    """One Session.run per step and hypothesis, feeding the decoded prefix."""
+    with tf.Graph().as_default():
+      enc_inp = [tf.placeholder(tf.int32, [None]) for _ in range(10)]
+      dec_inp = [tf.placeholder(tf.int32, [None]) for _ in range(max_length)]
+      outputs, _ = tf.contrib.legacy_seq2seq.embedding_attention_seq2seq(
+          enc_inp, dec_inp, tf.contrib.rnn.GRUCell(128), **self._model_args())
+      log_probs = [tf.nn.log_softmax(o) for o in outputs]
+      with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        start = time.time()
+        for _ in range(num_sentences):
+          feed = dict((p, np.random.randint(2, 1000, size=[1]))
+                      for p in enc_inp)
+          beams = [([0], 0.0)]
+          for t in range(max_length):
+            candidates = []
+            for prefix, score in beams:
+              if prefix[-1] == 1:
+                candidates.append((prefix, score))
+                continue
+              for i, p in enumerate(dec_inp):
+                feed[p] = [prefix[i] if i < len(prefix) else 0]
+              step_log_probs = sess.run(log_probs[t], feed)[0]
+              for symbol in np.argsort(step_log_probs)[-beam_size:]:
+                candidates.append((prefix + [symbol],
+                                   score + step_log_probs[symbol]))
+            beams = sorted(candidates, key=lambda c: -c[1])[:beam_size]
+        self._report("python_beam_%d" % beam_size, time.time() - start,
+                     num_sentences)
+
+
+class LargeVocabularyBenchmark(tf.test.Benchmark):
+  """Decoder tokens per second with full and large-vocabulary softmax.
+
+  Training compares `sequence_loss` over the full projected logits with
+  `sampled_softmax_loss_function`, and greedy decoding compares the full
+  output projection with an `output_shortlist`.
+  """
+
+  def _model(self, num_symbols, output_projection, feed_previous,
+             output_shortlist=None, batch_size=32, num_steps=10,
+             num_units=256):
+    enc_inp = [tf.constant(np.random.randint(1000, size=[batch_size]),
+                           tf.int32) for _ in range(num_steps)]
+    dec_inp = [tf.constant(np.random.randint(num_symbols, size=[batch_size]),
+                           tf.int32) for _ in range(num_steps)]
+    outputs, _ = tf.contrib.legacy_seq2seq.embedding_attention_seq2seq(
+        enc_inp, dec_inp, tf.contrib.rnn.GRUCell(num_units),
+        num_encoder_symbols=1000, num_decoder_symbols=num_symbols,
+        embedding_size=128, output_projection=output_projection,
+        feed_previous=feed_previous, output_shortlist=output_shortlist)
+    return outputs, dec_inp
+
+  def _run(self, name, op, num_tokens, iters=10):
+    with tf.Session() as sess:
+      sess.run(tf.global_variables_initializer())
+      sess.run(op)
+      start = time.time()
+      for _ in range(iters):
+        sess.run(op)
+      wall_time = (time.time() - start) / iters
+    self.report_benchmark(
+        name=name,
+        iters=iters,
+        wall_time=wall_time,
+        extras={"tokens_per_sec": num_tokens / wall_time})
+
+  def benchmarkTraining(self):
+    for num_symbols in (100000, 1000000):
+      for sampled in (False, True):
+        with tf.Graph().as_default():
+          # The sampled loss looks up rows of the transposed weights.
+          proj_w_t = tf.get_variable("proj_w_t", [num_symbols, 256])
+          proj_b = tf.get_variable("proj_b", [num_symbols])
+          # Without feed_previous, the decoder does not use the projection.
+          outputs, targets = self._model(
+              num_symbols, (tf.transpose(proj_w_t), proj_b), False)
+          weights = [tf.ones_like(t, dtype=tf.float32) for t in targets]
+          if sampled:
+            loss = tf.contrib.legacy_seq2seq.sequence_loss(
+                outputs, targets, weights,
+                softmax_loss_function=(
+                    tf.contrib.legacy_seq2seq.sampled_softmax_loss_function(
+                        proj_w_t, proj_b, num_symbols)))
+          else:
+            logits = [tf.matmul(o, proj_w_t, transpose_b=True) + proj_b
+                      for o in outputs]
+            loss = tf.contrib.legacy_seq2seq.sequence_loss(
+                logits, targets, weights)
+          train_op = tf.train.GradientDescentOptimizer(0.1).minimize(loss)
+          self._run("train_%s_V%d" % ("sampled" if sampled else "full",
+                                      num_symbols),
+                    train_op, len(targets) * 32)
+
+  def benchmarkGreedyDecoding(self, shortlist_size=10000):
+    for num_symbols in (100000, 1000000):
+      for shortlist in (None, np.arange(shortlist_size)):
+        with tf.Graph().as_default():
+          proj_w = tf.get_variable("proj_w", [256, num_symbols])
+          proj_b = tf.get_variable("proj_b", [num_symbols])
+          outputs, targets = self._model(
+              num_symbols, (proj_w, proj_b), True, output_shortlist=shortlist)
+          self._run("decode_%s_V%d" % ("full" if shortlist is None
+                                       else "shortlist", num_symbols),
+                    tf.group(*outputs), len(targets) * 32)
+
+
 if __name__ == "__main__":
   tf.test.main()
@@ -20,12 +20,15 @@
 @@InitializableLookupTableBase
 @@HashTable
 @@MutableHashTable
+@@BoundedIdTable
 @@TableInitializerBase
 @@KeyValueTensorInitializer
 @@TextFileIndex
 @@TextFileInitializer
 @@TextFileIdTableInitializer
 @@TextFileStringTableInitializer
+@@BinaryFileInitializer
+@@write_binary_vocab_file
 
 """
 
@@ -20,11 +20,15 @@ from __future__ import print_function
 
 import collections
 import functools
+import struct
+
+import numpy as np
 
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
 from tensorflow.python.framework import sparse_tensor
 from tensorflow.python.framework import tensor_shape
+from tensorflow.python.lib.io import file_io
 from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import gen_data_flow_ops
@@ -191,6 +195,10 @@ class InitializableLookupTableBase(LookupInterface):
       return values
 
 
+# Must match lookup::kProcessSharedContainer in core/kernels/lookup_util.cc.
+_PROCESS_SHARED_CONTAINER = "process_shared_lookup_tables"
+
+
 class HashTable(InitializableLookupTableBase):
   """A generic hash table implementation.
 
@@ -205,7 +213,8 @@ class HashTable(InitializableLookupTableBase):
   ```
   """
 
-  def __init__(self, initializer, default_value, shared_name=None, name=None):
+  def __init__(self, initializer, default_value, shared_name=None, name=None,
+               process_shared=False):
     """Creates a non-initialized `HashTable` object.
 
     Creates a table, the type of its keys and values are specified by the
@@ -219,13 +228,24 @@ class HashTable(InitializableLookupTableBase):
       shared_name: If non-empty, this table will be shared under
         the given name across multiple sessions.
       name: A name for the operation (optional).
+      process_shared: If `True`, the table is kept in a process-wide container
+        and shared under `shared_name` by all the graphs and sessions of the
+        process, instead of by the sessions of one device. It is initialized
+        once: later runs of file initializers, such as
+        `BinaryFileInitializer`, are no-ops.
 
     Returns:
       A `HashTable` object.
+
+    Raises:
+      ValueError: if `process_shared` is set without a `shared_name`.
     """
+    if process_shared and not shared_name:
+      raise ValueError("process_shared tables require a shared_name.")
     with ops.name_scope(name, "hash_table", [initializer]) as scope:
       # pylint: disable=protected-access
       table_ref = gen_data_flow_ops._hash_table(
+          container=_PROCESS_SHARED_CONTAINER if process_shared else None,
           shared_name=shared_name,
           key_dtype=initializer.key_dtype,
           value_dtype=initializer.value_dtype,
@@ -579,6 +599,160 @@ class TextFileIdTableInitializer(TextFileInitializer):
                                                      name=name)
 
 
+_BINARY_VOCAB_MAGIC = b"TFVOCAB1"
+_BINARY_VOCAB_DTYPES = (dtypes.string, dtypes.int32, dtypes.int64,
+                        dtypes.float32, dtypes.float64)
+
+
+def _binary_vocab_section(values, dtype):
+  """Serializes `values` of `dtype` as a section of a binary vocabulary file."""
+  if dtype == dtypes.string:
+    values = [compat.as_bytes(value) for value in values]
+    offsets = np.zeros(len(values) + 1, dtype="<u8")
+    offsets[1:] = np.cumsum([len(value) for value in values])
+    return offsets.tobytes() + b"".join(values)
+  little_endian_dtype = np.dtype(dtype.as_numpy_dtype).newbyteorder("<")
+  return np.asarray(values).astype(little_endian_dtype).tobytes()
+
+
+def write_binary_vocab_file(filename,
+                            keys,
+                            values=None,
+                            key_dtype=dtypes.string,
+                            value_dtype=dtypes.int64):
+  """Writes a vocabulary in the binary format read by `BinaryFileInitializer`.
+
+  The entries are sorted by key, so that the file can be loaded with a few bulk
+  reads instead of being parsed line by line. For instance, to convert the
+  vocabulary of a `TextFileIdTableInitializer`:
+
+  ```python
+  with tf.gfile.GFile(vocab_txt) as f:
+    tf.contrib.lookup.write_binary_vocab_file(
+        vocab_bin, [line.rstrip("\n") for line in f])
+  ```
+
+  Args:
+    filename: The file to write.
+    keys: A list or 1-D numpy array of keys.
+    values: A list or 1-D numpy array of values, of the same length as `keys`.
+      Defaults to the position of each key in `keys`.
+    key_dtype: The `key` data type.
+    value_dtype: The `value` data type.
+
+  Raises:
+    ValueError: if `keys` is empty or has duplicates, `values` has a different
+      length, or a data type is not supported.
+  """
+  key_dtype = dtypes.as_dtype(key_dtype)
+  value_dtype = dtypes.as_dtype(value_dtype)
+  for dtype in (key_dtype, value_dtype):
+    if dtype not in _BINARY_VOCAB_DTYPES:
+      raise ValueError("Unsupported data type %s, expected one of %s." %
+                       (dtype, _BINARY_VOCAB_DTYPES))
+  if key_dtype == dtypes.string:
+    keys = [compat.as_bytes(key) for key in keys]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    keys = [keys[i] for i in order]
+    duplicates = [i for i in range(1, len(keys)) if keys[i] == keys[i - 1]]
+  else:
+    keys = np.asarray(keys, dtype=key_dtype.as_numpy_dtype)
+    order = np.argsort(keys, kind="mergesort")
+    keys = keys[order]
+    duplicates = np.flatnonzero(keys[1:] == keys[:-1]) + 1
+  if not len(keys):  # pylint: disable=g-explicit-length-test
+    raise ValueError("Empty vocabulary for %s." % filename)
+  if len(duplicates):  # pylint: disable=g-explicit-length-test
+    raise ValueError("Duplicate key %s in vocabulary for %s." %
+                     (keys[duplicates[0]], filename))
+  if values is None:
+    values = np.arange(len(keys))
+  if len(values) != len(keys):
+    raise ValueError("Got %d keys but %d values for %s." %
+                     (len(keys), len(values), filename))
+  if value_dtype == dtypes.string:
+    values = [values[i] for i in order]
+  else:
+    values = np.asarray(values, dtype=value_dtype.as_numpy_dtype)[order]
+
+  with file_io.FileIO(filename, "w") as f:
+    f.write(_BINARY_VOCAB_MAGIC + struct.pack(
+        "<iiq", key_dtype.as_datatype_enum, value_dtype.as_datatype_enum,
+        len(keys)))
+    f.write(_binary_vocab_section(keys, key_dtype))
+    f.write(_binary_vocab_section(values, value_dtype))
+
+
+class BinaryFileInitializer(TableInitializerBase):
+  """Table initializer from a binary vocabulary file.
+
+  Initializing from a text file parses the file line by line, which dominates
+  the startup time of jobs with very large vocabularies. The binary format
+  written by `write_binary_vocab_file` is memory-mapped instead, and all of its
+  entries are inserted into the table in a single batch.
+
+  ```python
+  tf.contrib.lookup.write_binary_vocab_file("vocab.bin", ["emerson", "lake"])
+  table = tf.contrib.lookup.HashTable(
+      tf.contrib.lookup.BinaryFileInitializer("vocab.bin"), -1)
+  ```
+
+  To load the vocabulary once per process rather than once per session, create
+  the table with `process_shared=True` and a `shared_name`.
+  """
+
+  def __init__(self,
+               filename,
+               key_dtype=dtypes.string,
+               value_dtype=dtypes.int64,
+               name=None):
+    """Constructs a table initializer object to populate from a binary file.
+
+    Args:
+      filename: The filename of the binary vocabulary file, as written by
+        `write_binary_vocab_file`. The path must be accessible from wherever
+        the graph is initialized (eg. trainer or eval workers). The filename
+        may be a scalar `Tensor`.
+      key_dtype: The `key` data type. Must match the file.
+      value_dtype: The `value` data type. Must match the file.
+      name: A name for the operation (optional).
+
+    Raises:
+      ValueError: when the filename is empty.
+    """
+    if not isinstance(filename, ops.Tensor) and not filename:
+      raise ValueError("Filename required for %s." % name)
+    self._filename = filename
+    self._name = name
+    super(BinaryFileInitializer, self).__init__(key_dtype, value_dtype)
+
+  def initialize(self, table):
+    """Initializes the table from a binary vocabulary file.
+
+    Args:
+      table: The table to be initialized.
+
+    Returns:
+      The operation that initializes the table.
+
+    Raises:
+      TypeError: when the keys and values data types do not match the table
+      key and value data types.
+    """
+    table.check_table_dtypes(self.key_dtype, self.value_dtype)
+    with ops.name_scope(self._name, "binary_file_init", [table]) as scope:
+      filename = ops.convert_to_tensor(self._filename,
+                                       dtypes.string,
+                                       name="asset_filepath")
+      # pylint: disable=protected-access
+      init_op = gen_data_flow_ops._initialize_table_from_binary_file(
+          table.table_ref, filename, name=scope)
+      # pylint: enable=protected-access
+    ops.add_to_collection(ops.GraphKeys.TABLE_INITIALIZERS, init_op)
+    ops.add_to_collection(ops.GraphKeys.ASSET_FILEPATHS, filename)
+    return init_op
+
+
 class HasherSpec(collections.namedtuple("HasherSpec", ["hasher", "key"])):
   """A structure for the spec of the hashing function to use for hash buckets.
 
@@ -620,6 +794,20 @@ class StrongHashSpec(HasherSpec):
     return super(cls, StrongHashSpec).__new__(cls, "stronghash", key)
 
 
+def _get_string_to_hash_bucket_fn(hasher_spec):
+  """Returns the string_to_hash_bucket op to use based on `hasher_spec`."""
+  if not isinstance(hasher_spec, HasherSpec):
+    raise TypeError("hasher_spec must be of type HasherSpec %s" % hasher_spec)
+  if hasher_spec.hasher == "fasthash":
+    return string_ops.string_to_hash_bucket_fast
+  if hasher_spec.hasher == "legacy":
+    return string_ops.string_to_hash_bucket
+  if hasher_spec.hasher == "stronghash":
+    return functools.partial(
+        string_ops.string_to_hash_bucket_strong, key=hasher_spec.key)
+  raise ValueError("Unknown hasher %s" % hasher_spec.hasher)
+
+
 class IdTableWithHashBuckets(LookupInterface):
   """String to Id table wrapper that assigns out-of-vocabulary keys to buckets.
 
@@ -718,16 +906,7 @@ class IdTableWithHashBuckets(LookupInterface):
 
   def _get_string_to_hash_bucket_fn(self, hasher_spec):
     """Returns the string_to_hash_bucket op to use based on `hasher_spec`."""
-    if not isinstance(hasher_spec, HasherSpec):
-      raise TypeError("hasher_spec must be of type HasherSpec %s" % hasher_spec)
-    if hasher_spec.hasher == "fasthash":
-      return string_ops.string_to_hash_bucket_fast
-    if hasher_spec.hasher == "legacy":
-      return string_ops.string_to_hash_bucket
-    if hasher_spec.hasher == "stronghash":
-      return functools.partial(
-          string_ops.string_to_hash_bucket_strong, key=hasher_spec.key)
-    raise ValueError("Unknown hasher %s" % hasher_spec.hasher)
+    return _get_string_to_hash_bucket_fn(hasher_spec)
 
   def lookup(self, keys, name=None):
     """Looks up `keys` in the table, outputs the corresponding values.
@@ -1276,3 +1455,236 @@ class MutableDenseHashTable(LookupInterface):
       return gen_data_flow_ops._lookup_table_import(self.op._table_ref,
                                                     restored_tensors[0],
                                                     restored_tensors[1])
+
+
+class BoundedIdTable(LookupInterface):
+  """A mutable table assigning ids to the most frequent keys of a stream.
+
+  Unlike a `MutableHashTable` used for online id assignment, the memory of this
+  table is bounded: it maps at most `capacity` keys to ids in `[0, capacity)`,
+  and keeps the counts of at most `max_candidates` other keys.
+
+  Keys are counted by `observe`. A key is admitted, and given an id, once it
+  has been seen `min_count` times. When all ids are in use, a key replaces the
+  least frequently seen admitted key as soon as it has been seen more often,
+  and takes over its id. Keys that are not admitted are looked up as
+  `default_value`, or as one of `num_oov_buckets` hash buckets with ids in
+  `[capacity, capacity + num_oov_buckets)`, like in `IdTableWithHashBuckets`.
+
+  Example usage:
+
+  ```python
+  table = tf.contrib.lookup.BoundedIdTable(capacity=1000000, min_count=5,
+                                           num_oov_buckets=1000)
+  ids = table.lookup(keys)
+  with tf.control_dependencies([ids]):
+    observe_op = table.observe(keys)
+  ```
+  """
+
+  def __init__(self,
+               capacity,
+               min_count=1,
+               max_candidates=None,
+               key_dtype=dtypes.string,
+               default_value=-1,
+               num_oov_buckets=0,
+               hasher_spec=FastHashSpec,
+               shared_name=None,
+               name="BoundedIdTable",
+               checkpoint=True):
+    """Creates an empty `BoundedIdTable` object.
+
+    Args:
+      capacity: The maximum number of keys with an id.
+      min_count: The number of occurrences after which a key is given an id.
+      max_candidates: The maximum number of keys without an id whose counts
+        are kept. Defaults to `capacity`.
+      key_dtype: The type of the keys, `string` or `int64`.
+      default_value: The id of keys without an id, if `num_oov_buckets` is 0.
+      num_oov_buckets: Number of hash buckets for keys without an id.
+      hasher_spec: A `HasherSpec` to specify the hash function to use for
+        assignation of out-of-vocabulary buckets.
+      shared_name: If non-empty, this table will be shared under
+        the given name across multiple sessions.
+      name: A name for the operation (optional).
+      checkpoint: if True, the contents of the table, including the counts,
+        are saved to and restored from checkpoints. If `shared_name` is empty
+        for a checkpointed table, it is shared using the table node name.
+
+    Returns:
+      A `BoundedIdTable` object.
+
+    Raises:
+      ValueError: if `capacity`, `min_count`, `max_candidates` or
+        `num_oov_buckets` is out of range.
+      TypeError: when `hasher_spec` is invalid.
+    """
+    if capacity < 1:
+      raise ValueError("capacity must be positive, got %d." % capacity)
+    if min_count < 1:
+      raise ValueError("min_count must be positive, got %d." % min_count)
+    if max_candidates is None:
+      max_candidates = capacity
+    if max_candidates < 0:
+      raise ValueError("max_candidates must be non-negative, got %d." %
+                       max_candidates)
+    if num_oov_buckets < 0:
+      raise ValueError("num_oov_buckets must be non-negative, got %d." %
+                       num_oov_buckets)
+    if not isinstance(hasher_spec, HasherSpec):
+      raise TypeError("hasher_spec must be of type HasherSpec, got %s" %
+                      hasher_spec)
+    self._capacity = capacity
+    self._num_oov_buckets = num_oov_buckets
+    self._hasher_spec = hasher_spec
+    self._default_value = ops.convert_to_tensor(default_value,
+                                                dtype=dtypes.int64)
+
+    use_node_name_sharing = checkpoint and shared_name is None
+    # pylint: disable=protected-access
+    self._table_ref = gen_data_flow_ops._bounded_id_table(
+        shared_name=shared_name,
+        use_node_name_sharing=use_node_name_sharing,
+        key_dtype=key_dtype,
+        value_dtype=dtypes.int64,
+        capacity=capacity,
+        min_count=min_count,
+        max_candidates=max_candidates,
+        name=name)
+    # pylint: enable=protected-access
+    super(BoundedIdTable, self).__init__(key_dtype, dtypes.int64,
+                                         self._table_ref.op.name.split(
+                                             "/")[-1])
+
+    if checkpoint:
+      saveable = BoundedIdTable._Saveable(self, name)
+      ops.add_to_collection(ops.GraphKeys.SAVEABLE_OBJECTS, saveable)
+
+  @property
+  def capacity(self):
+    """The maximum number of keys with an id."""
+    return self._capacity
+
+  def size(self, name=None):
+    """Compute the number of keys with an id in this table.
+
+    Args:
+      name: A name for the operation (optional).
+
+    Returns:
+      A scalar tensor containing the number of keys with an id.
+    """
+    with ops.name_scope(name, "%s_Size" % self._name,
+                        [self._table_ref]) as name:
+      # pylint: disable=protected-access
+      return gen_data_flow_ops._lookup_table_size(self._table_ref, name=name)
+
+  def lookup(self, keys, name=None):
+    """Looks up the ids of `keys`, without counting them.
+
+    Args:
+      keys: Keys to look up. May be either a `SparseTensor` or dense `Tensor`.
+      name: A name for the operation (optional).
+
+    Returns:
+      A `SparseTensor` if keys are sparse, otherwise a dense `Tensor`.
+
+    Raises:
+      TypeError: when `keys` do not match the table key data type.
+    """
+    if keys.dtype != self._key_dtype:
+      raise TypeError("Signature mismatch. Keys must be dtype %s, got %s." %
+                      (self._key_dtype, keys.dtype))
+    key_tensor = keys
+    if isinstance(keys, sparse_tensor.SparseTensor):
+      key_tensor = keys.values
+
+    with ops.name_scope(name, "%s_lookup_table_find" % self._name,
+                        [self._table_ref, key_tensor]) as name:
+      # pylint: disable=protected-access
+      ids = gen_data_flow_ops._lookup_table_find(
+          self._table_ref, key_tensor, self._default_value)
+      # pylint: enable=protected-access
+      if self._num_oov_buckets:
+        string_keys = key_tensor
+        if self._key_dtype != dtypes.string:
+          string_keys = string_ops.as_string(key_tensor)
+        buckets = _get_string_to_hash_bucket_fn(self._hasher_spec)(
+            string_keys, num_buckets=self._num_oov_buckets, name="hash_bucket")
+        ids = array_ops.where(
+            math_ops.not_equal(ids, self._default_value), ids,
+            math_ops.add(buckets, self._capacity), name=name)
+      else:
+        ids = array_ops.identity(ids, name=name)
+
+    ids.set_shape(key_tensor.get_shape())
+    if isinstance(keys, sparse_tensor.SparseTensor):
+      return sparse_tensor.SparseTensor(keys.indices, ids, keys.dense_shape)
+    return ids
+
+  def observe(self, keys, counts=None, name=None):
+    """Counts occurrences of `keys`, admitting and evicting keys as needed.
+
+    Args:
+      keys: Keys to count. May be either a `SparseTensor` or dense `Tensor`.
+      counts: Optional `int64` tensor of the same shape as the (values of)
+        `keys`, with the number of occurrences of each key. Defaults to 1.
+      name: A name for the operation (optional).
+
+    Returns:
+      The created Operation.
+
+    Raises:
+      TypeError: when `keys` do not match the table key data type.
+    """
+    if isinstance(keys, sparse_tensor.SparseTensor):
+      keys = keys.values
+    if keys.dtype != self._key_dtype:
+      raise TypeError("Signature mismatch. Keys must be dtype %s, got %s." %
+                      (self._key_dtype, keys.dtype))
+    with ops.name_scope(name, "%s_lookup_table_insert" % self._name,
+                        [self._table_ref, keys, counts]) as name:
+      if counts is None:
+        counts = array_ops.ones_like(keys, dtype=dtypes.int64)
+      counts = ops.convert_to_tensor(counts, dtype=dtypes.int64)
+      # pylint: disable=protected-access
+      return gen_data_flow_ops._lookup_table_insert(
+          self._table_ref, keys, counts, name=name)
+
+  def export(self, name=None):
+    """Returns tensors of all keys in the table with their ids and counts.
+
+    Args:
+      name: A name for the operation (optional).
+
+    Returns:
+      A vector of keys and a `[n, 2]` matrix of `(id, count)` rows, where the
+      id of keys without an id is -1.
+    """
+    with ops.name_scope(name, "%s_lookup_table_export_values" % self._name,
+                        [self._table_ref]) as name:
+      # pylint: disable=protected-access
+      exported_keys, exported_values = gen_data_flow_ops._lookup_table_export(
+          self._table_ref, self._key_dtype, dtypes.int64, name=name)
+
+    exported_values.set_shape(exported_keys.get_shape().concatenate([2]))
+    return exported_keys, exported_values
+
+  class _Saveable(BaseSaverBuilder.SaveableObject):
+    """SaveableObject implementation for BoundedIdTable."""
+
+    def __init__(self, table, name):
+      tensors = table.export()
+      specs = [
+          BaseSaverBuilder.SaveSpec(tensors[0], "", name + "-keys"),
+          BaseSaverBuilder.SaveSpec(tensors[1], "", name + "-values")
+      ]
+      # pylint: disable=protected-access
+      super(BoundedIdTable._Saveable, self).__init__(table, specs, name)
+
+    def restore(self, restored_tensors, unused_restored_shapes):
+      # pylint: disable=protected-access
+      return gen_data_flow_ops._lookup_table_import(self.op._table_ref,
+                                                    restored_tensors[0],
+                                                    restored_tensors[1])
@@ -18,7 +18,10 @@ from __future__ import division
 from __future__ import print_function
 
 import os
+import resource
 import tempfile
+import time
+
 import numpy as np
 import six
 import tensorflow as tf
@@ -1123,6 +1126,97 @@ class MutableDenseHashTableOpTest(tf.test.TestCase):
         self.assertAllEqual(0, table2.size().eval())
 
 
+class BoundedIdTableTest(tf.test.TestCase):
+
+  def testAdmission(self):
+    with self.test_session():
+      table = tf.contrib.lookup.BoundedIdTable(capacity=2, min_count=2)
+      table.observe(tf.constant(["a", "b", "a", "c"])).run()
+      self.assertAllEqual(1, table.size().eval())
+
+      output = table.lookup(tf.constant(["a", "b", "c", "d"]))
+      self.assertAllEqual([0, -1, -1, -1], output.eval())
+
+      table.observe(tf.constant(["c"])).run()
+      self.assertAllEqual([0, -1, 1, -1], output.eval())
+
+  def testEvictionRecyclesIds(self):
+    with self.test_session():
+      table = tf.contrib.lookup.BoundedIdTable(capacity=2, key_dtype=tf.int64)
+      table.observe(tf.constant([7, 7, 8], tf.int64)).run()
+      output = table.lookup(tf.constant([7, 8, 9], tf.int64))
+      self.assertAllEqual([0, 1, -1], output.eval())
+
+      # 9 needs to be seen more often than 8 to replace it.
+      table.observe(tf.constant([9], tf.int64)).run()
+      self.assertAllEqual([0, 1, -1], output.eval())
+      table.observe(tf.constant([9], tf.int64),
+                    tf.constant([1], tf.int64)).run()
+      self.assertAllEqual([0, -1, 1], output.eval())
+      self.assertAllEqual(2, table.size().eval())
+
+  def testBoundedSize(self):
+    with self.test_session():
+      table = tf.contrib.lookup.BoundedIdTable(capacity=4, max_candidates=3)
+      keys = tf.as_string(tf.range(100))
+      table.observe(keys).run()
+      table.observe(tf.constant(["hot"] * 10)).run()
+
+      exported_keys, exported_values = table.export()
+      self.assertAllEqual(4, table.size().eval())
+      self.assertLessEqual(len(exported_keys.eval()), 7)
+      self.assertAllEqual([2], exported_values.get_shape().as_list()[1:])
+      self.assertNotEqual(-1, table.lookup(tf.constant(["hot"])).eval()[0])
+
+  def testOovBuckets(self):
+    with self.test_session():
+      table = tf.contrib.lookup.BoundedIdTable(capacity=2, num_oov_buckets=3)
+      table.observe(tf.constant(["a"])).run()
+      keys = tf.SparseTensor(indices=[[0, 0], [1, 1]],
+                             values=tf.constant(["a", "b"]),
+                             dense_shape=[2, 2])
+      output = table.lookup(keys).values.eval()
+      self.assertEqual(0, output[0])
+      self.assertTrue(2 <= output[1] < 5)
+
+  def testSaveRestore(self):
+    save_dir = os.path.join(self.get_temp_dir(), "save_restore")
+    save_path = os.path.join(tempfile.mkdtemp(prefix=save_dir), "bounded")
+
+    with self.test_session(graph=tf.Graph()) as sess:
+      table = tf.contrib.lookup.BoundedIdTable(capacity=2, min_count=2,
+                                               name="t1")
+      table.observe(tf.constant(["a", "b", "a", "c", "c"])).run()
+      save = tf.train.Saver()
+      save.save(sess, save_path)
+
+    with self.test_session(graph=tf.Graph()) as sess:
+      table = tf.contrib.lookup.BoundedIdTable(capacity=2, min_count=2,
+                                               name="t1")
+      table.observe(tf.constant(["d", "d"])).run()
+      save = tf.train.Saver()
+      save.restore(sess, save_path)
+      self.assertAllEqual(2, table.size().eval())
+
+      output = table.lookup(tf.constant(["a", "b", "c", "d"]))
+      self.assertAllEqual([0, -1, 1, -1], output.eval())
+      # The count of "b" was restored as well.
+      table.observe(tf.constant(["b", "b", "b"])).run()
+      self.assertAllEqual([-1, 0, 1, -1], output.eval())
+
+  def testInvalidArguments(self):
+    with self.assertRaisesRegexp(ValueError, "capacity"):
+      tf.contrib.lookup.BoundedIdTable(capacity=0)
+    with self.assertRaisesRegexp(ValueError, "min_count"):
+      tf.contrib.lookup.BoundedIdTable(capacity=1, min_count=0)
+    with self.test_session():
+      table = tf.contrib.lookup.BoundedIdTable(capacity=1)
+      with self.assertRaises(TypeError):
+        table.lookup(tf.constant([1], tf.int64))
+      with self.assertRaisesOpError("non-negative"):
+        table.observe(tf.constant(["a"]), tf.constant([-1], tf.int64)).run()
+
+
 class StringToIndexTest(tf.test.TestCase):
 
   def test_string_to_index(self):
@@ -1497,6 +1591,98 @@ class InitializeTableFromFileOpTest(tf.test.TestCase):
       self.assertEquals(vocab_size, table.size().eval())
 
 
+class InitializeTableFromBinaryFileOpTest(tf.test.TestCase):
+
+  def _createVocabFile(self, basename, keys, values=None, **kwargs):
+    vocabulary_file = os.path.join(self.get_temp_dir(), basename)
+    tf.contrib.lookup.write_binary_vocab_file(vocabulary_file, keys, values,
+                                              **kwargs)
+    return vocabulary_file
+
+  def testStringToIdTable(self):
+    vocabulary_file = self._createVocabFile("string_to_id.bin",
+                                            ["surgery", "brain", "salad"])
+    with self.test_session():
+      table = tf.contrib.lookup.HashTable(
+          tf.contrib.lookup.BinaryFileInitializer(vocabulary_file), -1)
+      table.init.run()
+
+      output = table.lookup(tf.constant(["brain", "salad", "surgery", "UNK"]))
+      self.assertAllEqual([1, 2, 0, -1], output.eval())
+      self.assertEqual(3, table.size().eval())
+
+  def testIdToStringTable(self):
+    vocabulary_file = self._createVocabFile(
+        "id_to_string.bin", [12, -3, 7], ["brain", "salad", "surgery"],
+        key_dtype=tf.int64, value_dtype=tf.string)
+    with self.test_session():
+      table = tf.contrib.lookup.HashTable(
+          tf.contrib.lookup.BinaryFileInitializer(vocabulary_file, tf.int64,
+                                                  tf.string), "UNK")
+      table.init.run()
+
+      output = table.lookup(tf.constant([-3, 7, 12, 0], tf.int64))
+      self.assertAllEqual([b"salad", b"surgery", b"brain", b"UNK"],
+                          output.eval())
+
+  def testInvalidVocabulary(self):
+    with self.assertRaisesRegexp(ValueError, "Duplicate key"):
+      self._createVocabFile("duplicates.bin", ["brain", "salad", "brain"])
+    with self.assertRaisesRegexp(ValueError, "Got 2 keys but 1 values"):
+      self._createVocabFile("lengths.bin", ["brain", "salad"], [0])
+    with self.assertRaisesRegexp(ValueError, "Unsupported data type"):
+      self._createVocabFile("dtype.bin", [True], key_dtype=tf.bool)
+    with self.assertRaisesRegexp(ValueError, "Filename required"):
+      tf.contrib.lookup.BinaryFileInitializer("")
+
+  def testInvalidFile(self):
+    vocabulary_file = self._createVocabFile("string_to_id_2.bin",
+                                            ["brain", "salad"])
+    text_file = os.path.join(self.get_temp_dir(), "vocab.txt")
+    with open(text_file, "w") as f:
+      f.write("\n".join(["brain", "salad", "surgery"]) + "\n")
+    with self.test_session():
+      table = tf.contrib.lookup.HashTable(
+          tf.contrib.lookup.BinaryFileInitializer(vocabulary_file,
+                                                  tf.string, tf.float32), -1.0)
+      with self.assertRaisesOpError("Conflicting key/value dtypes"):
+        table.init.run()
+
+      table = tf.contrib.lookup.HashTable(
+          tf.contrib.lookup.BinaryFileInitializer(text_file), -1)
+      with self.assertRaisesOpError("is not a binary vocabulary file"):
+        table.init.run()
+
+  def testProcessSharedTable(self):
+    vocabulary_file = self._createVocabFile("shared.bin",
+                                            ["brain", "salad", "surgery"])
+
+    def make_table():
+      return tf.contrib.lookup.HashTable(
+          tf.contrib.lookup.BinaryFileInitializer(vocabulary_file), -1,
+          shared_name="process_shared_vocab_test", process_shared=True)
+
+    with tf.Graph().as_default():
+      table = make_table()
+      with tf.Session() as sess:
+        sess.run(table.init)
+        self.assertEqual(3, sess.run(table.size()))
+
+    # A new graph and session see the table initialized by the first one.
+    with tf.Graph().as_default():
+      table = make_table()
+      output = table.lookup(tf.constant(["salad", "UNK"]))
+      with tf.Session() as sess:
+        self.assertAllEqual([1, -1], sess.run(output))
+        sess.run(table.init)
+        self.assertEqual(3, sess.run(table.size()))
+
+    with self.assertRaisesRegexp(ValueError, "shared_name"):
+      tf.contrib.lookup.HashTable(
+          tf.contrib.lookup.BinaryFileInitializer(vocabulary_file), -1,
+          process_shared=True)
+
+
 class IdTableWithHashBucketsTest(tf.test.TestCase):
 
   def _createVocabFile(self, basename):
@@ -1741,5 +1927,107 @@ class IdTableWithHashBucketsTest(tf.test.TestCase):
             hasher_spec=tf.contrib.lookup.StrongHashSpec([None, 2]))
 
 
+class VocabularyTableInitBenchmark(tf.test.Benchmark):
+  """Startup time of a string-to-id table with 10M entries.
+
+  Compares the text file initializer with the binary one, and with a second
+  session reusing a process-shared table.
+  """
+
+  def _write_vocabulary_files(self, vocab_size):
+    temp_dir = tempfile.mkdtemp()
+    words = ["word%d" % i for i in range(vocab_size)]
+    text_file = os.path.join(temp_dir, "vocab.txt")
+    with open(text_file, "w") as f:
+      f.write("\n".join(words) + "\n")
+    binary_file = os.path.join(temp_dir, "vocab.bin")
+    tf.contrib.lookup.write_binary_vocab_file(binary_file, words)
+    return text_file, binary_file
+
+  def _time_init(self, name, make_initializer, vocab_size, **kwargs):
+    with tf.Graph().as_default():
+      table = tf.contrib.lookup.HashTable(make_initializer(), -1, **kwargs)
+      with tf.Session() as sess:
+        start = time.time()
+        sess.run(table.init)
+        wall_time = time.time() - start
+        assert sess.run(table.size()) == vocab_size
+    self.report_benchmark(name=name, iters=1, wall_time=wall_time,
+                          extras={"entries": vocab_size})
+
+  def benchmarkInit(self):
+    vocab_size = 10 * 1000 * 1000
+    text_file, binary_file = self._write_vocabulary_files(vocab_size)
+    self._time_init(
+        "text_file_init",
+        lambda: tf.contrib.lookup.TextFileIdTableInitializer(text_file),
+        vocab_size)
+    self._time_init(
+        "binary_file_init",
+        lambda: tf.contrib.lookup.BinaryFileInitializer(binary_file),
+        vocab_size)
+    for name in ["process_shared_first_session",
+                 "process_shared_second_session"]:
+      self._time_init(
+          name,
+          lambda: tf.contrib.lookup.BinaryFileInitializer(binary_file),
+          vocab_size, shared_name="vocab_init_benchmark", process_shared=True)
+
+
+class BoundedIdTableBenchmark(tf.test.Benchmark):
+  """Online id assignment for a Zipfian stream of keys.
+
+  Compares a `MutableHashTable` that assigns an id to every new key with a
+  `BoundedIdTable`. Reports the number of resident keys, the growth of the
+  peak RSS of the process (the bounded table runs first) and the throughput.
+  """
+
+  def _run(self, name, make_step, num_steps=200, batch_size=10000):
+    with tf.Graph().as_default():
+      int_keys = tf.placeholder(tf.int64, [batch_size])
+      step, num_keys = make_step(tf.as_string(int_keys))
+      with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        batches = [np.random.zipf(1.1, batch_size) for _ in range(num_steps)]
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.time()
+        for batch in batches:
+          sess.run(step, {int_keys: batch})
+        wall_time = time.time() - start
+        self.report_benchmark(
+            name=name, iters=num_steps, wall_time=wall_time / num_steps,
+            extras={
+                "keys_per_sec": num_steps * batch_size / wall_time,
+                "resident_keys": sess.run(num_keys),
+                "max_rss_increase_kb": resource.getrusage(
+                    resource.RUSAGE_SELF).ru_maxrss - max_rss})
+
+  def benchmarkZipfianStream(self):
+    def bounded_step(keys):
+      table = tf.contrib.lookup.BoundedIdTable(
+          capacity=100000, min_count=3, num_oov_buckets=1000, checkpoint=False)
+      ids = table.lookup(keys)
+      with tf.control_dependencies([ids]):
+        step = table.observe(keys)
+      return step, tf.shape(table.export()[0])[0]
+
+    def unbounded_step(keys):
+      table = tf.contrib.lookup.MutableHashTable(tf.string, tf.int64, -1,
+                                                 checkpoint=False)
+      next_id = tf.Variable(0, dtype=tf.int64)
+      unique_keys, _ = tf.unique(keys)
+      new_keys = tf.boolean_mask(unique_keys,
+                                 tf.equal(table.lookup(unique_keys), -1))
+      num_new_keys = tf.to_int64(tf.size(new_keys))
+      step = tf.group(
+          table.insert(new_keys, next_id + tf.range(num_new_keys,
+                                                    dtype=tf.int64)),
+          next_id.assign_add(num_new_keys))
+      return step, table.size()
+
+    self._run("bounded_id_table", bounded_step)
+    self._run("unbounded_mutable_hash_table", unbounded_step)
+
+
 if __name__ == "__main__":
   tf.test.main()
@@ -40,6 +40,8 @@
 ### Block RNNCells
 @@LSTMBlockCell
 @@GRUBlockCell
+@@MultiLSTMBlockCell
+@@MultiGRUBlockCell
 
 ### Fused RNNCells
 @@FusedRNNCell
@@ -64,6 +66,7 @@ from __future__ import print_function
 from tensorflow.contrib.rnn.python.ops.fused_rnn_cell import *
 from tensorflow.contrib.rnn.python.ops.gru_ops import *
 from tensorflow.contrib.rnn.python.ops.lstm_ops import *
+from tensorflow.contrib.rnn.python.ops.multi_block_cell import *
 from tensorflow.contrib.rnn.python.ops.rnn import *
 from tensorflow.contrib.rnn.python.ops.rnn_cell import *
 # pylint: enable=unused-import,wildcard-import,line-too-long
@@ -0,0 +1,147 @@
+# Copyright 2016 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for multi-layer block RNN cells."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow.python.util import nest
+
+
+class MultiBlockCellTest(tf.test.TestCase):
+  _use_gpu = False
+
+  def _testRestoresFromCoreCells(self, core_cell, block_cell,
+                                 use_variable_map=True):
+    batch_size = 3
+    num_steps = 4
+    input_size = 5
+    input_values = np.random.randn(batch_size, num_steps, input_size)
+    sequence_length = [4, 2, 3]
+    save_path = os.path.join(self.get_temp_dir(), "core_cells")
+
+    with self.test_session(use_gpu=self._use_gpu, graph=tf.Graph()) as sess:
+      inputs = tf.constant(input_values, dtype=tf.float32)
+      with tf.variable_scope(
+          "root", initializer=tf.random_uniform_initializer(-0.5, 0.5)):
+        core_outputs, core_state = tf.nn.dynamic_rnn(
+            core_cell, inputs, sequence_length=sequence_length,
+            dtype=tf.float32)
+      sess.run(tf.global_variables_initializer())
+      tf.train.Saver().save(sess, save_path)
+      core_values = sess.run([core_outputs] + nest.flatten(core_state))
+
+    with self.test_session(use_gpu=self._use_gpu, graph=tf.Graph()) as sess:
+      inputs = tf.constant(input_values, dtype=tf.float32)
+      with tf.variable_scope("root"):
+        block_outputs, block_state = tf.nn.dynamic_rnn(
+            block_cell, inputs, sequence_length=sequence_length,
+            dtype=tf.float32)
+      self.assertEqual(block_cell.state_size,
+                       block_state.get_shape()[1].value)
+      var_list = block_cell.variable_map() if use_variable_map else None
+      tf.train.Saver(var_list).restore(sess, save_path)
+      block_values = sess.run([block_outputs, block_state])
+
+    self.assertAllClose(core_values[0], block_values[0])
+    self.assertAllClose(np.concatenate(core_values[1:], axis=1),
+                        block_values[1])
+
+  def testMultiLSTMBlockCell(self):
+    self._testRestoresFromCoreCells(
+        tf.contrib.rnn.MultiRNNCell(
+            [tf.contrib.rnn.BasicLSTMCell(6) for _ in range(3)]),
+        tf.contrib.rnn.MultiLSTMBlockCell(6, 3))
+
+  def testMultiLSTMBlockCellPeephole(self):
+    # LSTMCell variables have the same names as the block cell ones.
+    self._testRestoresFromCoreCells(
+        tf.contrib.rnn.MultiRNNCell(
+            [tf.contrib.rnn.LSTMCell(6, use_peepholes=True)
+             for _ in range(2)]),
+        tf.contrib.rnn.MultiLSTMBlockCell(6, 2, use_peephole=True),
+        use_variable_map=False)
+
+  def testMultiGRUBlockCell(self):
+    self._testRestoresFromCoreCells(
+        tf.contrib.rnn.MultiRNNCell(
+            [tf.contrib.rnn.GRUCell(6) for _ in range(2)]),
+        tf.contrib.rnn.MultiGRUBlockCell(6, 2))
+
+  def testSingleLayer(self):
+    self._testRestoresFromCoreCells(
+        tf.contrib.rnn.MultiRNNCell([tf.contrib.rnn.GRUCell(6)]),
+        tf.contrib.rnn.MultiGRUBlockCell(6, 1))
+
+  def testInvalidArgs(self):
+    with self.assertRaisesRegexp(ValueError, "num_layers"):
+      tf.contrib.rnn.MultiLSTMBlockCell(6, 0)
+    with self.assertRaisesRegexp(ValueError, "must be called"):
+      tf.contrib.rnn.MultiGRUBlockCell(6, 2).variable_map()
+
+
+class MultiBlockCellGpuTest(MultiBlockCellTest):
+  _use_gpu = True
+
+
+class MultiBlockCellBenchmark(tf.test.Benchmark):
+  """Compares training step times with a `MultiRNNCell` of LSTM cells on CPU."""
+
+  def _benchmark(self, name, cell, num_units, batch_size=32, num_steps=50,
+                 iters=10):
+    with tf.Graph().as_default(), tf.device("/cpu:0"):
+      inputs = tf.Variable(
+          np.random.randn(batch_size, num_steps, num_units).astype(np.float32),
+          trainable=False)
+      outputs, state = tf.nn.dynamic_rnn(cell, inputs.value(),
+                                         dtype=tf.float32)
+      loss = tf.reduce_sum(outputs) + sum(
+          tf.reduce_sum(s) for s in nest.flatten(state))
+      train_op = tf.train.GradientDescentOptimizer(0.01).minimize(loss)
+      with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        sess.run(train_op)
+        start = time.time()
+        for _ in range(iters):
+          sess.run(train_op)
+        wall_time = (time.time() - start) / iters
+    self.report_benchmark(
+        name="%s_N%04d" % (name, num_units),
+        iters=iters,
+        wall_time=wall_time,
+        extras={"steps_per_sec": num_steps / wall_time})
+
+  def benchmarkMultiLSTMCells(self, num_layers=2):
+    for num_units in (64, 128, 256, 512, 1024):
+      self._benchmark(
+          "multi_rnn_cell_basic_lstm",
+          tf.contrib.rnn.MultiRNNCell(
+              [tf.contrib.rnn.BasicLSTMCell(num_units)
+               for _ in range(num_layers)]),
+          num_units)
+      self._benchmark(
+          "multi_lstm_block_cell",
+          tf.contrib.rnn.MultiLSTMBlockCell(num_units, num_layers),
+          num_units)
+
+
+if __name__ == "__main__":
+  tf.test.main()
@@ -0,0 +1,184 @@
+# Copyright 2016 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Multi-layer block RNN cells with a single state tensor."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from tensorflow.contrib.rnn.python.ops import gru_ops
+from tensorflow.contrib.rnn.python.ops import lstm_ops
+from tensorflow.python.framework import ops
+from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import rnn_cell
+from tensorflow.python.ops import variable_scope as vs
+from tensorflow.python.util import nest
+
+
+class _MultiBlockCell(rnn_cell.RNNCell):
+  """Stacks block cells of the same size, packing their states in one tensor.
+
+  Each layer computes all its gates with a single fused op over the
+  concatenation of its input and previous output, and the states of all the
+  layers are kept in one `[batch_size, state_size]` tensor.  Compared to a
+  `MultiRNNCell` with tuple states, this leaves a handful of ops per layer and
+  time step, and a single state loop variable in `dynamic_rnn`, which is what
+  dominates the step time on CPU for small hidden sizes.
+
+  Variables are created with the same names as a `MultiRNNCell` of the block
+  cells; `variable_map` converts them to the names of the core cells.
+  """
+
+  # Maps the suffix of the block cell variable names to the suffix of the
+  # corresponding core cell variable names.
+  _CORE_VARIABLE_NAMES = {}
+
+  def __init__(self, cells, num_units):
+    self._cells = cells
+    self._num_units = num_units
+    self._variables = None
+
+  @property
+  def state_size(self):
+    return sum(sum(nest.flatten(cell.state_size)) for cell in self._cells)
+
+  @property
+  def output_size(self):
+    return self._num_units
+
+  def __call__(self, inputs, state, scope=None):
+    """Runs all the layers on `inputs` and the packed `state`."""
+    with vs.variable_scope(scope or "multi_rnn_cell") as varscope:
+      num_states = sum(len(nest.flatten(cell.state_size))
+                       for cell in self._cells)
+      if num_states > 1:
+        states = array_ops.split(1, num_states, state)
+      else:
+        states = [state]
+      cur_inp = inputs
+      new_states = []
+      for i, cell in enumerate(self._cells):
+        with vs.variable_scope("cell_%d" % i):
+          num_cell_states = len(nest.flatten(cell.state_size))
+          cur_state = nest.pack_sequence_as(
+              structure=cell.state_size,
+              flat_sequence=states[:num_cell_states])
+          states = states[num_cell_states:]
+          cur_inp, new_state = cell(cur_inp, cur_state)
+          new_states.extend(nest.flatten(new_state))
+      if self._variables is None:
+        self._variables = ops.get_collection(
+            ops.GraphKeys.GLOBAL_VARIABLES, scope=varscope.name + "/")
+    if len(new_states) > 1:
+      new_state = array_ops.concat_v2(new_states, 1)
+    else:
+      new_state = new_states[0]
+    return cur_inp, new_state
+
+  def variable_map(self):
+    """Returns the variables of this cell keyed by their core cell names.
+
+    The result can be used as the `var_list` of a `Saver` to restore this cell
+    from a checkpoint of the equivalent `MultiRNNCell` of core cells created
+    in the same scope, or to write a checkpoint that they can restore.
+
+    Returns:
+      A `dict` mapping variable names to `Variable`s.
+
+    Raises:
+      ValueError: if the cell has not been called yet.
+    """
+    if self._variables is None:
+      raise ValueError("The cell must be called before its variables can be "
+                       "mapped.")
+    var_map = {}
+    for var in self._variables:
+      name = var.op.name
+      for block_name, core_name in self._CORE_VARIABLE_NAMES.items():
+        if name.endswith("/" + block_name):
+          name = name[:-len(block_name)] + core_name
+          break
+      var_map[name] = var
+    return var_map
+
+
+class MultiLSTMBlockCell(_MultiBlockCell):
+  """Multi-layer `LSTMBlockCell` with all the layer states in one tensor.
+
+  Equivalent to `MultiRNNCell([BasicLSTMCell(num_units)] * num_layers)` (or
+  `LSTMCell` with `use_peepholes=use_peephole`), but the state is a single
+  tensor holding `[c_0, h_0, c_1, h_1, ...]` along its second dimension.
+
+  Variables are named like those of a `MultiRNNCell` of `LSTMCell`, so
+  checkpoints of the latter restore directly.  `variable_map` returns the
+  names of a `MultiRNNCell` of `BasicLSTMCell`.
+  """
+
+  _CORE_VARIABLE_NAMES = {
+      "lstm_cell/weights": "basic_lstm_cell/weights",
+      "lstm_cell/biases": "basic_lstm_cell/biases",
+  }
+
+  def __init__(self, num_units, num_layers, forget_bias=1.0,
+               use_peephole=False):
+    """Initialize the multi-layer LSTM cell.
+
+    Args:
+      num_units: int, The number of units in each LSTM layer.
+      num_layers: int, The number of layers.
+      forget_bias: float, The bias added to forget gates.
+      use_peephole: Whether to use peephole connections or not.
+
+    Raises:
+      ValueError: if `num_layers` is not positive.
+    """
+    if num_layers < 1:
+      raise ValueError("num_layers must be positive, got %d." % num_layers)
+    super(MultiLSTMBlockCell, self).__init__(
+        [lstm_ops.LSTMBlockCell(num_units, forget_bias=forget_bias,
+                                use_peephole=use_peephole)
+         for _ in range(num_layers)],
+        num_units)
+
+
+class MultiGRUBlockCell(_MultiBlockCell):
+  """Multi-layer `GRUBlockCell` with all the layer states in one tensor.
+
+  Equivalent to `MultiRNNCell([GRUCell(num_units)] * num_layers)`, with the
+  layer states concatenated along the second dimension of the state.
+  `variable_map` returns the names of a `MultiRNNCell` of `GRUCell`.
+  """
+
+  _CORE_VARIABLE_NAMES = {
+      "GRUBlockCell/w_ru": "gru_cell/gates/weights",
+      "GRUBlockCell/b_ru": "gru_cell/gates/biases",
+      "GRUBlockCell/w_c": "gru_cell/candidate/weights",
+      "GRUBlockCell/b_c": "gru_cell/candidate/biases",
+  }
+
+  def __init__(self, num_units, num_layers):
+    """Initialize the multi-layer GRU cell.
+
+    Args:
+      num_units: int, The number of units in each GRU layer.
+      num_layers: int, The number of layers.
+
+    Raises:
+      ValueError: if `num_layers` is not positive.
+    """
+    if num_layers < 1:
+      raise ValueError("num_layers must be positive, got %d." % num_layers)
+    super(MultiGRUBlockCell, self).__init__(
+        [gru_ops.GRUBlockCell(num_units) for _ in range(num_layers)],
+        num_units)
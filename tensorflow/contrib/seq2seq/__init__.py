@@ -22,6 +22,7 @@ from __future__ import print_function
 import sys
 
 # pylint: disable=unused-import,line-too-long
+from tensorflow.contrib.seq2seq.python.ops.bucketing import *
 from tensorflow.contrib.seq2seq.python.ops.decoder_fn import *
 from tensorflow.contrib.seq2seq.python.ops.loss import *
 from tensorflow.contrib.seq2seq.python.ops.seq2seq import *
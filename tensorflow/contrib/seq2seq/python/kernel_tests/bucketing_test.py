@@ -0,0 +1,244 @@
+# Copyright 2016 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Tests for contrib.seq2seq.python.ops.bucketing."""
+# pylint: disable=unused-import,g-bad-import-order
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+# pylint: enable=unused-import
+
+import time
+
+import numpy as np
+import tensorflow as tf
+
+
+def _random_batch(batch_size, encoder_length, decoder_length, num_symbols):
+  """Returns the padded inputs of a batch of sequences of the given lengths."""
+  max_time = max(encoder_length, decoder_length)
+  encoder_inputs = np.zeros([batch_size, max_time], np.int32)
+  decoder_inputs = np.zeros([batch_size, max_time], np.int32)
+  encoder_inputs[:, :encoder_length] = np.random.randint(
+      2, num_symbols, size=[batch_size, encoder_length])
+  decoder_inputs[:, :decoder_length] = np.random.randint(
+      2, num_symbols, size=[batch_size, decoder_length])
+  targets = np.zeros_like(decoder_inputs)
+  targets[:, :-1] = decoder_inputs[:, 1:]
+  weights = np.zeros([batch_size, max_time], np.float32)
+  weights[:, :decoder_length - 1] = 1.0
+  return encoder_inputs, decoder_inputs, targets, weights
+
+
+def _dynamic_model(cell, num_symbols, embedding_size):
+  """Returns the placeholders and loss of a dynamic seq2seq model."""
+  encoder_inputs = tf.placeholder(tf.int32, [None, None])
+  encoder_length = tf.placeholder(tf.int32, [None])
+  decoder_inputs = tf.placeholder(tf.int32, [None, None])
+  decoder_length = tf.placeholder(tf.int32, [None])
+  targets = tf.placeholder(tf.int32, [None, None])
+  weights = tf.placeholder(tf.float32, [None, None])
+  _, loss = tf.contrib.seq2seq.dynamic_model_with_buckets(
+      encoder_inputs, encoder_length, decoder_inputs, decoder_length,
+      targets, weights,
+      lambda enc, enc_len, dec, dec_len: (
+          tf.contrib.seq2seq.dynamic_embedding_rnn_seq2seq(
+              enc, enc_len, dec, dec_len, cell, num_symbols, num_symbols,
+              embedding_size)))
+  placeholders = (encoder_inputs, encoder_length, decoder_inputs,
+                  decoder_length, targets, weights)
+  return placeholders, loss
+
+
+def _dynamic_feed(placeholders, batch_size, encoder_length, decoder_length,
+                  batch):
+  encoder_inputs, decoder_inputs, targets, weights = batch
+  return dict(zip(placeholders, [encoder_inputs, [encoder_length] * batch_size,
+                                 decoder_inputs, [decoder_length] * batch_size,
+                                 targets, weights]))
+
+
+class BucketingTest(tf.test.TestCase):
+
+  def testDynamicModelWithBuckets(self):
+    with self.test_session() as sess:
+      batch_size, num_symbols = 4, 10
+      placeholders, loss = _dynamic_model(
+          tf.nn.rnn_cell.GRUCell(8), num_symbols, embedding_size=6)
+      tf.global_variables_initializer().run()
+      for encoder_length, decoder_length in [(3, 5), (7, 2)]:
+        batch = _random_batch(batch_size, encoder_length, decoder_length,
+                              num_symbols)
+        # The same batch padded to longer sequences has the same loss.
+        padded_batch = [
+            np.pad(t, [[0, 0], [0, 4]], "constant") for t in batch]
+        losses = [
+            sess.run(loss, _dynamic_feed(placeholders, batch_size,
+                                         encoder_length, decoder_length, b))
+            for b in [batch, padded_batch]]
+        self.assertAllClose(losses[0], losses[1])
+
+  def testPerExampleLoss(self):
+    with self.test_session() as sess:
+      encoder_inputs = tf.constant([[2, 3, 0], [4, 0, 0]])
+      decoder_inputs = tf.constant([[1, 5, 6], [1, 7, 0]])
+      length = tf.constant([3, 2])
+      targets = tf.constant([[5, 6, 0], [7, 0, 0]])
+      weights = tf.constant([[1.0, 1.0, 0.0], [1.0, 0.0, 0.0]])
+      outputs, loss = tf.contrib.seq2seq.dynamic_model_with_buckets(
+          encoder_inputs, length, decoder_inputs, length, targets, weights,
+          lambda enc, enc_len, dec, dec_len: (
+              tf.contrib.seq2seq.dynamic_embedding_rnn_seq2seq(
+                  enc, enc_len, dec, dec_len, tf.nn.rnn_cell.GRUCell(4), 10, 8,
+                  embedding_size=3)),
+          per_example_loss=True)
+      tf.global_variables_initializer().run()
+      outputs_value, loss_value = sess.run([outputs, loss])
+      self.assertEqual((2, 3, 8), outputs_value.shape)
+      self.assertEqual((2,), loss_value.shape)
+      # Steps past the decoder length produce no logits.
+      self.assertAllEqual(np.zeros(8), outputs_value[1, 2])
+
+  def testBucketSeq2seqByLength(self):
+    encoder_ids = tf.placeholder(tf.int32, [None])
+    decoder_ids = tf.placeholder(tf.int32, [None])
+    input_queue = tf.FIFOQueue(1000, [tf.int32, tf.int32])
+    enqueue_op = input_queue.enqueue([encoder_ids, decoder_ids])
+    close_op = input_queue.close()
+    encoder_t, decoder_t = input_queue.dequeue()
+    encoder_t.set_shape([None])
+    decoder_t.set_shape([None])
+    batch_size = 4
+    bucket_boundaries = [4, 8]
+    batch_t = tf.contrib.seq2seq.bucket_seq2seq_by_length(
+        encoder_t, decoder_t, batch_size=batch_size,
+        bucket_boundaries=bucket_boundaries)
+
+    with self.test_session() as sess:
+      for _ in range(10):
+        for length in [2, 5, 9]:
+          sess.run(enqueue_op, {encoder_ids: [length] * length,
+                                decoder_ids: [1] + [length] * (length - 1)})
+      sess.run(close_op)
+      coord = tf.train.Coordinator()
+      threads = tf.train.start_queue_runners(coord=coord)
+      for _ in range(5):
+        batch = sess.run(batch_t)
+        length = batch["encoder_length"][0]
+        # All the examples of a batch come from the same bucket, and are
+        # padded to the longest one only.
+        self.assertAllEqual([length] * batch_size, batch["encoder_length"])
+        self.assertAllEqual([length] * batch_size, batch["decoder_length"])
+        self.assertEqual((batch_size, length), batch["encoder_inputs"].shape)
+        self.assertAllEqual(batch["decoder_inputs"][:, 1:],
+                            batch["targets"][:, :-1])
+        self.assertAllEqual([length - 1] * batch_size,
+                            batch["weights"].sum(axis=1))
+      coord.request_stop()
+      coord.join(threads)
+
+
+class BucketingBenchmark(tf.test.Benchmark):
+  """Compares static buckets with a single dynamic graph.
+
+  Reports the size of the GraphDef and the time to build the model with its
+  gradients, and the training throughput in decoder tokens per second.
+  """
+
+  _BUCKETS = [(5, 10), (10, 15), (20, 25), (40, 50)]
+
+  def _run(self, name, build_fn, feed_fn, batch_size=64, num_units=256,
+           num_symbols=1000, iters=20):
+    with tf.Graph().as_default():
+      start = time.time()
+      train_ops = build_fn(tf.nn.rnn_cell.GRUCell(num_units), num_symbols)
+      build_time = time.time() - start
+      graph_size = tf.get_default_graph().as_graph_def().ByteSize()
+      with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        num_tokens = 0
+        start = None
+        for i in range(iters + len(self._BUCKETS)):
+          # Warm up each bucket first.
+          if i == len(self._BUCKETS):
+            start = time.time()
+            num_tokens = 0
+          bucket_id = i % len(self._BUCKETS)
+          encoder_length, decoder_length = self._BUCKETS[bucket_id]
+          batch = _random_batch(batch_size, encoder_length, decoder_length,
+                                num_symbols)
+          train_op, feed_dict = feed_fn(train_ops, bucket_id, batch)
+          sess.run(train_op, feed_dict)
+          num_tokens += batch_size * decoder_length
+        wall_time = time.time() - start
+    self.report_benchmark(
+        name=name,
+        iters=iters,
+        wall_time=wall_time / iters,
+        extras={"graph_bytes": graph_size,
+                "build_time": build_time,
+                "tokens_per_sec": num_tokens / wall_time})
+
+  def benchmarkStaticBuckets(self):
+    max_encoder, max_decoder = self._BUCKETS[-1]
+
+    def build(cell, num_symbols):
+      encoder_inputs = [tf.placeholder(tf.int32, [None])
+                        for _ in range(max_encoder)]
+      decoder_inputs = [tf.placeholder(tf.int32, [None])
+                        for _ in range(max_decoder)]
+      targets = [tf.placeholder(tf.int32, [None]) for _ in range(max_decoder)]
+      weights = [tf.placeholder(tf.float32, [None])
+                 for _ in range(max_decoder)]
+      _, losses = tf.nn.seq2seq.model_with_buckets(
+          encoder_inputs, decoder_inputs, targets, weights, self._BUCKETS,
+          lambda x, y: tf.nn.seq2seq.embedding_rnn_seq2seq(
+              x, y, cell, num_symbols, num_symbols, embedding_size=128))
+      opt = tf.train.GradientDescentOptimizer(0.1)
+      train_ops = [opt.minimize(loss) for loss in losses]
+      return train_ops, encoder_inputs, decoder_inputs, targets, weights
+
+    def feed(train_ops, bucket_id, batch):
+      train_ops, encoder_inputs, decoder_inputs, targets, weights = train_ops
+      encoder_length, decoder_length = self._BUCKETS[bucket_id]
+      feed_dict = {}
+      for placeholders, values, length in zip(
+          [encoder_inputs, decoder_inputs, targets, weights], batch,
+          [encoder_length, decoder_length, decoder_length, decoder_length]):
+        for t in range(length):
+          feed_dict[placeholders[t]] = values[:, t]
+      return train_ops[bucket_id], feed_dict
+
+    self._run("static_buckets", build, feed)
+
+  def benchmarkDynamic(self):
+
+    def build(cell, num_symbols):
+      placeholders, loss = _dynamic_model(cell, num_symbols,
+                                          embedding_size=128)
+      opt = tf.train.GradientDescentOptimizer(0.1)
+      return opt.minimize(loss), placeholders
+
+    def feed(train_ops, bucket_id, batch):
+      train_op, placeholders = train_ops
+      encoder_length, decoder_length = self._BUCKETS[bucket_id]
+      return train_op, _dynamic_feed(placeholders, len(batch[0]),
+                                     encoder_length, decoder_length, batch)
+
+    self._run("dynamic", build, feed)
+
+
+if __name__ == "__main__":
+  tf.test.main()
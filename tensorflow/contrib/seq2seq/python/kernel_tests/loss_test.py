@@ -20,6 +20,7 @@ from __future__ import division
 from __future__ import print_function
 # pylint: enable=unused-import
 
+import numpy as np
 import tensorflow as tf
 
 
@@ -28,6 +29,40 @@ class LossTest(tf.test.TestCase):
   def testLoss(self):
     pass
 
+  def testDynamicSequenceLossMatchesSequenceLoss(self):
+    with self.test_session() as sess:
+      batch_size, max_time, num_symbols = 3, 4, 5
+      logits = tf.constant(
+          np.random.randn(batch_size, max_time, num_symbols), tf.float32)
+      targets = tf.constant(
+          np.random.randint(num_symbols, size=[batch_size, max_time]),
+          tf.int32)
+      # Sequences of length 4, 2 and 0.
+      weights = tf.constant([[1.0, 1.0, 1.0, 1.0],
+                             [1.0, 1.0, 0.0, 0.0],
+                             [0.0, 0.0, 0.0, 0.0]])
+      static_logits = tf.unstack(logits, axis=1)
+      static_targets = tf.unstack(targets, axis=1)
+      static_weights = tf.unstack(weights, axis=1)
+      for average_across_timesteps in [True, False]:
+        expected_by_example = tf.nn.seq2seq.sequence_loss_by_example(
+            static_logits, static_targets, static_weights,
+            average_across_timesteps=average_across_timesteps)
+        by_example = tf.contrib.seq2seq.dynamic_sequence_loss_by_example(
+            logits, targets, weights,
+            average_across_timesteps=average_across_timesteps)
+        expected = tf.nn.seq2seq.sequence_loss(
+            static_logits, static_targets, static_weights,
+            average_across_timesteps=average_across_timesteps)
+        loss = tf.contrib.seq2seq.dynamic_sequence_loss(
+            tf.transpose(logits, [1, 0, 2]), tf.transpose(targets),
+            tf.transpose(weights),
+            average_across_timesteps=average_across_timesteps,
+            time_major=True)
+        results = sess.run([expected_by_example, by_example, expected, loss])
+        self.assertAllClose(results[0], results[1])
+        self.assertAllClose(results[2], results[3])
+
 
 if __name__ == '__main__':
   tf.test.main()
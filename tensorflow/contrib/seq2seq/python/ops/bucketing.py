@@ -0,0 +1,234 @@
+# Copyright 2016 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Bucketed sequence-to-sequence training with a single graph.
+
+`tf.nn.seq2seq.model_with_buckets` builds a copy of the model for each
+(input size, output size) bucket, which multiplies the size of the graph by
+the number of buckets.  Here the model is built once with `dynamic_rnn`, whose
+number of steps is the length of the longest sequence of each batch, and the
+bucketing is moved to the input pipeline: `bucket_seq2seq_by_length` batches
+together examples of similar lengths, so that little time is spent on padding.
+
+```python
+batch = bucket_seq2seq_by_length(encoder_ids, decoder_ids, batch_size=64,
+                                 bucket_boundaries=[10, 20, 40])
+outputs, loss = dynamic_model_with_buckets(
+    batch["encoder_inputs"], batch["encoder_length"],
+    batch["decoder_inputs"], batch["decoder_length"],
+    batch["targets"], batch["weights"],
+    lambda enc, enc_len, dec, dec_len: dynamic_embedding_rnn_seq2seq(
+        enc, enc_len, dec, dec_len, cell, num_encoder_symbols,
+        num_decoder_symbols, embedding_size))
+```
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from tensorflow.contrib.seq2seq.python.ops import loss
+from tensorflow.contrib.training.python.training import bucket_ops
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import ops
+from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import embedding_ops
+from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import rnn
+from tensorflow.python.ops import rnn_cell
+from tensorflow.python.ops import variable_scope as vs
+
+__all__ = ["bucket_seq2seq_by_length",
+           "dynamic_embedding_rnn_seq2seq",
+           "dynamic_model_with_buckets"]
+
+
+def bucket_seq2seq_by_length(encoder_inputs,
+                             decoder_inputs,
+                             batch_size,
+                             bucket_boundaries,
+                             num_threads=1,
+                             capacity=32,
+                             allow_smaller_final_batch=False,
+                             name=None):
+  """Batches sequence pairs of similar lengths, padded with 0.
+
+  The examples are bucketed with `tf.contrib.training.bucket_by_sequence_length`
+  by the longer of their two sequences, and each batch is padded to its
+  longest sequences only.
+
+  As in the translation tutorial, `decoder_inputs` are expected to start with
+  a GO symbol: the targets are the decoder inputs shifted by one step, with a
+  weight of 1 for the `decoder_length - 1` steps having a target.
+
+  Args:
+    encoder_inputs: 1D int32 `Tensor`, the encoder ids of one example.
+    decoder_inputs: 1D int32 `Tensor`, the decoder ids of one example.
+    batch_size: The batch size (python int or int32 scalar).
+    bucket_boundaries: int list, increasing non-negative numbers.  The edges
+      of the length buckets, see `bucket_by_sequence_length`.
+    num_threads: An integer.  The number of threads enqueuing examples.
+    capacity: An integer.  The maximum number of minibatches in the top queue,
+      and also the maximum number of elements within each bucket.
+    allow_smaller_final_batch: (Optional) Boolean. If `True`, allow the final
+      batches to be smaller if there are insufficient items left in the queues.
+    name: (Optional) A name for the operations.
+
+  Returns:
+    A dictionary with the batched tensors "encoder_inputs" and
+    "decoder_inputs" (int32, `[batch_size, max_time]`), "encoder_length" and
+    "decoder_length" (int32, `[batch_size]`), and "targets" and "weights"
+    (int32 and float32, shaped like "decoder_inputs").
+  """
+  with ops.name_scope(name, "bucket_seq2seq_by_length",
+                      [encoder_inputs, decoder_inputs]):
+    encoder_inputs = ops.convert_to_tensor(encoder_inputs)
+    decoder_inputs = ops.convert_to_tensor(decoder_inputs)
+    encoder_length = array_ops.size(encoder_inputs)
+    decoder_length = array_ops.size(decoder_inputs)
+    _, batch = bucket_ops.bucket_by_sequence_length(
+        input_length=math_ops.maximum(encoder_length, decoder_length),
+        tensors={"encoder_inputs": encoder_inputs,
+                 "decoder_inputs": decoder_inputs,
+                 "encoder_length": encoder_length,
+                 "decoder_length": decoder_length},
+        batch_size=batch_size,
+        bucket_boundaries=bucket_boundaries,
+        num_threads=num_threads,
+        capacity=capacity,
+        dynamic_pad=True,
+        allow_smaller_final_batch=allow_smaller_final_batch)
+    decoder_inputs = batch["decoder_inputs"]
+    batch["targets"] = array_ops.concat(
+        1, [decoder_inputs[:, 1:], array_ops.zeros_like(decoder_inputs[:, :1])])
+    batch["weights"] = array_ops.sequence_mask(
+        batch["decoder_length"] - 1, array_ops.shape(decoder_inputs)[1],
+        dtype=dtypes.float32)
+    return batch
+
+
+def dynamic_embedding_rnn_seq2seq(encoder_inputs,
+                                  encoder_length,
+                                  decoder_inputs,
+                                  decoder_length,
+                                  cell,
+                                  num_encoder_symbols,
+                                  num_decoder_symbols,
+                                  embedding_size,
+                                  dtype=None,
+                                  scope=None):
+  """Embedding RNN sequence-to-sequence model over padded batches.
+
+  The model of `tf.nn.seq2seq.embedding_rnn_seq2seq` (without output
+  projection or feed_previous), built once with `dynamic_rnn` for any sequence
+  lengths.  The encoder state at `encoder_length` initializes the decoder,
+  which is fed with the embedded `decoder_inputs`.
+
+  Args:
+    encoder_inputs: int32 `Tensor` of shape `[batch_size, max_encoder_time]`.
+    encoder_length: int32 `Tensor` of shape `[batch_size]`.
+    decoder_inputs: int32 `Tensor` of shape `[batch_size, max_decoder_time]`.
+    decoder_length: int32 `Tensor` of shape `[batch_size]`.
+    cell: rnn_cell.RNNCell defining the cell function and size.
+    num_encoder_symbols: Integer; number of symbols on the encoder side.
+    num_decoder_symbols: Integer; number of symbols on the decoder side.
+    embedding_size: Integer, the length of the embedding vector for each symbol.
+    dtype: The dtype of the initial state of the RNN cell (default: tf.float32).
+    scope: VariableScope for the created subgraph; defaults to
+      "dynamic_embedding_rnn_seq2seq".
+
+  Returns:
+    A tuple of the form (outputs, state), where:
+      outputs: A float `Tensor` of shape
+        `[batch_size, max_decoder_time, num_decoder_symbols]`, the logits.
+        Steps past `decoder_length` are zeros.
+      state: The final state of the decoder.
+  """
+  with vs.variable_scope(scope or "dynamic_embedding_rnn_seq2seq",
+                         dtype=dtype) as scope:
+    dtype = scope.dtype
+    with vs.variable_scope("encoder"):
+      embedding = vs.get_variable(
+          "embedding", [num_encoder_symbols, embedding_size], dtype=dtype)
+      _, encoder_state = rnn.dynamic_rnn(
+          cell, embedding_ops.embedding_lookup(embedding, encoder_inputs),
+          sequence_length=encoder_length, dtype=dtype)
+    with vs.variable_scope("decoder"):
+      embedding = vs.get_variable(
+          "embedding", [num_decoder_symbols, embedding_size], dtype=dtype)
+      return rnn.dynamic_rnn(
+          rnn_cell.OutputProjectionWrapper(cell, num_decoder_symbols),
+          embedding_ops.embedding_lookup(embedding, decoder_inputs),
+          sequence_length=decoder_length, initial_state=encoder_state)
+
+
+def dynamic_model_with_buckets(encoder_inputs,
+                               encoder_length,
+                               decoder_inputs,
+                               decoder_length,
+                               targets,
+                               weights,
+                               seq2seq,
+                               softmax_loss_function=None,
+                               per_example_loss=False,
+                               name=None):
+  """Creates a sequence-to-sequence model for batches of any sequence lengths.
+
+  The single-graph counterpart of `tf.nn.seq2seq.model_with_buckets`: the
+  model is built once and the bucketing happens when batching the inputs, see
+  `bucket_seq2seq_by_length`.  The loss is that of the bucket the batch would
+  fall into with `model_with_buckets`, provided the weights of the padding
+  steps are 0.
+
+  Args:
+    encoder_inputs: A `Tensor` of shape `[batch_size, max_encoder_time, ...]`.
+    encoder_length: int32 `Tensor` of shape `[batch_size]`.
+    decoder_inputs: A `Tensor` of shape `[batch_size, max_decoder_time, ...]`.
+    decoder_length: int32 `Tensor` of shape `[batch_size]`.
+    targets: int32 `Tensor` of shape `[batch_size, max_decoder_time]`.
+    weights: float `Tensor` of shape `[batch_size, max_decoder_time]`.
+    seq2seq: A sequence-to-sequence model function; it takes the encoder
+      inputs and lengths and the decoder inputs and lengths, and returns a pair
+      consisting of batch-major outputs and states (as, e.g.,
+      `dynamic_embedding_rnn_seq2seq`).
+    softmax_loss_function: Function (labels-batch, inputs-batch) -> loss-batch
+      to be used instead of the standard softmax (the default if this is None).
+    per_example_loss: Boolean. If set, the returned loss will be a batch-sized
+      tensor of losses for each sequence in the batch. If unset, it will be
+      a scalar with the averaged loss from all examples.
+    name: Optional name for this operation, defaults to
+      "dynamic_model_with_buckets".
+
+  Returns:
+    A tuple of the form (outputs, loss), where:
+      outputs: The outputs of `seq2seq`, of shape
+        `[batch_size, max_decoder_time, ...]`.
+      loss: A scalar `Tensor`, or if per_example_loss is set, a 1D batch-sized
+        float `Tensor`.
+  """
+  all_inputs = [encoder_inputs, encoder_length, decoder_inputs, decoder_length,
+                targets, weights]
+  with ops.name_scope(name, "dynamic_model_with_buckets", all_inputs):
+    outputs, _ = seq2seq(encoder_inputs, encoder_length, decoder_inputs,
+                         decoder_length)
+    if per_example_loss:
+      seq_loss = loss.dynamic_sequence_loss_by_example(
+          outputs, targets, weights,
+          softmax_loss_function=softmax_loss_function)
+    else:
+      seq_loss = loss.dynamic_sequence_loss(
+          outputs, targets, weights,
+          softmax_loss_function=softmax_loss_function)
+  return outputs, seq_loss
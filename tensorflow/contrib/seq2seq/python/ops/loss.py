@@ -20,11 +20,119 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from tensorflow.python.framework import ops
 from tensorflow.python.ops import array_ops
+from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import nn_ops
 
 
-__all__ = ["seq2seq_loss"]
+__all__ = ["seq2seq_loss",
+           "dynamic_sequence_loss_by_example",
+           "dynamic_sequence_loss"]
 
 
 def seq2seq_loss(*args, **kwargs):
   pass
+
+
+def dynamic_sequence_loss_by_example(logits,
+                                     targets,
+                                     weights,
+                                     average_across_timesteps=True,
+                                     softmax_loss_function=None,
+                                     time_major=False,
+                                     name=None):
+  """Weighted cross-entropy loss for a padded batch of sequences (per example).
+
+  Computes the same loss as `tf.nn.seq2seq.sequence_loss_by_example` for the
+  outputs of `dynamic_rnn` or `dynamic_rnn_decoder`: the time steps are a
+  dimension of the tensors instead of a Python list, so the number of steps
+  may change from batch to batch.  Padding steps must have a weight of 0.
+
+  Args:
+    logits: 3D Tensor of shape `[batch_size, max_time, num_decoder_symbols]`
+      (`[max_time, batch_size, num_decoder_symbols]` if `time_major`).
+    targets: 2D int32 Tensor of shape `[batch_size, max_time]`
+      (`[max_time, batch_size]` if `time_major`).
+    weights: 2D float Tensor of the same shape as `targets`.
+    average_across_timesteps: If set, divide the returned cost by the total
+      label weight of each sequence.
+    softmax_loss_function: Function (labels-batch, inputs-batch) -> loss-batch
+      to be used instead of the standard softmax (the default if this is None).
+      It is called once on all the time steps of the batch.
+    time_major: Whether the tensors are shaped `[max_time, batch_size, ...]`.
+    name: Optional name for this operation, default:
+      "dynamic_sequence_loss_by_example".
+
+  Returns:
+    1D batch-sized float Tensor: The log-perplexity for each sequence.
+  """
+  with ops.name_scope(name, "dynamic_sequence_loss_by_example",
+                      [logits, targets, weights]):
+    logits = ops.convert_to_tensor(logits)
+    targets = ops.convert_to_tensor(targets)
+    weights = ops.convert_to_tensor(weights)
+    num_symbols = array_ops.shape(logits)[2]
+    flat_logits = array_ops.reshape(logits, array_ops.stack([-1, num_symbols]))
+    flat_targets = array_ops.reshape(targets, [-1])
+    if softmax_loss_function is None:
+      crossent = nn_ops.sparse_softmax_cross_entropy_with_logits(
+          logits=flat_logits, labels=flat_targets)
+    else:
+      crossent = softmax_loss_function(flat_targets, flat_logits)
+    log_perps = array_ops.reshape(crossent, array_ops.shape(targets)) * weights
+    time_axis = 0 if time_major else 1
+    log_perps = math_ops.reduce_sum(log_perps, time_axis)
+    if average_across_timesteps:
+      total_size = math_ops.reduce_sum(weights, time_axis)
+      total_size += 1e-12  # Just to avoid division by 0 for all-0 weights.
+      log_perps /= total_size
+  return log_perps
+
+
+def dynamic_sequence_loss(logits,
+                          targets,
+                          weights,
+                          average_across_timesteps=True,
+                          average_across_batch=True,
+                          softmax_loss_function=None,
+                          time_major=False,
+                          name=None):
+  """Weighted cross-entropy loss for a padded batch of sequences.
+
+  The counterpart of `tf.nn.seq2seq.sequence_loss`, see
+  `dynamic_sequence_loss_by_example`.
+
+  Args:
+    logits: 3D Tensor of shape `[batch_size, max_time, num_decoder_symbols]`
+      (`[max_time, batch_size, num_decoder_symbols]` if `time_major`).
+    targets: 2D int32 Tensor of shape `[batch_size, max_time]`
+      (`[max_time, batch_size]` if `time_major`).
+    weights: 2D float Tensor of the same shape as `targets`.
+    average_across_timesteps: If set, divide the returned cost by the total
+      label weight of each sequence.
+    average_across_batch: If set, divide the returned cost by the batch size.
+    softmax_loss_function: Function (labels-batch, inputs-batch) -> loss-batch
+      to be used instead of the standard softmax (the default if this is None).
+    time_major: Whether the tensors are shaped `[max_time, batch_size, ...]`.
+    name: Optional name for this operation, defaults to
+      "dynamic_sequence_loss".
+
+  Returns:
+    A scalar float Tensor: The average log-perplexity per symbol (weighted).
+  """
+  with ops.name_scope(name, "dynamic_sequence_loss",
+                      [logits, targets, weights]):
+    cost = math_ops.reduce_sum(
+        dynamic_sequence_loss_by_example(
+            logits,
+            targets,
+            weights,
+            average_across_timesteps=average_across_timesteps,
+            softmax_loss_function=softmax_loss_function,
+            time_major=time_major))
+    if average_across_batch:
+      batch_size = array_ops.shape(targets)[1 if time_major else 0]
+      return cost / math_ops.cast(batch_size, cost.dtype)
+    else:
+      return cost
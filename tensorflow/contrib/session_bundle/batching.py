@@ -0,0 +1,305 @@
+# Copyright 2016 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Dynamic request batching for models loaded into a session.
+
+Serving a model with one `Session.run` call per request spends most of the
+time in per-call overhead. `BatchingSession` accepts individual requests
+against a `SignatureDef`, merges them into batches of up to `max_batch_size`
+rows (or whatever arrived within `batch_timeout_secs`), runs them with a
+single `Session.run` and splits the results back to the callers.
+
+Usage, with a model exported as a SavedModel:
+
+```python
+sess = tf.Session(graph=tf.Graph())
+meta_graph_def = loader.load(sess, [tag_constants.SERVING], export_dir)
+signature_def = meta_graph_def.signature_def[
+    signature_constants.DEFAULT_SERVING_SIGNATURE_DEF_KEY]
+batching_session = batching.BatchingSession(sess, signature_def,
+                                            max_batch_size=64)
+# From any number of threads:
+outputs = batching_session.run({"inputs": np.array([example])})
+```
+
+A `SessionBundle` can be served the same way after converting its signatures
+with `bundle_shim.load_session_bundle_or_saved_model_bundle_from_path`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import threading
+import time
+
+import numpy as np
+from six.moves import queue  # pylint: disable=redefined-builtin
+
+
+class BatchingFuture(object):
+  """The pending result of a request submitted to a `BatchingSession`."""
+
+  def __init__(self):
+    self._done = threading.Event()
+    self._result = None
+    self._exception = None
+
+  def done(self):
+    """Returns `True` if the request has completed."""
+    return self._done.is_set()
+
+  def result(self, timeout=None):
+    """Waits for the request to complete and returns its outputs.
+
+    Args:
+      timeout: Seconds to wait for the result. `None` waits forever.
+
+    Returns:
+      A `dict` mapping the signature's output keys to numpy arrays holding the
+      rows of this request.
+
+    Raises:
+      RuntimeError: if the result is not available within `timeout`.
+      Exception: the error raised by `Session.run` for the batch, if any.
+    """
+    if not self._done.wait(timeout):
+      raise RuntimeError("Timed out waiting for the batched result.")
+    if self._exception is not None:
+      raise self._exception  # pylint: disable=raising-bad-type
+    return self._result
+
+  def _set_result(self, result):
+    self._result = result
+    self._done.set()
+
+  def _set_exception(self, exception):
+    self._exception = exception
+    self._done.set()
+
+
+_Request = collections.namedtuple("_Request", ["inputs", "num_rows", "future"])
+
+
+def _pad_to_shape(value, shape, pad_value):
+  """Pads `value` at the end of each non-batch dimension up to `shape`."""
+  if list(value.shape[1:]) == list(shape):
+    return value
+  padding = [(0, 0)] + [(0, target - dim)
+                        for dim, target in zip(value.shape[1:], shape)]
+  return np.pad(value, padding, mode="constant", constant_values=pad_value)
+
+
+class BatchingSession(object):
+  """Merges concurrent requests against a signature into batched runs.
+
+  Every input of the signature must have the batch as its first dimension, and
+  every output must produce one row per input row. Requests may contain one or
+  more rows.
+
+  Inputs listed in `pad_values` may have different non-batch dimensions across
+  requests (e.g. variable-length token ids). They are padded at the end of each
+  dimension to the largest request in the batch, using the given pad value.
+  Outputs are returned with the shape produced for the padded batch.
+
+  Batches are run from a pool of `num_batch_threads` threads, so that batching
+  of new requests overlaps with running the previous batch.
+  """
+
+  def __init__(self,
+               session,
+               signature_def,
+               max_batch_size=32,
+               batch_timeout_secs=0.002,
+               pad_values=None,
+               num_batch_threads=1):
+    """Creates a `BatchingSession`.
+
+    Args:
+      session: A `Session` holding the loaded model.
+      signature_def: A `SignatureDef` protobuf naming the input and output
+        tensors to batch, e.g. from `signature_def_utils`.
+      max_batch_size: Maximum number of rows to run in one batch. A single
+        request larger than this is run as its own batch.
+      batch_timeout_secs: Maximum time to wait for a batch to fill up after its
+        first request has arrived.
+      pad_values: Optional `dict` mapping input keys to the scalar used to pad
+        variable-shaped inputs.
+      num_batch_threads: Number of threads running batches concurrently.
+
+    Raises:
+      ValueError: if `max_batch_size` or `num_batch_threads` are not positive,
+        or `pad_values` names unknown inputs.
+    """
+    if max_batch_size < 1:
+      raise ValueError("max_batch_size must be positive, got %d." %
+                       max_batch_size)
+    if num_batch_threads < 1:
+      raise ValueError("num_batch_threads must be positive, got %d." %
+                       num_batch_threads)
+    self._session = session
+    self._input_names = dict(
+        (key, info.name) for key, info in signature_def.inputs.items())
+    self._output_keys = sorted(signature_def.outputs.keys())
+    self._output_names = [signature_def.outputs[key].name
+                          for key in self._output_keys]
+    self._pad_values = dict(pad_values or {})
+    unknown_keys = set(self._pad_values) - set(self._input_names)
+    if unknown_keys:
+      raise ValueError("pad_values refers to unknown inputs %s." %
+                       sorted(unknown_keys))
+    self._max_batch_size = max_batch_size
+    self._batch_timeout_secs = batch_timeout_secs
+    self._requests = queue.Queue()
+    self._batches = queue.Queue(maxsize=num_batch_threads)
+    self._closed = False
+    self._lock = threading.Lock()
+    self._stats = {"num_requests": 0, "num_batches": 0, "num_rows": 0}
+
+    self._threads = [threading.Thread(target=self._batching_loop)]
+    self._threads.extend(
+        threading.Thread(target=self._run_loop)
+        for _ in range(num_batch_threads))
+    for thread in self._threads:
+      thread.daemon = True
+      thread.start()
+
+  @property
+  def stats(self):
+    """A `dict` with the number of requests, batches and rows processed."""
+    with self._lock:
+      return dict(self._stats)
+
+  def submit(self, inputs):
+    """Submits a request and returns a `BatchingFuture` for its outputs.
+
+    Args:
+      inputs: A `dict` mapping every input key of the signature to a value
+        whose first dimension is the number of rows in the request. All values
+        must have the same number of rows.
+
+    Returns:
+      A `BatchingFuture`.
+
+    Raises:
+      ValueError: if `inputs` does not match the signature.
+      RuntimeError: if the session has been closed.
+    """
+    if self._closed:
+      raise RuntimeError("BatchingSession has been closed.")
+    if set(inputs) != set(self._input_names):
+      raise ValueError("Expected inputs %s, got %s." %
+                       (sorted(self._input_names), sorted(inputs)))
+    inputs = dict((key, np.asarray(value)) for key, value in inputs.items())
+    num_rows = None
+    for key, value in inputs.items():
+      if not value.shape:
+        raise ValueError("Input %s must have a batch dimension." % key)
+      if num_rows is None:
+        num_rows = value.shape[0]
+      elif value.shape[0] != num_rows:
+        raise ValueError("All inputs must have the same number of rows, got "
+                         "%d and %d for %s." % (num_rows, value.shape[0], key))
+    future = BatchingFuture()
+    self._requests.put(_Request(inputs, num_rows, future))
+    return future
+
+  def run(self, inputs, timeout=None):
+    """Submits a request and waits for its outputs. See `submit`."""
+    return self.submit(inputs).result(timeout)
+
+  def close(self):
+    """Runs the pending requests and stops the batching threads."""
+    if self._closed:
+      return
+    self._closed = True
+    self._requests.put(None)
+    for thread in self._threads:
+      thread.join()
+
+  def _batching_loop(self):
+    """Groups requests into batches and hands them to the run threads."""
+    pending = None
+    while True:
+      request = pending or self._requests.get()
+      pending = None
+      if request is None:
+        break
+      batch = [request]
+      num_rows = request.num_rows
+      deadline = time.time() + self._batch_timeout_secs
+      while num_rows < self._max_batch_size:
+        try:
+          request = self._requests.get(
+              timeout=max(0.0, deadline - time.time()))
+        except queue.Empty:
+          break
+        if (request is None or
+            num_rows + request.num_rows > self._max_batch_size):
+          # Does not fit (or is the stop signal): start the next batch with it.
+          pending = request
+          break
+        batch.append(request)
+        num_rows += request.num_rows
+      self._batches.put(batch)
+      if pending is None and request is None:
+        break
+    # Fail requests that raced with `close`.
+    while True:
+      try:
+        request = self._requests.get_nowait()
+      except queue.Empty:
+        break
+      if request is not None:
+        request.future._set_exception(  # pylint: disable=protected-access
+            RuntimeError("BatchingSession has been closed."))
+    for _ in range(len(self._threads) - 1):
+      self._batches.put(None)
+
+  def _merge_inputs(self, batch):
+    feed_dict = {}
+    for key, name in self._input_names.items():
+      values = [request.inputs[key] for request in batch]
+      if key in self._pad_values and len(values) > 1:
+        shape = np.max([value.shape[1:] for value in values], axis=0)
+        values = [_pad_to_shape(value, shape, self._pad_values[key])
+                  for value in values]
+      feed_dict[name] = (values[0] if len(values) == 1
+                         else np.concatenate(values))
+    return feed_dict
+
+  def _run_loop(self):
+    """Runs batches and splits their outputs back to the requests."""
+    while True:
+      batch = self._batches.get()
+      if batch is None:
+        break
+      try:
+        outputs = self._session.run(self._output_names,
+                                    feed_dict=self._merge_inputs(batch))
+      except Exception as e:  # pylint: disable=broad-except
+        for request in batch:
+          request.future._set_exception(e)  # pylint: disable=protected-access
+        continue
+      start = 0
+      for request in batch:
+        end = start + request.num_rows
+        request.future._set_result(dict(  # pylint: disable=protected-access
+            (key, output[start:end])
+            for key, output in zip(self._output_keys, outputs)))
+        start = end
+      with self._lock:
+        self._stats["num_requests"] += len(batch)
+        self._stats["num_batches"] += 1
+        self._stats["num_rows"] += start
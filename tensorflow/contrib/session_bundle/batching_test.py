@@ -0,0 +1,175 @@
+# Copyright 2016 The TensorFlow Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Tests for batching.py."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow.contrib.session_bundle import batching
+from tensorflow.python.saved_model import signature_def_utils
+
+
+def _half_plus_two_session():
+  """Returns a session and signature computing y = 0.5 * x + 2."""
+  graph = tf.Graph()
+  with graph.as_default():
+    x = tf.placeholder(tf.float32, shape=[None], name="x")
+    y = tf.add(tf.mul(x, 0.5), 2.0, name="y")
+  signature_def = signature_def_utils.predict_signature_def(
+      inputs={"x": x}, outputs={"y": y})
+  return tf.Session(graph=graph), signature_def
+
+
+class BatchingSessionTest(tf.test.TestCase):
+
+  def testRun(self):
+    sess, signature_def = _half_plus_two_session()
+    batching_session = batching.BatchingSession(sess, signature_def)
+    outputs = batching_session.run({"x": np.array([0.0, 2.0])})
+    self.assertAllClose([2.0, 3.0], outputs["y"])
+    batching_session.close()
+
+  def testConcurrentRequestsAreBatched(self):
+    sess, signature_def = _half_plus_two_session()
+    batching_session = batching.BatchingSession(
+        sess, signature_def, max_batch_size=8, batch_timeout_secs=1.0)
+    futures = [batching_session.submit({"x": np.array([float(i)])})
+               for i in range(16)]
+    for i, future in enumerate(futures):
+      self.assertAllClose([0.5 * i + 2.0], future.result()["y"])
+    batching_session.close()
+    stats = batching_session.stats
+    self.assertEqual(16, stats["num_requests"])
+    self.assertEqual(16, stats["num_rows"])
+    self.assertEqual(2, stats["num_batches"])
+
+  def testPadding(self):
+    graph = tf.Graph()
+    with graph.as_default():
+      ids = tf.placeholder(tf.int32, shape=[None, None])
+      length = tf.reduce_sum(tf.to_int32(tf.not_equal(ids, -1)), 1)
+    signature_def = signature_def_utils.predict_signature_def(
+        inputs={"ids": ids}, outputs={"length": length})
+    batching_session = batching.BatchingSession(
+        tf.Session(graph=graph), signature_def, max_batch_size=2,
+        batch_timeout_secs=1.0, pad_values={"ids": -1})
+    short = batching_session.submit({"ids": np.array([[1, 2]])})
+    long_ = batching_session.submit({"ids": np.array([[1, 2, 3, 4]])})
+    self.assertAllEqual([2], short.result()["length"])
+    self.assertAllEqual([4], long_.result()["length"])
+    batching_session.close()
+    self.assertEqual(1, batching_session.stats["num_batches"])
+
+  def testErrorIsPropagated(self):
+    sess, signature_def = _half_plus_two_session()
+    batching_session = batching.BatchingSession(sess, signature_def)
+    future = batching_session.submit({"x": np.array([[1.0, 2.0]])})
+    with self.assertRaises(ValueError):
+      future.result()
+    batching_session.close()
+
+  def testInvalidArgs(self):
+    sess, signature_def = _half_plus_two_session()
+    with self.assertRaisesRegexp(ValueError, "max_batch_size"):
+      batching.BatchingSession(sess, signature_def, max_batch_size=0)
+    with self.assertRaisesRegexp(ValueError, "unknown inputs"):
+      batching.BatchingSession(sess, signature_def, pad_values={"z": 0})
+    batching_session = batching.BatchingSession(sess, signature_def)
+    with self.assertRaisesRegexp(ValueError, "Expected inputs"):
+      batching_session.submit({"z": np.array([1.0])})
+    with self.assertRaisesRegexp(ValueError, "batch dimension"):
+      batching_session.submit({"x": np.array(1.0)})
+    batching_session.close()
+    with self.assertRaisesRegexp(RuntimeError, "closed"):
+      batching_session.submit({"x": np.array([1.0])})
+
+
+class BatchingSessionBenchmark(tf.test.Benchmark):
+  """Load test comparing batched and unbatched serving.
+
+  `num_clients` threads each issue single-row requests back to back. Reports
+  QPS and p50/p99 request latency.
+  """
+
+  def _model(self, hidden_size=256):
+    graph = tf.Graph()
+    with graph.as_default():
+      x = tf.placeholder(tf.float32, shape=[None, hidden_size])
+      w = tf.constant(np.random.randn(hidden_size, hidden_size),
+                      dtype=tf.float32)
+      y = tf.nn.relu(tf.matmul(tf.nn.relu(tf.matmul(x, w)), w))
+    signature_def = signature_def_utils.predict_signature_def(
+        inputs={"x": x}, outputs={"y": y})
+    return tf.Session(graph=graph), signature_def, hidden_size
+
+  def _load_test(self, name, run_fn, hidden_size, num_clients=16,
+                 requests_per_client=200):
+    latencies = []
+    lock = threading.Lock()
+    request = {"x": np.random.randn(1, hidden_size).astype(np.float32)}
+
+    def client():
+      client_latencies = []
+      for _ in range(requests_per_client):
+        start = time.time()
+        run_fn(request)
+        client_latencies.append(time.time() - start)
+      with lock:
+        latencies.extend(client_latencies)
+
+    threads = [threading.Thread(target=client) for _ in range(num_clients)]
+    start = time.time()
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    wall_time = time.time() - start
+    num_requests = num_clients * requests_per_client
+    self.report_benchmark(
+        name=name,
+        iters=num_requests,
+        wall_time=wall_time / num_requests,
+        extras={"qps": num_requests / wall_time,
+                "p50_latency_ms": 1000 * np.percentile(latencies, 50),
+                "p99_latency_ms": 1000 * np.percentile(latencies, 99)})
+
+  def benchmarkUnbatched(self):
+    sess, signature_def, hidden_size = self._model()
+    input_name = signature_def.inputs["x"].name
+    output_name = signature_def.outputs["y"].name
+    self._load_test(
+        "unbatched",
+        lambda request: sess.run(output_name, {input_name: request["x"]}),
+        hidden_size)
+
+  def benchmarkBatched(self):
+    for max_batch_size in [8, 32]:
+      sess, signature_def, hidden_size = self._model()
+      batching_session = batching.BatchingSession(
+          sess, signature_def, max_batch_size=max_batch_size,
+          batch_timeout_secs=0.001)
+      self._load_test("batched_%d" % max_batch_size, batching_session.run,
+                      hidden_size)
+      batching_session.close()
+
+
+if __name__ == "__main__":
+  tf.test.main()
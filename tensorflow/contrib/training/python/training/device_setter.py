@@ -19,11 +19,20 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+
 import numpy as np
 
+from tensorflow.python.framework import device as pydev
+from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import ops
 from tensorflow.python.framework import tensor_shape
 
 
+_VARIABLE_OPS = ("Variable", "VariableV2")
+_UPDATE_OP_PREFIXES = ("Apply", "SparseApply", "Assign", "Scatter")
+
+
 class GreedyLoadBalancingStrategy(object):
   """Returns the least-loaded ps task for op placement.
 
@@ -105,3 +114,246 @@ def byte_size_load_fn(op):
     shape = tensor_shape.TensorShape(op.get_attr("shape"))
   shape.assert_is_fully_defined()
   return shape.num_elements() * elem_size
+
+
+def _balanced_assignment(num_tasks, costs):
+  """Assigns ops to tasks, largest cost first, each to the least-loaded task.
+
+  Args:
+    num_tasks: Number of tasks.
+    costs: A `dict` mapping op names to numeric costs.
+
+  Returns:
+    A tuple `(assignment, loads)` of a `dict` mapping op names to task indices
+    and a numpy array with the resulting load of each task.
+  """
+  loads = np.zeros(num_tasks)
+  assignment = {}
+  for name, cost in sorted(costs.items(), key=lambda item: (-item[1], item[0])):
+    task = int(np.argmin(loads))
+    loads[task] += cost
+    assignment[name] = task
+  return assignment, loads
+
+
+class CostModelLoadBalancingStrategy(object):
+  """Places ps ops according to a balanced assignment of measured costs.
+
+  Unlike `GreedyLoadBalancingStrategy`, which places each op as it is created,
+  this strategy solves the assignment up front from a cost profile covering
+  all ps ops, so the result does not depend on the creation order. Costs are
+  typically the bytes read and written per step, which makes sparsely
+  accessed embeddings much cheaper than dense layers of the same size. See
+  `variable_costs_from_run_metadata` and `estimate_variable_costs`.
+
+  Ops missing from the profile (e.g. created after profiling) are placed
+  greedily on the least-loaded task using `default_load_fn`.
+
+  This class is intended to be used as a `ps_strategy` in
+  `tf.train.replica_device_setter`.
+  """
+
+  def __init__(self, num_tasks, costs, default_load_fn=None):
+    """Create a new `CostModelLoadBalancingStrategy`.
+
+    Args:
+      num_tasks: Number of ps tasks to balance among.
+      costs: A `dict` mapping ps op names (e.g. variable names without the
+        `:0` suffix) to numeric costs.
+      default_load_fn: A callable that takes an `Operation` and returns a
+        numeric load value, used for ops missing from `costs`. Defaults to
+        `byte_size_load_fn`.
+    """
+    self._num_tasks = num_tasks
+    self._default_load_fn = default_load_fn or byte_size_load_fn
+    self._assignment, self._ps_loads = _balanced_assignment(num_tasks, costs)
+
+  @property
+  def ps_loads(self):
+    """A list with the predicted load of each ps task."""
+    return list(self._ps_loads)
+
+  def __call__(self, op):
+    """Choose a ps task index for the given `Operation`.
+
+    Args:
+      op: A `Operation` to be placed on ps.
+
+    Returns:
+      The ps task index assigned to the op in the cost profile, or the
+      least-loaded ps task so far if the op is not in the profile.
+    """
+    task = self._assignment.get(op.name)
+    if task is None:
+      task = int(np.argmin(self._ps_loads))
+      self._ps_loads[task] += self._default_load_fn(op)
+    return task
+
+
+def _tensor_description_bytes(tensor_description):
+  """Returns the number of bytes of a `TensorDescription`."""
+  requested_bytes = tensor_description.allocation_description.requested_bytes
+  if requested_bytes:
+    return requested_bytes
+  shape = tensor_shape.TensorShape(tensor_description.shape)
+  if not shape.is_fully_defined():
+    return 0
+  return shape.num_elements() * dtypes.as_dtype(tensor_description.dtype).size
+
+
+def _variable_step_bytes(variable_op, output_bytes):
+  """Returns the bytes a variable reads and writes in a traced step.
+
+  Args:
+    variable_op: A variable `Operation`.
+    output_bytes: A `dict` mapping `(op_name, output_index)` to the bytes of
+      the outputs produced in the step.
+
+  Returns:
+    The bytes read and written by `variable_op`.
+  """
+  dense_read = False
+  step_bytes = 0
+  tensors = [variable_op.outputs[0]]
+  while tensors:
+    tensor = tensors.pop()
+    for consumer in tensor.consumers():
+      if (consumer.name, 0) not in output_bytes:
+        continue  # Not run in the step.
+      if consumer.type == "Identity":
+        tensors.append(consumer.outputs[0])
+      elif consumer.type.startswith(_UPDATE_OP_PREFIXES):
+        step_bytes += sum(
+            output_bytes.get((t.op.name, t.value_index), 0)
+            for t in consumer.inputs[1:] if t.op.type not in _VARIABLE_OPS)
+      elif consumer.type == "Gather":
+        step_bytes += output_bytes[(consumer.name, 0)]
+      else:
+        dense_read = True
+  if dense_read:
+    step_bytes += byte_size_load_fn(variable_op)
+  return step_bytes
+
+
+def variable_costs_from_run_metadata(run_metadata, graph=None):
+  """Measures the bytes each variable reads and writes per step.
+
+  Uses the step stats collected by running one training step with
+  `RunOptions(trace_level=RunOptions.FULL_TRACE)`. A variable consumed by any
+  op other than `Gather` (through its `Identity` snapshots) is read in full.
+  `Gather`s, which `embedding_lookup` colocates with the variable, only read
+  the bytes of their output, and updates (e.g. `ApplyAdam` or `ScatterAdd`)
+  write the bytes of their non-variable inputs. Optimizer slots are colocated
+  with their variable and so are not counted separately.
+
+  Args:
+    run_metadata: A `RunMetadata` protocol buffer with step stats.
+    graph: The `Graph` that was run. Defaults to the default graph.
+
+  Returns:
+    A `dict` mapping variable op names to bytes per step, suitable as the
+    `costs` of a `CostModelLoadBalancingStrategy`.
+  """
+  graph = graph or ops.get_default_graph()
+  output_bytes = {}
+  for dev_stats in run_metadata.step_stats.dev_stats:
+    for node_stats in dev_stats.node_stats:
+      for output in node_stats.output:
+        output_bytes[(node_stats.node_name, output.slot)] = (
+            _tensor_description_bytes(output.tensor_description))
+  return dict((op.name, _variable_step_bytes(op, output_bytes))
+              for op in graph.get_operations() if op.type in _VARIABLE_OPS)
+
+
+def estimate_variable_costs(grads_and_vars, sparse_rows=None):
+  """Estimates the bytes each variable reads and writes per step.
+
+  A variable with a dense gradient is read and updated in full every step. A
+  variable with an `IndexedSlices` gradient only transfers the rows it
+  gathers and updates, i.e. the number of rows of the gradient.
+
+  Args:
+    grads_and_vars: A list of `(gradient, variable)` pairs, e.g. as returned
+      by `Optimizer.compute_gradients()`. Pairs with a `None` gradient are
+      skipped.
+    sparse_rows: Number of rows per step to assume for `IndexedSlices`
+      gradients whose number of rows is not statically known.
+
+  Returns:
+    A `dict` mapping variable op names to estimated bytes per step, suitable
+    as the `costs` of a `CostModelLoadBalancingStrategy`.
+
+  Raises:
+    ValueError: if the number of rows of an `IndexedSlices` gradient is not
+      statically known and `sparse_rows` is not given.
+  """
+  costs = {}
+  for grad, var in grads_and_vars:
+    if grad is None:
+      continue
+    var_bytes = byte_size_load_fn(var.op)
+    if isinstance(grad, ops.IndexedSlices):
+      rows = grad.values.get_shape()[:1].num_elements()
+      if rows is None:
+        if sparse_rows is None:
+          raise ValueError(
+              "Number of rows of the gradient of %s is unknown; pass "
+              "sparse_rows." % var.op.name)
+        rows = sparse_rows
+      var_rows = var.get_shape()[0].value
+      var_bytes = min(var_bytes, var_bytes * rows // max(var_rows, 1))
+    costs[var.op.name] = 2 * var_bytes
+  return costs
+
+
+def predicted_ps_loads(costs, graph=None, ps_job="ps", default_load_fn=None):
+  """Returns the predicted load of each ps task for a placed graph.
+
+  Args:
+    costs: A `dict` mapping variable op names to costs, as passed to
+      `CostModelLoadBalancingStrategy`.
+    graph: The `Graph` whose variables have been placed. Defaults to the
+      default graph.
+    ps_job: The name of the ps job.
+    default_load_fn: A callable that takes an `Operation` and returns a
+      numeric load value, used for variables missing from `costs`. Defaults to
+      `byte_size_load_fn`.
+
+  Returns:
+    A `dict` mapping ps task indices to their total load.
+  """
+  graph = graph or ops.get_default_graph()
+  default_load_fn = default_load_fn or byte_size_load_fn
+  loads = collections.defaultdict(float)
+  for op in graph.get_operations():
+    if op.type not in _VARIABLE_OPS:
+      continue
+    device = pydev.DeviceSpec.from_string(op.device or "")
+    if device.job != ps_job:
+      continue
+    loads[device.task or 0] += (
+        costs[op.name] if op.name in costs else default_load_fn(op))
+  return dict(loads)
+
+
+def print_ps_loads(costs, graph=None, ps_job="ps", default_load_fn=None):
+  """Prints the predicted load of each ps task for a placed graph.
+
+  See `predicted_ps_loads` for the arguments. Also prints the imbalance, the
+  ratio of the largest load to the mean load, which bounds the step time of
+  network-bound jobs.
+
+  Returns:
+    A `dict` mapping ps task indices to their total load.
+  """
+  loads = predicted_ps_loads(costs, graph, ps_job, default_load_fn)
+  if not loads:
+    print("No variables placed on job %s." % ps_job)
+    return loads
+  total = sum(loads.values()) or 1.0
+  for task in sorted(loads):
+    print("/job:%s/task:%d: %.0f (%.1f%%)" %
+          (ps_job, task, loads[task], 100.0 * loads[task] / total))
+  print("Imbalance (max / mean): %.2f" %
+        (max(loads.values()) * len(loads) / total))
+  return loads
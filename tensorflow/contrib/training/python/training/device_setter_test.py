@@ -82,5 +82,86 @@ class GreedyLoadBalancingStrategyTest(tf.test.TestCase):
       self.assertDeviceEqual("/job:ps/task:0", u.device)
       self.assertDeviceEqual("/job:ps/task:0", u.initializer.device)
 
+
+class CostModelLoadBalancingStrategyTest(tf.test.TestCase):
+  _cluster_spec = tf.train.ClusterSpec({
+      "ps": ["ps0:2222", "ps1:2222"],
+      "worker": ["worker0:2222"]})
+
+  def testBalancedAssignmentIgnoresCreationOrder(self):
+    costs = {"a": 1.0, "b": 1.0, "c": 2.0, "d": 4.0}
+    with tf.device(tf.train.replica_device_setter(
+        cluster=self._cluster_spec,
+        ps_strategy=tf.contrib.training.CostModelLoadBalancingStrategy(
+            2, costs))):
+      a = tf.Variable(tf.zeros([1]), name="a")
+      b = tf.Variable(tf.zeros([1]), name="b")
+      c = tf.Variable(tf.zeros([1]), name="c")
+      d = tf.Variable(tf.zeros([1]), name="d")
+    # Largest first: d -> 0, c -> 1, a -> 1, b -> 1.
+    self.assertDeviceEqual("/job:ps/task:0", d.device)
+    self.assertDeviceEqual("/job:ps/task:1", c.device)
+    self.assertDeviceEqual("/job:ps/task:1", a.device)
+    self.assertDeviceEqual("/job:ps/task:1", b.device)
+    self.assertEqual({0: 4.0, 1: 4.0},
+                     tf.contrib.training.predicted_ps_loads(costs))
+
+  def testUnknownOpsArePlacedGreedily(self):
+    strategy = tf.contrib.training.CostModelLoadBalancingStrategy(
+        2, {"big": 100.0}, default_load_fn=lambda unused_op: 10.0)
+    with tf.device(tf.train.replica_device_setter(
+        cluster=self._cluster_spec, ps_strategy=strategy)):
+      big = tf.Variable(tf.zeros([1]), name="big")
+      u = tf.Variable(tf.zeros([1]), name="u")
+      v = tf.Variable(tf.zeros([1]), name="v")
+    self.assertDeviceEqual("/job:ps/task:0", big.device)
+    self.assertDeviceEqual("/job:ps/task:1", u.device)
+    self.assertDeviceEqual("/job:ps/task:1", v.device)
+    self.assertEqual([100.0, 20.0], strategy.ps_loads)
+
+  def testEstimateVariableCosts(self):
+    dense = tf.Variable(tf.zeros([10, 4]), name="dense")
+    embedding = tf.Variable(tf.zeros([1000, 4]), name="embedding")
+    sparse_grad = tf.IndexedSlices(
+        tf.zeros([5, 4]), tf.zeros([5], dtype=tf.int32))
+    costs = tf.contrib.training.estimate_variable_costs(
+        [(tf.zeros([10, 4]), dense), (sparse_grad, embedding),
+         (None, embedding)])
+    self.assertEqual({"dense": 2 * 160, "embedding": 2 * 5 * 16}, costs)
+
+  def testEstimateVariableCostsUnknownRows(self):
+    embedding = tf.Variable(tf.zeros([1000, 4]), name="embedding")
+    sparse_grad = tf.IndexedSlices(
+        tf.placeholder(tf.float32, [None, 4]),
+        tf.placeholder(tf.int32, [None]))
+    with self.assertRaisesRegexp(ValueError, "sparse_rows"):
+      tf.contrib.training.estimate_variable_costs([(sparse_grad, embedding)])
+    costs = tf.contrib.training.estimate_variable_costs(
+        [(sparse_grad, embedding)], sparse_rows=10)
+    self.assertEqual({"embedding": 2 * 10 * 16}, costs)
+
+  def testVariableCostsFromRunMetadata(self):
+    with tf.Graph().as_default():
+      dense = tf.Variable(tf.ones([10, 4]), name="dense")
+      embedding = tf.Variable(tf.ones([1000, 4]), name="embedding")
+      ids = tf.constant([1, 2, 3])
+      loss = (tf.reduce_sum(tf.matmul(tf.ones([1, 10]), dense)) +
+              tf.reduce_sum(tf.gather(embedding, ids)))
+      train_op = tf.train.GradientDescentOptimizer(0.1).minimize(loss)
+      with self.test_session() as sess:
+        sess.run(tf.global_variables_initializer())
+        run_metadata = tf.RunMetadata()
+        sess.run(train_op,
+                 options=tf.RunOptions(trace_level=tf.RunOptions.FULL_TRACE),
+                 run_metadata=run_metadata)
+      costs = tf.contrib.training.variable_costs_from_run_metadata(
+          run_metadata)
+    # The dense variable is read and updated in full, the embedding only for
+    # the three gathered rows.
+    self.assertGreaterEqual(costs["dense"], 2 * 160)
+    self.assertGreater(costs["embedding"], 0)
+    self.assertLess(costs["embedding"], costs["dense"])
+
+
 if __name__ == "__main__":
   tf.test.main()
@@ -16,6 +16,7 @@ limitations under the License.
 #define EIGEN_USE_THREADS
 
 #include <algorithm>
+#include <cstring>
 #include <memory>
 #include <string>
 #include <vector>
@@ -28,10 +29,13 @@ limitations under the License.
 #include "tensorflow/core/kernels/initializable_lookup_table.h"
 #include "tensorflow/core/kernels/lookup_util.h"
 #include "tensorflow/core/lib/core/errors.h"
+#include "tensorflow/core/lib/core/raw_coding.h"
 #include "tensorflow/core/lib/core/status.h"
 #include "tensorflow/core/lib/io/inputbuffer.h"
 #include "tensorflow/core/lib/strings/numbers.h"
 #include "tensorflow/core/lib/strings/str_util.h"
+#include "tensorflow/core/platform/cpu_info.h"
+#include "tensorflow/core/platform/env.h"
 #include "tensorflow/core/platform/macros.h"
 
 namespace tensorflow {
@@ -350,6 +354,165 @@ Status InitializeTableFromTextFile(const string& filename, int64 vocab_size,
   return s;
 }
 
+// Binary vocabulary files start with the magic string, the key and value
+// dtypes and the number of entries. See the InitializeTableFromBinaryFile op.
+static const char kBinaryVocabMagic[] = "TFVOCAB1";
+static const uint64 kBinaryVocabMagicSize = sizeof(kBinaryVocabMagic) - 1;
+static const uint64 kBinaryVocabHeaderSize = kBinaryVocabMagicSize + 16;
+
+// Copies the `num_entries` elements of `tensor` stored at `*offset` in the
+// `size` bytes of `data` and advances `*offset` past them.
+Status ReadBinaryVocabSection(const string& filename, const char* data,
+                              uint64 size, uint64 num_entries, uint64* offset,
+                              Tensor* tensor) {
+  const uint64 remaining = size - *offset;
+  if (tensor->dtype() != DT_STRING) {
+    const uint64 element_size = DataTypeSize(tensor->dtype());
+    if (element_size == 0) {
+      return errors::InvalidArgument("Data type ", tensor->dtype(),
+                                     " not supported.");
+    }
+    if (num_entries > remaining / element_size) {
+      return errors::InvalidArgument("Truncated binary vocabulary file ",
+                                     filename);
+    }
+    const uint64 num_bytes = num_entries * element_size;
+    std::memcpy(const_cast<char*>(tensor->tensor_data().data()),
+                data + *offset, num_bytes);
+    *offset += num_bytes;
+    return Status::OK();
+  }
+
+  // Strings are stored as num_entries + 1 offsets into their concatenation.
+  if (num_entries >= remaining / sizeof(uint64)) {
+    return errors::InvalidArgument("Truncated binary vocabulary file ",
+                                   filename);
+  }
+  const char* string_offsets = data + *offset;
+  const uint64 strings_begin = *offset + (num_entries + 1) * sizeof(uint64);
+  const uint64 strings_size = size - strings_begin;
+  auto strings = tensor->flat<string>();
+  uint64 begin = core::DecodeFixed64(string_offsets);
+  if (begin != 0) {
+    return errors::InvalidArgument("Invalid string offsets in ", filename);
+  }
+  for (uint64 i = 0; i < num_entries; ++i) {
+    const uint64 end =
+        core::DecodeFixed64(string_offsets + (i + 1) * sizeof(uint64));
+    if (end < begin || end > strings_size) {
+      return errors::InvalidArgument("Invalid string offsets in ", filename,
+                                     " at entry ", i);
+    }
+    strings(i).assign(data + strings_begin + begin, end - begin);
+    begin = end;
+  }
+  *offset = strings_begin + begin;
+  return Status::OK();
+}
+
+template <typename T>
+Status CheckSortedKeys(const string& filename, const Tensor& keys) {
+  const auto flat_keys = keys.flat<T>();
+  for (int64 i = 1; i < flat_keys.size(); ++i) {
+    if (!(flat_keys(i - 1) < flat_keys(i))) {
+      return errors::InvalidArgument(
+          "Keys of binary vocabulary file ", filename,
+          " must be sorted and unique, but entry ", i, " is not greater than ",
+          "the previous one.");
+    }
+  }
+  return Status::OK();
+}
+
+// Helper function to initialize an InitializableLookupTable from a binary
+// vocabulary file.
+//
+// The file is memory-mapped and its keys and values are copied into two
+// tensors, which are inserted into the table in a single batch.
+Status InitializeTableFromBinaryFile(const string& filename, Env* env,
+                                     InitializableLookupTable* table) {
+  if (table->is_initialized()) {
+    // Don't map the file again for tables shared by several sessions.
+    return Status::OK();
+  }
+  if (!port::kLittleEndian) {
+    return errors::Unimplemented(
+        "Binary vocabulary files are only supported on little-endian hosts.");
+  }
+  std::unique_ptr<ReadOnlyMemoryRegion> region;
+  TF_RETURN_IF_ERROR(env->NewReadOnlyMemoryRegionFromFile(filename, &region));
+  const char* data = static_cast<const char*>(region->data());
+  const uint64 size = region->length();
+  if (size < kBinaryVocabHeaderSize ||
+      std::memcmp(data, kBinaryVocabMagic, kBinaryVocabMagicSize) != 0) {
+    return errors::InvalidArgument(filename,
+                                   " is not a binary vocabulary file.");
+  }
+  const DataType key_dtype = static_cast<DataType>(
+      core::DecodeFixed32(data + kBinaryVocabMagicSize));
+  const DataType value_dtype = static_cast<DataType>(
+      core::DecodeFixed32(data + kBinaryVocabMagicSize + 4));
+  if (key_dtype != table->key_dtype() ||
+      value_dtype != table->value_dtype()) {
+    return errors::InvalidArgument(
+        "Conflicting key/value dtypes ", DataTypeString(key_dtype), "->",
+        DataTypeString(value_dtype), " in ", filename, " for table with ",
+        DataTypeString(table->key_dtype()), "->",
+        DataTypeString(table->value_dtype()));
+  }
+  const uint64 num_entries =
+      core::DecodeFixed64(data + kBinaryVocabMagicSize + 8);
+  if (num_entries == 0 || num_entries > size) {
+    return errors::InvalidArgument("Invalid number of entries ", num_entries,
+                                   " in ", filename);
+  }
+
+  const TensorShape shape({static_cast<int64>(num_entries)});
+  Tensor keys(key_dtype, shape);
+  Tensor values(value_dtype, shape);
+  uint64 offset = kBinaryVocabHeaderSize;
+  TF_RETURN_IF_ERROR(
+      ReadBinaryVocabSection(filename, data, size, num_entries, &offset,
+                             &keys));
+  TF_RETURN_IF_ERROR(
+      ReadBinaryVocabSection(filename, data, size, num_entries, &offset,
+                             &values));
+  if (offset != size) {
+    return errors::InvalidArgument("Unexpected ", size - offset,
+                                   " trailing bytes in ", filename);
+  }
+  switch (key_dtype) {
+    case DT_INT32:
+      TF_RETURN_IF_ERROR(CheckSortedKeys<int32>(filename, keys));
+      break;
+    case DT_INT64:
+      TF_RETURN_IF_ERROR(CheckSortedKeys<int64>(filename, keys));
+      break;
+    case DT_FLOAT:
+      TF_RETURN_IF_ERROR(CheckSortedKeys<float>(filename, keys));
+      break;
+    case DT_DOUBLE:
+      TF_RETURN_IF_ERROR(CheckSortedKeys<double>(filename, keys));
+      break;
+    case DT_STRING:
+      TF_RETURN_IF_ERROR(CheckSortedKeys<string>(filename, keys));
+      break;
+    default:
+      return errors::InvalidArgument("Data type ", key_dtype,
+                                     " not supported.");
+  }
+  region.reset();
+
+  KeyValueTensorIterator iter(&keys, &values);
+  Status s = table->Initialize(iter);
+  if (errors::IsFailedPrecondition(s) && table->is_initialized()) {
+    LOG(WARNING) << "Table trying to initialize from file " << filename
+                 << " is already initialized.";
+    return Status::OK();
+  }
+  return s;
+}
+
 }  // namespace
 }  // namespace lookup
 
@@ -455,4 +618,47 @@ class InitializeTableFromTextFileOp : public OpKernel {
 REGISTER_KERNEL_BUILDER(Name("InitializeTableFromTextFile").Device(DEVICE_CPU),
                         InitializeTableFromTextFileOp);
 
+// Kernel to initialize a lookup table from a binary vocabulary file.
+//
+// After this operation, the table becomes read-only.
+class InitializeTableFromBinaryFileOp : public OpKernel {
+ public:
+  explicit InitializeTableFromBinaryFileOp(OpKernelConstruction* ctx)
+      : OpKernel(ctx) {}
+
+  void Compute(OpKernelContext* ctx) override {
+    mutex_lock l(mu_);
+    lookup::InitializableLookupTable* table;
+    OP_REQUIRES_OK(ctx,
+                   GetInitializableLookupTable("table_handle", ctx, &table));
+    core::ScopedUnref unref_me(table);
+
+    DataTypeVector expected_inputs = {DT_STRING_REF, DT_STRING};
+    DataTypeVector expected_outputs = {};
+    OP_REQUIRES_OK(ctx, ctx->MatchSignature(expected_inputs, expected_outputs));
+
+    const Tensor& vocab_filename_tensor = ctx->input(1);
+    OP_REQUIRES(
+        ctx, TensorShapeUtils::IsScalar(vocab_filename_tensor.shape()),
+        errors::InvalidArgument("filename should be a single string, but got",
+                                vocab_filename_tensor.shape().DebugString()));
+
+    string vocab_filename = vocab_filename_tensor.scalar<string>()();
+    OP_REQUIRES(ctx, !vocab_filename.empty(),
+                errors::InvalidArgument("filename cannot be empty."));
+
+    OP_REQUIRES_OK(ctx, lookup::InitializeTableFromBinaryFile(
+                            vocab_filename, ctx->env(), table));
+  }
+
+ private:
+  mutex mu_;
+
+  TF_DISALLOW_COPY_AND_ASSIGN(InitializeTableFromBinaryFileOp);
+};
+
+REGISTER_KERNEL_BUILDER(
+    Name("InitializeTableFromBinaryFile").Device(DEVICE_CPU),
+    InitializeTableFromBinaryFileOp);
+
 }  // namespace tensorflow
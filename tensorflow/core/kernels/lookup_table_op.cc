@@ -16,9 +16,12 @@ limitations under the License.
 #include "tensorflow/core/kernels/lookup_table_op.h"
 #define EIGEN_USE_THREADS
 
+#include <limits>
+#include <map>
 #include <string>
 #include <type_traits>
 #include <utility>
+#include <vector>
 
 #include "tensorflow/core/framework/register_types.h"
 #include "tensorflow/core/framework/types.h"
@@ -66,8 +69,8 @@ const double SubtleMustCopyUnlessStringOrFloat(const double value) {
 // Sample use case:
 //
 // HashTable<int64, int64> table;  // int64 -> int64.
-// table.Prepare(10); // Prepare the underlying data structure, the number of
-//                    // elements is required by interface, but not used.
+// table.Prepare(10); // Prepare the underlying data structure, reserving
+//                    // space for the expected number of elements.
 // // Populate the table, elements could be added in one or multiple calls.
 // table.Insert(key_tensor, value_tensor); // Populate the table.
 // ...
@@ -94,7 +97,7 @@ class HashTable : public InitializableLookupTable {
   DataType value_dtype() const override { return DataTypeToEnum<V>::v(); }
 
  protected:
-  Status DoPrepare(size_t unused) override {
+  Status DoPrepare(size_t expected_num_elements) override {
     if (is_initialized_) {
       return errors::Aborted("HashTable already initialized.");
     }
@@ -102,6 +105,12 @@ class HashTable : public InitializableLookupTable {
       table_ = std::unique_ptr<std::unordered_map<K, V>>(
           new std::unordered_map<K, V>());
     }
+    // Iterators that don't know their size report -1, i.e. SIZE_MAX here.
+    if (expected_num_elements > 0 &&
+        expected_num_elements <=
+            static_cast<size_t>(std::numeric_limits<int64>::max())) {
+      table_->reserve(expected_num_elements);
+    }
     return Status::OK();
   };
 
@@ -726,6 +735,222 @@ class MutableDenseHashTable final : public LookupInterface {
   uint64 empty_key_hash_;
 };
 
+// Lookup table that assigns int64 ids in [0, capacity) to the most frequent
+// keys of a stream, using bounded memory.
+//
+// Insert adds the given number of occurrences to the count of each key. A key
+// is admitted, and given an id, once its count reaches min_count. When all ids
+// are in use, it replaces the least frequently seen admitted key if its count
+// is larger, and takes over its id. Ties between equal counts are broken by
+// evicting the least recently seen key.
+//
+// The counts of at most max_candidates keys that are not admitted are kept,
+// including evicted keys, dropping the least frequent ones first. Hence the
+// table never holds more than capacity + max_candidates keys.
+//
+// Find returns the id of admitted keys and the default value for the others.
+// ExportValues outputs all the keys with a [n, 2] matrix of (id, count) rows,
+// where the id of keys that are not admitted is -1.
+template <class K>
+class BoundedIdTable final : public LookupInterface {
+ public:
+  BoundedIdTable(OpKernelContext* ctx, OpKernel* kernel)
+      : next_id_(0), tick_(0) {
+    OP_REQUIRES_OK(ctx, GetNodeAttr(kernel->def(), "capacity", &capacity_));
+    OP_REQUIRES_OK(ctx, GetNodeAttr(kernel->def(), "min_count", &min_count_));
+    OP_REQUIRES_OK(
+        ctx, GetNodeAttr(kernel->def(), "max_candidates", &max_candidates_));
+  }
+
+  size_t size() const override {
+    mutex_lock l(mu_);
+    return admitted_.size();
+  }
+
+  Status Find(OpKernelContext* ctx, const Tensor& key, Tensor* value,
+              const Tensor& default_value) override {
+    const int64 default_val = default_value.flat<int64>()(0);
+    const auto key_values = key.flat<K>();
+    auto value_values = value->flat<int64>();
+
+    mutex_lock l(mu_);
+    for (int64 i = 0; i < key_values.size(); ++i) {
+      auto it = entries_.find(SubtleMustCopyUnlessStringOrFloat(key_values(i)));
+      value_values(i) = (it != entries_.end() && it->second.id >= 0)
+                            ? it->second.id
+                            : default_val;
+    }
+    return Status::OK();
+  }
+
+  Status Insert(OpKernelContext* ctx, const Tensor& keys,
+                const Tensor& values) override {
+    const auto key_values = keys.flat<K>();
+    const auto count_values = values.flat<int64>();
+
+    mutex_lock l(mu_);
+    for (int64 i = 0; i < key_values.size(); ++i) {
+      const int64 count = internal::SubtleMustCopy(count_values(i));
+      if (count < 0) {
+        return errors::InvalidArgument("Counts must be non-negative, got ",
+                                       count);
+      }
+      const K key = SubtleMustCopyUnlessStringOrFloat(key_values(i));
+      auto inserted = entries_.insert({key, Entry()});
+      Entry* entry = &inserted.first->second;
+      if (!inserted.second) {
+        Index(*entry)->erase({entry->count, entry->tick});
+      }
+      entry->count += count;
+      entry->tick = ++tick_;
+      if (entry->id < 0 && entry->count >= min_count_) {
+        Admit(entry);
+      }
+      Index(*entry)->insert({{entry->count, entry->tick}, key});
+      TrimCandidates();
+    }
+    return Status::OK();
+  }
+
+  Status ImportValues(OpKernelContext* ctx, const Tensor& keys,
+                      const Tensor& values) override {
+    const auto key_values = keys.flat<K>();
+    const auto value_values = values.matrix<int64>();
+
+    mutex_lock l(mu_);
+    entries_.clear();
+    admitted_.clear();
+    candidates_.clear();
+    free_ids_.clear();
+    next_id_ = 0;
+    tick_ = 0;
+    std::vector<bool> used_ids(capacity_, false);
+    for (int64 i = 0; i < key_values.size(); ++i) {
+      Entry entry;
+      entry.id = value_values(i, 0);
+      entry.count = value_values(i, 1);
+      entry.tick = ++tick_;
+      if (entry.id >= capacity_ || entry.count < 0 ||
+          (entry.id >= 0 && used_ids[entry.id])) {
+        return errors::InvalidArgument("Invalid id ", entry.id, " and count ",
+                                       entry.count, " for imported key ", i);
+      }
+      const K key = SubtleMustCopyUnlessStringOrFloat(key_values(i));
+      if (!entries_.insert({key, entry}).second) {
+        return errors::InvalidArgument("Duplicate imported key ", i);
+      }
+      Index(entry)->insert({{entry.count, entry.tick}, key});
+      if (entry.id >= 0) {
+        used_ids[entry.id] = true;
+        next_id_ = std::max(next_id_, entry.id + 1);
+      }
+    }
+    for (int64 id = next_id_ - 1; id >= 0; --id) {
+      if (!used_ids[id]) free_ids_.push_back(id);
+    }
+    TrimCandidates();
+    return Status::OK();
+  }
+
+  Status ExportValues(OpKernelContext* ctx) override {
+    mutex_lock l(mu_);
+    const int64 size = entries_.size();
+
+    Tensor* keys;
+    Tensor* values;
+    TF_RETURN_IF_ERROR(
+        ctx->allocate_output("keys", TensorShape({size}), &keys));
+    TF_RETURN_IF_ERROR(
+        ctx->allocate_output("values", TensorShape({size, 2}), &values));
+
+    // Export in frequency order so that importing restores the same order.
+    auto keys_data = keys->flat<K>();
+    auto values_data = values->matrix<int64>();
+    int64 i = 0;
+    for (const FrequencyIndex* index : {&candidates_, &admitted_}) {
+      for (const auto& item : *index) {
+        keys_data(i) = item.second;
+        values_data(i, 0) = entries_.at(item.second).id;
+        values_data(i, 1) = item.first.first;
+        ++i;
+      }
+    }
+    return Status::OK();
+  }
+
+  Status CheckKeyAndValueTensorsForImport(const Tensor& keys,
+                                          const Tensor& values) override {
+    TF_RETURN_IF_ERROR(CheckKeyAndValueTypes(keys, values));
+    TF_RETURN_IF_ERROR(CheckKeyShape(keys.shape()));
+    if (!TensorShapeUtils::IsVector(keys.shape()) ||
+        values.shape() != TensorShape({keys.NumElements(), 2})) {
+      return errors::InvalidArgument(
+          "Expected a vector of keys and a [n, 2] matrix of values, got ",
+          keys.shape().DebugString(), " and ", values.shape().DebugString());
+    }
+    return Status::OK();
+  }
+
+  DataType key_dtype() const override { return DataTypeToEnum<K>::v(); }
+
+  DataType value_dtype() const override { return DT_INT64; }
+
+  TensorShape key_shape() const final { return TensorShape(); }
+
+  TensorShape value_shape() const override { return TensorShape(); }
+
+ private:
+  struct Entry {
+    int64 id = -1;  // -1 while the key is not admitted.
+    int64 count = 0;
+    int64 tick = 0;  // Time of the last update, for tie-breaking.
+  };
+
+  // Keys ordered by (count, tick), i.e. least frequently seen first.
+  typedef std::map<std::pair<int64, int64>, K> FrequencyIndex;
+
+  FrequencyIndex* Index(const Entry& entry) EXCLUSIVE_LOCKS_REQUIRED(mu_) {
+    return entry.id >= 0 ? &admitted_ : &candidates_;
+  }
+
+  // Gives an id to the key of `entry`, which must not be in any index, if one
+  // is free or if it is more frequent than the least frequent admitted key.
+  void Admit(Entry* entry) EXCLUSIVE_LOCKS_REQUIRED(mu_) {
+    if (!free_ids_.empty()) {
+      entry->id = free_ids_.back();
+      free_ids_.pop_back();
+    } else if (next_id_ < capacity_) {
+      entry->id = next_id_++;
+    } else if (!admitted_.empty() &&
+               admitted_.begin()->first.first < entry->count) {
+      auto evicted = admitted_.begin();
+      Entry* evicted_entry = &entries_.at(evicted->second);
+      entry->id = evicted_entry->id;
+      evicted_entry->id = -1;
+      candidates_.insert(*evicted);
+      admitted_.erase(evicted);
+    }
+  }
+
+  void TrimCandidates() EXCLUSIVE_LOCKS_REQUIRED(mu_) {
+    while (candidates_.size() > static_cast<size_t>(max_candidates_)) {
+      entries_.erase(candidates_.begin()->second);
+      candidates_.erase(candidates_.begin());
+    }
+  }
+
+  int64 capacity_;
+  int64 min_count_;
+  int64 max_candidates_;
+  mutable mutex mu_;
+  std::unordered_map<K, Entry> entries_ GUARDED_BY(mu_);
+  FrequencyIndex admitted_ GUARDED_BY(mu_);
+  FrequencyIndex candidates_ GUARDED_BY(mu_);
+  std::vector<int64> free_ids_ GUARDED_BY(mu_);
+  int64 next_id_ GUARDED_BY(mu_);
+  int64 tick_ GUARDED_BY(mu_);
+};
+
 }  // namespace lookup
 
 // Table lookup op. Perform the lookup operation on the given table.
@@ -913,4 +1138,18 @@ REGISTER_KERNEL(string, float);
 
 #undef REGISTER_KERNEL
 
+// Register the BoundedIdTable op.
+#define REGISTER_KERNEL(key_dtype)                                        \
+  REGISTER_KERNEL_BUILDER(                                                \
+      Name("BoundedIdTable")                                              \
+          .Device(DEVICE_CPU)                                             \
+          .TypeConstraint<key_dtype>("key_dtype")                         \
+          .TypeConstraint<int64>("value_dtype"),                          \
+      LookupTableOp<lookup::BoundedIdTable<key_dtype>, key_dtype, int64>)
+
+REGISTER_KERNEL(string);
+REGISTER_KERNEL(int64);
+
+#undef REGISTER_KERNEL
+
 }  // namespace tensorflow
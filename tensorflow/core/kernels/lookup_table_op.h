@@ -50,8 +50,11 @@ class LookupTableOp : public OpKernel {
   void Compute(OpKernelContext* ctx) override {
     mutex_lock l(mu_);
     if (!table_handle_set_) {
-      OP_REQUIRES_OK(ctx, cinfo_.Init(ctx->resource_manager(), def(),
-                                      use_node_name_sharing_));
+      string container;
+      OP_REQUIRES_OK(ctx, GetNodeAttr(def(), "container", &container));
+      OP_REQUIRES_OK(ctx,
+                     cinfo_.Init(lookup::GetTableResourceMgr(ctx, container),
+                                 def(), use_node_name_sharing_));
       auto creator = [ctx, this](lookup::LookupInterface** ret) {
         lookup::LookupInterface* container = new Container(ctx, this);
         if (!ctx->status().ok()) {
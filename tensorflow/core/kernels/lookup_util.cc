@@ -45,13 +45,25 @@ Status GetTableHandle(const string& input_name, OpKernelContext* ctx,
 
 }  // namespace
 
+const char* const kProcessSharedContainer = "process_shared_lookup_tables";
+
+ResourceMgr* GetTableResourceMgr(OpKernelContext* ctx,
+                                 const string& container) {
+  if (container == kProcessSharedContainer) {
+    static ResourceMgr* process_shared_resource_mgr = new ResourceMgr();
+    return process_shared_resource_mgr;
+  }
+  return ctx->resource_manager();
+}
+
 Status GetLookupTable(const string& input_name, OpKernelContext* ctx,
                       LookupInterface** table) {
   string container;
   string table_handle;
   TF_RETURN_IF_ERROR(
       GetTableHandle(input_name, ctx, &container, &table_handle));
-  return ctx->resource_manager()->Lookup(container, table_handle, table);
+  return GetTableResourceMgr(ctx, container)
+      ->Lookup(container, table_handle, table);
 }
 
 Status GetInitializableLookupTable(const string& input_name,
@@ -62,8 +74,8 @@ Status GetInitializableLookupTable(const string& input_name,
   TF_RETURN_IF_ERROR(
       GetTableHandle(input_name, ctx, &container, &table_handle));
   LookupInterface* lookup_table;
-  TF_RETURN_IF_ERROR(
-      ctx->resource_manager()->Lookup(container, table_handle, &lookup_table));
+  TF_RETURN_IF_ERROR(GetTableResourceMgr(ctx, container)
+                         ->Lookup(container, table_handle, &lookup_table));
   *table = lookup_table->GetInitializableLookupTable();
   if (*table == nullptr) {
     lookup_table->Unref();
@@ -18,11 +18,23 @@ limitations under the License.
 
 #include "tensorflow/core/framework/lookup_interface.h"
 #include "tensorflow/core/framework/op_kernel.h"
+#include "tensorflow/core/framework/resource_mgr.h"
 #include "tensorflow/core/kernels/initializable_lookup_table.h"
 
 namespace tensorflow {
 namespace lookup {
 
+// Tables created in this container are kept in a process-wide resource manager
+// rather than in the one of the device, so all the sessions of the process
+// share them.
+extern const char* const kProcessSharedContainer;
+
+// Returns the resource manager holding the tables of `container`: the
+// process-wide one for kProcessSharedContainer, ctx->resource_manager()
+// otherwise.
+ResourceMgr* GetTableResourceMgr(OpKernelContext* ctx,
+                                 const string& container);
+
 // Gets the LookupTable stored in the ctx->resource_manager() with key
 // passed by attribute with name input_name, returns null if the table
 // doesn't exist.
@@ -2668,4 +2668,202 @@ REGISTER_KERNELS(double, int64);
 
 #undef REGISTER_KERNELS
 
+// The elements of each variable of a GroupedApply* op start at a multiple of
+// this many bytes in the flat slots, so that their slices stay aligned.
+static constexpr int64 kGroupedSlotAlignmentBytes = 64;
+
+// Base class of the kernels updating a group of "N" variables whose slots are
+// concatenated into flat tensors, with one call to the functor of the
+// corresponding Apply* op per variable.
+template <typename T>
+class GroupedApplyOpBase : public OpKernel {
+ public:
+  GroupedApplyOpBase(OpKernelConstruction* ctx, int num_slots,
+                     int num_scalars_before_grad)
+      : OpKernel(ctx),
+        num_slots_(num_slots),
+        num_scalars_before_grad_(num_scalars_before_grad) {
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("use_locking", &use_exclusive_lock_));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("N", &num_vars_));
+  }
+
+  void Compute(OpKernelContext* ctx) override {
+    const int num_refs = num_vars_ + num_slots_;
+    // Acquire the distinct mutexes in address order to mitigate deadlock.
+    std::vector<mutex*> mutexes;
+    if (use_exclusive_lock_) {
+      for (int i = 0; i < num_refs; ++i) {
+        mutexes.push_back(ctx->input_ref_mutex(i));
+      }
+      std::sort(mutexes.begin(), mutexes.end());
+      mutexes.erase(std::unique(mutexes.begin(), mutexes.end()),
+                    mutexes.end());
+    }
+    std::vector<mutex_lock> locks;
+    locks.reserve(mutexes.size());
+    for (mutex* mu : mutexes) {
+      locks.emplace_back(*mu);
+    }
+
+    std::vector<Tensor> refs;
+    refs.reserve(num_refs);
+    for (int i = 0; i < num_refs; ++i) {
+      refs.push_back(ctx->mutable_input(i, use_exclusive_lock_));
+      OP_REQUIRES(
+          ctx, refs.back().IsInitialized(),
+          errors::FailedPrecondition(
+              "Attempting to use uninitialized variables: ", def().input(i)));
+    }
+
+    const int grad_index = grad_index_begin();
+    for (int i = num_refs; i < ctx->num_inputs(); ++i) {
+      if (i >= grad_index && i < grad_index + num_vars_) continue;
+      OP_REQUIRES(ctx, TensorShapeUtils::IsScalar(ctx->input(i).shape()),
+                  errors::InvalidArgument(def().input(i), " is not a scalar: ",
+                                          ctx->input(i).shape().DebugString()));
+    }
+
+    const int64 alignment =
+        std::max<int64>(1, kGroupedSlotAlignmentBytes / sizeof(T));
+    std::vector<int64> offsets;
+    offsets.reserve(num_vars_);
+    int64 slot_size = 0;
+    for (int i = 0; i < num_vars_; ++i) {
+      const Tensor& grad = ctx->input(grad_index + i);
+      OP_REQUIRES(
+          ctx, refs[i].shape().IsSameSize(grad.shape()),
+          errors::InvalidArgument("var and grad do not have the same shape",
+                                  refs[i].shape().DebugString(), " ",
+                                  grad.shape().DebugString()));
+      offsets.push_back(slot_size);
+      slot_size += (refs[i].NumElements() + alignment - 1) / alignment *
+                   alignment;
+    }
+    for (int i = num_vars_; i < num_refs; ++i) {
+      OP_REQUIRES(ctx, TensorShapeUtils::IsVector(refs[i].shape()) &&
+                           refs[i].NumElements() == slot_size,
+                  errors::InvalidArgument(
+                      def().input(i), " must be a vector of ", slot_size,
+                      " elements for the variables of the group, got shape ",
+                      refs[i].shape().DebugString()));
+    }
+
+    const CPUDevice& device = ctx->eigen_device<CPUDevice>();
+    for (int i = 0; i < num_vars_; ++i) {
+      std::vector<typename TTypes<T>::Flat> slots;
+      for (int j = num_vars_; j < num_refs; ++j) {
+        slots.emplace_back(refs[j].flat<T>().data() + offsets[i],
+                           refs[i].NumElements());
+      }
+      Apply(ctx, device, refs[i].flat<T>(), slots,
+            ctx->input(grad_index + i).flat<T>());
+    }
+  }
+
+ protected:
+  // Applies the update to one variable, given the slices of its slots.
+  virtual void Apply(OpKernelContext* ctx, const CPUDevice& d,
+                     typename TTypes<T>::Flat var,
+                     const std::vector<typename TTypes<T>::Flat>& slots,
+                     typename TTypes<T>::ConstFlat grad) = 0;
+
+  // Index of the first scalar input.
+  int scalar_index_begin() const { return num_vars_ + num_slots_; }
+  // Index of the first gradient.
+  int grad_index_begin() const {
+    return num_vars_ + num_slots_ + num_scalars_before_grad_;
+  }
+  int num_vars() const { return num_vars_; }
+
+ private:
+  const int num_slots_;
+  const int num_scalars_before_grad_;
+  int num_vars_;
+  bool use_exclusive_lock_;
+};
+
+template <typename T>
+class GroupedApplyMomentumOp : public GroupedApplyOpBase<T> {
+ public:
+  explicit GroupedApplyMomentumOp(OpKernelConstruction* ctx)
+      : GroupedApplyOpBase<T>(ctx, 1 /* num_slots */,
+                              1 /* num_scalars_before_grad */) {
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("use_nesterov", &use_nesterov_));
+  }
+
+ protected:
+  void Apply(OpKernelContext* ctx, const CPUDevice& d,
+             typename TTypes<T>::Flat var,
+             const std::vector<typename TTypes<T>::Flat>& slots,
+             typename TTypes<T>::ConstFlat grad) override {
+    const Tensor& lr = ctx->input(this->scalar_index_begin());
+    const Tensor& momentum =
+        ctx->input(this->grad_index_begin() + this->num_vars());
+    functor::ApplyMomentum<CPUDevice, T>()(d, var, slots[0], lr.scalar<T>(),
+                                           grad, momentum.scalar<T>(),
+                                           use_nesterov_);
+  }
+
+ private:
+  bool use_nesterov_;
+};
+
+template <typename T>
+class GroupedApplyAdagradOp : public GroupedApplyOpBase<T> {
+ public:
+  explicit GroupedApplyAdagradOp(OpKernelConstruction* ctx)
+      : GroupedApplyOpBase<T>(ctx, 1 /* num_slots */,
+                              1 /* num_scalars_before_grad */) {}
+
+ protected:
+  void Apply(OpKernelContext* ctx, const CPUDevice& d,
+             typename TTypes<T>::Flat var,
+             const std::vector<typename TTypes<T>::Flat>& slots,
+             typename TTypes<T>::ConstFlat grad) override {
+    const Tensor& lr = ctx->input(this->scalar_index_begin());
+    functor::ApplyAdagrad<CPUDevice, T>()(d, var, slots[0], lr.scalar<T>(),
+                                          grad);
+  }
+};
+
+template <typename T>
+class GroupedApplyAdamOp : public GroupedApplyOpBase<T> {
+ public:
+  explicit GroupedApplyAdamOp(OpKernelConstruction* ctx)
+      : GroupedApplyOpBase<T>(ctx, 2 /* num_slots */,
+                              6 /* num_scalars_before_grad */) {}
+
+ protected:
+  void Apply(OpKernelContext* ctx, const CPUDevice& d,
+             typename TTypes<T>::Flat var,
+             const std::vector<typename TTypes<T>::Flat>& slots,
+             typename TTypes<T>::ConstFlat grad) override {
+    const int i = this->scalar_index_begin();
+    functor::ApplyAdam<CPUDevice, T>()(
+        d, var, slots[0], slots[1], ctx->input(i).scalar<T>(),
+        ctx->input(i + 1).scalar<T>(), ctx->input(i + 2).scalar<T>(),
+        ctx->input(i + 3).scalar<T>(), ctx->input(i + 4).scalar<T>(),
+        ctx->input(i + 5).scalar<T>(), grad);
+  }
+};
+
+#define REGISTER_KERNELS(T)                                       \
+  REGISTER_KERNEL_BUILDER(Name("GroupedApplyMomentum")            \
+                              .Device(DEVICE_CPU)                 \
+                              .TypeConstraint<T>("T"),            \
+                          GroupedApplyMomentumOp<T>);             \
+  REGISTER_KERNEL_BUILDER(Name("GroupedApplyAdagrad")             \
+                              .Device(DEVICE_CPU)                 \
+                              .TypeConstraint<T>("T"),            \
+                          GroupedApplyAdagradOp<T>);              \
+  REGISTER_KERNEL_BUILDER(                                        \
+      Name("GroupedApplyAdam").Device(DEVICE_CPU).TypeConstraint<T>("T"), \
+      GroupedApplyAdamOp<T>);
+
+TF_CALL_half(REGISTER_KERNELS);
+TF_CALL_float(REGISTER_KERNELS);
+TF_CALL_double(REGISTER_KERNELS);
+
+#undef REGISTER_KERNELS
+
 }  // namespace tensorflow
@@ -1605,6 +1605,48 @@ max_load_factor: The maximum ratio between number of entries and number of
   buckets before growing the table. Must be between 0 and 1.
 )doc");
 
+REGISTER_OP("BoundedIdTable")
+    .Output("table_handle: Ref(string)")
+    .Attr("container: string = ''")
+    .Attr("shared_name: string = ''")
+    .Attr("use_node_name_sharing: bool = false")
+    .Attr("key_dtype: {string, int64}")
+    .Attr("value_dtype: {int64} = DT_INT64")
+    .Attr("capacity: int >= 1")
+    .Attr("min_count: int >= 1 = 1")
+    .Attr("max_candidates: int >= 0 = 0")
+    .SetIsStateful()
+    .SetShapeFn(TwoElementOutput)
+    .Doc(R"doc(
+Creates an empty table assigning ids to the most frequent keys of a stream.
+
+The table maps at most `capacity` keys to ids in `[0, capacity)`. Inserting a
+key with a value adds that many occurrences to its count. A key is admitted,
+and given an id, once its count reaches `min_count`. When all ids are in use, a
+key replaces the least frequently seen admitted key if its count is larger, and
+takes over its id.
+
+The counts of up to `max_candidates` keys that are not admitted are kept, least
+frequent first out, so the table never holds more than
+`capacity + max_candidates` keys. Looking up a key that is not admitted returns
+the default value. Exported values are `[n, 2]` rows of `(id, count)`, with id
+-1 for keys that are not admitted.
+
+table_handle: Handle to a table.
+container: If non-empty, this table is placed in the given container.
+  Otherwise, a default container is used.
+shared_name: If non-empty, this table is shared under the given name across
+  multiple sessions.
+use_node_name_sharing: If true and shared_name is empty, the table is shared
+  using the node name.
+key_dtype: Type of the table keys.
+value_dtype: Type of the table values, i.e. of the ids.
+capacity: The maximum number of admitted keys.
+min_count: The number of occurrences after which a key is admitted.
+max_candidates: The maximum number of keys that are not admitted whose counts
+  are kept.
+)doc");
+
 REGISTER_OP("InitializeTable")
     .Input("table_handle: Ref(string)")
     .Input("keys: Tkey")
@@ -1669,6 +1711,38 @@ vocab_size: Number of elements of the file, use -1 if unknown.
 delimiter: Delimiter to separate fields in a line.
 )doc");
 
+REGISTER_OP("InitializeTableFromBinaryFile")
+    .Input("table_handle: Ref(string)")
+    .Input("filename: string")
+    .SetShapeFn([](InferenceContext* c) {
+      ShapeHandle handle;
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(0), 1, &handle));
+      DimensionHandle unused_dim;
+      TF_RETURN_IF_ERROR(c->WithValue(c->Dim(handle, 0), 2, &unused_dim));
+
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(1), 0, &handle));
+      return Status::OK();
+    })
+    .Doc(R"doc(
+Initializes a table from a binary vocabulary file.
+
+The file is memory-mapped and all of its entries are inserted into the table in
+a single batch. It holds, in little-endian byte order:
+
+- The 8 byte magic string `TFVOCAB1`.
+- The key and value `DataType` enums, as 32 bit integers.
+- The number of entries `n`, as a 64 bit integer.
+- The keys, followed by the values. Numeric types are stored as an array of `n`
+  elements. Strings are stored as `n + 1` 64 bit offsets into the
+  concatenation of their bytes, followed by that concatenation.
+
+Keys must be sorted in strictly increasing order. If the table is already
+initialized, e.g. because it is shared, the op does nothing.
+
+table_handle: Handle to a table which will be initialized.
+filename: Filename of a binary vocabulary file.
+)doc");
+
 REGISTER_OP("GetSessionHandle")
     .Input("value: T")
     .Output("handle: string")
@@ -89,6 +89,13 @@ TEST(DataFlowOpsTest, InitializeTableFromTextFile) {
   INFER_ERROR("Shape must be rank 0 but is rank 1", op, "[2];[1]");
 }
 
+TEST(DataFlowOpsTest, InitializeTableFromBinaryFile) {
+  ShapeInferenceTestOp op("InitializeTableFromBinaryFile");
+  INFER_OK(op, "?;?", "");
+  INFER_ERROR("Shape must be rank 1 but is rank 0", op, "[];[]");
+  INFER_ERROR("Shape must be rank 0 but is rank 1", op, "[2];[1]");
+}
+
 TEST(DataFlowOpsTest, DynamicPartition) {
   ShapeInferenceTestOp op("DynamicPartition");
   TF_ASSERT_OK(NodeDefBuilder("test", "DynamicPartition")
@@ -693,6 +693,139 @@ use_locking: If `True`, updating of the var, m, and v tensors will be protected
   contention.
 )doc");
 
+// Shape function of the GroupedApply* ops, whose inputs are "N" variables,
+// "num_slots" flat slots, "num_scalars_before_grad" scalars, "N" gradients
+// and "num_scalars_after_grad" scalars.
+static Status GroupedApplyShapeFn(InferenceContext* c, int num_slots,
+                                  int num_scalars_before_grad,
+                                  int num_scalars_after_grad) {
+  int n;
+  TF_RETURN_IF_ERROR(c->GetAttr("N", &n));
+  ShapeHandle unused;
+  for (int i = n; i < n + num_slots; ++i) {
+    TF_RETURN_IF_ERROR(c->WithRank(c->input(i), 1, &unused));  // slot
+  }
+  const int grad_idx = n + num_slots + num_scalars_before_grad;
+  for (int i = n + num_slots; i < grad_idx; ++i) {
+    TF_RETURN_IF_ERROR(c->WithRank(c->input(i), 0, &unused));
+  }
+  for (int i = 0; i < n; ++i) {
+    TF_RETURN_IF_ERROR(c->Merge(c->input(i), c->input(grad_idx + i), &unused));
+  }
+  for (int i = grad_idx + n; i < grad_idx + n + num_scalars_after_grad; ++i) {
+    TF_RETURN_IF_ERROR(c->WithRank(c->input(i), 0, &unused));
+  }
+  return Status::OK();
+}
+
+REGISTER_OP("GroupedApplyMomentum")
+    .Input("var: Ref(N * T)")
+    .Input("accum: Ref(T)")
+    .Input("lr: T")
+    .Input("grad: N * T")
+    .Input("momentum: T")
+    .Attr("N: int >= 1")
+    .Attr("T: numbertype")
+    .Attr("use_locking: bool = false")
+    .Attr("use_nesterov: bool = false")
+    .SetShapeFn([](InferenceContext* c) {
+      return GroupedApplyShapeFn(c, 1 /* num_slots */,
+                                 1 /* num_scalars_before_grad */,
+                                 1 /* num_scalars_after_grad */);
+    })
+    .Doc(R"doc(
+Update a group of variables according to the momentum scheme.
+
+Same as ApplyMomentum for each `var[i]` and `grad[i]`, with the
+accumulators of all the variables concatenated in the flat `accum`. The
+elements of `var[i]` start at the first multiple of 64 bytes after the end of
+those of `var[i - 1]` in `accum`.
+
+var: Should be from Variables.
+accum: Should be from a Variable().
+lr: Scaling factor. Must be a scalar.
+grad: The gradients.
+momentum: Momentum. Must be a scalar.
+use_locking: If `True`, updating of the var and accum tensors will be protected
+  by a lock; otherwise the behavior is undefined, but may exhibit less
+  contention.
+use_nesterov: If `True`, the tensor passed to compute grad will be
+  var - lr * momentum * accum, so in the end, the var you get is actually
+  var - lr * momentum * accum.
+)doc");
+
+REGISTER_OP("GroupedApplyAdagrad")
+    .Input("var: Ref(N * T)")
+    .Input("accum: Ref(T)")
+    .Input("lr: T")
+    .Input("grad: N * T")
+    .Attr("N: int >= 1")
+    .Attr("T: numbertype")
+    .Attr("use_locking: bool = false")
+    .SetShapeFn([](InferenceContext* c) {
+      return GroupedApplyShapeFn(c, 1 /* num_slots */,
+                                 1 /* num_scalars_before_grad */,
+                                 0 /* num_scalars_after_grad */);
+    })
+    .Doc(R"doc(
+Update a group of variables according to the adagrad scheme.
+
+Same as ApplyAdagrad for each `var[i]` and `grad[i]`, with the
+accumulators of all the variables concatenated in the flat `accum`. The
+elements of `var[i]` start at the first multiple of 64 bytes after the end of
+those of `var[i - 1]` in `accum`.
+
+var: Should be from Variables.
+accum: Should be from a Variable().
+lr: Scaling factor. Must be a scalar.
+grad: The gradients.
+use_locking: If `True`, updating of the var and accum tensors will be protected
+  by a lock; otherwise the behavior is undefined, but may exhibit less
+  contention.
+)doc");
+
+REGISTER_OP("GroupedApplyAdam")
+    .Input("var: Ref(N * T)")
+    .Input("m: Ref(T)")
+    .Input("v: Ref(T)")
+    .Input("beta1_power: T")
+    .Input("beta2_power: T")
+    .Input("lr: T")
+    .Input("beta1: T")
+    .Input("beta2: T")
+    .Input("epsilon: T")
+    .Input("grad: N * T")
+    .Attr("N: int >= 1")
+    .Attr("T: numbertype")
+    .Attr("use_locking: bool = false")
+    .SetShapeFn([](InferenceContext* c) {
+      return GroupedApplyShapeFn(c, 2 /* num_slots */,
+                                 6 /* num_scalars_before_grad */,
+                                 0 /* num_scalars_after_grad */);
+    })
+    .Doc(R"doc(
+Update a group of variables according to the Adam algorithm.
+
+Same as ApplyAdam for each `var[i]` and `grad[i]`, with the moments of all
+the variables concatenated in the flat `m` and `v`. The elements of `var[i]`
+start at the first multiple of 64 bytes after the end of those of
+`var[i - 1]` in `m` and `v`.
+
+var: Should be from Variables.
+m: Should be from a Variable().
+v: Should be from a Variable().
+beta1_power: Must be a scalar.
+beta2_power: Must be a scalar.
+lr: Scaling factor. Must be a scalar.
+beta1: Momentum factor. Must be a scalar.
+beta2: Momentum factor. Must be a scalar.
+epsilon: Ridge term. Must be a scalar.
+grad: The gradients.
+use_locking: If `True`, updating of the var, m, and v tensors will be protected
+  by a lock; otherwise the behavior is undefined, but may exhibit less
+  contention.
+)doc");
+
 static Status ApplyRMSPropShapeFn(InferenceContext* c, bool sparse) {
   ShapeHandle unused;
   ShapeHandle s = c->input(0);                               // var
@@ -14,8 +14,10 @@ limitations under the License.
 ==============================================================================*/
 
 #include "tensorflow/core/framework/graph.pb.h"
+#include "tensorflow/core/framework/node_def_builder.h"
 #include "tensorflow/core/framework/op.h"
 #include "tensorflow/core/framework/shape_inference_testutil.h"
+#include "tensorflow/core/lib/core/status_test_util.h"
 #include "tensorflow/core/platform/test.h"
 
 namespace tensorflow {
@@ -290,6 +292,39 @@ TEST(TrainingOpsTest, ApplyAdam_ShapeFn) {
   INFER_ERROR(err, op, "?;?;?;?;?;?;?;?;[?];?");
 }
 
+TEST(TrainingOpsTest, GroupedApplyAdam_ShapeFn) {
+  ShapeInferenceTestOp op("GroupedApplyAdam");
+  std::vector<NodeDefBuilder::NodeOut> vars;
+  std::vector<NodeDefBuilder::NodeOut> grads;
+  for (int i = 0; i < 2; ++i) {
+    vars.emplace_back("var", i, DT_FLOAT_REF);
+    grads.emplace_back("grad", i, DT_FLOAT);
+  }
+  TF_ASSERT_OK(NodeDefBuilder("test", "GroupedApplyAdam")
+                   .Input(vars)
+                   .Input("m", 0, DT_FLOAT_REF)
+                   .Input("v", 0, DT_FLOAT_REF)
+                   .Input("beta1_power", 0, DT_FLOAT)
+                   .Input("beta2_power", 0, DT_FLOAT)
+                   .Input("lr", 0, DT_FLOAT)
+                   .Input("beta1", 0, DT_FLOAT)
+                   .Input("beta2", 0, DT_FLOAT)
+                   .Input("epsilon", 0, DT_FLOAT)
+                   .Input(grads)
+                   .Finalize(&op.node_def));
+
+  // No outputs; each var must match its grad.
+  INFER_OK(op, "[1,2];[3];[32];[32];[];[];[];[];[];[];[1,2];[3]", "");
+  INFER_ERROR("Dimension 0 in both shapes must be equal, but are 1 and 2", op,
+              "[1];[3];?;?;[];[];[];[];[];[];[2];[3]");
+
+  // The slots must be vectors and the hyperparameters scalars.
+  INFER_ERROR("Shape must be rank 1 but is rank 2", op,
+              "?;?;[1,1];?;?;?;?;?;?;?;?;?");
+  INFER_ERROR("Shape must be rank 0 but is rank 1", op,
+              "?;?;?;?;?;?;?;?;?;[?];?;?");
+}
+
 TEST(TrainingOpsTest, ApplyRMSProp_ShapeFn) {
   ShapeInferenceTestOp op("ApplyRMSProp");
 
@@ -19,6 +19,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import time
+
 import tensorflow as tf
 
 
@@ -222,6 +224,34 @@ class ClipTest(tf.test.TestCase):
     self.assertAllClose(np_ans_0, tf_ans_1)
     self.assertAllClose(np_ans_1, tf_ans_2)
 
+  def testClipByGlobalNormDeduplicatesIndexedSlices(self):
+    with self.test_session():
+      x0 = tf.constant([3.0])
+      # Represents [0, 4, 0] with duplicate indices.
+      x1 = tf.IndexedSlices(tf.constant([1.0, 3.0]), tf.constant([1, 1]),
+                            dense_shape=tf.constant([3]))
+      # Global norm of x0 and dense x1 = sqrt(3^2 + 4^2) = 5
+      ans, norm = tf.clip_by_global_norm([x0, x1], 4.0,
+                                         deduplicate_indexed_slices=True)
+      self.assertTrue(isinstance(ans[1], tf.IndexedSlices))
+      self.assertAllClose(5.0, norm.eval())
+      self.assertAllClose([2.4], ans[0].eval())
+      self.assertAllEqual([1], ans[1].indices.eval())
+      self.assertAllClose([3.2], ans[1].values.eval())
+      self.assertAllClose(
+          5.0, tf.global_norm([x0, x1], deduplicate_indexed_slices=True).eval())
+
+  def testGlobalNormSumsPerDevice(self):
+    with tf.Graph().as_default() as g:
+      t_list = []
+      for device in ["/job:a", "/job:b"]:
+        with tf.device(device):
+          t_list.extend([tf.constant([1.0, 2.0]), tf.constant([2.0])])
+      tf.global_norm(t_list)
+      add_n_devices = sorted(op.device for op in g.get_operations()
+                             if op.type == "AddN")
+    self.assertEqual(["", "/job:a", "/job:b"], add_n_devices)
+
   def testClipByGlobalNormPreservesDenseShape(self):
     dense_shape = (1,)
     slices = tf.IndexedSlices(
@@ -325,5 +355,43 @@ class ClipTest(tf.test.TestCase):
 
     self.assertAllClose(np_ans, tf_ans)
 
+
+class ClipByGlobalNormBenchmark(tf.test.Benchmark):
+  """Step time of clipping and applying many sparse gradients."""
+
+  def _benchmark(self, name, deduplicate_indexed_slices, num_shards=2000,
+                 shard_size=100, dim=16, num_ids=64, num_iters=10):
+    with tf.Graph().as_default():
+      grads_and_vars = []
+      for _ in range(num_shards):
+        var = tf.Variable(tf.zeros([shard_size, dim]))
+        ids = tf.random_uniform([num_ids], maxval=shard_size, dtype=tf.int32)
+        grads_and_vars.append(
+            (tf.IndexedSlices(tf.ones([num_ids, dim]), ids,
+                              tf.constant([shard_size, dim])), var))
+      grads, _ = tf.clip_by_global_norm(
+          [g for g, _ in grads_and_vars], 1.0,
+          deduplicate_indexed_slices=deduplicate_indexed_slices)
+      train_op = tf.train.GradientDescentOptimizer(0.1).apply_gradients(
+          zip(grads, [v for _, v in grads_and_vars]))
+      with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        sess.run(train_op)
+        start = time.time()
+        for _ in range(num_iters):
+          sess.run(train_op)
+        self.report_benchmark(
+            name=name,
+            iters=num_iters,
+            wall_time=(time.time() - start) / num_iters,
+            extras={"num_ops": len(tf.get_default_graph().get_operations())})
+
+  def benchmarkSparse(self):
+    self._benchmark("clip_2000_sparse", False)
+
+  def benchmarkSparseDeduplicated(self):
+    self._benchmark("clip_2000_sparse_deduplicated", True)
+
+
 if __name__ == "__main__":
   tf.test.main()
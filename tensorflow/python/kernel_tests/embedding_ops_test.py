@@ -19,6 +19,7 @@ from __future__ import division
 from __future__ import print_function
 
 import itertools
+import time
 
 import numpy as np
 from six.moves import xrange  # pylint: disable=redefined-builtin
@@ -490,6 +491,66 @@ class EmbeddingLookupTest(tf.test.TestCase):
             sharded = tf.nn.embedding_lookup(split_params, ids).eval()
             self.assertAllEqual(simple, sharded)
 
+  def testUniqueIds(self):
+    np.random.seed(8)
+    with self.test_session():
+      for num_shards, partition_strategy in [(1, "mod"), (3, "mod"),
+                                             (3, "div")]:
+        p, _, feed_dict = _EmbeddingParams(num_shards, 13, shape=[2, 3])
+        ids = tf.constant(np.random.randint(13, size=(4, 5)), dtype=tf.int64)
+        expected = tf.nn.embedding_lookup(
+            p, ids, partition_strategy=partition_strategy)
+        unique = tf.nn.embedding_lookup(
+            p, ids, partition_strategy=partition_strategy, unique_ids=True)
+        self.assertEqual([4, 5, 2, 3], unique.get_shape().as_list())
+        self.assertAllEqual(expected.eval(feed_dict=feed_dict),
+                            unique.eval(feed_dict=feed_dict))
+
+  def testUniqueIdsMaxNorm(self):
+    with self.test_session():
+      embeddings = tf.constant([[2.0, 4.0], [3.0, 1.0]])
+      ids = tf.constant([0, 1, 0], dtype=tf.int32)
+      self.assertAllClose(
+          tf.nn.embedding_lookup([embeddings], ids, max_norm=2.0).eval(),
+          tf.nn.embedding_lookup([embeddings], ids, max_norm=2.0,
+                                 unique_ids=True).eval())
+
+  def testUniqueIdsGradientsAreAggregated(self):
+    with self.test_session():
+      params = [tf.Variable(tf.ones([5, 2])) for _ in range(2)]
+      ids = tf.constant([0, 2, 2, 2, 3, 0], dtype=tf.int32)
+      embedding = tf.nn.embedding_lookup(params, ids, unique_ids=True)
+      grads = tf.gradients(tf.reduce_sum(embedding), params)
+      tf.global_variables_initializer().run()
+      # "mod": ids 0 and 2 live in shard 0, id 3 in shard 1.
+      for grad, expected_indices, expected_values in [
+          (grads[0], [0, 1], [[2.0, 2.0], [3.0, 3.0]]),
+          (grads[1], [1], [[1.0, 1.0]])]:
+        self.assertTrue(isinstance(grad, tf.IndexedSlices))
+        indices, values = tf.get_default_session().run(
+            [grad.indices, grad.values])
+        self.assertAllEqual(expected_indices, indices)
+        self.assertAllClose(expected_values, values)
+
+  def testGradientsUniqueIds(self):
+    vocab_size = 9
+    id_vals = [1, 4, 1, 8, 4, 4]
+    for num_shards in [1, 3]:
+      with self.test_session():
+        ids = tf.constant(id_vals, dtype=tf.int32)
+        x, params, _ = _EmbeddingParams(num_shards, vocab_size, shape=[2])
+        y = tf.nn.embedding_lookup(x, ids, unique_ids=True)
+        y_shape = [len(id_vals)] + list(params[_PName(0) + ":0"].shape[1:])
+        x_name = [_PName(i) for i in range(num_shards)]
+        x_init_value = [params[x_n + ":0"] for x_n in x_name]
+        x_shape = [i.shape for i in x_init_value]
+        err = tf.test.compute_gradient_error(x,
+                                             x_shape,
+                                             y,
+                                             y_shape,
+                                             x_init_value=x_init_value)
+      self.assertLess(err, 1e-4)
+
 
 class EmbeddingLookupSparseTest(tf.test.TestCase):
 
@@ -671,5 +732,51 @@ class DynamicStitchOpTest(tf.test.TestCase):
     self.assertAllEqual(np_values[-1], stitched)
 
 
+class EmbeddingLookupUniqueIdsBenchmark(tf.test.Benchmark):
+  """Compares lookups with and without `unique_ids` on Zipf-distributed ids.
+
+  Reports the wall time of a forward and backward step, and the bytes gathered
+  from the shards and sent back to them as gradients.
+  """
+
+  def _benchmark(self, unique_ids, zipf_a, vocab_size=100000, dim=64,
+                 num_shards=4, batch_size=8192, iters=20):
+    np.random.seed(0)
+    id_vals = (np.random.zipf(zipf_a, size=batch_size) - 1) % vocab_size
+    with tf.Graph().as_default() as g:
+      params = [tf.Variable(tf.random_normal([vocab_size // num_shards, dim]))
+                for _ in range(num_shards)]
+      ids = tf.constant(id_vals, dtype=tf.int64)
+      loss = tf.reduce_sum(
+          tf.nn.embedding_lookup(params, ids, unique_ids=unique_ids))
+      grads = tf.gradients(loss, params)
+      train_op = tf.train.GradientDescentOptimizer(0.1).apply_gradients(
+          zip(grads, params))
+      # The rows gathered from the shards, and the gradient rows sent back.
+      shards = set(p.value() for p in params)
+      gathered = [op.outputs[0] for op in g.get_operations()
+                  if op.type == "Gather" and op.inputs[0] in shards]
+      grad_values = [grad.values for grad in grads]
+      with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        sess.run(train_op)
+        start = time.time()
+        for _ in range(iters):
+          sess.run(train_op)
+        wall_time = (time.time() - start) / iters
+        gathered_vals, grad_vals = sess.run([gathered, grad_values])
+    self.report_benchmark(
+        name="embedding_lookup_zipf_%.1f_unique_%s" % (zipf_a, unique_ids),
+        iters=iters,
+        wall_time=wall_time,
+        extras={"gathered_bytes": sum(v.nbytes for v in gathered_vals),
+                "gradient_bytes": sum(v.nbytes for v in grad_vals)})
+
+  def benchmarkZipfIds(self):
+    for zipf_a in [1.1, 1.5]:
+      for unique_ids in [False, True]:
+        self._benchmark(unique_ids, zipf_a)
+
+
 if __name__ == "__main__":
   tf.test.main()
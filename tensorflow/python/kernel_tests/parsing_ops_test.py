@@ -19,6 +19,7 @@ from __future__ import division
 from __future__ import print_function
 
 import itertools
+import time
 
 import numpy as np
 import tensorflow as tf
@@ -578,6 +579,66 @@ class ParseExampleTest(tf.test.TestCase):
         },
         expected_output)
 
+  def testCompiledFeatureSpec(self):
+    original = [
+        example(features=features({
+            "a": float_feature([1, 1]),
+            "st_c": int64_feature([3]),
+            "val": bytes_feature([b"a", b"b"]),
+            "idx": int64_feature([0, 3]),
+        })),
+        example(features=features({
+            "b": bytes_feature([b"b1"]),
+        })),
+    ]
+    serialized = [m.SerializeToString() for m in original]
+    spec = tf.CompiledFeatureSpec({
+        "a": tf.FixedLenFeature(
+            (1, 2), dtype=tf.float32, default_value=[3.0, -3.0]),
+        "b": tf.FixedLenFeature((), dtype=tf.string, default_value="tmp"),
+        "st_c": tf.VarLenFeature(tf.int64),
+        "sp": tf.SparseFeature("idx", "val", tf.string, 13),
+    })
+    self.assertEqual(["a", "b", "sp", "st_c"], sorted(spec))
+    self.assertEqual(["idx", "val", "st_c"], spec.sparse_keys)
+    self.assertEqual(["a", "b"], spec.dense_keys)
+    self.assertEqual([tf.TensorShape([1, 2]), tf.TensorShape([])],
+                     spec.dense_shapes)
+
+    expected_output = {
+        "a": np.array([[[1, 1]], [[3, -3]]], dtype=np.float32),
+        "b": np.array([b"tmp", b"b1"], dtype=bytes),
+        "st_c": (np.array([[0, 0]], dtype=np.int64),
+                 np.array([3], dtype=np.int64),
+                 np.array([2, 1], dtype=np.int64)),
+        "sp": (np.array([[0, 0], [0, 3]], dtype=np.int64),
+               np.array([b"a", b"b"], dtype="|S"),
+               np.array([2, 13], dtype=np.int64)),
+    }
+    # The same spec can be parsed any number of times.
+    for _ in range(2):
+      self._test({"serialized": tf.convert_to_tensor(serialized),
+                  "features": spec}, expected_output)
+
+  def testCompiledFeatureSpecSharesEmptyDefaults(self):
+    feature_spec = dict(
+        ("f%d" % i, tf.FixedLenFeature([1], tf.float32)) for i in range(10))
+    with tf.Graph().as_default() as g:
+      tf.parse_example(["", ""], tf.CompiledFeatureSpec(feature_spec))
+      consts = [op for op in g.get_operations() if op.type == "Const"]
+      # One for the serialized input, one for the example names and a single
+      # shared empty default.
+      self.assertEqual(3, len(consts))
+
+  def testCompiledFeatureSpecInvalid(self):
+    with self.assertRaisesRegexp(ValueError, "Missing: features"):
+      tf.CompiledFeatureSpec({})
+    with self.assertRaisesRegexp(ValueError, "Missing shape for feature a"):
+      tf.CompiledFeatureSpec({"a": tf.FixedLenFeature(None, tf.float32)})
+    with self.assertRaisesRegexp(ValueError, "Invalid default_value.*a"):
+      tf.CompiledFeatureSpec({"a": tf.FixedLenFeature(
+          [3], tf.float32, default_value=[1.0, 2.0])})
+
 
 class ParseSingleExampleTest(tf.test.TestCase):
 
@@ -1167,5 +1228,40 @@ class ParseTensorOpTest(tf.test.TestCase):
         tensor.eval(feed_dict={serialized: ["bogus"]})
 
 
+class ParseExampleGraphConstructionBenchmark(tf.test.Benchmark):
+  """Time to add `parse_example` for a wide feature spec to a graph."""
+
+  def _feature_spec(self, num_features):
+    feature_spec = {}
+    for i in range(num_features):
+      if i % 3 == 0:
+        feature_spec["dense_%d" % i] = tf.FixedLenFeature(
+            [1], tf.float32, default_value=[0.0])
+      elif i % 3 == 1:
+        feature_spec["dense_%d" % i] = tf.FixedLenFeature([1], tf.int64)
+      else:
+        feature_spec["sparse_%d" % i] = tf.VarLenFeature(tf.string)
+    return feature_spec
+
+  def _run(self, name, features_fn, num_parses=10, num_features=1000):
+    with tf.Graph().as_default() as g:
+      serialized = tf.placeholder(tf.string, shape=[None])
+      features = features_fn(self._feature_spec(num_features))
+      start = time.time()
+      for _ in range(num_parses):
+        tf.parse_example(serialized, features)
+      wall_time = (time.time() - start) / num_parses
+      num_ops = len(g.get_operations()) // num_parses
+    self.report_benchmark(
+        name="%s_%d_features" % (name, num_features), iters=num_parses,
+        wall_time=wall_time, extras={"ops_per_parse": num_ops})
+
+  def benchmarkDict(self):
+    self._run("dict", lambda feature_spec: feature_spec)
+
+  def benchmarkCompiledFeatureSpec(self):
+    self._run("compiled", tf.CompiledFeatureSpec)
+
+
 if __name__ == "__main__":
   tf.test.main()
@@ -141,6 +141,45 @@ class PartitionerCreatorsTest(tf.test.TestCase):
         self.assertEqual(len(v3str_list), 4)
         self.assertAllEqual(v3str_part, (1, 1, 1, 4))
 
+  def testPsBalancedPartitioner(self):
+    with self.test_session():
+      partitioner = tf.ps_balanced_partitioner(
+          num_ps_tasks=3, max_shard_bytes=4 << 10, min_shard_bytes=1 << 10)
+      with tf.variable_scope("root", partitioner=partitioner):
+        # 64K bytes: 16 shards of 4K, rounded up to a multiple of 3.
+        large = tf.get_variable("large", dtype=tf.float32, shape=(256, 64))
+        # 2K bytes, below 3 * 1K: 2 shards of at least 1K.
+        small = tf.get_variable("small", dtype=tf.float32, shape=(8, 64))
+        # 512 bytes: not partitioned.
+        tiny = tf.get_variable("tiny", dtype=tf.float32, shape=(2, 64))
+      self.assertAllEqual([18, 1], large._get_partitions())
+      self.assertAllEqual([2, 1], small._get_partitions())
+      self.assertEqual(1, len(tiny._get_variable_list()))
+
+  def testPsBalancedPartitionerInvalidArgs(self):
+    with self.assertRaisesRegexp(ValueError, "num_ps_tasks"):
+      tf.ps_balanced_partitioner(num_ps_tasks=0)
+    with self.assertRaisesRegexp(ValueError, "must not exceed"):
+      tf.ps_balanced_partitioner(
+          num_ps_tasks=2, max_shard_bytes=1, min_shard_bytes=2)
+
+  def testPartitioningReport(self):
+    partitioner = tf.ps_balanced_partitioner(
+        num_ps_tasks=2, max_shard_bytes=4 << 10, min_shard_bytes=1 << 10)
+    report = tf.partitioning_report(
+        partitioner,
+        [("emb", [1024, 4], tf.float32), ("bias", [64], tf.float32)],
+        num_ps_tasks=2, ids_per_step=100)
+    lines = report.split("\n")
+    self.assertEqual(4, len(lines))
+    self.assertTrue(lines[0].startswith(
+        "emb: partitions=[4, 1] max_shard_bytes=4096"))
+    self.assertIn("expected_ps_per_lookup=2.0", lines[0])
+    self.assertTrue(lines[1].startswith(
+        "bias: partitions=[1] max_shard_bytes=256"))
+    self.assertEqual("ps task 0: 8448 bytes", lines[2])
+    self.assertEqual("ps task 1: 8192 bytes", lines[3])
+
   def _testMinMaxVariablePartitioner(self, max_partitions, axis, min_slice_size,
                                      var_name, var_shape,
                                      expected_axis_shards, expected_partitions):
@@ -23,6 +23,7 @@ import collections
 import gzip
 import os
 import threading
+import time
 import zlib
 
 import six
@@ -656,6 +657,81 @@ class TFRecordWriterZlibTest(tf.test.TestCase):
     self.assertEqual(actual, original)
 
 
+class ShardedTFRecordWriterTest(tf.test.TestCase):
+
+  def _Record(self, r):
+    return tf.compat.as_bytes("Record %d" % r)
+
+  def _ReadAll(self, fns, options=None):
+    records = []
+    for fn in fns:
+      records.extend(tf.python_io.tf_record_iterator(fn, options))
+    return records
+
+  def testRoundRobin(self):
+    pattern = os.path.join(self.get_temp_dir(), "round_robin-{shard:02d}")
+    records = [self._Record(i) for i in range(10)]
+    with tf.python_io.ShardedTFRecordWriter(pattern, num_shards=3) as writer:
+      for r in records:
+        writer.write(r)
+    self.assertEqual([pattern.format(shard=i) for i in range(3)],
+                     sorted(writer.filenames))
+    self.assertEqual(records[0::3], self._ReadAll([pattern.format(shard=0)]))
+    self.assertItemsEqual(records, self._ReadAll(writer.filenames))
+
+  def testKeyHashing(self):
+    pattern = os.path.join(self.get_temp_dir(), "keyed-{shard}")
+    with tf.python_io.ShardedTFRecordWriter(pattern, num_shards=4) as writer:
+      for i in range(20):
+        writer.write(self._Record(i), key="key %d" % (i % 2))
+    shards = [list(tf.python_io.tf_record_iterator(fn))
+              for fn in writer.filenames]
+    for shard in shards:
+      keys = set(int(tf.compat.as_str(r).split()[1]) % 2 for r in shard)
+      self.assertEqual(1, len(keys))
+
+  def testRolloverAndIndex(self):
+    pattern = os.path.join(self.get_temp_dir(),
+                           "rollover-{shard}-{part}.tfrecord.gz")
+    options = tf.python_io.TFRecordOptions(TFRecordCompressionType.GZIP)
+    records = [self._Record(i) for i in range(10)]
+    with tf.python_io.ShardedTFRecordWriter(
+        pattern, num_shards=2, options=options, max_records_per_file=2,
+        write_index=True) as writer:
+      for r in records:
+        writer.write(r)
+    self.assertEqual(
+        sorted(pattern.format(shard=shard, part=part)
+               for shard in range(2) for part in range(3)),
+        sorted(writer.filenames))
+    for fn in writer.filenames:
+      self.assertEqual(tf.python_io.tf_record_index(fn, options),
+                       tf.python_io.read_tf_record_index(fn + ".index"))
+    self.assertItemsEqual(records, self._ReadAll(writer.filenames, options))
+
+  def testRolloverBySize(self):
+    pattern = os.path.join(self.get_temp_dir(), "size-{shard}-{part}")
+    with tf.python_io.ShardedTFRecordWriter(
+        pattern, num_shards=1, max_bytes_per_file=25) as writer:
+      for i in range(6):
+        writer.write(b"x" * 10)
+    self.assertEqual(2, len(writer.filenames))
+
+  def testInvalidArgs(self):
+    pattern = os.path.join(self.get_temp_dir(), "invalid")
+    with self.assertRaisesRegexp(ValueError, "num_shards"):
+      tf.python_io.ShardedTFRecordWriter(pattern + "-{shard}", num_shards=0)
+    with self.assertRaisesRegexp(ValueError, "{shard}"):
+      tf.python_io.ShardedTFRecordWriter(pattern, num_shards=2)
+    with self.assertRaisesRegexp(ValueError, "{part}"):
+      tf.python_io.ShardedTFRecordWriter(pattern + "-{shard}", num_shards=2,
+                                         max_records_per_file=10)
+    writer = tf.python_io.ShardedTFRecordWriter(pattern + "-{shard}", 1)
+    writer.close()
+    with self.assertRaisesRegexp(RuntimeError, "closed"):
+      writer.write(b"foo")
+
+
 class TFRecordIteratorTest(tf.test.TestCase):
 
   def setUp(self):
@@ -756,6 +832,142 @@ class TFRecordIteratorTest(tf.test.TestCase):
       for _ in tf.python_io.tf_record_iterator(fn_truncated):
         pass
 
+  def _WriteRecordsToFile(self, records, name):
+    fn = os.path.join(self.get_temp_dir(), name)
+    with tf.python_io.TFRecordWriter(fn) as writer:
+      for r in records:
+        writer.write(r)
+    return fn
+
+  def testBatchIterator(self):
+    records = [self._Record(i) for i in range(self._num_records)]
+    fn = self._WriteRecordsToFile(records, "batch_records")
+    batches = list(tf.python_io.tf_record_batch_iterator(fn, batch_size=3))
+    self.assertEqual([records[:3], records[3:6], records[6:]], batches)
+    with self.assertRaisesRegexp(ValueError, "batch_size"):
+      list(tf.python_io.tf_record_batch_iterator(fn, batch_size=0))
+
+  def testBatchIteratorCompressed(self):
+    records = [self._Record(i) for i in range(self._num_records)]
+    fn = self._WriteCompressedRecordsToFile(records, "batch_records.gz",
+                                            TFRecordCompressionType.GZIP)
+    options = tf.python_io.TFRecordOptions(TFRecordCompressionType.GZIP)
+    batches = list(tf.python_io.tf_record_batch_iterator(fn, 4, options))
+    self.assertEqual([records[:4], records[4:]], batches)
+
+  def testMultiShardIterator(self):
+    expected = []
+    fns = []
+    for shard in range(5):
+      records = [tf.compat.as_bytes("Shard %d record %d" % (shard, i))
+                 for i in range(shard * 3)]
+      expected.extend(records)
+      fns.append(self._WriteRecordsToFile(records, "shard_%d" % shard))
+    actual = list(tf.python_io.tf_record_multi_shard_iterator(
+        fns, num_threads=3, batch_size=2))
+    self.assertItemsEqual(expected, actual)
+    # Records of each shard keep their order.
+    for shard in range(5):
+      prefix = tf.compat.as_bytes("Shard %d " % shard)
+      self.assertEqual([r for r in expected if r.startswith(prefix)],
+                       [r for r in actual if r.startswith(prefix)])
+
+  def testMultiShardIteratorPropagatesErrors(self):
+    fn = self._WriteRecordsToFile([self._Record(0)], "good_shard")
+    with self.assertRaises(tf.errors.NotFoundError):
+      list(tf.python_io.tf_record_multi_shard_iterator(
+          [fn, os.path.join(self.get_temp_dir(), "missing_shard")]))
+
+  def testIndexAndRangeIterator(self):
+    records = [self._Record(i) for i in range(self._num_records)]
+    fn = self._WriteRecordsToFile(records, "indexed_records")
+    index = tf.python_io.tf_record_index(fn)
+    self.assertEqual(self._num_records, len(index))
+    self.assertEqual(0, index[0])
+    index_fn = fn + ".index"
+    tf.python_io.write_tf_record_index(index_fn, index)
+    self.assertEqual(index, tf.python_io.read_tf_record_index(index_fn))
+
+    self.assertEqual(records[2:5], list(tf.python_io.tf_record_range_iterator(
+        fn, 2, 5, index=index)))
+    self.assertEqual(records[4:], list(tf.python_io.tf_record_range_iterator(
+        fn, 4, index=index)))
+    self.assertEqual(records[3:6], list(tf.python_io.tf_record_range_iterator(
+        fn, 3, 6)))
+    self.assertEqual([], list(tf.python_io.tf_record_range_iterator(
+        fn, self._num_records, index=index)))
+    self.assertEqual([], list(tf.python_io.tf_record_range_iterator(
+        fn, 3, 3)))
+    with self.assertRaisesRegexp(ValueError, "beyond"):
+      list(tf.python_io.tf_record_range_iterator(
+          fn, self._num_records + 1, index=index))
+
+  def testRangeIteratorCompressed(self):
+    records = [self._Record(i) for i in range(self._num_records)]
+    fn = self._WriteCompressedRecordsToFile(records, "indexed_records.z")
+    options = tf.python_io.TFRecordOptions(TFRecordCompressionType.ZLIB)
+    index = tf.python_io.tf_record_index(fn, options)
+    self.assertEqual(self._num_records, len(index))
+    self.assertEqual(records[2:5], list(tf.python_io.tf_record_range_iterator(
+        fn, 2, 5, options=options, index=index)))
+
+
+class TFRecordIteratorBenchmark(tf.test.Benchmark):
+  """Read throughput of the python TFRecord iterators."""
+
+  def _WriteShards(self, num_shards, records_per_shard, compression_type):
+    options = tf.python_io.TFRecordOptions(compression_type)
+    record = b"x" * 1000
+    fns = []
+    for shard in range(num_shards):
+      fn = os.path.join(tf.test.get_temp_dir(),
+                        "benchmark_%d_%d" % (compression_type, shard))
+      with tf.python_io.TFRecordWriter(fn, options) as writer:
+        for _ in range(records_per_shard):
+          writer.write(record)
+      fns.append(fn)
+    return fns, options
+
+  def _Report(self, name, read_fn, num_records, num_bytes):
+    start = time.time()
+    read_fn()
+    wall_time = time.time() - start
+    self.report_benchmark(
+        name=name, iters=num_records, wall_time=wall_time / num_records,
+        extras={"records_per_sec": num_records / wall_time,
+                "mb_per_sec": num_bytes / wall_time / 1e6})
+
+  def benchmarkIterators(self):
+    num_shards, records_per_shard = 8, 20000
+    num_records = num_shards * records_per_shard
+    num_bytes = num_records * 1000
+    for compression_type, suffix in [(TFRecordCompressionType.NONE, "none"),
+                                     (TFRecordCompressionType.GZIP, "gzip")]:
+      fns, options = self._WriteShards(num_shards, records_per_shard,
+                                       compression_type)
+
+      def _ReadSequential():
+        for fn in fns:
+          for _ in tf.python_io.tf_record_iterator(fn, options):
+            pass
+
+      def _ReadBatched():
+        for fn in fns:
+          for _ in tf.python_io.tf_record_batch_iterator(fn, 256, options):
+            pass
+
+      def _ReadMultiShard():
+        for _ in tf.python_io.tf_record_multi_shard_iterator(
+            fns, options, num_threads=num_shards):
+          pass
+
+      self._Report("tf_record_iterator_%s" % suffix, _ReadSequential,
+                   num_records, num_bytes)
+      self._Report("tf_record_batch_iterator_%s" % suffix, _ReadBatched,
+                   num_records, num_bytes)
+      self._Report("tf_record_multi_shard_iterator_%s" % suffix,
+                   _ReadMultiShard, num_records, num_bytes)
+
 
 class AsyncReaderTest(tf.test.TestCase):
 
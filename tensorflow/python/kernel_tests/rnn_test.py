@@ -493,6 +493,51 @@ class LSTMTest(tf.test.TestCase):
     self._testDynamicEquivalentToStaticRNN(
         use_gpu=True, use_sequence_length=True)
 
+  def _testDynamicCompactBatch(self, use_gpu):
+    time_steps = 6
+    batch_size = 5
+    input_size = 3
+    num_units = 4
+    input_values = np.random.randn(batch_size, time_steps, input_size)
+    sequence_length = [5, 1, 0, 3, 5]
+
+    results = []
+    for compact_batch in [False, True]:
+      with self.test_session(use_gpu=use_gpu, graph=tf.Graph()) as sess:
+        inputs = tf.constant(input_values, dtype=tf.float32)
+        initializer = tf.random_uniform_initializer(
+            -0.01, 0.01, seed=self._seed)
+        cell = tf.contrib.rnn.LSTMCell(
+            num_units, use_peepholes=True, initializer=initializer,
+            state_is_tuple=True)
+        outputs, state = tf.nn.dynamic_rnn(
+            cell, inputs, sequence_length=sequence_length, dtype=tf.float32,
+            compact_batch=compact_batch)
+        self.assertEqual([batch_size, time_steps, num_units],
+                         outputs.get_shape().as_list())
+        trainable_variables = tf.get_collection(
+            tf.GraphKeys.TRAINABLE_VARIABLES)
+        gradients = tf.gradients(
+            [outputs, state.c, state.h], [inputs] + trainable_variables)
+        tf.global_variables_initializer().run()
+        results.append(sess.run([outputs, state.c, state.h] + gradients))
+
+    for value, compact_value in zip(*results):
+      self.assertAllClose(value, compact_value)
+    # Outputs past the sequence length are zero.
+    self.assertAllEqual(np.zeros((time_steps - 1, num_units)),
+                        results[1][0][1, 1:])
+
+  def testDynamicCompactBatch(self):
+    self._testDynamicCompactBatch(use_gpu=False)
+    self._testDynamicCompactBatch(use_gpu=True)
+
+  def testDynamicCompactBatchRequiresSequenceLength(self):
+    inputs = tf.placeholder(tf.float32, shape=(2, 3, 4))
+    with self.assertRaisesRegexp(ValueError, "requires sequence_length"):
+      tf.nn.dynamic_rnn(tf.contrib.rnn.GRUCell(4), inputs, dtype=tf.float32,
+                        compact_batch=True)
+
 
 class BidirectionalRNNTest(tf.test.TestCase):
 
@@ -1432,6 +1477,43 @@ def dynamic_rnn_swap_memory_benchmark(batch_size, max_time, num_units):
   return no_swap, swap
 
 
+def dynamic_rnn_compact_batch_benchmark(batch_size, max_time, num_units):
+  config = tf.ConfigProto()
+  config.allow_soft_placement = True
+
+  # Long-tail sequence lengths: most sequences are short, one is max_time.
+  np.random.seed([127])
+  sequence_length = np.minimum(
+      max_time, 1 + np.random.exponential(max_time / 8.0, size=batch_size))
+  sequence_length = sequence_length.astype(np.int32)
+  sequence_length[0] = max_time
+  inputs = np.random.randn(batch_size, max_time, num_units).astype(np.float32)
+
+  deltas = []
+  for compact_batch in (False, True):
+    with tf.Session(config=config, graph=tf.Graph()) as sess:
+      inputs_t = tf.Variable(inputs, trainable=False).value()
+      initializer = tf.random_uniform_initializer(-0.01, 0.01, seed=127)
+      cell = tf.contrib.rnn.LSTMCell(
+          num_units=num_units, use_peepholes=True, initializer=initializer,
+          state_is_tuple=False)
+      outputs, final_state = tf.nn.dynamic_rnn(
+          cell, inputs_t, sequence_length=sequence_length, dtype=tf.float32,
+          compact_batch=compact_batch)
+      trainable_variables = tf.get_collection(
+          tf.GraphKeys.TRAINABLE_VARIABLES)
+      gradients = tf.gradients([outputs, final_state], trainable_variables)
+      ops = tf.group(final_state, outputs, *gradients)
+      tf.global_variables_initializer().run()
+      deltas.append(_timer(sess, ops))
+
+  no_compact, compact = deltas
+  print("%d \t %d \t %d \t %f \t %f \t %f \t %f" %
+        (batch_size, max_time, num_units, np.mean(sequence_length),
+         no_compact, compact, compact/no_compact))
+  return no_compact, compact
+
+
 def rnn_long_sequence_benchmark(batch_size, seqlen, num_units,
                                 dynamic, swap_memory):
   config = tf.ConfigProto()
@@ -1516,6 +1598,25 @@ class BenchmarkRNN(tf.test.Benchmark):
               % (max_time, batch_size, num_units),
               iters=20, wall_time=swap)
 
+  def benchmarkDynamicLSTMNoCompactVsCompactBatch(self):
+    print("Calculation: Dynamic LSTM with long-tail sequence lengths, "
+          "No Batch Compaction vs. Batch Compaction")
+    print("batch \t max_t \t units \t mean_t \t no_compact \t compact "
+          "\t compact/no_compact")
+    for batch_size in (64, 256):
+      for max_time in (100,):
+        for num_units in (512, 128):
+          no_compact, compact = dynamic_rnn_compact_batch_benchmark(
+              batch_size, max_time, num_units)
+          self.report_benchmark(
+              name="dynamic_lstm_no_compact_batch_T%02d_B%03d_N%03d"
+              % (max_time, batch_size, num_units),
+              iters=20, wall_time=no_compact)
+          self.report_benchmark(
+              name="dynamic_lstm_compact_batch_T%02d_B%03d_N%03d"
+              % (max_time, batch_size, num_units),
+              iters=20, wall_time=compact)
+
   def benchmarkStaticUnrollHalfSequenceLengthVsHalfUnroll(self):
     print("Calculation: Static Unroll with Halved Sequence Length "
           "vs. Half Static Unroll")
@@ -16,6 +16,7 @@ limitations under the License.
 #include "tensorflow/python/lib/io/py_record_reader.h"
 
 #include "tensorflow/c/tf_status_helper.h"
+#include "tensorflow/core/lib/core/errors.h"
 #include "tensorflow/core/lib/core/stringpiece.h"
 #include "tensorflow/core/lib/io/record_reader.h"
 #include "tensorflow/core/lib/io/zlib_compression_options.h"
@@ -65,6 +66,31 @@ void PyRecordReader::GetNext(TF_Status* status) {
   Set_TF_Status_from_Status(status, s);
 }
 
+std::vector<string> PyRecordReader::GetNextBatch(int max_records,
+                                                 TF_Status* status) {
+  std::vector<string> records;
+  if (reader_ == nullptr) {
+    Set_TF_Status_from_Status(status,
+                              errors::FailedPrecondition("Reader is closed."));
+    return records;
+  }
+  records.reserve(max_records);
+  Status s;
+  while (records.size() < static_cast<size_t>(max_records)) {
+    string record;
+    s = reader_->ReadRecord(&offset_, &record);
+    if (!s.ok()) break;
+    records.push_back(std::move(record));
+  }
+  if (errors::IsOutOfRange(s) && !records.empty()) {
+    s = Status::OK();
+  } else if (!s.ok()) {
+    records.clear();
+  }
+  Set_TF_Status_from_Status(status, s);
+  return records;
+}
+
 void PyRecordReader::Close() {
   delete reader_;
   delete file_;
@@ -16,6 +16,8 @@ limitations under the License.
 #ifndef TENSORFLOW_PYTHON_LIB_IO_PY_RECORD_READER_H_
 #define TENSORFLOW_PYTHON_LIB_IO_PY_RECORD_READER_H_
 
+#include <vector>
+
 #include "tensorflow/c/c_api.h"
 #include "tensorflow/core/lib/core/stringpiece.h"
 #include "tensorflow/core/platform/macros.h"
@@ -48,6 +50,13 @@ class PyRecordReader {
   // (e.g., filesystem errors).
   void GetNext(TF_Status* status);
 
+  // Read up to "max_records" records starting at "current_offset()", stopping
+  // early at the end of the file. Populates status with OUT_OF_RANGE if the
+  // end of the file is reached before any record is read, or with the error
+  // that stopped the read otherwise; on error the records read so far are
+  // discarded and "current_offset()" is the offset of the failing record.
+  std::vector<string> GetNextBatch(int max_records, TF_Status* status);
+
   // Return the current record contents.  Only valid after the preceding call
   // to GetNext() returned true
   string record() const { return record_; }
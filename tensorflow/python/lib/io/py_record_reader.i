@@ -14,7 +14,9 @@ limitations under the License.
 ==============================================================================*/
 
 %nothread tensorflow::io::PyRecordReader::GetNext;
+%nothread tensorflow::io::PyRecordReader::GetNextBatch;
 
+%include "tensorflow/python/lib/core/strings.i"
 %include "tensorflow/python/platform/base.i"
 
 %feature("except") tensorflow::io::PyRecordReader::New {
@@ -33,6 +35,13 @@ limitations under the License.
   Py_END_ALLOW_THREADS
 }
 
+%feature("except") tensorflow::io::PyRecordReader::GetNextBatch {
+  // Let other threads run while we read
+  Py_BEGIN_ALLOW_THREADS
+  $action
+  Py_END_ALLOW_THREADS
+}
+
 %{
 #include "tensorflow/python/lib/io/py_record_reader.h"
 %}
@@ -44,6 +53,7 @@ limitations under the License.
 %unignore tensorflow::io::PyRecordReader;
 %unignore tensorflow::io::PyRecordReader::~PyRecordReader;
 %unignore tensorflow::io::PyRecordReader::GetNext;
+%unignore tensorflow::io::PyRecordReader::GetNextBatch;
 %unignore tensorflow::io::PyRecordReader::offset;
 %unignore tensorflow::io::PyRecordReader::record;
 %unignore tensorflow::io::PyRecordReader::Close;
@@ -17,10 +17,19 @@
 
 A TFRecords file represents a sequence of (binary) strings.  The format is not
 random access, so it is suitable for streaming large amounts of data but not
-suitable if fast sharding or other non-sequential access is desired.
+suitable if fast sharding or other non-sequential access is desired. For
+uncompressed files, an index of record offsets built with `tf_record_index`
+allows `tf_record_range_iterator` to start reading at any record.
 
 @@TFRecordWriter
+@@ShardedTFRecordWriter
 @@tf_record_iterator
+@@tf_record_batch_iterator
+@@tf_record_multi_shard_iterator
+@@tf_record_range_iterator
+@@tf_record_index
+@@write_tf_record_index
+@@read_tf_record_index
 @@TFRecordCompressionType
 @@TFRecordOptions
 
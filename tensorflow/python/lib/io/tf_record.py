@@ -19,8 +19,15 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import struct
+import threading
+import zlib
+
+from six.moves import queue  # pylint: disable=redefined-builtin
+
 from tensorflow.python import pywrap_tensorflow
 from tensorflow.python.framework import errors
+from tensorflow.python.lib.io import file_io
 from tensorflow.python.util import compat
 
 
@@ -64,21 +71,249 @@ def tf_record_iterator(path, options=None):
   Raises:
     IOError: If `path` cannot be opened for reading.
   """
+  reader = _new_record_reader(path, 0, options)
+  while True:
+    try:
+      with errors.raise_exception_on_not_ok_status() as status:
+        reader.GetNext(status)
+    except errors.OutOfRangeError:
+      break
+    yield reader.record()
+  reader.Close()
+
+
+def _new_record_reader(path, offset, options):
+  """Opens a `PyRecordReader` for `path` positioned at `offset`."""
   compression_type = TFRecordOptions.get_compression_type_string(options)
   with errors.raise_exception_on_not_ok_status() as status:
     reader = pywrap_tensorflow.PyRecordReader_New(
-        compat.as_bytes(path), 0, compat.as_bytes(compression_type), status)
+        compat.as_bytes(path), offset, compat.as_bytes(compression_type),
+        status)
 
   if reader is None:
     raise IOError("Could not open %s." % path)
+  return reader
+
+
+def tf_record_batch_iterator(path, batch_size=256, options=None):
+  """An iterator that reads the records from a TFRecords file in batches.
+
+  Each batch is read with a single call into the C++ reader, which releases
+  the GIL while reading, so this is both faster than `tf_record_iterator` and
+  allows several files to be read concurrently from Python threads.
+
+  Args:
+    path: The path to the TFRecords file.
+    batch_size: The maximum number of records per batch. The last batch of the
+      file may be smaller.
+    options: (optional) A TFRecordOptions object.
+
+  Yields:
+    Lists of strings.
+
+  Raises:
+    IOError: If `path` cannot be opened for reading.
+    ValueError: If `batch_size` is not positive.
+  """
+  if batch_size < 1:
+    raise ValueError("batch_size must be positive, got %d." % batch_size)
+  reader = _new_record_reader(path, 0, options)
+  while True:
+    try:
+      with errors.raise_exception_on_not_ok_status() as status:
+        records = reader.GetNextBatch(batch_size, status)
+    except errors.OutOfRangeError:
+      break
+    yield records
+  reader.Close()
+
+
+def tf_record_multi_shard_iterator(paths, options=None, num_threads=4,
+                                   batch_size=256, max_pending_batches=16):
+  """An iterator that reads the records from many TFRecords files concurrently.
+
+  Up to `num_threads` files are read at the same time, each by its own thread
+  reading batches of `batch_size` records. Batches are yielded in the order in
+  which they are read, so the records of different files are interleaved in a
+  non-deterministic order; the records of a single file keep their order.
+
+  Args:
+    paths: A list of paths to TFRecords files.
+    options: (optional) A TFRecordOptions object, used for all files.
+    num_threads: The number of files read concurrently.
+    batch_size: The number of records read from a file at a time.
+    max_pending_batches: The maximum number of batches read ahead of the
+      consumer.
+
+  Yields:
+    Strings.
+
+  Raises:
+    IOError: If one of `paths` cannot be opened for reading.
+    ValueError: If `num_threads` is not positive.
+  """
+  if num_threads < 1:
+    raise ValueError("num_threads must be positive, got %d." % num_threads)
+  paths_queue = queue.Queue()
+  for path in paths:
+    paths_queue.put(path)
+  batches = queue.Queue(maxsize=max_pending_batches)
+  stop = threading.Event()
+  done = object()
+
+  def _read_shards():
+    try:
+      while not stop.is_set():
+        try:
+          path = paths_queue.get_nowait()
+        except queue.Empty:
+          break
+        for records in tf_record_batch_iterator(path, batch_size, options):
+          while not stop.is_set():
+            try:
+              batches.put(records, timeout=0.1)
+              break
+            except queue.Full:
+              pass
+          if stop.is_set():
+            break
+    except Exception as e:  # pylint: disable=broad-except
+      batches.put(e)
+    batches.put(done)
+
+  threads = [threading.Thread(target=_read_shards)
+             for _ in range(min(num_threads, len(paths)))]
+  for thread in threads:
+    thread.daemon = True
+    thread.start()
+  try:
+    num_done = 0
+    while num_done < len(threads):
+      records = batches.get()
+      if records is done:
+        num_done += 1
+      elif isinstance(records, Exception):
+        raise records  # pylint: disable=raising-bad-type
+      else:
+        for record in records:
+          yield record
+  finally:
+    stop.set()
+    # Unblock readers waiting on a full queue so that they can exit.
+    while any(thread.is_alive() for thread in threads):
+      try:
+        batches.get(timeout=0.1)
+      except queue.Empty:
+        pass
+
+
+def tf_record_index(path, options=None):
+  """Returns the offsets of the records in a TFRecords file.
+
+  The offsets can be written to a sidecar file with `write_tf_record_index`,
+  and used by `tf_record_range_iterator` to start reading at any record.
+
+  Args:
+    path: The path to the TFRecords file.
+    options: (optional) A TFRecordOptions object.
+
+  Returns:
+    A list with the offset of each record. For compressed files, these are
+    offsets into the uncompressed data.
+
+  Raises:
+    IOError: If `path` cannot be opened for reading.
+  """
+  reader = _new_record_reader(path, 0, options)
+  offsets = []
   while True:
+    offset = reader.offset()
     try:
       with errors.raise_exception_on_not_ok_status() as status:
         reader.GetNext(status)
     except errors.OutOfRangeError:
       break
-    yield reader.record()
+    offsets.append(offset)
   reader.Close()
+  return offsets
+
+
+def write_tf_record_index(index_path, offsets):
+  """Writes record offsets, as returned by `tf_record_index`, to a file.
+
+  Args:
+    index_path: The path of the index file, e.g. the TFRecords file path with a
+      `.index` suffix.
+    offsets: A list of record offsets.
+  """
+  file_io.write_string_to_file(
+      index_path, struct.pack("<%dQ" % len(offsets), *offsets))
+
+
+def read_tf_record_index(index_path):
+  """Reads record offsets written by `write_tf_record_index`.
+
+  Args:
+    index_path: The path of the index file.
+
+  Returns:
+    A list of record offsets.
+  """
+  content = file_io.read_file_to_string(index_path)
+  return list(struct.unpack("<%dQ" % (len(content) // 8), content))
+
+
+def tf_record_range_iterator(path, start, stop=None, options=None, index=None):
+  """An iterator over the records `[start, stop)` of a TFRecords file.
+
+  With an `index` of an uncompressed file, reading starts directly at record
+  `start`. Compressed files can only be read sequentially, so the records
+  before `start` are read and skipped.
+
+  Args:
+    path: The path to the TFRecords file.
+    start: The number of the first record to read.
+    stop: The number of the record to stop at, or `None` to read to the end of
+      the file.
+    options: (optional) A TFRecordOptions object.
+    index: (optional) The record offsets of the file, see `tf_record_index`.
+
+  Yields:
+    Strings.
+
+  Raises:
+    IOError: If `path` cannot be opened for reading.
+    ValueError: If `start` is beyond the records listed in `index`.
+  """
+  if stop is not None and stop <= start:
+    return
+  offset = 0
+  to_skip = start
+  if index is not None and not TFRecordOptions.get_compression_type_string(
+      options):
+    if start > len(index):
+      raise ValueError("Record %d is beyond the %d records in the index." %
+                       (start, len(index)))
+    if start == len(index):
+      return
+    offset = index[start]
+    to_skip = 0
+  reader = _new_record_reader(path, offset, options)
+  try:
+    num_read = start
+    while stop is None or num_read < stop:
+      try:
+        with errors.raise_exception_on_not_ok_status() as status:
+          reader.GetNext(status)
+      except errors.OutOfRangeError:
+        break
+      if to_skip:
+        to_skip -= 1
+        continue
+      num_read += 1
+      yield reader.record()
+  finally:
+    reader.Close()
 
 
 class TFRecordWriter(object):
@@ -128,3 +363,186 @@ class TFRecordWriter(object):
   def close(self):
     """Close the file."""
     self._writer.Close()
+
+
+# Size of the length, length checksum and data checksum around each record.
+_RECORD_OVERHEAD_BYTES = 16
+
+
+class ShardedTFRecordWriter(object):
+  """A class to write records to many TFRecords files in parallel.
+
+  Records are distributed over `num_shards` shards, round-robin or by the hash
+  of a key. Each shard is written by its own thread, so that compression and
+  file IO of the shards run concurrently. A shard rolls over to a new file once
+  it reaches `max_records_per_file` records or `max_bytes_per_file` bytes of
+  uncompressed record data.
+
+  File names are built from `filename_pattern` with `str.format`, using the
+  fields `shard` and `part` (the number of the file within the shard), e.g.
+  `"/data/train-{shard:05d}-{part:03d}.tfrecord"`. With `write_index`, an index
+  of the record offsets (see `tf_record_index`) is written next to each file,
+  with an `.index` suffix.
+
+  This class implements `__enter__` and `__exit__`, and can be used
+  in `with` blocks like a normal file.
+
+  @@__init__
+  @@write
+  @@close
+  @@filenames
+  """
+
+  def __init__(self, filename_pattern, num_shards, options=None,
+               max_records_per_file=None, max_bytes_per_file=None,
+               write_index=False, max_pending_records=1024):
+    """Creates a `ShardedTFRecordWriter`.
+
+    Args:
+      filename_pattern: A `str.format` pattern with a `shard` field, and a
+        `part` field if files roll over.
+      num_shards: The number of shards written in parallel.
+      options: (optional) A TFRecordOptions object, used for all files.
+      max_records_per_file: (optional) Roll over to a new file after this many
+        records.
+      max_bytes_per_file: (optional) Roll over to a new file once this many
+        bytes of uncompressed record data have been written.
+      write_index: Whether to write an index file next to each file.
+      max_pending_records: The maximum number of records queued per shard
+        before `write` blocks.
+
+    Raises:
+      ValueError: If `num_shards` is not positive, or `filename_pattern` lacks a
+        required field.
+    """
+    if num_shards < 1:
+      raise ValueError("num_shards must be positive, got %d." % num_shards)
+    if "{shard" not in filename_pattern:
+      raise ValueError("filename_pattern must contain a {shard} field: %s" %
+                       filename_pattern)
+    rolls_over = max_records_per_file or max_bytes_per_file
+    if rolls_over and "{part" not in filename_pattern:
+      raise ValueError("filename_pattern must contain a {part} field when "
+                       "files roll over: %s" % filename_pattern)
+    self._filename_pattern = filename_pattern
+    self._options = options
+    self._max_records_per_file = max_records_per_file
+    self._max_bytes_per_file = max_bytes_per_file
+    self._write_index = write_index
+    self._next_shard = 0
+    self._closed = False
+    self._errors = []
+    self._filenames = []
+    self._lock = threading.Lock()
+    self._queues = [queue.Queue(maxsize=max_pending_records)
+                    for _ in range(num_shards)]
+    self._threads = [threading.Thread(target=self._write_shard, args=(shard,))
+                     for shard in range(num_shards)]
+    for thread in self._threads:
+      thread.daemon = True
+      thread.start()
+
+  def __enter__(self):
+    """Enter a `with` block."""
+    return self
+
+  def __exit__(self, unused_type, unused_value, unused_traceback):
+    """Exit a `with` block, closing the files."""
+    self.close()
+
+  @property
+  def filenames(self):
+    """The names of the files written so far, in order of creation."""
+    with self._lock:
+      return list(self._filenames)
+
+  def _open_file(self, shard, part):
+    path = self._filename_pattern.format(shard=shard, part=part)
+    with self._lock:
+      self._filenames.append(path)
+    return path, TFRecordWriter(path, self._options)
+
+  def _close_file(self, path, writer, offsets):
+    writer.close()
+    if self._write_index:
+      write_tf_record_index(path + ".index", offsets)
+
+  def _write_shard(self, shard):
+    """Writes the records queued for `shard`, rolling over files as needed."""
+    records = self._queues[shard]
+    part = 0
+    path, writer = None, None
+    offsets = []
+    num_bytes = 0
+    try:
+      while True:
+        record = records.get()
+        if record is None:
+          break
+        if writer is not None and (
+            (self._max_records_per_file and
+             len(offsets) >= self._max_records_per_file) or
+            (self._max_bytes_per_file and
+             num_bytes >= self._max_bytes_per_file)):
+          self._close_file(path, writer, offsets)
+          part += 1
+          writer = None
+        if writer is None:
+          path, writer = self._open_file(shard, part)
+          offsets = []
+          num_bytes = 0
+        offsets.append(num_bytes + _RECORD_OVERHEAD_BYTES * len(offsets))
+        writer.write(record)
+        num_bytes += len(record)
+      if writer is not None:
+        self._close_file(path, writer, offsets)
+    except Exception as e:  # pylint: disable=broad-except
+      with self._lock:
+        self._errors.append(e)
+      # Drain the queue so that `write` and `close` do not block.
+      while records.get() is not None:
+        pass
+
+  def _raise_error(self):
+    with self._lock:
+      if self._errors:
+        raise self._errors[0]  # pylint: disable=raising-bad-type
+
+  def write(self, record, key=None):
+    """Queues a string record for writing.
+
+    Args:
+      record: str
+      key: (optional) A string or bytes key. Records with the same key are
+        written to the same shard. If `None`, records are assigned to shards
+        round-robin.
+
+    Raises:
+      RuntimeError: If the writer has been closed.
+      Exception: An error previously raised while writing a shard.
+    """
+    if self._closed:
+      raise RuntimeError("Writer has been closed.")
+    self._raise_error()
+    if key is None:
+      shard = self._next_shard
+      self._next_shard = (self._next_shard + 1) % len(self._queues)
+    else:
+      shard = (zlib.crc32(compat.as_bytes(key)) & 0xffffffff) % len(
+          self._queues)
+    self._queues[shard].put(compat.as_bytes(record))
+
+  def close(self):
+    """Writes the queued records and closes all files.
+
+    Raises:
+      Exception: An error raised while writing a shard.
+    """
+    if self._closed:
+      return
+    self._closed = True
+    for records in self._queues:
+      records.put(None)
+    for thread in self._threads:
+      thread.join()
+    self._raise_error()
@@ -104,7 +104,24 @@ def clip_by_norm(t, clip_norm, axes=None, name=None):
 
   return tclip
 
-def global_norm(t_list, name=None):
+def _deduplicate_indexed_slices(t):
+  """Sums the values of `IndexedSlices` `t` with the same index."""
+  with ops.colocate_with(t.indices):
+    unique_indices, new_index_positions = array_ops.unique(t.indices)
+    summed_values = math_ops.unsorted_segment_sum(
+        t.values, new_index_positions, array_ops.shape(unique_indices)[0])
+  return ops.IndexedSlices(summed_values, unique_indices, t.dense_shape)
+
+
+def _maybe_deduplicate(t_list, deduplicate_indexed_slices):
+  if not deduplicate_indexed_slices:
+    return t_list
+  with ops.name_scope("deduplicate_indexed_slices"):
+    return [_deduplicate_indexed_slices(t)
+            if isinstance(t, ops.IndexedSlices) else t for t in t_list]
+
+
+def global_norm(t_list, name=None, deduplicate_indexed_slices=False):
   """Computes the global norm of multiple tensors.
 
   Given a tuple or list of tensors `t_list`, this operation returns the
@@ -115,9 +132,20 @@ def global_norm(t_list, name=None):
 
   Any entries in `t_list` that are of type None are ignored.
 
+  The squared norms of the tensors placed on the same device are summed on
+  that device first, so that only one partial norm per device has to be
+  gathered.
+
+  The norm of `IndexedSlices` is computed over their `values`, which is only
+  the norm of the dense tensor they represent if their indices are unique.
+  Set `deduplicate_indexed_slices` to sum the values with the same index
+  first.
+
   Args:
     t_list: A tuple or list of mixed `Tensors`, `IndexedSlices`, or None.
     name: A name for the operation (optional).
+    deduplicate_indexed_slices: If True, sum the values of `IndexedSlices`
+      with the same index before computing their norm.
 
   Returns:
     A 0-D (scalar) `Tensor` of type `float`.
@@ -130,19 +158,32 @@ def global_norm(t_list, name=None):
     raise TypeError("t_list should be a sequence")
   t_list = list(t_list)
   with ops.name_scope(name, "global_norm", t_list) as name:
+    t_list = _maybe_deduplicate(t_list, deduplicate_indexed_slices)
     values = [
         ops.convert_to_tensor(
             t.values if isinstance(t, ops.IndexedSlices) else t,
             name="t_%d" % i)
         if t is not None else t
         for i, t in enumerate(t_list)]
-    half_squared_norms = []
+    # Maps devices to the half squared norms of the values placed on them.
+    half_squared_norms = collections.OrderedDict()
     for v in values:
       if v is not None:
         with ops.colocate_with(v):
-          half_squared_norms.append(gen_nn_ops.l2_loss(v))
+          half_squared_norms.setdefault(v.device, []).append(
+              gen_nn_ops.l2_loss(v))
 
-    half_squared_norm = math_ops.reduce_sum(array_ops.pack(half_squared_norms))
+    partial_norms = []
+    for device_norms in half_squared_norms.values():
+      if len(device_norms) == 1:
+        partial_norms.append(device_norms[0])
+      else:
+        with ops.colocate_with(device_norms[0]):
+          partial_norms.append(math_ops.add_n(device_norms))
+    if len(partial_norms) == 1:
+      half_squared_norm = partial_norms[0]
+    else:
+      half_squared_norm = math_ops.add_n(partial_norms)
 
     norm = math_ops.sqrt(
         half_squared_norm *
@@ -151,7 +192,8 @@ def global_norm(t_list, name=None):
 
   return norm
 
-def clip_by_global_norm(t_list, clip_norm, use_norm=None, name=None):
+def clip_by_global_norm(t_list, clip_norm, use_norm=None, name=None,
+                        deduplicate_indexed_slices=False):
   """Clips values of multiple tensors by the ratio of the sum of their norms.
 
   Given a tuple or list of tensors `t_list`, and a clipping ratio `clip_norm`,
@@ -180,12 +222,18 @@ def clip_by_global_norm(t_list, clip_norm, use_norm=None, name=None):
   However, it is slower than `clip_by_norm()` because all the parameters must be
   ready before the clipping operation can be performed.
 
+  `IndexedSlices` stay sparse. With `deduplicate_indexed_slices`, their values
+  with the same index are summed first, which makes their norm that of the
+  dense tensor they represent and saves the optimizer from doing it again.
+
   Args:
     t_list: A tuple or list of mixed `Tensors`, `IndexedSlices`, or None.
     clip_norm: A 0-D (scalar) `Tensor` > 0. The clipping ratio.
     use_norm: A 0-D (scalar) `Tensor` of type `float` (optional). The global
       norm to use. If not provided, `global_norm()` is used to compute the norm.
     name: A name for the operation (optional).
+    deduplicate_indexed_slices: If True, sum the values of `IndexedSlices`
+      with the same index before computing the norm and clipping them.
 
   Returns:
     list_clipped: A list of `Tensors` of the same type as `list_t`.
@@ -197,7 +245,7 @@ def clip_by_global_norm(t_list, clip_norm, use_norm=None, name=None):
   if (not isinstance(t_list, collections.Sequence)
       or isinstance(t_list, six.string_types)):
     raise TypeError("t_list should be a sequence")
-  t_list = list(t_list)
+  t_list = _maybe_deduplicate(list(t_list), deduplicate_indexed_slices)
   if use_norm is None:
     use_norm = global_norm(t_list, name)
 
@@ -222,7 +270,7 @@ def clip_by_global_norm(t_list, clip_norm, use_norm=None, name=None):
       else:
         with ops.colocate_with(v):
           values_clipped.append(
-              array_ops.identity(v * scale, name="%s_%d" % (name, i)))
+              math_ops.mul(v, scale, name="%s_%d" % (name, i)))
 
     list_clipped = [
         ops.IndexedSlices(c_v, t.indices, t.dense_shape)
@@ -1055,8 +1055,10 @@ ops.NotDifferentiable("LookupTableFind")
 ops.NotDifferentiable("LookupTableInsert")
 ops.NotDifferentiable("LookupTableSize")
 ops.NotDifferentiable("HashTable")
+ops.NotDifferentiable("BoundedIdTable")
 ops.NotDifferentiable("InitializeTable")
 ops.NotDifferentiable("InitializeTableFromTextFile")
+ops.NotDifferentiable("InitializeTableFromBinaryFile")
 ops.NotDifferentiable("MutableDenseHashTable")
 ops.NotDifferentiable("MutableHashTable")
 ops.NotDifferentiable("MutableHashTableOfTensors")
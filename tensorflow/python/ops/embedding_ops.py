@@ -33,8 +33,67 @@ from tensorflow.python.ops import variables
 from tensorflow.python.platform import tf_logging as logging
 
 
+def _partition_ids(params, flat_ids, partition_strategy):
+  """Assigns ids to the partitions in `params`. See `embedding_lookup`.
+
+  Args:
+    params: A list of P tensors or variables, the partitions of the embedding.
+    flat_ids: A 1-D `Tensor` of ids.
+    partition_strategy: `"mod"` or `"div"`.
+
+  Returns:
+    A tuple `(p_assignments, new_ids)` with, for each id, the index of its
+    partition and its index within that partition.
+
+  Raises:
+    ValueError: If `partition_strategy` is not recognized.
+  """
+  np = len(params)  # Number of partitions
+  if partition_strategy == "mod":
+    p_assignments = flat_ids % np
+    new_ids = flat_ids // np
+  elif partition_strategy == "div":
+    # Compute num_total_ids as the sum of dim-0 of params, then assign to
+    # partitions based on a constant number of ids per partition. Optimize
+    # if we already know the full shape statically.
+    dim_0_size = params[0].get_shape()[0]
+    for p in xrange(1, np):
+      dim_0_size += params[p].get_shape()[0]
+    if dim_0_size.value:
+      num_total_ids = constant_op.constant(dim_0_size.value, flat_ids.dtype)
+    else:
+      dim_0_sizes = []
+      for p in xrange(np):
+        if params[p].get_shape()[0].value is not None:
+          dim_0_sizes.append(params[p].get_shape()[0].value)
+        else:
+          with ops.colocate_with(params[p]):
+            dim_0_sizes.append(array_ops.shape(params[p])[0])
+      num_total_ids = math_ops.reduce_sum(
+          math_ops.cast(array_ops.pack(dim_0_sizes), flat_ids.dtype))
+    ids_per_partition = num_total_ids // np
+    extras = num_total_ids % np
+
+    p_assignments = math_ops.maximum(
+        flat_ids // (ids_per_partition + 1),
+        (flat_ids - extras) // ids_per_partition)
+
+    # Emulate a conditional using a boolean indicator tensor
+    is_in_first_extras_partitions = math_ops.cast(
+        p_assignments < extras, flat_ids.dtype)
+    new_ids = (
+        is_in_first_extras_partitions * (
+            flat_ids % (ids_per_partition + 1)) +
+        (1 - is_in_first_extras_partitions) * (
+            (flat_ids - extras) % ids_per_partition))
+  else:
+    raise ValueError("Unrecognized partition strategy: " +
+                     partition_strategy)
+  return p_assignments, new_ids
+
+
 def embedding_lookup(params, ids, partition_strategy="mod", name=None,
-                     validate_indices=True, max_norm=None):
+                     validate_indices=True, max_norm=None, unique_ids=False):
   """Looks up `ids` in a list of embedding tensors.
 
   This function is used to perform parallel lookups on the list of
@@ -62,6 +121,13 @@ def embedding_lookup(params, ids, partition_strategy="mod", name=None,
   The results of the lookup are concatenated into a dense
   tensor. The returned tensor has shape `shape(ids) + shape(params)[1:]`.
 
+  If `unique_ids` is `True`, duplicate ids are removed across the whole batch
+  before partitioning, so that each distinct row is gathered from its shard
+  (and transferred) once. The gradient sums the contributions of duplicate
+  ids before they reach `params`, so every shard receives one gradient row
+  per distinct id. This pays off when `ids` has many duplicates, e.g. for
+  power-law distributed ids.
+
   Args:
     params: A single tensor representing the complete embedding tensor,
       or a list of P tensors all of same shape except for the first dimension,
@@ -77,6 +143,7 @@ def embedding_lookup(params, ids, partition_strategy="mod", name=None,
     validate_indices: Whether or not to validate gather indices.
     max_norm: If not None, embedding values are l2-normalized to the value of
      max_norm.
+    unique_ids: Whether to look up each distinct id only once.
 
   Returns:
     A `Tensor` with the same type as the tensors in `params`.
@@ -90,6 +157,9 @@ def embedding_lookup(params, ids, partition_strategy="mod", name=None,
     params = list(params)  # Iterate to get the underlying Variables.
   if not isinstance(params, list):
     params = [params]
+  if unique_ids:
+    return _embedding_lookup_unique(params, ids, partition_strategy, name,
+                                    validate_indices, max_norm)
   def maybe_normalize(x):
     if max_norm is not None:
       if x.get_shape().ndims is not None:
@@ -115,47 +185,8 @@ def embedding_lookup(params, ids, partition_strategy="mod", name=None,
       flat_ids = array_ops.reshape(ids, [-1])
       original_indices = math_ops.range(array_ops.size(flat_ids))
 
-      # Create p_assignments and set new_ids depending on the strategy.
-      if partition_strategy == "mod":
-        p_assignments = flat_ids % np
-        new_ids = flat_ids // np
-      elif partition_strategy == "div":
-        # Compute num_total_ids as the sum of dim-0 of params, then assign to
-        # partitions based on a constant number of ids per partition. Optimize
-        # if we already know the full shape statically.
-        dim_0_size = params[0].get_shape()[0]
-        for p in xrange(1, np):
-          dim_0_size += params[p].get_shape()[0]
-        if dim_0_size.value:
-          num_total_ids = constant_op.constant(dim_0_size.value, flat_ids.dtype)
-        else:
-          dim_0_sizes = []
-          for p in xrange(np):
-            if params[p].get_shape()[0].value is not None:
-              dim_0_sizes.append(params[p].get_shape()[0].value)
-            else:
-              with ops.colocate_with(params[p]):
-                dim_0_sizes.append(array_ops.shape(params[p])[0])
-          num_total_ids = math_ops.reduce_sum(
-              math_ops.cast(array_ops.pack(dim_0_sizes), flat_ids.dtype))
-        ids_per_partition = num_total_ids // np
-        extras = num_total_ids % np
-
-        p_assignments = math_ops.maximum(
-            flat_ids // (ids_per_partition + 1),
-            (flat_ids - extras) // ids_per_partition)
-
-        # Emulate a conditional using a boolean indicator tensor
-        is_in_first_extras_partitions = math_ops.cast(
-            p_assignments < extras, flat_ids.dtype)
-        new_ids = (
-            is_in_first_extras_partitions * (
-                flat_ids % (ids_per_partition + 1)) +
-            (1 - is_in_first_extras_partitions) * (
-                (flat_ids - extras) % ids_per_partition))
-      else:
-        raise ValueError("Unrecognized partition strategy: " +
-                         partition_strategy)
+      p_assignments, new_ids = _partition_ids(params, flat_ids,
+                                              partition_strategy)
 
       # Cast partition assignments to int32 for use in dynamic_partition.
       # There really should not be more than 2^32 partitions.
@@ -200,6 +231,38 @@ def embedding_lookup(params, ids, partition_strategy="mod", name=None,
       return maybe_normalize(ret)
 
 
+@ops.RegisterGradient("EmbeddingLookupUniqueGather")
+def _EmbeddingLookupUniqueGatherGrad(op, grad):
+  """Sums the gradients of duplicate ids into one row per distinct id."""
+  unique_embeddings, idx = op.inputs
+  num_unique = array_ops.shape(unique_embeddings)[0]
+  return [math_ops.unsorted_segment_sum(grad, idx, num_unique), None]
+
+
+def _embedding_lookup_unique(params, ids, partition_strategy, name,
+                             validate_indices, max_norm):
+  """Looks up each distinct id once. See `embedding_lookup`."""
+  with ops.name_scope(name, "embedding_lookup", params + [ids]) as name:
+    ids = ops.convert_to_tensor(ids, name="ids")
+    unique_flat_ids, idx = array_ops.unique(array_ops.reshape(ids, [-1]))
+    unique_embeddings = embedding_lookup(
+        params, unique_flat_ids, partition_strategy=partition_strategy,
+        validate_indices=validate_indices, max_norm=max_norm)
+    # Scatter the distinct rows back to the positions of the ids, summing
+    # the gradients of duplicates locally instead of on the shards.
+    with ops.get_default_graph().gradient_override_map(
+        {"Gather": "EmbeddingLookupUniqueGather"}):
+      ret = array_ops.gather(unique_embeddings, idx)
+    ret = array_ops.reshape(
+        ret,
+        array_ops.concat_v2([array_ops.shape(ids),
+                             array_ops.shape(unique_embeddings)[1:]], 0),
+        name=name)
+    ret.set_shape(ids.get_shape().concatenate(
+        unique_embeddings.get_shape()[1:]))
+    return ret
+
+
 def embedding_lookup_sparse(params, sp_ids, sp_weights,
                             partition_strategy="mod",
                             name=None,
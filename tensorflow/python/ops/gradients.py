@@ -22,6 +22,7 @@ from __future__ import print_function
 from tensorflow.python.ops.gradients_impl import AggregationMethod
 from tensorflow.python.ops.gradients_impl import gradients
 from tensorflow.python.ops.gradients_impl import hessians
+from tensorflow.python.ops.gradients_impl import profile_gradients
 # pylint: enable=unused-import
 from tensorflow.python.util.all_util import remove_undocumented
 
@@ -30,5 +31,6 @@ _allowed_symbols = [
     "AggregationMethod",
     "gradients",  # tf.gradients.gradients.
     "hessians",  # tf.gradients.hessians
+    "profile_gradients",
 ]
 remove_undocumented(__name__, _allowed_symbols)
@@ -20,6 +20,9 @@ from __future__ import print_function
 
 import collections
 import contextlib
+import math
+import threading
+import time
 import warnings
 
 import numpy as np
@@ -98,12 +101,14 @@ ops.register_tensor_conversion_function(ops.IndexedSlices,
                                         _IndexedSlicesToTensor)
 
 
-def _MarkReachedOps(from_ops, reached_ops):
+def _MarkReachedOps(from_ops, reached_ops, ancestor_ops=None):
   """Mark all ops reached from "from_ops".
 
   Args:
     from_ops: list of Operations.
     reached_ops: list of booleans, indexed by operation id.
+    ancestor_ops: Optional list of booleans, indexed by operation id. If
+      given, consumers that are not marked in it are not visited.
   """
   queue = collections.deque()
   queue.extend(from_ops)
@@ -112,7 +117,25 @@ def _MarkReachedOps(from_ops, reached_ops):
     if not reached_ops[op._id]:
       reached_ops[op._id] = True
       for output in op.outputs:
-        queue.extend(output.consumers())
+        if ancestor_ops is None:
+          queue.extend(output.consumers())
+        else:
+          queue.extend(c for c in output.consumers() if ancestor_ops[c._id])
+
+
+def _MarkAncestorOps(to_ops, ancestor_ops):
+  """Mark "to_ops" and all the ops they (transitively) take inputs from.
+
+  Args:
+    to_ops: list of Operations.
+    ancestor_ops: list of booleans, indexed by operation id.
+  """
+  stack = list(to_ops)
+  while stack:
+    op = stack.pop()
+    if not ancestor_ops[op._id]:
+      ancestor_ops[op._id] = True
+      stack.extend(inp.op for inp in op.inputs)
 
 
 def _GatherInputs(to_ops, reached_ops):
@@ -159,14 +182,25 @@ def _PendingCount(graph, to_ops, from_ops, colocate_gradients_with_ops):
     a ControlFlowState object which is not None if the ops between from_ops
     and to_ops contain control flow loops.
   """
+  # The per-op flags are bytearrays rather than lists of booleans: they are
+  # allocated for every op in the graph, which may have hundreds of thousands.
+  num_ops = graph._last_id + 1
+
+  # Only ancestors of to_ops can be between from_ops and to_ops. Marking them
+  # first lets the forward traversal skip all the other consumers of from_ops
+  # (e.g. the gradients already built for other losses) instead of walking
+  # everything downstream of the variables.
+  ancestor_ops = bytearray(num_ops)
+  _MarkAncestorOps(to_ops, ancestor_ops)
+
   # Mark reachable ops from from_ops.
-  reached_ops = [False] * (graph._last_id + 1)
+  reached_ops = bytearray(num_ops)
   for op in to_ops:
     reached_ops[op._id] = True
-  _MarkReachedOps(from_ops, reached_ops)
+  _MarkReachedOps(from_ops, reached_ops, ancestor_ops)
 
   # Mark between ops.
-  between_ops = [False] * (graph._last_id + 1)
+  between_ops = bytearray(num_ops)
   between_op_list = []
   queue = collections.deque()
   queue.extend(to_ops)
@@ -186,7 +220,7 @@ def _PendingCount(graph, to_ops, from_ops, colocate_gradients_with_ops):
       between_op_list, between_ops, colocate_gradients_with_ops)
 
   # Initialize pending count for between ops.
-  pending_count = [0] * (graph._last_id + 1)
+  pending_count = [0] * num_ops
   for op in between_op_list:
     for x in op.inputs:
       if between_ops[x.op._id]:
@@ -317,13 +351,277 @@ def _SymGrad(op, out_grads):
   return in_grads
 
 
+def _BetweenOps(to_ops, from_ops):
+  """Returns the ops on a path from "from_ops" to "to_ops", sorted by id.
+
+  Args:
+    to_ops: list of Operations.
+    from_ops: list of Operations.
+
+  Returns:
+    A list of Operations, including the reached "from_ops" and "to_ops".
+  """
+  num_ops = ops.get_default_graph()._last_id + 1
+  ancestor_ops = bytearray(num_ops)
+  _MarkAncestorOps(to_ops, ancestor_ops)
+  reached_ops = bytearray(num_ops)
+  for op in to_ops:
+    reached_ops[op._id] = True
+  _MarkReachedOps(from_ops, reached_ops, ancestor_ops)
+  between_ops = _GatherInputs(to_ops, reached_ops)
+  between_ops.sort(key=lambda op: op._id)
+  return between_ops
+
+
+class _Recomputer(object):
+  """Recreates forward activations for the gradient functions that use them.
+
+  The outputs of the ops between `xs` and `ys` are recomputed, rather than
+  kept alive until the backward pass, unless they are checkpoints, outputs of
+  the ops of `xs`, references, or outputs of stateful ops (whose results would
+  differ). The copies made for a gradient function take a control dependency
+  on the gradients it receives, so they only run once the backward pass
+  reaches them.
+  """
+
+  def __init__(self, between_ops, from_ops, checkpoints):
+    """Creates a `_Recomputer`.
+
+    Args:
+      between_ops: list of the Operations between `xs` and `ys`.
+      from_ops: list of the Operations of `xs`.
+      checkpoints: list of the Tensors kept for the backward pass.
+    """
+    self._between_ops = set(between_ops)
+    self._from_ops = set(from_ops)
+    self._checkpoints = set(checkpoints)
+    # Maps original ops to their copies.
+    self._copies = {}
+
+  def _IsCopyable(self, op):
+    # pylint: disable=protected-access
+    return (op in self._between_ops and op not in self._from_ops and
+            op.op_def is not None and not op.op_def.is_stateful and
+            not op.graph._is_function(op.type))
+    # pylint: enable=protected-access
+
+  def IsRecomputable(self, t):
+    """Returns True if `t` is recomputed rather than kept for backprop."""
+    return (t not in self._checkpoints and
+            not t.dtype._is_ref_dtype and  # pylint: disable=protected-access
+            self._IsCopyable(t.op))
+
+  def _Copy(self, op):
+    """Copies `op` and the recomputed ops it depends on."""
+    graph = ops.get_default_graph()
+    stack = [op]
+    while stack:
+      current = stack[-1]
+      if current in self._copies:
+        stack.pop()
+        continue
+      missing = [t.op for t in current.inputs
+                 if self.IsRecomputable(t) and t.op not in self._copies]
+      if missing:
+        stack.extend(missing)
+        continue
+      stack.pop()
+      inputs = [self._copies[t.op].outputs[t.value_index]
+                if self.IsRecomputable(t) else t for t in current.inputs]
+      # Control inputs are not recomputed for their own sake: the copy waits
+      # for the copies of those that were recomputed anyway, and for the
+      # original ops otherwise.
+      control_inputs = [self._copies.get(c, c) for c in current.control_inputs]
+      with ops.colocate_with(current, ignore_existing=True), (
+          ops.control_dependencies(control_inputs)):
+        copy = graph.create_op(
+            current.type, inputs, [t.dtype for t in current.outputs],
+            input_types=[t.dtype for t in current.inputs],
+            name=current.name.split("/")[-1],
+            attrs=dict(current.node_def.attr), op_def=current.op_def)
+      for copied, original in zip(copy.outputs, current.outputs):
+        copied.set_shape(original.get_shape())
+      self._copies[current] = copy
+    return self._copies[op]
+
+  def Recompute(self, op, out_grads):
+    """Returns the op to pass to the gradient function of `op`.
+
+    Args:
+      op: An Operation between `xs` and `ys`.
+      out_grads: The aggregated gradients received by `op`.
+
+    Returns:
+      `op` if all its inputs and outputs are kept for the backward pass, or
+      a copy of `op` reading recomputed inputs otherwise. Outputs of the copy
+      that the gradient function does not use are never computed.
+    """
+    if op in self._copies:
+      return self._copies[op]
+    if not self._IsCopyable(op) or not any(
+        self.IsRecomputable(t) for t in list(op.inputs) + op.outputs):
+      return op
+    trigger = []
+    for g in out_grads:
+      if isinstance(g, ops.Tensor):
+        trigger.append(g.op)
+      elif isinstance(g, ops.IndexedSlices):
+        trigger.append(g.values.op)
+    with ops.name_scope("recompute"), ops.control_dependencies(trigger):
+      return self._Copy(op)
+
+
+def _SqrtCheckpoints(between_ops, recomputer):
+  """Chooses about sqrt(N) checkpoints among `between_ops`.
+
+  The ops are swept in id order, recording after each op the set of
+  recomputable tensors that still have consumers ahead. Among the positions
+  where this set is smallest (e.g. one tensor between the layers of an MLP,
+  the cell and hidden states between the steps of an LSTM), the sets of
+  every sqrt(N)-th of the N positions are kept as checkpoints.
+
+  Args:
+    between_ops: list of the Operations between `xs` and `ys`, sorted by id.
+    recomputer: A `_Recomputer` without checkpoints.
+
+  Returns:
+    A list of Tensors.
+  """
+  between_set = set(between_ops)
+  open_tensors = collections.OrderedDict()
+  smallest_cuts = []
+  for op in between_ops:
+    for t in op.inputs:
+      if t in open_tensors:
+        open_tensors[t] -= 1
+        if not open_tensors[t]:
+          del open_tensors[t]
+    for t in op.outputs:
+      if recomputer.IsRecomputable(t):
+        num_consumers = len([c for c in t.consumers() if c in between_set])
+        if num_consumers:
+          open_tensors[t] = num_consumers
+    if not open_tensors:
+      continue
+    if not smallest_cuts or len(open_tensors) < len(smallest_cuts[0]):
+      smallest_cuts = []
+    if not smallest_cuts or len(open_tensors) == len(smallest_cuts[0]):
+      smallest_cuts.append(list(open_tensors))
+  stride = int(math.ceil(math.sqrt(len(smallest_cuts))))
+  checkpoints = []
+  for cut in smallest_cuts[stride - 1::stride]:
+    checkpoints.extend(cut)
+  return checkpoints
+
+
+class GradientsProfile(object):
+  """Time spent building gradient graphs, collected by `profile_gradients`.
+
+  Attributes:
+    num_calls: Number of `gradients()` calls profiled.
+    num_ops: Number of ops visited during backprop.
+    total_time: Seconds spent in `gradients()`.
+    pending_count_time: Seconds spent finding the ops between `xs` and `ys`
+      and initializing their pending counts.
+    aggregation_time: Seconds spent aggregating the gradients received by
+      each op.
+    grad_fn_time: Dict mapping op types to the seconds spent in their
+      gradient functions.
+    grad_fn_calls: Dict mapping op types to the number of calls to their
+      gradient functions.
+    aggregations: List of `(tensor_name, num_grads, shape, method)` tuples,
+      one per dense gradient summed from several terms, where `method` is
+      "add_n", "tree", "accumulate_n" or "chunked_tree".
+  """
+
+  def __init__(self):
+    self.num_calls = 0
+    self.num_ops = 0
+    self.total_time = 0.0
+    self.pending_count_time = 0.0
+    self.aggregation_time = 0.0
+    self.grad_fn_time = collections.defaultdict(float)
+    self.grad_fn_calls = collections.defaultdict(int)
+    self.aggregations = []
+
+  @property
+  def bookkeeping_time(self):
+    """Seconds not spent in gradient functions or in aggregation."""
+    return (self.total_time - self.aggregation_time -
+            sum(self.grad_fn_time.values()))
+
+  def _add_grad_fn_time(self, op_type, seconds):
+    self.grad_fn_time[op_type] += seconds
+    self.grad_fn_calls[op_type] += 1
+
+  def report(self, max_op_types=20):
+    """Returns a human-readable summary of the profile.
+
+    Args:
+      max_op_types: Maximum number of op types listed, slowest first.
+
+    Returns:
+      A string.
+    """
+    lines = [
+        "gradients(): %d calls, %d ops, %.3fs" % (
+            self.num_calls, self.num_ops, self.total_time),
+        "  bookkeeping: %.3fs (%.3fs in pending counts)" % (
+            self.bookkeeping_time, self.pending_count_time),
+        "  aggregation: %.3fs (%s)" % (
+            self.aggregation_time,
+            ", ".join("%d %s" % (count, method) for method, count in
+                      sorted(collections.Counter(
+                          a[3] for a in self.aggregations).items()))),
+        "  gradient functions: %.3fs" % sum(self.grad_fn_time.values())]
+    op_types = sorted(self.grad_fn_time, key=self.grad_fn_time.get,
+                      reverse=True)
+    for op_type in op_types[:max_op_types]:
+      lines.append("    %-30s %8d calls %10.3fs" % (
+          op_type, self.grad_fn_calls[op_type], self.grad_fn_time[op_type]))
+    return "\n".join(lines)
+
+
+_profile_state = threading.local()
+
+
+def _CurrentProfile():
+  return getattr(_profile_state, "profile", None)
+
+
+@contextlib.contextmanager
+def profile_gradients():
+  """Profiles the calls to `gradients()` made in this thread.
+
+  For example:
+
+  ```python
+  with gradients_impl.profile_gradients() as profile:
+    grads = tf.gradients(loss, tf.trainable_variables())
+  print(profile.report())
+  ```
+
+  Yields:
+    A `GradientsProfile`, updated by every `gradients()` call made in the
+    scope of the context manager.
+  """
+  previous_profile = _CurrentProfile()
+  profile = GradientsProfile()
+  _profile_state.profile = profile
+  try:
+    yield profile
+  finally:
+    _profile_state.profile = previous_profile
+
+
 def gradients(ys,
               xs,
               grad_ys=None,
               name="gradients",
               colocate_gradients_with_ops=False,
               gate_gradients=False,
-              aggregation_method=None):
+              aggregation_method=None,
+              checkpoints=None):
   """Constructs symbolic partial derivatives of sum of `ys` w.r.t. x in `xs`.
 
   `ys` and `xs` are each a `Tensor` or a list of tensors.  `grad_ys`
@@ -343,6 +641,15 @@ def gradients(ys,
   one wanted to weight the gradient differently for each value in
   each y).
 
+  By default, every forward activation used by a gradient function is kept
+  alive until the backward pass reaches it. When `checkpoints` is given, only
+  those activations are kept: the gradient functions read copies of the
+  forward ops between checkpoints, which are recomputed once the backward pass
+  reaches them. This trades one more forward pass for a peak memory roughly
+  proportional to the number of checkpoints plus the size of the largest
+  segment between them. Activations produced by stateful ops (e.g. random
+  ops) are always kept. Recomputation is not supported through while loops.
+
   Args:
     ys: A `Tensor` or list of tensors to be differentiated.
     xs: A `Tensor` or list of tensors to be used for differentiation.
@@ -356,6 +663,9 @@ def gradients(ys,
       for an operations.  This avoids some race conditions.
     aggregation_method: Specifies the method used to combine gradient terms.
       Accepted values are constants defined in the class `AggregationMethod`.
+    checkpoints: Optional. A list of tensors between `xs` and `ys` to keep
+      for the backward pass, recomputing the other activations, or "sqrt" to
+      choose about sqrt(N) of them at the narrowest cuts of the graph.
 
   Returns:
     A list of `sum(dy/dx)` for each x in `xs`.
@@ -366,6 +676,9 @@ def gradients(ys,
     ValueError: if the arguments are invalid.
 
   """
+  profile = _CurrentProfile()
+  if profile is not None:
+    start_time = time.time()
   ys = _AsList(ys)
   xs = _AsList(xs)
   if grad_ys is None:
@@ -387,11 +700,29 @@ def gradients(ys,
 
     # Initialize the pending count for ops in the connected subgraph from ys
     # to the xs.
+    graph = ops.get_default_graph()
     to_ops = [t.op for t in ys]
     from_ops = [t.op for t in xs]
-    pending_count, loop_state = _PendingCount(ops.get_default_graph(), to_ops,
-                                              from_ops,
+    if profile is not None:
+      pending_count_start = time.time()
+    pending_count, loop_state = _PendingCount(graph, to_ops, from_ops,
                                               colocate_gradients_with_ops)
+    if profile is not None:
+      profile.pending_count_time += time.time() - pending_count_start
+
+    recomputer = None
+    if checkpoints is not None:
+      if loop_state:
+        raise ValueError("checkpoints are not supported with while loops.")
+      between_ops = _BetweenOps(to_ops, from_ops)
+      if checkpoints == "sqrt":
+        checkpoints = _SqrtCheckpoints(
+            between_ops, _Recomputer(between_ops, from_ops, []))
+      elif isinstance(checkpoints, six.string_types):
+        raise ValueError("Invalid checkpoints specified %s." % checkpoints)
+      else:
+        checkpoints = [ops.convert_to_tensor(t) for t in _AsList(checkpoints)]
+      recomputer = _Recomputer(between_ops, from_ops, checkpoints)
 
     # Iterate over the collected ops.
     #
@@ -432,20 +763,32 @@ def gradients(ys,
     while queue:
       # generate gradient subgraph for op.
       op = queue.popleft()
+      if profile is not None:
+        profile.num_ops += 1
+      if not loop_state and op not in grads:
+        # No gradient reached this op, so there is nothing to aggregate or
+        # backprop: just release its inputs.
+        _UpdatePendingAndEnqueueReady(grads, op, queue, pending_count,
+                                      loop_state)
+        continue
       with _maybe_colocate_with(op, colocate_gradients_with_ops):
         if loop_state:
           loop_state.EnterGradWhileContext(op, before=True)
+        if profile is not None:
+          aggregation_start = time.time()
         out_grads = _AggregatedGrads(grads, op, loop_state, aggregation_method)
+        if profile is not None:
+          profile.aggregation_time += time.time() - aggregation_start
         if loop_state:
           loop_state.ExitGradWhileContext(op, before=True)
 
         grad_fn = None
         # pylint: disable=protected-access
-        is_func_call = ops.get_default_graph()._is_function(op.type)
+        is_func_call = graph._is_function(op.type)
         has_out_grads = any(isinstance(g, ops.Tensor) or g for g in out_grads)
         if has_out_grads and (op._id not in stop_ops):
           if is_func_call:
-            grad_fn = ops.get_default_graph()._get_function(
+            grad_fn = graph._get_function(
                 op.type).python_grad_func
             # pylint: enable=protected-access
           else:
@@ -474,16 +817,25 @@ def gradients(ys,
                 out_grads[i] = control_flow_ops.ZerosLikeOutsideLoop(op, i)
           with ops.name_scope(op.name + "_grad"):
             # pylint: disable=protected-access
-            with ops.get_default_graph()._original_op(op):
+            with graph._original_op(op):
               # pylint: enable=protected-access
+              if profile is not None:
+                grad_fn_start = time.time()
               if grad_fn:
                 # If grad_fn was found, do not use SymbolicGradient even for
                 # functions.
-                in_grads = grad_fn(op, *out_grads)
+                if recomputer is not None:
+                  in_grads = grad_fn(recomputer.Recompute(op, out_grads),
+                                     *out_grads)
+                else:
+                  in_grads = grad_fn(op, *out_grads)
               else:
                 # For function call ops, we add a 'SymbolicGradient'
                 # node to the graph to compute gradients.
                 in_grads = _SymGrad(op, out_grads)
+              if profile is not None:
+                profile._add_grad_fn_time(op.type,
+                                          time.time() - grad_fn_start)
               in_grads = _AsList(in_grads)
               _VerifyGeneratedGradients(in_grads, op)
               if gate_gradients and len(
@@ -507,6 +859,9 @@ def gradients(ys,
 
   if loop_state:
     loop_state.PostProcessing()
+  if profile is not None:
+    profile.num_calls += 1
+    profile.total_time += time.time() - start_time
   return [_GetGrad(grads, x) for x in xs]
 
 
@@ -619,6 +974,9 @@ def _AccumulatorShape(inputs):
 
 def _LogOpGradients(op, out_grads, in_grads):
   """Log the in and out grads of an op."""
+  if logging.get_verbosity() > 1:
+    # Building the messages is costly on large graphs.
+    return
   logging.vlog(1, "Gradient for '" + op.name + "'")
 
   def _FilterGrad(x):
@@ -671,12 +1029,54 @@ class AggregationMethod(object):
      operation using the "AddN" op. It has the property that all
      gradients must be ready before any aggregation is performed.
   *  `DEFAULT`: The system-chosen default aggregation method.
+  *  `EXPERIMENTAL_AUTO`: Chosen per aggregated tensor to bound the memory
+     held by partial gradients: "AccumulateN" for large tensors of known
+     shape, a chain of "AddN" ops summing a few terms each when the shape
+     is not fully known, and a single "AddN" otherwise.
   """
   ADD_N = 0
   DEFAULT = ADD_N
   # The following are experimental and may not be supported in future releases.
   EXPERIMENTAL_TREE = 1
   EXPERIMENTAL_ACCUMULATE_N = 2
+  EXPERIMENTAL_AUTO = 3
+
+
+# With EXPERIMENTAL_AUTO, gradients whose terms add up to at least this many
+# bytes are summed with AccumulateN, which only keeps the running sum alive.
+_AUTO_ACCUMULATE_N_MIN_BYTES = 1 << 20
+
+# With EXPERIMENTAL_AUTO, the number of terms summed by each AddN when the
+# gradients are chained in chunks.
+_AUTO_AGGREGATION_CHUNK_SIZE = 8
+
+
+def _AutoAggregation(out_grad, tensor_shape, loop_state):
+  """Picks how EXPERIMENTAL_AUTO sums the dense gradients `out_grad`.
+
+  Args:
+    out_grad: A list of at least two `Tensor`s (or None) to sum.
+    tensor_shape: The merged static shape of `out_grad`.
+    loop_state: A ControlFlowState, or None if there are no while loops.
+
+  Returns:
+    One of "add_n", "accumulate_n" or "chunked_tree".
+  """
+  grads = [g for g in out_grad if g is not None]
+  if len(grads) <= 2:
+    return "add_n"
+  if tensor_shape.is_fully_defined():
+    num_bytes = (tensor_shape.num_elements() * grads[0].dtype.size *
+                 len(grads))
+    if num_bytes < _AUTO_ACCUMULATE_N_MIN_BYTES:
+      return "add_n"
+    # AccumulateN keeps its sum in a temporary variable, which can neither be
+    # created in a while loop nor span several devices.
+    if not loop_state and len(set(g.device for g in grads)) == 1:
+      return "accumulate_n"
+  if len(grads) <= _AUTO_AGGREGATION_CHUNK_SIZE:
+    return "add_n"
+  return "chunked_tree"
 
 
 def _AggregatedGrads(grads, op, loop_state, aggregation_method=None):
@@ -705,7 +1105,8 @@ def _AggregatedGrads(grads, op, loop_state, aggregation_method=None):
     aggregation_method = AggregationMethod.DEFAULT
   if aggregation_method not in [
       AggregationMethod.ADD_N, AggregationMethod.EXPERIMENTAL_TREE,
-      AggregationMethod.EXPERIMENTAL_ACCUMULATE_N
+      AggregationMethod.EXPERIMENTAL_ACCUMULATE_N,
+      AggregationMethod.EXPERIMENTAL_AUTO
   ]:
     raise ValueError("Invalid aggregation_method specified %s." %
                      aggregation_method)
@@ -729,8 +1130,26 @@ def _AggregatedGrads(grads, op, loop_state, aggregation_method=None):
         out_grads[i] = out_grad[0]
       elif all([isinstance(g, ops.Tensor) for g in out_grad if g is not None]):
         tensor_shape = _AccumulatorShape(out_grad)
-        if (aggregation_method == AggregationMethod.EXPERIMENTAL_ACCUMULATE_N
-            and len(out_grad) > 2 and tensor_shape.is_fully_defined()):
+        if aggregation_method == AggregationMethod.EXPERIMENTAL_AUTO:
+          used = _AutoAggregation(out_grad, tensor_shape, loop_state)
+          terms = [g for g in out_grad if g is not None]
+          if used == "accumulate_n":
+            out_grads[i] = math_ops.accumulate_n(terms)
+          elif used == "chunked_tree":
+            # Each AddN only waits for a chunk of the terms, so the ones
+            # computed first can be released before the last ones exist.
+            with ops.name_scope(op.name + "_gradient_sum"):
+              chunk_size = _AUTO_AGGREGATION_CHUNK_SIZE
+              running_sum = _MultiDeviceAddN(terms[:chunk_size])
+              for j in xrange(chunk_size, len(terms), chunk_size - 1):
+                running_sum = _MultiDeviceAddN(
+                    [running_sum] + terms[j:j + chunk_size - 1])
+              out_grads[i] = running_sum
+          else:
+            out_grads[i] = _MultiDeviceAddN(out_grad)
+        elif (aggregation_method ==
+              AggregationMethod.EXPERIMENTAL_ACCUMULATE_N and
+              len(out_grad) > 2 and tensor_shape.is_fully_defined()):
           # The benefit of using AccumulateN is that its inputs can be combined
           # in any order and this can allow the expression to be evaluated with
           # a smaller memory footprint.  When used with gpu_allocator_retry,
@@ -763,6 +1182,10 @@ def _AggregatedGrads(grads, op, loop_state, aggregation_method=None):
           out_grads[i] = _MultiDeviceAddN(out_grad)
         logging.vlog(2, "  _AggregatedGrads %d x %s using %s",
                      len(out_grad), tensor_shape, used)
+        profile = _CurrentProfile()
+        if profile is not None:
+          profile.aggregations.append(
+              (op.outputs[i].name, len(out_grad), tensor_shape, used))
       else:
         out_grad = math_ops._as_indexed_slices_list(
             [g for g in out_grad if g is not None])
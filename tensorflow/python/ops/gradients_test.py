@@ -18,6 +18,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import time
 import warnings
 
 import numpy as np
@@ -39,6 +40,8 @@ from tensorflow.python.ops import gradients_impl
 from tensorflow.python.ops import math_grad  # pylint: disable=unused-import
 from tensorflow.python.ops import math_ops
 from tensorflow.python.ops import nn_grad  # pylint: disable=unused-import
+from tensorflow.python.ops import rnn
+from tensorflow.python.ops import rnn_cell
 from tensorflow.python.ops import state_grad  # pylint: disable=unused-import
 from tensorflow.python.ops import functional_ops  # pylint: disable=unused-import
 
@@ -156,6 +159,54 @@ class GradientsTest(test_util.TensorFlowTestCase):
       gw = gradients.gradients(c, [w])[0]
     self.assertEquals("MatMul", gw.op.type)
 
+  def testUnusedConsumersAreSkipped(self):
+    with ops.Graph().as_default():
+      x = constant(1.0)
+      y = math_ops.mul(x, 2.0)
+      z = x
+      for _ in range(10):
+        z = math_ops.mul(z, 3.0)
+      to_ops = [y.op]
+      pending_count, _ = gradients_impl._PendingCount(
+          ops.get_default_graph(), to_ops, [x.op], False)
+      self.assertEqual(1, pending_count[x.op._id])
+      self.assertEqual(0, pending_count[z.op._id])
+      # The forward traversal from x stops at the ops y does not depend on,
+      # so none of the consumers building z is visited.
+      num_ops = ops.get_default_graph()._last_id + 1
+      ancestor_ops = bytearray(num_ops)
+      gradients_impl._MarkAncestorOps(to_ops, ancestor_ops)
+      reached_ops = bytearray(num_ops)
+      gradients_impl._MarkReachedOps([x.op], reached_ops, ancestor_ops)
+      self.assertEqual(
+          set([x.op, y.op]),
+          set(op for op in ops.get_default_graph().get_operations()
+              if reached_ops[op._id]))
+      with gradients_impl.profile_gradients() as profile:
+        dx = gradients.gradients(y, [x])[0]
+      self.assertEqual(2, profile.num_ops)
+      with self.test_session():
+        self.assertAllClose(2.0, dx.eval())
+
+  def testProfileGradients(self):
+    with ops.Graph().as_default():
+      inp = constant(1.0, shape=[32, 100], name="in")
+      w = constant(1.0, shape=[100, 10], name="w")
+      h = math_ops.reduce_sum(math_ops.matmul(inp, w))
+      with gradients_impl.profile_gradients() as profile:
+        gradients.gradients(h, w)
+        gradients.gradients(h, inp)
+      gradients.gradients(h, w)
+    self.assertEqual(2, profile.num_calls)
+    self.assertEqual(2, profile.grad_fn_calls["MatMul"])
+    self.assertEqual(2, profile.grad_fn_calls["Sum"])
+    self.assertGreaterEqual(profile.total_time,
+                            sum(profile.grad_fn_time.values()))
+    self.assertGreaterEqual(profile.bookkeeping_time,
+                            profile.pending_count_time)
+    self.assertIn("MatMul", profile.report())
+    self.assertIsNone(gradients_impl._CurrentProfile())
+
   def testColocateGradients(self):
     with ops.Graph().as_default() as g:
       w = constant(1.0, shape=[1, 1])
@@ -264,6 +315,98 @@ class GradientsTest(test_util.TensorFlowTestCase):
       self.assertEqual(20.0, grads[0].eval())
       self.assertEqual(10.0, grads[1].eval())
 
+  def testAggregationMethodAuto(self):
+    with self.test_session():
+      x = constant(1.0)
+      y = x * 2.0
+      z = y + y + y + y + y + y + y + y + y + y
+      grads = gradients.gradients(
+          z,
+          [x, y],
+          aggregation_method=gradients.AggregationMethod.EXPERIMENTAL_AUTO)
+      self.assertTrue(all(x is not None for x in grads))
+      self.assertEqual(20.0, grads[0].eval())
+      self.assertEqual(10.0, grads[1].eval())
+
+  def testAggregationMethodAutoPolicy(self):
+    with self.test_session() as sess:
+      large = constant(1.0, shape=[512, 512], name="large")
+      small = constant(1.0, shape=[2, 2], name="small")
+      unknown = array_ops.placeholder(dtypes.float32, name="unknown")
+      ys = [math_ops.add_n([large] * 3), math_ops.add_n([small] * 3),
+            math_ops.add_n([unknown] * 20)]
+      with gradients_impl.profile_gradients() as profile:
+        grads = gradients.gradients(
+            ys, [large, small, unknown],
+            aggregation_method=gradients.AggregationMethod.EXPERIMENTAL_AUTO)
+      used = dict((name, method)
+                  for name, _, _, method in profile.aggregations)
+      self.assertEqual("accumulate_n", used["large:0"])
+      self.assertEqual("add_n", used["small:0"])
+      self.assertEqual("chunked_tree", used["unknown:0"])
+      large_grad, small_grad, unknown_grad = sess.run(
+          grads, feed_dict={unknown: [1.0, 2.0]})
+      self.assertAllEqual(np.full([512, 512], 3.0), large_grad)
+      self.assertAllEqual(np.full([2, 2], 3.0), small_grad)
+      self.assertAllEqual([20.0, 20.0], unknown_grad)
+
+  def _BuildMLP(self, num_layers, size=8):
+    h = constant(np.random.rand(4, size).astype(np.float32))
+    weights = []
+    activations = []
+    for _ in range(num_layers):
+      w = constant(np.random.rand(size, size).astype(np.float32) / size)
+      h = math_ops.tanh(math_ops.matmul(h, w))
+      weights.append(w)
+      activations.append(h)
+    return weights, activations, math_ops.reduce_sum(h)
+
+  def testCheckpoints(self):
+    with self.test_session() as sess:
+      weights, activations, loss = self._BuildMLP(9)
+      expected = gradients.gradients(loss, weights)
+      for checkpoints in ["sqrt", activations[2::3]]:
+        actual = gradients.gradients(loss, weights, checkpoints=checkpoints)
+        self.assertAllClose(*sess.run([expected, actual]))
+
+  def testCheckpointsRecomputeActivations(self):
+    with ops.Graph().as_default() as g:
+      weights, activations, loss = self._BuildMLP(9)
+      forward_ops = set(g.get_operations())
+      checkpoints = activations[2::3]
+      gradients.gradients(loss, weights, checkpoints=checkpoints)
+      for h in activations:
+        if h in checkpoints:
+          self.assertTrue(any(c not in forward_ops for c in h.consumers()))
+        else:
+          self.assertTrue(all(c in forward_ops for c in h.consumers()))
+
+  def testCheckpointsKeepControlInputs(self):
+    with ops.Graph().as_default() as g:
+      x = constant(np.random.rand(4, 8).astype(np.float32))
+      w = constant(np.random.rand(8, 8).astype(np.float32) / 8)
+      side = math_ops.square(x)
+      h0 = math_ops.tanh(math_ops.matmul(x, w))
+      h1 = math_ops.tanh(math_ops.matmul(h0, w))
+      with ops.control_dependencies([side.op, h0.op]):
+        y = math_ops.matmul(h1, w)
+      loss = math_ops.reduce_sum(math_ops.tanh(y))
+      forward_ops = set(g.get_operations())
+      gradients.gradients(loss, w, checkpoints=[])
+      y_copies = [op for op in g.get_operations()
+                  if op not in forward_ops and side.op in op.control_inputs]
+      self.assertEqual(1, len(y_copies))
+      # The control input on h0 is remapped to its recomputed copy.
+      self.assertNotIn(h0.op, y_copies[0].control_inputs)
+      self.assertTrue(any(c.type == "Tanh" and c not in forward_ops
+                          for c in y_copies[0].control_inputs))
+
+  def testInvalidCheckpoints(self):
+    with ops.Graph().as_default():
+      weights, _, loss = self._BuildMLP(2)
+      with self.assertRaisesRegexp(ValueError, "Invalid checkpoints"):
+        gradients.gradients(loss, weights, checkpoints="all")
+
   def testNoGradientForStringOutputs(self):
     with ops.Graph().as_default():
       def _TestOpGrad(_, float_grad, string_grad):
@@ -549,5 +692,157 @@ class IndexedSlicesToTensorTest(test_util.TensorFlowTestCase):
         in str(w[0].message))
 
 
+class GradientsBenchmark(tf.test.Benchmark):
+  """Cost of building and of aggregating gradients."""
+
+  def _build_lstm_loss(self, num_steps, num_units=256, batch_size=32):
+    inputs = [array_ops.zeros([batch_size, num_units])
+              for _ in range(num_steps)]
+    cell = rnn_cell.BasicLSTMCell(num_units, state_is_tuple=True)
+    outputs, _ = rnn.rnn(cell, inputs, dtype=dtypes.float32)
+    return math_ops.reduce_sum(math_ops.add_n(outputs))
+
+  def _benchmark_gradients(self, name, num_steps=100):
+    with ops.Graph().as_default():
+      loss = self._build_lstm_loss(num_steps)
+      params = tf.trainable_variables()
+      # The variables of the second call are also consumed by the gradient
+      # graph built by the first one, which its traversal should skip.
+      for call in ["first", "second"]:
+        with gradients_impl.profile_gradients() as profile:
+          start = time.time()
+          gradients.gradients(loss, params)
+          wall_time = time.time() - start
+        self.report_benchmark(
+            name="%s_%s" % (name, call),
+            iters=1,
+            wall_time=wall_time,
+            extras={"num_ops": profile.num_ops,
+                    "grad_fn_time": sum(profile.grad_fn_time.values()),
+                    "aggregation_time": profile.aggregation_time,
+                    "bookkeeping_time": profile.bookkeeping_time,
+                    "pending_count_time": profile.pending_count_time})
+
+  def benchmarkUnrolledLSTMGradients(self):
+    self._benchmark_gradients("unrolled_lstm_100_steps")
+
+  def _benchmark_checkpoints(self, name, build_loss, num_iters=10):
+    for checkpoints in [None, "sqrt"]:
+      with ops.Graph().as_default() as graph:
+        loss = build_loss()
+        grads = gradients.gradients(loss, tf.trainable_variables(),
+                                    checkpoints=checkpoints)
+        train_op = tf.group(*grads)
+        with tf.Session() as sess:
+          sess.run(tf.global_variables_initializer())
+          sess.run(train_op)
+          start = time.time()
+          for _ in range(num_iters):
+            sess.run(train_op)
+          wall_time = (time.time() - start) / num_iters
+          run_metadata = tf.RunMetadata()
+          sess.run(train_op,
+                   options=tf.RunOptions(
+                       trace_level=tf.RunOptions.FULL_TRACE),
+                   run_metadata=run_metadata)
+        self.report_benchmark(
+            name="%s_checkpoints_%s" % (name, checkpoints),
+            iters=num_iters,
+            wall_time=wall_time,
+            extras={"peak_bytes": self._peak_bytes(graph, run_metadata)})
+
+  def benchmarkCheckpointsMLP(self, num_layers=50, size=1024,
+                              batch_size=256):
+    def build_loss():
+      h = array_ops.ones([batch_size, size])
+      for _ in range(num_layers):
+        w = tf.Variable(np.random.randn(size, size).astype(np.float32) /
+                        np.sqrt(size))
+        h = math_ops.tanh(math_ops.matmul(h, w))
+      return math_ops.reduce_sum(h)
+    self._benchmark_checkpoints("mlp_%d_layers" % num_layers, build_loss)
+
+  def benchmarkCheckpointsLSTM(self, num_steps=50):
+    self._benchmark_checkpoints(
+        "unrolled_lstm_%d_steps" % num_steps,
+        lambda: self._build_lstm_loss(num_steps))
+
+  def _peak_bytes(self, graph, run_metadata):
+    """Estimates the peak memory in use from the step stats of a run.
+
+    Each output is counted from the start of the node producing it to the end
+    of its last consumer.
+
+    Args:
+      graph: The `Graph` that was run.
+      run_metadata: The `RunMetadata` of a `FULL_TRACE` run.
+
+    Returns:
+      The peak number of bytes held by live outputs.
+    """
+    start_micros = {}
+    end_micros = {}
+    output_bytes = {}
+    for dev_stats in run_metadata.step_stats.dev_stats:
+      for node_stats in dev_stats.node_stats:
+        name = node_stats.node_name
+        start_micros[name] = node_stats.all_start_micros
+        end_micros[name] = (node_stats.all_start_micros +
+                            node_stats.all_end_rel_micros)
+        for output in node_stats.output:
+          description = output.tensor_description.allocation_description
+          output_bytes[(name, output.slot)] = description.allocated_bytes
+    events = []
+    for (name, slot), num_bytes in output_bytes.items():
+      try:
+        tensor = graph.get_operation_by_name(name).outputs[slot]
+      except (KeyError, ValueError, IndexError):
+        continue
+      last_use = max([end_micros[name]] +
+                     [end_micros.get(c.name, end_micros[name])
+                      for c in tensor.consumers()])
+      events.append((start_micros[name], num_bytes))
+      events.append((last_use, -num_bytes))
+    peak_bytes = bytes_in_use = 0
+    for _, num_bytes in sorted(events):
+      bytes_in_use += num_bytes
+      peak_bytes = max(peak_bytes, bytes_in_use)
+    return peak_bytes
+
+  def benchmarkAggregationPeakMemory(self, num_steps=32, size=512):
+    """Sums the gradients of a weight shared across `num_steps` steps."""
+    methods = [("add_n", gradients.AggregationMethod.ADD_N),
+               ("tree", gradients.AggregationMethod.EXPERIMENTAL_TREE),
+               ("accumulate_n",
+                gradients.AggregationMethod.EXPERIMENTAL_ACCUMULATE_N),
+               ("auto", gradients.AggregationMethod.EXPERIMENTAL_AUTO)]
+    for name, aggregation_method in methods:
+      with ops.Graph().as_default() as graph:
+        with ops.device("/cpu:0"):
+          w = tf.Variable(np.random.randn(size, size).astype(np.float32) /
+                          size)
+          h = array_ops.ones([size, size])
+          for _ in range(num_steps):
+            h = math_ops.tanh(math_ops.matmul(h, w))
+          grad = gradients.gradients(
+              math_ops.reduce_sum(h), w,
+              aggregation_method=aggregation_method)[0]
+        with tf.Session() as sess:
+          sess.run(tf.global_variables_initializer())
+          sess.run(grad.op)
+          run_metadata = tf.RunMetadata()
+          start = time.time()
+          sess.run(grad.op,
+                   options=tf.RunOptions(
+                       trace_level=tf.RunOptions.FULL_TRACE),
+                   run_metadata=run_metadata)
+          wall_time = time.time() - start
+        self.report_benchmark(
+            name="aggregation_%s_%d_steps" % (name, num_steps),
+            iters=1,
+            wall_time=wall_time,
+            extras={"peak_bytes": self._peak_bytes(graph, run_metadata)})
+
+
 if __name__ == "__main__":
   googletest.main()
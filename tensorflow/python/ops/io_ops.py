@@ -64,6 +64,7 @@ here](https://www.tensorflow.org/code/tensorflow/core/example/feature.proto).
 @@FixedLenFeature
 @@FixedLenSequenceFeature
 @@SparseFeature
+@@CompiledFeatureSpec
 @@parse_example
 @@parse_single_example
 @@parse_tensor
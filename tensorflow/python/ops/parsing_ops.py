@@ -21,6 +21,8 @@ from __future__ import print_function
 import collections
 import re
 
+import numpy as np
+
 from tensorflow.python.framework import constant_op
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
@@ -233,6 +235,163 @@ def _construct_sparse_tensors_for_sparse_features(features, tensor_dict):
     del tensor_dict[key]
 
 
+class CompiledFeatureSpec(collections.Mapping):
+  """A validated `Example` feature configuration, reusable across parses.
+
+  `parse_example` has to validate its `features` and split them into the
+  sorted keys, types, shapes and default values taken by the parsing kernel.
+  A `CompiledFeatureSpec` does this once, so that the same configuration can
+  be parsed by many input pipelines (e.g. one per reader thread) without
+  redoing the work:
+
+  ```python
+  spec = tf.CompiledFeatureSpec({
+      "age": tf.FixedLenFeature([1], tf.int64, default_value=[-1]),
+      "query": tf.VarLenFeature(tf.string),
+  })
+  for serialized in serialized_batches:
+    features = tf.parse_example(serialized, spec)
+  ```
+
+  Default values are converted to numpy arrays of the dense shape when the
+  spec is compiled, so each parse adds a single constant per default value
+  instead of a conversion and a reshape, and features without a default
+  share one empty constant per type.
+
+  A `CompiledFeatureSpec` is a read-only mapping from feature keys to their
+  `FixedLenFeature`, `VarLenFeature` or `SparseFeature` configuration and can
+  be used wherever a `features` dict is accepted.
+  """
+
+  def __init__(self, features):
+    """Validates and compiles `features`.
+
+    Args:
+      features: A `dict` mapping feature keys to `FixedLenFeature`,
+        `VarLenFeature`, and `SparseFeature` values.
+
+    Raises:
+      ValueError: if `features` is empty or any feature is invalid.
+    """
+    if not features:
+      raise ValueError("Missing: features was %s." % features)
+    self._features = dict(features)
+    (self._sparse_keys, self._sparse_types, self._dense_keys,
+     self._dense_types, dense_defaults, dense_shapes) = _features_to_raw_params(
+         self._features, [VarLenFeature, SparseFeature, FixedLenFeature])
+    if not set(self._dense_keys).isdisjoint(set(self._sparse_keys)):
+      raise ValueError(
+          "Dense and sparse keys must not intersect; intersection: %s" %
+          set(self._dense_keys).intersection(set(self._sparse_keys)))
+    self._dense_shapes = [tensor_shape.as_shape(shape)
+                          for shape in dense_shapes]
+    self._dense_shape_protos = [shape.as_proto()
+                                for shape in self._dense_shapes]
+    self._dense_defaults = []
+    self._default_names = []
+    for key, dtype, shape in zip(self._dense_keys, self._dense_types,
+                                 self._dense_shapes):
+      default_value = dense_defaults.get(key)
+      if (default_value is not None and
+          not isinstance(default_value, ops.Tensor)):
+        try:
+          default_value = np.reshape(
+              np.asarray(default_value, dtype=dtype.as_numpy_dtype),
+              shape.as_list())
+        except (TypeError, ValueError) as e:
+          raise ValueError("Invalid default_value for feature %s: %s" %
+                           (key, e))
+      self._dense_defaults.append(default_value)
+      self._default_names.append(
+          "key_" + re.sub("[^A-Za-z0-9_.\\-/]", "_", key))
+    self._sparse_features = [
+        (key, self._features[key]) for key in sorted(self._features)
+        if isinstance(self._features[key], SparseFeature)]
+
+  def __getitem__(self, key):
+    return self._features[key]
+
+  def __iter__(self):
+    return iter(self._features)
+
+  def __len__(self):
+    return len(self._features)
+
+  @property
+  def sparse_keys(self):
+    """Sorted keys parsed into `SparseTensor`s, incl. `SparseFeature` parts."""
+    return list(self._sparse_keys)
+
+  @property
+  def sparse_types(self):
+    """The `DType`s of `sparse_keys`."""
+    return list(self._sparse_types)
+
+  @property
+  def dense_keys(self):
+    """Sorted keys of the `FixedLenFeature`s."""
+    return list(self._dense_keys)
+
+  @property
+  def dense_types(self):
+    """The `DType`s of `dense_keys`."""
+    return list(self._dense_types)
+
+  @property
+  def dense_shapes(self):
+    """The `TensorShape`s of `dense_keys`."""
+    return list(self._dense_shapes)
+
+  def _parse_example(self, serialized, names=None, name=None):
+    """Parses `serialized` with this spec. See `parse_example`."""
+    with ops.name_scope(name, "ParseExample", [serialized, names]):
+      names = [] if names is None else names
+      empty_defaults = {}
+      dense_defaults_vec = []
+      for dtype, default_value, default_name in zip(
+          self._dense_types, self._dense_defaults, self._default_names):
+        if default_value is None:
+          if dtype not in empty_defaults:
+            empty_defaults[dtype] = constant_op.constant([], dtype=dtype)
+          default_value = empty_defaults[dtype]
+        elif not isinstance(default_value, ops.Tensor):
+          default_value = constant_op.constant(
+              default_value, dtype=dtype, name=default_name)
+        dense_defaults_vec.append(default_value)
+
+      # pylint: disable=protected-access
+      outputs = gen_parsing_ops._parse_example(
+          serialized=serialized,
+          names=names,
+          dense_defaults=dense_defaults_vec,
+          sparse_keys=self._sparse_keys,
+          sparse_types=self._sparse_types,
+          dense_keys=self._dense_keys,
+          dense_shapes=self._dense_shape_protos,
+          name=name)
+      # pylint: enable=protected-access
+
+      (sparse_indices, sparse_values, sparse_shapes, dense_values) = outputs
+
+      tensor_dict = dict(zip(self._dense_keys, dense_values))
+      for key, ix, val, shape in zip(self._sparse_keys, sparse_indices,
+                                     sparse_values, sparse_shapes):
+        tensor_dict[key] = sparse_tensor.SparseTensor(ix, val, shape)
+
+    if self._sparse_features:
+      for key, feature in self._sparse_features:
+        tensor_dict[key] = sparse_ops.sparse_merge(
+            tensor_dict[feature.index_key],
+            tensor_dict[feature.value_key],
+            feature.size,
+            feature.already_sorted)
+      # Remove tensors that were only used to construct the SparseTensors of
+      # SparseFeatures.
+      for key in set(tensor_dict) - set(self._features):
+        del tensor_dict[key]
+    return tensor_dict
+
+
 def parse_example(serialized, features, name=None, example_names=None):
   # pylint: disable=line-too-long
   """Parses `Example` protos into a `dict` of tensors.
@@ -413,7 +572,8 @@ def parse_example(serialized, features, name=None, example_names=None):
     serialized: A vector (1-D Tensor) of strings, a batch of binary
       serialized `Example` protos.
     features: A `dict` mapping feature keys to `FixedLenFeature`,
-      `VarLenFeature`, and `SparseFeature` values.
+      `VarLenFeature`, and `SparseFeature` values, or a `CompiledFeatureSpec`
+      of them. Compile the spec once when parsing it repeatedly.
     name: A name for this operation (optional).
     example_names: A vector (1-D Tensor) of strings (optional), the names of
       the serialized protos in the batch.
@@ -424,16 +584,11 @@ def parse_example(serialized, features, name=None, example_names=None):
   Raises:
     ValueError: if any feature is invalid.
   """
-  if not features:
-    raise ValueError("Missing: features was %s." % features)
-  (sparse_keys, sparse_types, dense_keys, dense_types, dense_defaults,
-   dense_shapes) = _features_to_raw_params(
-       features, [VarLenFeature, SparseFeature, FixedLenFeature])
-  outputs = _parse_example_raw(
-      serialized, example_names, sparse_keys, sparse_types, dense_keys,
-      dense_types, dense_defaults, dense_shapes, name)
-  _construct_sparse_tensors_for_sparse_features(features, outputs)
-  return outputs
+  if not isinstance(features, CompiledFeatureSpec):
+    features = CompiledFeatureSpec(features)
+  # pylint: disable=protected-access
+  return features._parse_example(serialized, example_names, name)
+  # pylint: enable=protected-access
 
 
 def _parse_example_raw(serialized,
@@ -64,6 +64,8 @@ __all__ = [
     "variable_axis_size_partitioner",
     "min_max_variable_partitioner",
     "fixed_size_partitioner",
+    "ps_balanced_partitioner",
+    "partitioning_report",
 ]
 
 
@@ -232,6 +234,148 @@ def fixed_size_partitioner(num_shards, axis=0):
   return _partitioner
 
 
+def _element_size(dtype, bytes_per_string_element):
+  if dtype.base_dtype == dtypes.string:
+    return bytes_per_string_element
+  return dtype.size
+
+
+def ps_balanced_partitioner(num_ps_tasks, max_shard_bytes=(64 << 20) - 1,
+                            min_shard_bytes=256 << 10, axis=0,
+                            bytes_per_string_element=16):
+  """Partitioner that spreads the bytes of every variable evenly across ps.
+
+  Variables of at least `num_ps_tasks * min_shard_bytes` bytes are split into
+  a multiple of `num_ps_tasks` shards, the smallest one that keeps every shard
+  below `max_shard_bytes`. When the shards are placed round-robin (the default
+  of `replica_device_setter`), every ps task then receives the same number of
+  equally sized shards of each large variable, whatever the creation order.
+  Smaller variables are split into as many shards of at least
+  `min_shard_bytes` as they hold, which bounds the fan-out of lookups into
+  small tables.
+
+  Use `partitioning_report` to check the resulting shards before creating the
+  variables.
+
+  Args:
+    num_ps_tasks: Number of ps tasks the shards are placed on.
+    max_shard_bytes: The maximum size of a shard. Defaults to almost 64MB, to
+      keep below the protobuf byte limit.
+    min_shard_bytes: The minimum size of a shard. Defaults to 256K.
+    axis: The axis to partition along.  Default: outermost axis.
+    bytes_per_string_element: If the `Variable` is of type string, this provides
+      an estimate of how large each scalar in the `Variable` is.
+
+  Returns:
+    A partition function usable as the `partitioner` argument to
+    `variable_scope`, `get_variable`, and `get_partitioned_variable_list`.
+
+  Raises:
+    ValueError: If `num_ps_tasks` or any of the byte counts are non-positive,
+      or if `min_shard_bytes` exceeds `max_shard_bytes`.
+  """
+  if num_ps_tasks < 1:
+    raise ValueError("num_ps_tasks must be positive, got %d." % num_ps_tasks)
+  if min(max_shard_bytes, min_shard_bytes, bytes_per_string_element) < 1:
+    raise ValueError("max_shard_bytes, min_shard_bytes and "
+                     "bytes_per_string_element must be positive.")
+  if min_shard_bytes > max_shard_bytes:
+    raise ValueError("min_shard_bytes (%d) must not exceed max_shard_bytes "
+                     "(%d)." % (min_shard_bytes, max_shard_bytes))
+
+  def _partitioner(shape, dtype):
+    """Partitioner that balances the shards of a variable across ps tasks.
+
+    Args:
+      shape: A `TensorShape`.
+      dtype: A `DType`.
+
+    Returns:
+      A list representing how much to slice each axis in shape.
+
+    Raises:
+      ValueError: If shape is not a fully defined `TensorShape` or dtype is not
+        a `DType`.
+    """
+    if not isinstance(shape, tensor_shape.TensorShape):
+      raise ValueError("shape is not a TensorShape: %s" % shape)
+    if not shape.is_fully_defined():
+      raise ValueError("shape is not fully defined: %s" % shape)
+    if not isinstance(dtype, dtypes.DType):
+      raise ValueError("dtype is not a DType: %s" % dtype)
+
+    total_bytes = (shape.num_elements() *
+                   _element_size(dtype, bytes_per_string_element))
+    if total_bytes < num_ps_tasks * min_shard_bytes:
+      num_shards = total_bytes // min_shard_bytes
+    else:
+      num_shards = num_ps_tasks * int(
+          math.ceil(1.0 * total_bytes / (num_ps_tasks * max_shard_bytes)))
+    partitions = [1] * shape.ndims
+    partitions[axis] = int(max(1, min(num_shards, shape[axis].value)))
+    return partitions
+
+  return _partitioner
+
+
+def partitioning_report(partitioner, variables, num_ps_tasks,
+                        ids_per_step=None, bytes_per_string_element=16):
+  """Returns a dry-run report of how `partitioner` shards `variables`.
+
+  No variables are created. The shards of all variables are placed
+  round-robin on `num_ps_tasks` tasks in the given order, as
+  `replica_device_setter` does by default.
+
+  Args:
+    partitioner: A partition function, e.g. from `ps_balanced_partitioner`.
+    variables: A list of `(name, shape, dtype)` tuples describing the
+      variables in creation order.
+    num_ps_tasks: Number of ps tasks the shards are placed on.
+    ids_per_step: Optional number of ids looked up in every variable per step.
+      If set, the report includes the expected number of shards and ps tasks
+      an `embedding_lookup` of that many uniformly distributed ids touches.
+    bytes_per_string_element: An estimate of how large each scalar of string
+      variables is.
+
+  Returns:
+    A string with one line per variable giving its partitions and largest
+    shard in bytes, followed by one line per ps task with its total bytes.
+  """
+  lines = []
+  ps_bytes = [0] * num_ps_tasks
+  next_task = 0
+  for name, shape, dtype in variables:
+    shape = tensor_shape.as_shape(shape)
+    dtype = dtypes.as_dtype(dtype)
+    partitions = partitioner(shape=shape, dtype=dtype)
+    axis = [i for i, p in enumerate(partitions) if p > 1]
+    axis = axis[0] if axis else 0
+    num_shards = partitions[axis]
+    slice_bytes = (shape.num_elements() // max(shape[axis].value, 1) *
+                   _element_size(dtype, bytes_per_string_element))
+    for i in range(num_shards):
+      shard_slices = shape[axis].value // num_shards + (
+          1 if i < shape[axis].value % num_shards else 0)
+      ps_bytes[next_task] += shard_slices * slice_bytes
+      next_task = (next_task + 1) % num_ps_tasks
+    line = "%s: partitions=%s max_shard_bytes=%d" % (
+        name, list(partitions),
+        int(math.ceil(1.0 * shape[axis].value / num_shards)) * slice_bytes)
+    if ids_per_step:
+      line += " expected_shards_per_lookup=%.1f expected_ps_per_lookup=%.1f" % (
+          _expected_distinct(num_shards, ids_per_step),
+          _expected_distinct(min(num_shards, num_ps_tasks), ids_per_step))
+    lines.append(line)
+  for task, num_bytes in enumerate(ps_bytes):
+    lines.append("ps task %d: %d bytes" % (task, num_bytes))
+  return "\n".join(lines)
+
+
+def _expected_distinct(num_buckets, num_draws):
+  """Expected number of distinct buckets hit by uniform random draws."""
+  return num_buckets * (1.0 - (1.0 - 1.0 / num_buckets) ** num_draws)
+
+
 def create_partitioned_variables(
     shape, slicing, initializer, dtype=dtypes.float32,
     trainable=True, collections=None, name=None, reuse=None):
@@ -26,6 +26,7 @@ from tensorflow.python.framework import tensor_shape
 from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import nn_ops
 from tensorflow.python.ops import rnn_cell
 from tensorflow.python.ops import rnn_cell_impl
 from tensorflow.python.ops import tensor_array_ops
@@ -696,7 +697,7 @@ def bidirectional_dynamic_rnn(cell_fw, cell_bw, inputs, sequence_length=None,
 
 def dynamic_rnn(cell, inputs, sequence_length=None, initial_state=None,
                 dtype=None, parallel_iterations=None, swap_memory=False,
-                time_major=False, scope=None):
+                time_major=False, scope=None, compact_batch=False):
   """Creates a recurrent neural network specified by RNNCell `cell`.
 
   This function is functionally identical to the function `rnn` above, but
@@ -713,7 +714,18 @@ def dynamic_rnn(cell, inputs, sequence_length=None, initial_state=None,
 
   The parameter `sequence_length` is optional and is used to copy-through state
   and zero-out outputs when past a batch element's sequence length. So it's more
-  for correctness than performance, unlike in rnn().
+  for correctness than performance, unlike in rnn(), unless `compact_batch` is
+  set.
+
+  With `compact_batch=True`, the batch is sorted by decreasing
+  `sequence_length` and each time step only runs `cell` on the rows that have
+  not finished yet, gathering their inputs and scattering their outputs back
+  to the original batch order.  The loop also stops after
+  `max(sequence_length)` steps instead of `max_time`.  A batch with a few long
+  sequences then costs about as much as its total number of valid time steps,
+  and the activations kept (or swapped, see `swap_memory`) for back prop only
+  cover the rows still running at each step.  Outputs and final state are the
+  same as without compaction.
 
   Args:
     cell: An instance of RNNCell.
@@ -762,6 +774,9 @@ def dynamic_rnn(cell, inputs, sequence_length=None, initial_state=None,
       most TensorFlow data is batch-major, so by default this function
       accepts input and emits output in batch-major form.
     scope: VariableScope for the created subgraph; defaults to "rnn".
+    compact_batch: If `True`, only compute the rows of the batch that have not
+      reached their `sequence_length` at each time step.  Requires
+      `sequence_length`, and that `cell` handles a varying batch size.
 
   Returns:
     A pair (outputs, state) where:
@@ -787,11 +802,14 @@ def dynamic_rnn(cell, inputs, sequence_length=None, initial_state=None,
 
   Raises:
     TypeError: If `cell` is not an instance of RNNCell.
-    ValueError: If inputs is None or an empty list.
+    ValueError: If inputs is None or an empty list, or if `compact_batch` is
+      set without `sequence_length`.
   """
 
   if not isinstance(cell, rnn_cell.RNNCell):
     raise TypeError("cell must be an instance of RNNCell")
+  if compact_batch and sequence_length is None:
+    raise ValueError("compact_batch requires sequence_length.")
 
   # By default, time_major==False and inputs are batch-major: shaped
   #   [batch, time, depth]
@@ -857,7 +875,8 @@ def dynamic_rnn(cell, inputs, sequence_length=None, initial_state=None,
         parallel_iterations=parallel_iterations,
         swap_memory=swap_memory,
         sequence_length=sequence_length,
-        dtype=dtype)
+        dtype=dtype,
+        compact_batch=compact_batch)
 
     # Outputs of _dynamic_rnn_loop are always shaped [time, batch, depth].
     # If we are performing batch-major calculations, transpose output back
@@ -879,7 +898,8 @@ def _dynamic_rnn_loop(cell,
                       parallel_iterations,
                       swap_memory,
                       sequence_length=None,
-                      dtype=None):
+                      dtype=None,
+                      compact_batch=False):
   """Internal implementation of Dynamic RNN.
 
   Args:
@@ -894,6 +914,8 @@ def _dynamic_rnn_loop(cell,
     sequence_length: (optional) An `int32` `Tensor` of shape [batch_size].
     dtype: (optional) Expected dtype of output. If not specified, inferred from
       initial_state.
+    compact_batch: A Python boolean.  If `True`, only run `cell` on the rows
+      that have not reached their `sequence_length`, which must be given.
 
   Returns:
     Tuple `(final_outputs, final_state)`.
@@ -958,18 +980,35 @@ def _dynamic_rnn_loop(cell,
     min_sequence_length = math_ops.reduce_min(sequence_length)
     max_sequence_length = math_ops.reduce_max(sequence_length)
 
+  loop_steps = time_steps
+  if compact_batch:
+    # Sort the batch by decreasing length, so that the rows still running at
+    # any time step are a prefix of the sorted batch.  The state is kept in
+    # sorted order inside the loop.
+    sorted_length, sorted_indices = nn_ops.top_k(
+        sequence_length, k=batch_size, sorted=True)
+    unsorted_indices = array_ops.invert_permutation(sorted_indices)
+    state = nest.pack_sequence_as(
+        structure=state,
+        flat_sequence=[array_ops.gather(s, sorted_indices)
+                       for s in nest.flatten(state)])
+    # Nothing is computed past the longest sequence.
+    loop_steps = math_ops.minimum(
+        time_steps, math_ops.maximum(max_sequence_length, 1))
+
   time = array_ops.constant(0, dtype=dtypes.int32, name="time")
 
   with ops.name_scope("dynamic_rnn") as scope:
     base_name = scope
 
-  def _create_ta(name, dtype):
+  def _create_ta(name, dtype, size=time_steps):
     return tensor_array_ops.TensorArray(dtype=dtype,
-                                        size=time_steps,
+                                        size=size,
                                         tensor_array_name=base_name + name)
 
   output_ta = tuple(_create_ta("output_%d" % i,
-                               _infer_state_dtype(dtype, state))
+                               _infer_state_dtype(dtype, state),
+                               size=loop_steps)
                     for i in range(len(flat_output_size)))
   input_ta = tuple(_create_ta("input_%d" % i, flat_input[0].dtype)
                    for i in range(len(flat_input)))
@@ -994,6 +1033,9 @@ def _dynamic_rnn_loop(cell,
     for input_, shape in zip(input_t, inputs_got_shape):
       input_.set_shape(shape[1:])
 
+    if compact_batch:
+      return _compact_time_step(time, input_t, output_ta_t, state)
+
     input_t = nest.pack_sequence_as(structure=inputs, flat_sequence=input_t)
     call_cell = lambda: cell(input_t, state)
 
@@ -1019,8 +1061,42 @@ def _dynamic_rnn_loop(cell,
 
     return (time + 1, output_ta_t, new_state)
 
+  def _compact_time_step(time, input_t, output_ta_t, state):
+    """Takes a time step on the unfinished rows of the sorted batch."""
+    num_active = math_ops.reduce_sum(
+        math_ops.to_int32(sorted_length > time))
+    active_indices = sorted_indices[:num_active]
+    input_t = nest.pack_sequence_as(
+        structure=inputs,
+        flat_sequence=[array_ops.gather(input_, active_indices)
+                       for input_ in input_t])
+    flat_state = nest.flatten(state)
+    active_state = nest.pack_sequence_as(
+        structure=state, flat_sequence=[s[:num_active] for s in flat_state])
+    (output, new_active_state) = cell(input_t, active_state)
+
+    # Finished rows copy their state through.
+    flat_new_state = []
+    for old, new in zip(flat_state, nest.flatten(new_active_state)):
+      new = array_ops.concat_v2([new, old[num_active:]], 0)
+      new.set_shape(old.get_shape())
+      flat_new_state.append(new)
+    new_state = nest.pack_sequence_as(
+        structure=state, flat_sequence=flat_new_state)
+
+    # Finished rows output zeros.  Outputs are written in the original order.
+    output = [
+        array_ops.gather(array_ops.concat_v2([out, zero[num_active:]], 0),
+                         unsorted_indices)
+        for out, zero in zip(nest.flatten(output), flat_zero_output)]
+
+    output_ta_t = tuple(
+        ta.write(time, out) for ta, out in zip(output_ta_t, output))
+
+    return (time + 1, output_ta_t, new_state)
+
   _, output_final_ta, final_state = control_flow_ops.while_loop(
-      cond=lambda time, *_: time < time_steps,
+      cond=lambda time, *_: time < loop_steps,
       body=_time_step,
       loop_vars=(time, output_ta, state),
       parallel_iterations=parallel_iterations,
@@ -1029,6 +1105,22 @@ def _dynamic_rnn_loop(cell,
   # Unpack final output if not using output tuples.
   final_outputs = tuple(ta.pack() for ta in output_final_ta)
 
+  if compact_batch:
+    # Zero outputs for the time steps that were not run, and restore the
+    # original batch order of the state.
+    final_outputs = tuple(
+        array_ops.concat_v2(
+            [output, array_ops.zeros(
+                array_ops.concat_v2(
+                    [[time_steps - loop_steps],
+                     array_ops.shape(output)[1:]], 0),
+                output.dtype)], 0)
+        for output in final_outputs)
+    final_state = nest.pack_sequence_as(
+        structure=final_state,
+        flat_sequence=[array_ops.gather(s, unsorted_indices)
+                       for s in nest.flatten(final_state)])
+
   # Restore some shape information
   for output, output_size in zip(final_outputs, flat_output_size):
     shape = _state_size_with_prefix(
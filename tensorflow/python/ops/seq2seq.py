@@ -44,9 +44,23 @@ one of them, others should be easy to substitute.
   - rnn_decoder: The basic decoder based on a pure RNN.
   - attention_decoder: A decoder that uses the attention mechanism.
 
+* Beam search decoders (for inference with the variables of trained models).
+  - embedding_attention_beam_search_decoder: Decodes with the variables of
+      embedding_attention_decoder.
+  - embedding_attention_seq2seq_beam_search: Decodes with the variables of
+      embedding_attention_seq2seq.
+
 * Losses.
   - sequence_loss: Loss for a sequence model returning average log-perplexity.
   - sequence_loss_by_example: As above, but not averaging over all examples.
+  - sampled_softmax_loss_function: A softmax_loss_function for the losses
+      above using sampled softmax, for large decoder vocabularies.
+
+* Large vocabularies.
+  - Train models built with an output_projection with
+    sampled_softmax_loss_function, and decode them with an output_shortlist
+    of candidate symbols, so that neither does a full vocabulary projection
+    at every step.
 
 * model_with_buckets: A convenience function to create models with bucketing
     (see the tutorial above for an explanation of why and how to use it).
@@ -60,16 +74,19 @@ from __future__ import print_function
 from six.moves import xrange  # pylint: disable=redefined-builtin
 from six.moves import zip  # pylint: disable=redefined-builtin
 
+from tensorflow.python.framework import constant_op
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
 from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import embedding_ops
 from tensorflow.python.ops import math_ops
+from tensorflow.python.ops import nn_impl
 from tensorflow.python.ops import nn_ops
 from tensorflow.python.ops import rnn
 from tensorflow.python.ops import rnn_cell
 from tensorflow.python.ops import rnn_cell_impl
+from tensorflow.python.ops import tensor_array_ops
 from tensorflow.python.ops import variable_scope
 from tensorflow.python.util import nest
 
@@ -77,9 +94,44 @@ from tensorflow.python.util import nest
 linear = rnn_cell_impl._linear  # pylint: disable=protected-access
 
 
+def _shortlist_projection(output_projection, output_shortlist):
+  """Restricts an output projection to the symbols of a shortlist.
+
+  Args:
+    output_projection: A pair (W, B) of output projection weights and biases.
+    output_shortlist: 1D int32 Tensor of the symbols to project on.
+
+  Returns:
+    A pair (projection, shortlist) of the (W, B) pair with the columns of the
+    shortlisted symbols, and the shortlist as an int32 Tensor.
+
+  Raises:
+    ValueError: When output_projection is None.
+  """
+  if output_projection is None:
+    raise ValueError("output_shortlist requires an output_projection.")
+  shortlist = ops.convert_to_tensor(output_shortlist, dtype=dtypes.int32,
+                                    name="output_shortlist")
+  weights = ops.convert_to_tensor(output_projection[0])
+  weights_shape = array_ops.shape(weights, out_type=dtypes.int64)
+  # gather only indexes the first dimension, so gather the shortlisted
+  # columns from the flattened weights instead of transposing all of them.
+  column_indices = (
+      array_ops.expand_dims(
+          math_ops.range(weights_shape[0]) * weights_shape[1], 1) +
+      math_ops.to_int64(shortlist))
+  shortlisted_weights = array_ops.gather(array_ops.reshape(weights, [-1]),
+                                         column_indices)
+  shortlisted_weights.set_shape(
+      weights.get_shape()[:1].concatenate(shortlist.get_shape()))
+  biases = array_ops.gather(output_projection[1], shortlist)
+  return (shortlisted_weights, biases), shortlist
+
+
 def _extract_argmax_and_embed(embedding,
                               output_projection=None,
-                              update_embedding=True):
+                              update_embedding=True,
+                              output_shortlist=None):
   """Get a loop_function that extracts the previous symbol and embeds it.
 
   Args:
@@ -88,15 +140,25 @@ def _extract_argmax_and_embed(embedding,
       output will first be multiplied by W and added B.
     update_embedding: Boolean; if False, the gradients will not propagate
       through the embeddings.
+    output_shortlist: None or a 1D int32 Tensor of candidate symbols. If
+      provided, the previous symbol is the argmax over these symbols only,
+      and only their columns of W are multiplied.
 
   Returns:
     A loop function.
   """
+  shortlist = None
+  if output_shortlist is not None:
+    # Gathered once, outside of the decoding steps.
+    output_projection, shortlist = _shortlist_projection(output_projection,
+                                                         output_shortlist)
 
   def loop_function(prev, _):
     if output_projection is not None:
       prev = nn_ops.xw_plus_b(prev, output_projection[0], output_projection[1])
     prev_symbol = math_ops.argmax(prev, 1)
+    if shortlist is not None:
+      prev_symbol = array_ops.gather(shortlist, prev_symbol)
     # Note that gradients will not propagate through the second parameter of
     # embedding_lookup.
     emb_prev = embedding_ops.embedding_lookup(embedding, prev_symbol)
@@ -531,6 +593,105 @@ def embedding_tied_rnn_seq2seq(encoder_inputs,
     return outputs_and_state[:outputs_len], state
 
 
+def _attention_fn(attention_states, num_heads):
+  """Creates the attention variables of `attention_decoder`.
+
+  Must be called in the variable scope of the decoder.
+
+  Args:
+    attention_states: 3D Tensor [batch_size x attn_length x attn_size].
+    num_heads: Number of attention heads that read from attention_states.
+
+  Returns:
+    A pair (attention, attn_size), where attention is a function mapping a
+    query (the decoder state) to the list of attention reads of each head, of
+    shape [batch_size x attn_size].
+  """
+  attn_length = attention_states.get_shape()[1].value
+  if attn_length is None:
+    attn_length = array_ops.shape(attention_states)[1]
+  attn_size = attention_states.get_shape()[2].value
+
+  # To calculate W1 * h_t we use a 1-by-1 convolution, need to reshape before.
+  hidden = array_ops.reshape(attention_states,
+                             [-1, attn_length, 1, attn_size])
+  hidden_features = []
+  v = []
+  attention_vec_size = attn_size  # Size of query vectors for attention.
+  for a in xrange(num_heads):
+    k = variable_scope.get_variable("AttnW_%d" % a,
+                                    [1, 1, attn_size, attention_vec_size])
+    hidden_features.append(nn_ops.conv2d(hidden, k, [1, 1, 1, 1], "SAME"))
+    v.append(
+        variable_scope.get_variable("AttnV_%d" % a, [attention_vec_size]))
+
+  def attention(query):
+    """Put attention masks on hidden using hidden_features and query."""
+    ds = []  # Results of attention reads will be stored here.
+    if nest.is_sequence(query):  # If the query is a tuple, flatten it.
+      query_list = nest.flatten(query)
+      for q in query_list:  # Check that ndims == 2 if specified.
+        ndims = q.get_shape().ndims
+        if ndims:
+          assert ndims == 2
+      query = array_ops.concat_v2(query_list, 1)
+    for a in xrange(num_heads):
+      with variable_scope.variable_scope("Attention_%d" % a):
+        y = linear(query, attention_vec_size, True)
+        y = array_ops.reshape(y, [-1, 1, 1, attention_vec_size])
+        # Attention mask is a softmax of v^T * tanh(...).
+        s = math_ops.reduce_sum(v[a] * math_ops.tanh(hidden_features[a] + y),
+                                [2, 3])
+        a = nn_ops.softmax(s)
+        # Now calculate the attention-weighted vector d.
+        d = math_ops.reduce_sum(
+            array_ops.reshape(a, [-1, attn_length, 1, 1]) * hidden, [1, 2])
+        ds.append(array_ops.reshape(d, [-1, attn_size]))
+    return ds
+
+  return attention, attn_size
+
+
+def _attention_decoder_step(inp, attns, state, cell, attention, output_size,
+                            reuse_attention=False):
+  """Runs one step of `attention_decoder`.
+
+  Args:
+    inp: 2D Tensor [batch_size x input_size], the input of the step.
+    attns: List of the previous attention reads of each head.
+    state: The previous state of the cell.
+    cell: rnn_cell.RNNCell defining the cell function and size.
+    attention: The attention function returned by `_attention_fn`.
+    output_size: Size of the output vectors.
+    reuse_attention: Whether the attention variables already exist, when the
+      initial attentions were computed from the initial state.
+
+  Returns:
+    A tuple (output, state, attns) for the next step.
+
+  Raises:
+    ValueError: If the input size cannot be inferred from the input.
+  """
+  # Merge input and previous attentions into one vector of the right size.
+  input_size = inp.get_shape().with_rank(2)[1]
+  if input_size.value is None:
+    raise ValueError("Could not infer input size from input: %s" % inp.name)
+  x = linear([inp] + attns, input_size, True)
+  # Run the RNN.
+  cell_output, state = cell(x, state)
+  # Run the attention mechanism.
+  if reuse_attention:
+    with variable_scope.variable_scope(
+        variable_scope.get_variable_scope(), reuse=True):
+      attns = attention(state)
+  else:
+    attns = attention(state)
+
+  with variable_scope.variable_scope("AttnOutputProjection"):
+    output = linear([cell_output] + attns, output_size, True)
+  return output, state, attns
+
+
 def attention_decoder(decoder_inputs,
                       initial_state,
                       attention_states,
@@ -608,50 +769,9 @@ def attention_decoder(decoder_inputs,
     dtype = scope.dtype
 
     batch_size = array_ops.shape(decoder_inputs[0])[0]  # Needed for reshaping.
-    attn_length = attention_states.get_shape()[1].value
-    if attn_length is None:
-      attn_length = array_ops.shape(attention_states)[1]
-    attn_size = attention_states.get_shape()[2].value
-
-    # To calculate W1 * h_t we use a 1-by-1 convolution, need to reshape before.
-    hidden = array_ops.reshape(attention_states,
-                               [-1, attn_length, 1, attn_size])
-    hidden_features = []
-    v = []
-    attention_vec_size = attn_size  # Size of query vectors for attention.
-    for a in xrange(num_heads):
-      k = variable_scope.get_variable("AttnW_%d" % a,
-                                      [1, 1, attn_size, attention_vec_size])
-      hidden_features.append(nn_ops.conv2d(hidden, k, [1, 1, 1, 1], "SAME"))
-      v.append(
-          variable_scope.get_variable("AttnV_%d" % a, [attention_vec_size]))
-
+    attention, attn_size = _attention_fn(attention_states, num_heads)
     state = initial_state
 
-    def attention(query):
-      """Put attention masks on hidden using hidden_features and query."""
-      ds = []  # Results of attention reads will be stored here.
-      if nest.is_sequence(query):  # If the query is a tuple, flatten it.
-        query_list = nest.flatten(query)
-        for q in query_list:  # Check that ndims == 2 if specified.
-          ndims = q.get_shape().ndims
-          if ndims:
-            assert ndims == 2
-        query = array_ops.concat_v2(query_list, 1)
-      for a in xrange(num_heads):
-        with variable_scope.variable_scope("Attention_%d" % a):
-          y = linear(query, attention_vec_size, True)
-          y = array_ops.reshape(y, [-1, 1, 1, attention_vec_size])
-          # Attention mask is a softmax of v^T * tanh(...).
-          s = math_ops.reduce_sum(v[a] * math_ops.tanh(hidden_features[a] + y),
-                                  [2, 3])
-          a = nn_ops.softmax(s)
-          # Now calculate the attention-weighted vector d.
-          d = math_ops.reduce_sum(
-              array_ops.reshape(a, [-1, attn_length, 1, 1]) * hidden, [1, 2])
-          ds.append(array_ops.reshape(d, [-1, attn_size]))
-      return ds
-
     outputs = []
     prev = None
     batch_attn_size = array_ops.pack([batch_size, attn_size])
@@ -670,23 +790,9 @@ def attention_decoder(decoder_inputs,
       if loop_function is not None and prev is not None:
         with variable_scope.variable_scope("loop_function", reuse=True):
           inp = loop_function(prev, i)
-      # Merge input and previous attentions into one vector of the right size.
-      input_size = inp.get_shape().with_rank(2)[1]
-      if input_size.value is None:
-        raise ValueError("Could not infer input size from input: %s" % inp.name)
-      x = linear([inp] + attns, input_size, True)
-      # Run the RNN.
-      cell_output, state = cell(x, state)
-      # Run the attention mechanism.
-      if i == 0 and initial_state_attention:
-        with variable_scope.variable_scope(
-            variable_scope.get_variable_scope(), reuse=True):
-          attns = attention(state)
-      else:
-        attns = attention(state)
-
-      with variable_scope.variable_scope("AttnOutputProjection"):
-        output = linear([cell_output] + attns, output_size, True)
+      output, state, attns = _attention_decoder_step(
+          inp, attns, state, cell, attention, output_size,
+          reuse_attention=(i == 0 and initial_state_attention))
       if loop_function is not None:
         prev = output
       outputs.append(output)
@@ -707,7 +813,8 @@ def embedding_attention_decoder(decoder_inputs,
                                 update_embedding_for_previous=True,
                                 dtype=None,
                                 scope=None,
-                                initial_state_attention=False):
+                                initial_state_attention=False,
+                                output_shortlist=None):
   """RNN decoder with embedding and attention and a pure-decoding option.
 
   Args:
@@ -741,6 +848,11 @@ def embedding_attention_decoder(decoder_inputs,
       If True, initialize the attentions from the initial state and attention
       states -- useful when we wish to resume decoding from a previously
       stored decoder state and attention states.
+    output_shortlist: None or a 1D int32 Tensor of candidate symbols; if
+      provided and feed_previous=True, each fed previous symbol is the argmax
+      over these symbols only, and only their columns of W are multiplied.
+      This avoids the full [output_size x num_symbols] projection at every
+      step when decoding with a large vocabulary.
 
   Returns:
     A tuple of the form (outputs, state), where:
@@ -750,8 +862,11 @@ def embedding_attention_decoder(decoder_inputs,
         It is a 2D Tensor of shape [batch_size x cell.state_size].
 
   Raises:
-    ValueError: When output_projection has the wrong shape.
+    ValueError: When output_projection has the wrong shape, or is None and
+      output_shortlist is given.
   """
+  if output_shortlist is not None and output_projection is None:
+    raise ValueError("output_shortlist requires an output_projection.")
   if output_size is None:
     output_size = cell.output_size
   if output_projection is not None:
@@ -765,7 +880,8 @@ def embedding_attention_decoder(decoder_inputs,
                                             [num_symbols, embedding_size])
     loop_function = _extract_argmax_and_embed(
         embedding, output_projection,
-        update_embedding_for_previous) if feed_previous else None
+        update_embedding_for_previous,
+        output_shortlist=output_shortlist) if feed_previous else None
     emb_inp = [
         embedding_ops.embedding_lookup(embedding, i) for i in decoder_inputs
     ]
@@ -780,6 +896,49 @@ def embedding_attention_decoder(decoder_inputs,
         initial_state_attention=initial_state_attention)
 
 
+def _embedding_attention_encoder(encoder_inputs, cell, num_encoder_symbols,
+                                 num_decoder_symbols, embedding_size,
+                                 output_projection, dtype):
+  """Encoder of `embedding_attention_seq2seq` and its beam search decoding.
+
+  Args:
+    encoder_inputs: A list of 1D int32 Tensors of shape [batch_size].
+    cell: rnn_cell.RNNCell defining the cell function and size.
+    num_encoder_symbols: Integer; number of symbols on the encoder side.
+    num_decoder_symbols: Integer; number of symbols on the decoder side.
+    embedding_size: Integer, the length of the embedding vector for each symbol.
+    output_projection: None or a pair (W, B) of output projection weights and
+      biases.
+    dtype: The dtype of the initial RNN state.
+
+  Returns:
+    A tuple (encoder_state, attention_states, decoder_cell, output_size) of
+    the final encoder state, the [batch_size x attn_length x attn_size]
+    encoder outputs to attend to, and the decoder cell and its output_size
+    argument, which project on the decoder symbols when output_projection is
+    None.
+  """
+  encoder_cell = rnn_cell.EmbeddingWrapper(
+      cell,
+      embedding_classes=num_encoder_symbols,
+      embedding_size=embedding_size)
+  encoder_outputs, encoder_state = rnn.rnn(encoder_cell,
+                                           encoder_inputs,
+                                           dtype=dtype)
+
+  # First calculate a concatenation of encoder outputs to put attention on.
+  top_states = [
+      array_ops.reshape(e, [-1, 1, cell.output_size]) for e in encoder_outputs
+  ]
+  attention_states = array_ops.concat_v2(top_states, 1)
+
+  output_size = None
+  if output_projection is None:
+    cell = rnn_cell.OutputProjectionWrapper(cell, num_decoder_symbols)
+    output_size = num_decoder_symbols
+  return encoder_state, attention_states, cell, output_size
+
+
 def embedding_attention_seq2seq(encoder_inputs,
                                 decoder_inputs,
                                 cell,
@@ -791,7 +950,8 @@ def embedding_attention_seq2seq(encoder_inputs,
                                 feed_previous=False,
                                 dtype=None,
                                 scope=None,
-                                initial_state_attention=False):
+                                initial_state_attention=False,
+                                output_shortlist=None):
   """Embedding sequence-to-sequence model with attention.
 
   This model first embeds encoder_inputs by a newly created embedding (of shape
@@ -827,6 +987,9 @@ def embedding_attention_seq2seq(encoder_inputs,
     initial_state_attention: If False (default), initial attentions are zero.
       If True, initialize the attentions from the initial state and attention
       states.
+    output_shortlist: None or a 1D int32 Tensor of candidate decoder symbols
+      to restrict the previous outputs to when feeding them; requires
+      output_projection (see embedding_attention_decoder).
 
   Returns:
     A tuple of the form (outputs, state), where:
@@ -839,27 +1002,12 @@ def embedding_attention_seq2seq(encoder_inputs,
   with variable_scope.variable_scope(
       scope or "embedding_attention_seq2seq", dtype=dtype) as scope:
     dtype = scope.dtype
-    # Encoder.
-    encoder_cell = rnn_cell.EmbeddingWrapper(
-        cell,
-        embedding_classes=num_encoder_symbols,
-        embedding_size=embedding_size)
-    encoder_outputs, encoder_state = rnn.rnn(encoder_cell,
-                                             encoder_inputs,
-                                             dtype=dtype)
-
-    # First calculate a concatenation of encoder outputs to put attention on.
-    top_states = [
-        array_ops.reshape(e, [-1, 1, cell.output_size]) for e in encoder_outputs
-    ]
-    attention_states = array_ops.concat_v2(top_states, 1)
+    encoder_state, attention_states, cell, output_size = (
+        _embedding_attention_encoder(encoder_inputs, cell,
+                                     num_encoder_symbols, num_decoder_symbols,
+                                     embedding_size, output_projection, dtype))
 
     # Decoder.
-    output_size = None
-    if output_projection is None:
-      cell = rnn_cell.OutputProjectionWrapper(cell, num_decoder_symbols)
-      output_size = num_decoder_symbols
-
     if isinstance(feed_previous, bool):
       return embedding_attention_decoder(
           decoder_inputs,
@@ -872,7 +1020,8 @@ def embedding_attention_seq2seq(encoder_inputs,
           output_size=output_size,
           output_projection=output_projection,
           feed_previous=feed_previous,
-          initial_state_attention=initial_state_attention)
+          initial_state_attention=initial_state_attention,
+          output_shortlist=output_shortlist)
 
     # If feed_previous is a Tensor, we construct 2 graphs and use cond.
     def decoder(feed_previous_bool):
@@ -891,7 +1040,8 @@ def embedding_attention_seq2seq(encoder_inputs,
             output_projection=output_projection,
             feed_previous=feed_previous_bool,
             update_embedding_for_previous=False,
-            initial_state_attention=initial_state_attention)
+            initial_state_attention=initial_state_attention,
+            output_shortlist=output_shortlist)
         state_list = [state]
         if nest.is_sequence(state):
           state_list = nest.flatten(state)
@@ -909,6 +1059,345 @@ def embedding_attention_seq2seq(encoder_inputs,
     return outputs_and_state[:outputs_len], state
 
 
+# Log-probability of the continuations a hypothesis must not take.
+_BEAM_NEG_INF = -1e9
+
+
+def _tile_beams(t, beam_size):
+  """Repeats each entry of `t` `beam_size` times along the first dimension."""
+  shape = t.get_shape()
+  tiled = array_ops.tile(array_ops.expand_dims(t, 1),
+                         [1, beam_size] + [1] * (shape.ndims - 1))
+  tiled = array_ops.reshape(
+      tiled, array_ops.concat_v2([[-1], array_ops.shape(t)[1:]], 0))
+  tiled.set_shape([None] + shape[1:].as_list())
+  return tiled
+
+
+def _length_penalty(lengths, weight, dtype):
+  """The length normalization of https://arxiv.org/abs/1609.08144."""
+  return math_ops.pow((5. + math_ops.cast(lengths, dtype)) / 6., weight)
+
+
+def embedding_attention_beam_search_decoder(initial_state,
+                                            attention_states,
+                                            cell,
+                                            num_symbols,
+                                            embedding_size,
+                                            beam_size,
+                                            go_symbol,
+                                            eos_symbol,
+                                            max_length,
+                                            num_heads=1,
+                                            output_size=None,
+                                            output_projection=None,
+                                            length_penalty_weight=0.0,
+                                            dtype=None,
+                                            scope=None,
+                                            initial_state_attention=False,
+                                            output_shortlist=None):
+  """Beam search decoding with the variables of embedding_attention_decoder.
+
+  Decodes the whole batch in the graph: the `beam_size` hypotheses of every
+  batch entry are run as one batch of `batch_size * beam_size` through the
+  attention decoder step, in a `while_loop` that stops after `max_length` steps
+  or as soon as all the hypotheses have produced `eos_symbol`.
+
+  Hypotheses are ranked by their log-probability divided by
+  `((5 + length) / 6) ** length_penalty_weight`, so that a positive weight
+  favors longer outputs (0 ranks by log-probability alone).
+
+  The variables are those of `embedding_attention_decoder` called with the
+  same arguments and scope, so a model trained with it (and `feed_previous`
+  False) can be decoded by building this function in the same variable scope,
+  with `reuse=True` or from a checkpoint.
+
+  Args:
+    initial_state: 2D Tensor [batch_size x cell.state_size].
+    attention_states: 3D Tensor [batch_size x attn_length x attn_size].
+    cell: rnn_cell.RNNCell defining the cell function.
+    num_symbols: Integer, how many symbols come into the embedding.
+    embedding_size: Integer, the length of the embedding vector for each symbol.
+    beam_size: Integer, the number of hypotheses kept for each batch entry.
+    go_symbol: Integer, the first input of the decoder.
+    eos_symbol: Integer, the symbol ending a hypothesis.
+    max_length: Integer or scalar int32 Tensor, the maximum number of steps.
+    num_heads: Number of attention heads that read from attention_states.
+    output_size: Size of the output vectors; if None, use cell.output_size.
+    output_projection: None or a pair (W, B) of output projection weights and
+      biases, applied to the outputs to get the logits of the symbols.
+    length_penalty_weight: Float, the exponent of the length normalization.
+    dtype: The dtype to use for the RNN initial states (default: tf.float32).
+    scope: VariableScope for the created subgraph; defaults to
+      "embedding_attention_decoder".
+    initial_state_attention: If False (default), initial attentions are zero.
+      If True, initialize the attentions from the initial state and attention
+      states.
+    output_shortlist: None or a 1D int32 Tensor of candidate symbols, which
+      must include eos_symbol. If provided, hypotheses are only extended by
+      these symbols, and only their columns of the output projection are
+      multiplied; the scores are then normalized over the shortlist.
+
+  Returns:
+    A tuple of the form (symbols, scores, lengths), where:
+      symbols: int32 Tensor [batch_size x beam_size x num_steps], the decoded
+        hypotheses of each batch entry, best first.  Hypotheses ending before
+        the last step are padded with eos_symbol.
+      scores: Tensor [batch_size x beam_size], the length-normalized
+        log-probabilities of the hypotheses.
+      lengths: int32 Tensor [batch_size x beam_size], the number of symbols of
+        the hypotheses, including their eos_symbol if any.
+
+  Raises:
+    ValueError: When beam_size is not positive, or output_shortlist is given
+      without output_projection.
+  """
+  if beam_size < 1:
+    raise ValueError("beam_size must be positive, got %d." % beam_size)
+  if output_size is None:
+    output_size = cell.output_size
+  shortlist = None
+  if output_shortlist is not None:
+    output_projection, shortlist = _shortlist_projection(output_projection,
+                                                         output_shortlist)
+
+  with variable_scope.variable_scope(
+      scope or "embedding_attention_decoder", dtype=dtype) as scope:
+    dtype = scope.dtype
+    embedding = variable_scope.get_variable("embedding",
+                                            [num_symbols, embedding_size])
+    batch_size = array_ops.shape(attention_states)[0]
+    # Offsets of the first hypothesis of each batch entry in the tiled batch.
+    beam_offsets = array_ops.expand_dims(
+        math_ops.range(batch_size) * beam_size, 1)
+    attention_states = _tile_beams(attention_states, beam_size)
+    state = nest.pack_sequence_as(
+        initial_state,
+        [_tile_beams(s, beam_size) for s in nest.flatten(initial_state)])
+
+    with variable_scope.variable_scope("attention_decoder") as decoder_scope:
+      attention, attn_size = _attention_fn(attention_states, num_heads)
+      attns = [
+          array_ops.zeros(
+              array_ops.pack([batch_size * beam_size, attn_size]), dtype=dtype)
+          for _ in xrange(num_heads)
+      ]
+      for a in attns:  # Ensure the second shape of attention vectors is set.
+        a.set_shape([None, attn_size])
+      if initial_state_attention:
+        attns = attention(state)
+
+      def step(symbols, attns, state, reuse_attention=False):
+        """Returns the log-probabilities of the next symbols."""
+        inp = embedding_ops.embedding_lookup(embedding,
+                                             array_ops.reshape(symbols, [-1]))
+        output, state, attns = _attention_decoder_step(
+            inp, attns, state, cell, attention, output_size,
+            reuse_attention=reuse_attention)
+        if output_projection is not None:
+          output = nn_ops.xw_plus_b(output, output_projection[0],
+                                    output_projection[1])
+        return nn_ops.log_softmax(output), attns, state
+
+      def select(log_probs, attns, state, scores, finished, lengths):
+        """Keeps the best `beam_size` continuations of the hypotheses."""
+        num_classes = array_ops.shape(log_probs)[1]
+        log_probs = array_ops.reshape(
+            log_probs, array_ops.pack([batch_size, beam_size, num_classes]))
+        # Finished hypotheses are only extended by eos_symbol, at no cost.
+        finished_mask = array_ops.expand_dims(
+            math_ops.cast(finished, dtype), 2)
+        if shortlist is None:
+          eos_only = array_ops.one_hot(eos_symbol, num_classes, on_value=0.0,
+                                       off_value=_BEAM_NEG_INF, dtype=dtype)
+        else:
+          eos_only = _BEAM_NEG_INF * (1.0 - math_ops.cast(
+              math_ops.equal(shortlist, eos_symbol), dtype))
+        log_probs = (log_probs * (1.0 - finished_mask) +
+                     eos_only * finished_mask)
+        total = array_ops.expand_dims(scores, 2) + log_probs
+        new_lengths = lengths + 1 - math_ops.cast(finished, dtypes.int32)
+        normalized = total / array_ops.expand_dims(
+            _length_penalty(new_lengths, length_penalty_weight, dtype), 2)
+        _, indices = nn_ops.top_k(
+            array_ops.reshape(normalized, array_ops.pack([batch_size, -1])),
+            beam_size)
+        parents = indices // num_classes
+        classes = indices % num_classes
+        flat_parents = array_ops.reshape(parents + beam_offsets, [-1])
+        scores = array_ops.reshape(
+            array_ops.gather(
+                array_ops.reshape(total, [-1]),
+                flat_parents * num_classes + array_ops.reshape(classes, [-1])),
+            [-1, beam_size])
+        symbols = classes
+        if shortlist is not None:
+          symbols = array_ops.gather(shortlist, classes)
+        finished = math_ops.logical_or(
+            array_ops.reshape(
+                array_ops.gather(array_ops.reshape(finished, [-1]),
+                                 flat_parents), [-1, beam_size]),
+            math_ops.equal(symbols, eos_symbol))
+        lengths = array_ops.reshape(
+            array_ops.gather(array_ops.reshape(new_lengths, [-1]),
+                             flat_parents), [-1, beam_size])
+        attns = [array_ops.gather(a, flat_parents) for a in attns]
+        state = nest.pack_sequence_as(
+            state, [array_ops.gather(s, flat_parents)
+                    for s in nest.flatten(state)])
+        return symbols, parents, attns, state, scores, finished, lengths
+
+      # Only the first hypothesis of each batch entry is live at the start.
+      scores = array_ops.tile(
+          math_ops.cast(
+              array_ops.expand_dims(
+                  [0.0] + [_BEAM_NEG_INF] * (beam_size - 1), 0), dtype),
+          array_ops.pack([batch_size, 1]))
+      finished = array_ops.zeros(array_ops.pack([batch_size, beam_size]),
+                                 dtype=dtypes.bool)
+      lengths = array_ops.zeros(array_ops.pack([batch_size, beam_size]),
+                                dtype=dtypes.int32)
+      symbols = array_ops.fill(array_ops.pack([batch_size, beam_size]),
+                               go_symbol)
+      # The first step creates the variables, outside of the loop.
+      log_probs, attns, state = step(symbols, attns, state,
+                                     reuse_attention=initial_state_attention)
+      symbols, parents, attns, state, scores, finished, lengths = select(
+          log_probs, attns, state, scores, finished, lengths)
+      symbols_ta = tensor_array_ops.TensorArray(
+          dtypes.int32, size=0, dynamic_size=True).write(0, symbols)
+      parents_ta = tensor_array_ops.TensorArray(
+          dtypes.int32, size=0, dynamic_size=True).write(0, parents)
+
+      def condition(time, unused_symbols, unused_attns, unused_state,
+                    unused_scores, finished, unused_lengths, unused_symbols_ta,
+                    unused_parents_ta):
+        return math_ops.logical_and(
+            math_ops.less(time, max_length),
+            math_ops.logical_not(math_ops.reduce_all(finished)))
+
+      def body(time, symbols, attns, state, scores, finished, lengths,
+               symbols_ta, parents_ta):
+        with variable_scope.variable_scope(decoder_scope, reuse=True):
+          log_probs, attns, state = step(symbols, attns, state)
+        symbols, parents, attns, state, scores, finished, lengths = select(
+            log_probs, attns, state, scores, finished, lengths)
+        return (time + 1, symbols, attns, state, scores, finished, lengths,
+                symbols_ta.write(time, symbols),
+                parents_ta.write(time, parents))
+
+      (num_steps, _, _, _, scores, _, lengths, symbols_ta,
+       parents_ta) = control_flow_ops.while_loop(
+           condition, body,
+           (constant_op.constant(1), symbols, attns, state, scores, finished,
+            lengths, symbols_ta, parents_ta))
+
+    # Sort the hypotheses and follow their parents back to the first step.
+    scores /= _length_penalty(lengths, length_penalty_weight, dtype)
+    scores, beams = nn_ops.top_k(scores, beam_size)
+    flat_beams = array_ops.reshape(beams + beam_offsets, [-1])
+    lengths = array_ops.reshape(
+        array_ops.gather(array_ops.reshape(lengths, [-1]), flat_beams),
+        [-1, beam_size])
+
+    def backtrack_body(time, beams, output_ta):
+      flat_beams = array_ops.reshape(beams + beam_offsets, [-1])
+      step_symbols = array_ops.gather(
+          array_ops.reshape(symbols_ta.read(time), [-1]), flat_beams)
+      beams = array_ops.reshape(
+          array_ops.gather(array_ops.reshape(parents_ta.read(time), [-1]),
+                           flat_beams), [-1, beam_size])
+      return (time - 1, beams,
+              output_ta.write(time, array_ops.reshape(step_symbols,
+                                                      [-1, beam_size])))
+
+    _, _, output_ta = control_flow_ops.while_loop(
+        lambda time, unused_beams, unused_output_ta: time >= 0,
+        backtrack_body,
+        (num_steps - 1, beams,
+         tensor_array_ops.TensorArray(dtypes.int32, size=num_steps)))
+    symbols = array_ops.transpose(output_ta.pack(), [1, 2, 0])
+    return symbols, scores, lengths
+
+
+def embedding_attention_seq2seq_beam_search(encoder_inputs,
+                                            cell,
+                                            num_encoder_symbols,
+                                            num_decoder_symbols,
+                                            embedding_size,
+                                            beam_size,
+                                            go_symbol,
+                                            eos_symbol,
+                                            max_length,
+                                            num_heads=1,
+                                            output_projection=None,
+                                            length_penalty_weight=0.0,
+                                            dtype=None,
+                                            scope=None,
+                                            initial_state_attention=False,
+                                            output_shortlist=None):
+  """Beam search decoding of an embedding_attention_seq2seq model.
+
+  Builds the encoder of `embedding_attention_seq2seq` and decodes with
+  `embedding_attention_beam_search_decoder`, using the same variables: call
+  it with the arguments of the trained model, in the same variable scope.
+
+  Args:
+    encoder_inputs: A list of 1D int32 Tensors of shape [batch_size].
+    cell: rnn_cell.RNNCell defining the cell function and size.
+    num_encoder_symbols: Integer; number of symbols on the encoder side.
+    num_decoder_symbols: Integer; number of symbols on the decoder side.
+    embedding_size: Integer, the length of the embedding vector for each symbol.
+    beam_size: Integer, the number of hypotheses kept for each batch entry.
+    go_symbol: Integer, the first input of the decoder.
+    eos_symbol: Integer, the symbol ending a hypothesis.
+    max_length: Integer or scalar int32 Tensor, the maximum number of steps.
+    num_heads: Number of attention heads that read from attention_states.
+    output_projection: None or a pair (W, B) of output projection weights and
+      biases; W has shape [output_size x num_decoder_symbols] and B has
+      shape [num_decoder_symbols].
+    length_penalty_weight: Float, the exponent of the length normalization,
+      see `embedding_attention_beam_search_decoder`.
+    dtype: The dtype of the initial RNN state (default: tf.float32).
+    scope: VariableScope for the created subgraph; defaults to
+      "embedding_attention_seq2seq".
+    initial_state_attention: If False (default), initial attentions are zero.
+      If True, initialize the attentions from the initial state and attention
+      states.
+    output_shortlist: None or a 1D int32 Tensor of candidate decoder symbols,
+      see `embedding_attention_beam_search_decoder`.
+
+  Returns:
+    A tuple (symbols, scores, lengths), see
+    `embedding_attention_beam_search_decoder`.
+  """
+  with variable_scope.variable_scope(
+      scope or "embedding_attention_seq2seq", dtype=dtype) as scope:
+    dtype = scope.dtype
+    encoder_state, attention_states, cell, output_size = (
+        _embedding_attention_encoder(encoder_inputs, cell,
+                                     num_encoder_symbols, num_decoder_symbols,
+                                     embedding_size, output_projection, dtype))
+
+    # Decoder.
+    return embedding_attention_beam_search_decoder(
+        encoder_state,
+        attention_states,
+        cell,
+        num_decoder_symbols,
+        embedding_size,
+        beam_size,
+        go_symbol,
+        eos_symbol,
+        max_length,
+        num_heads=num_heads,
+        output_size=output_size,
+        output_projection=output_projection,
+        length_penalty_weight=length_penalty_weight,
+        initial_state_attention=initial_state_attention,
+        output_shortlist=output_shortlist)
+
+
 def one2many_rnn_seq2seq(encoder_inputs,
                          decoder_inputs_dict,
                          cell,
@@ -1072,6 +1561,49 @@ def sequence_loss_by_example(logits,
   return log_perps
 
 
+def sampled_softmax_loss_function(weights,
+                                  biases,
+                                  num_symbols,
+                                  num_samples=512):
+  """Returns a sampled softmax `softmax_loss_function` for large vocabularies.
+
+  Models built with an `output_projection` (W, B) output the decoder states
+  before the projection.  The returned function computes
+  `nn.sampled_softmax_loss` of these outputs against the target and
+  `num_samples` symbols sampled for the batch, instead of the softmax over all
+  `num_symbols`.  Pass it as `softmax_loss_function` to `sequence_loss`,
+  `sequence_loss_by_example` or `model_with_buckets`.
+
+  The weights are taken as [num_symbols x output_size], the transpose of W, as
+  only the rows of the sampled symbols are read.  Keep this as the variable
+  and use its transpose as W in `output_projection`, so that the training
+  steps do not transpose it.
+
+  Args:
+    weights: A Tensor [num_symbols x output_size], the transpose of W, or a
+      list of its shards along the first dimension.
+    biases: A Tensor [num_symbols], B.
+    num_symbols: Integer, the number of decoder symbols.
+    num_samples: Integer, the number of symbols sampled per batch.
+
+  Returns:
+    A function (labels-batch, inputs-batch) -> loss-batch.
+
+  Raises:
+    ValueError: If num_samples is not between 0 and num_symbols.
+  """
+  if not 0 < num_samples < num_symbols:
+    raise ValueError("num_samples must be between 0 and num_symbols (%d), "
+                     "got %d." % (num_symbols, num_samples))
+
+  def loss_function(labels, inputs):
+    labels = math_ops.to_int64(array_ops.reshape(labels, [-1, 1]))
+    return nn_impl.sampled_softmax_loss(weights, biases, inputs, labels,
+                                        num_samples, num_symbols)
+
+  return loss_function
+
+
 def sequence_loss(logits,
                   targets,
                   weights,
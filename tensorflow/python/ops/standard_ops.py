@@ -190,6 +190,8 @@ _allowed_symbols_partitioned_variables = [
     "variable_axis_size_partitioner",
     "min_max_variable_partitioner",
     "fixed_size_partitioner",
+    "ps_balanced_partitioner",
+    "partitioning_report",
 ]
 
 _allowed_symbols_control_flow_ops = [
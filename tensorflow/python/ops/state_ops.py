@@ -76,6 +76,8 @@ create variables contingent on certain conditions.
 @@fixed_size_partitioner
 @@variable_axis_size_partitioner
 @@min_max_variable_partitioner
+@@ps_balanced_partitioner
+@@partitioning_report
 
 ## Sparse Variable Updates
 
@@ -61,13 +61,18 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import os
+import threading
+import time
+
 import tensorflow as tf
 
 from google.protobuf import text_format
 from tensorflow.core.protobuf import meta_graph_pb2
 from tensorflow.core.protobuf import saved_model_pb2
 from tensorflow.python.lib.io import file_io
+from tensorflow.python.platform import tf_logging as logging
 from tensorflow.python.saved_model import constants
 from tensorflow.python.training import saver as tf_saver
 from tensorflow.python.util import compat
@@ -216,49 +221,37 @@ def maybe_saved_model_directory(export_dir):
   return (file_io.file_exists(txt_path) or file_io.file_exists(pb_path))
 
 
-def load(sess, tags, export_dir):
-  """Loads the model from a SavedModel as specified by tags.
+def _get_meta_graph_def_to_load(export_dir, tags):
+  """Finds the meta graph def with the given tags in the SavedModel.
 
   Args:
-    sess: The TensorFlow session to restore the variables.
-    tags: Set of string tags to identify the required MetaGraphDef. These should
-        correspond to the tags used when saving the variables using the
-        SavedModel `save()` API.
-    export_dir: Directory in which the SavedModel protocol buffer and variables
-        to be loaded are located.
+    export_dir: Directory in which the SavedModel protocol buffer is located.
+    tags: Set of string tags to identify the required MetaGraphDef.
 
   Returns:
-    The `MetaGraphDef` protocol buffer loaded in the provided session. This
-    can be used to further extract signature-defs, collection-defs, etc.
+    The matching `MetaGraphDef` protocol buffer.
 
   Raises:
     RuntimeError: MetaGraphDef associated with the tags cannot be found.
   """
-  # Build the SavedModel protocol buffer and find the requested meta graph def.
   saved_model = _parse_saved_model(export_dir)
-  found_match = False
   for meta_graph_def in saved_model.meta_graphs:
     if set(meta_graph_def.meta_info_def.tags) == set(tags):
-      meta_graph_def_to_load = meta_graph_def
-      found_match = True
-      break
+      return meta_graph_def
+  raise RuntimeError("MetaGraphDef associated with tags " + str(tags).strip(
+      "[]") + " could not be found in SavedModel")
 
-  if not found_match:
-    raise RuntimeError("MetaGraphDef associated with tags " + str(tags).strip(
-        "[]") + " could not be found in SavedModel")
-
-  # Build a saver by importing the meta graph def to load.
-  saver = tf_saver.import_meta_graph(meta_graph_def_to_load)
 
-  # Build the checkpoint path where the variables are located.
-  variables_path = os.path.join(
+def _get_variables_path(export_dir):
+  """Builds the checkpoint path where the variables are located."""
+  return os.path.join(
       compat.as_bytes(export_dir),
       compat.as_bytes(constants.VARIABLES_DIRECTORY),
       compat.as_bytes(constants.VARIABLES_FILENAME))
 
-  # Restore the variables using the built saver in the provided session.
-  saver.restore(sess, variables_path)
 
+def _run_main_op(sess, export_dir, meta_graph_def_to_load):
+  """Runs the main op, or the legacy init op, with the asset paths fed."""
   # Get asset tensors, if any.
   asset_tensors_dictionary = _get_asset_tensors(export_dir,
                                                 meta_graph_def_to_load)
@@ -272,4 +265,176 @@ def load(sess, tags, export_dir):
       sess.run(fetches=[legacy_init_op_tensor],
                feed_dict=asset_tensors_dictionary)
 
+
+def load(sess, tags, export_dir):
+  """Loads the model from a SavedModel as specified by tags.
+
+  Args:
+    sess: The TensorFlow session to restore the variables.
+    tags: Set of string tags to identify the required MetaGraphDef. These should
+        correspond to the tags used when saving the variables using the
+        SavedModel `save()` API.
+    export_dir: Directory in which the SavedModel protocol buffer and variables
+        to be loaded are located.
+
+  Returns:
+    The `MetaGraphDef` protocol buffer loaded in the provided session. This
+    can be used to further extract signature-defs, collection-defs, etc.
+
+  Raises:
+    RuntimeError: MetaGraphDef associated with the tags cannot be found.
+  """
+  # Build the SavedModel protocol buffer and find the requested meta graph def.
+  meta_graph_def_to_load = _get_meta_graph_def_to_load(export_dir, tags)
+
+  # Build a saver by importing the meta graph def to load.
+  saver = tf_saver.import_meta_graph(meta_graph_def_to_load)
+
+  # Restore the variables using the built saver in the provided session.
+  saver.restore(sess, _get_variables_path(export_dir))
+
+  _run_main_op(sess, export_dir, meta_graph_def_to_load)
+
   return meta_graph_def_to_load
+
+
+class DeferredRestore(object):
+  """Restores a set of variables in a background thread.
+
+  Returned by `load_with_deferred_restore`. Until `is_ready()` returns `True`,
+  running ops that read the deferred variables fails with
+  `FailedPreconditionError` (uninitialized value).
+  """
+
+  def __init__(self, sess, saver, variables_path, deferred_variables):
+    self._sess = sess
+    self._saver = saver
+    self._variables_path = variables_path
+    self._deferred_variables = deferred_variables
+    self._ready = threading.Event()
+    self._error = None
+    self._restore_secs = None
+    self._thread = None
+    if saver is None:
+      self._ready.set()
+    else:
+      self._thread = threading.Thread(target=self._restore)
+      self._thread.daemon = True
+      self._thread.start()
+
+  def _restore(self):
+    start_time = time.time()
+    try:
+      self._saver.restore(self._sess, self._variables_path)
+    except Exception as e:  # pylint: disable=broad-except
+      logging.error("Deferred restore of %s failed: %s", self._variables_path,
+                    e)
+      self._error = e
+    self._restore_secs = time.time() - start_time
+    self._ready.set()
+
+  @property
+  def deferred_variables(self):
+    """The list of variables restored in the background."""
+    return list(self._deferred_variables)
+
+  @property
+  def restore_secs(self):
+    """Time taken by the background restore, `None` while it is running."""
+    return self._restore_secs
+
+  def is_ready(self):
+    """Returns `True` once all deferred variables have been restored."""
+    return self._ready.is_set() and self._error is None
+
+  def wait(self, timeout=None):
+    """Waits for the deferred restore to finish.
+
+    Args:
+      timeout: Seconds to wait. `None` waits until the restore finishes.
+
+    Returns:
+      `True` if the deferred variables have been restored, `False` if
+      `timeout` expired first.
+
+    Raises:
+      Exception: the error raised while restoring, if any.
+    """
+    if not self._ready.wait(timeout):
+      return False
+    if self._error is not None:
+      raise self._error  # pylint: disable=raising-bad-type
+    return True
+
+
+def _variable_size_in_bytes(variable):
+  num_elements = variable.get_shape().num_elements()
+  if num_elements is None:
+    return 0
+  return num_elements * variable.dtype.base_dtype.size
+
+
+def load_with_deferred_restore(sess, tags, export_dir,
+                               deferred_min_bytes=64 * 1024 * 1024):
+  """Loads a SavedModel, restoring large partitioned variables in background.
+
+  Like `load`, but only dense variables, partitioned variables smaller than
+  `deferred_min_bytes` in total, and saveable objects (e.g. mutable tables) are
+  restored before returning. The partitions of larger partitioned variables,
+  e.g. huge embeddings, are restored by a background thread, which cuts the
+  time to the first prediction that does not need them.
+
+  The main op (or legacy init op) is run after the eager restore, so it must
+  not read the deferred variables.
+
+  Args:
+    sess: The TensorFlow session to restore the variables.
+    tags: Set of string tags to identify the required MetaGraphDef.
+    export_dir: Directory in which the SavedModel protocol buffer and variables
+        to be loaded are located.
+    deferred_min_bytes: Partitioned variables whose partitions add up to at
+        least this many bytes are restored in the background.
+
+  Returns:
+    A tuple `(meta_graph_def, deferred_restore)` of the loaded `MetaGraphDef`
+    protocol buffer and a `DeferredRestore` signalling readiness of the
+    deferred variables.
+
+  Raises:
+    RuntimeError: MetaGraphDef associated with the tags cannot be found.
+  """
+  meta_graph_def_to_load = _get_meta_graph_def_to_load(export_dir, tags)
+  saver = tf_saver.import_meta_graph(meta_graph_def_to_load)
+  variables_path = _get_variables_path(export_dir)
+
+  # Group the partitions of each partitioned variable by its full name.
+  partitioned = collections.OrderedDict()
+  eager_variables = []
+  for variable in tf.global_variables():
+    # pylint: disable=protected-access
+    save_slice_info = variable._save_slice_info
+    # pylint: enable=protected-access
+    if save_slice_info:
+      partitioned.setdefault(save_slice_info.full_name, []).append(variable)
+    else:
+      eager_variables.append(variable)
+  deferred_variables = []
+  for partitions in partitioned.values():
+    if sum(_variable_size_in_bytes(v) for v in partitions) >= (
+        deferred_min_bytes):
+      deferred_variables.extend(partitions)
+    else:
+      eager_variables.extend(partitions)
+
+  deferred_saver = None
+  if deferred_variables:
+    eager_variables.extend(tf.get_collection(tf.GraphKeys.SAVEABLE_OBJECTS))
+    saver = tf_saver.Saver(eager_variables, sharded=True, allow_empty=True)
+    deferred_saver = tf_saver.Saver(deferred_variables, sharded=True)
+  if saver is not None:
+    saver.restore(sess, variables_path)
+
+  _run_main_op(sess, export_dir, meta_graph_def_to_load)
+
+  return meta_graph_def_to_load, DeferredRestore(
+      sess, deferred_saver, variables_path, deferred_variables)
@@ -34,7 +34,7 @@ class AdagradOptimizer(optimizer.Optimizer):
   """
 
   def __init__(self, learning_rate, initial_accumulator_value=0.1,
-               use_locking=False, name="Adagrad"):
+               use_locking=False, name="Adagrad", group_dense_updates=False):
     """Construct a new Adagrad optimizer.
 
     Args:
@@ -44,6 +44,10 @@ class AdagradOptimizer(optimizer.Optimizer):
       use_locking: If `True` use locks for update operations.
       name: Optional name prefix for the operations created when applying
         gradients.  Defaults to "Adagrad".
+      group_dense_updates: If `True`, apply the dense updates of the variables
+        with the same type and device with one op, and store their
+        accumulators in one flat variable.  `get_slot()` then returns views of
+        it.
 
     Raises:
       ValueError: If the `initial_accumulator_value` is invalid.
@@ -51,7 +55,8 @@ class AdagradOptimizer(optimizer.Optimizer):
     if initial_accumulator_value <= 0.0:
       raise ValueError("initial_accumulator_value must be positive: %s" %
                        initial_accumulator_value)
-    super(AdagradOptimizer, self).__init__(use_locking, name)
+    super(AdagradOptimizer, self).__init__(
+        use_locking, name, group_dense_updates=group_dense_updates)
     self._learning_rate = learning_rate
     self._initial_accumulator_value = initial_accumulator_value
     # Created in Initialize.
@@ -78,6 +83,14 @@ class AdagradOptimizer(optimizer.Optimizer):
         grad,
         use_locking=self._use_locking)
 
+  def _apply_dense_group(self, grads, group):
+    return training_ops.grouped_apply_adagrad(
+        group.variables,
+        group.slots["accumulator"],
+        math_ops.cast(self._learning_rate_tensor, group.dtype),
+        grads,
+        use_locking=self._use_locking)
+
   def _apply_sparse(self, grad, var):
     acc = self.get_slot(var, "accumulator")
     return training_ops.sparse_apply_adagrad(
@@ -80,6 +80,28 @@ class AdagradOptimizerTest(tf.test.TestCase):
         self.assertAllCloseAccordingToType(
             np.array([2.715679168701172, 3.715679168701172]), var1.eval())
 
+  def testGroupDenseUpdates(self):
+    for dtype in [tf.half, tf.float32, tf.float64]:
+      with self.test_session():
+        var0 = tf.Variable([1.0, 2.0], dtype=dtype)
+        var1 = tf.Variable([3.0, 4.0], dtype=dtype)
+        grads0 = tf.constant([0.1, 0.1], dtype=dtype)
+        grads1 = tf.constant([0.01, 0.01], dtype=dtype)
+        ada_opt = tf.train.AdagradOptimizer(3.0, initial_accumulator_value=0.1,
+                                            group_dense_updates=True)
+        ada_update = ada_opt.apply_gradients(zip(
+            [grads0, grads1], [var0, var1]))
+        tf.global_variables_initializer().run()
+        self.assertAllClose([0.1, 0.1],
+                            ada_opt.get_slot(var1, "accumulator").eval())
+        for _ in range(3):
+          ada_update.run()
+        # Same values as testBasic.
+        self.assertAllCloseAccordingToType(
+            np.array([-1.6026098728179932, -0.6026098728179932]), var0.eval())
+        self.assertAllCloseAccordingToType(
+            np.array([2.715679168701172, 3.715679168701172]), var1.eval())
+
   def testSparseBasic(self):
     for dtype in [tf.half, tf.float32, tf.float64]:
       with self.test_session():
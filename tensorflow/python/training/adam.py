@@ -37,7 +37,7 @@ class AdamOptimizer(optimizer.Optimizer):
   """
 
   def __init__(self, learning_rate=0.001, beta1=0.9, beta2=0.999, epsilon=1e-8,
-               use_locking=False, name="Adam"):
+               use_locking=False, name="Adam", group_dense_updates=False):
     """Construct a new Adam optimizer.
 
     Initialization:
@@ -78,8 +78,14 @@ class AdamOptimizer(optimizer.Optimizer):
       use_locking: If True use locks for update operations.
       name: Optional name for the operations created when applying gradients.
         Defaults to "Adam".
+      group_dense_updates: If True, apply the dense updates of the variables
+        with the same type and device with one op, and store their `m` and `v`
+        slots in one flat variable each.  Cuts the per-op overhead of models
+        with many small variables.  `get_slot()` then returns views of the
+        flat slots.
     """
-    super(AdamOptimizer, self).__init__(use_locking, name)
+    super(AdamOptimizer, self).__init__(use_locking, name,
+                                        group_dense_updates=group_dense_updates)
     self._lr = learning_rate
     self._beta1 = beta1
     self._beta2 = beta2
@@ -138,6 +144,18 @@ class AdamOptimizer(optimizer.Optimizer):
         math_ops.cast(self._epsilon_t, var.dtype.base_dtype),
         grad, use_locking=self._use_locking).op
 
+  def _apply_dense_group(self, grads, group):
+    dtype = group.dtype
+    return training_ops.grouped_apply_adam(
+        group.variables, group.slots["m"], group.slots["v"],
+        math_ops.cast(self._beta1_power, dtype),
+        math_ops.cast(self._beta2_power, dtype),
+        math_ops.cast(self._lr_t, dtype),
+        math_ops.cast(self._beta1_t, dtype),
+        math_ops.cast(self._beta2_t, dtype),
+        math_ops.cast(self._epsilon_t, dtype),
+        grads, use_locking=self._use_locking)
+
   def _apply_sparse(self, grad, var):
     beta1_power = math_ops.cast(self._beta1_power, var.dtype.base_dtype)
     beta2_power = math_ops.cast(self._beta2_power, var.dtype.base_dtype)
@@ -115,6 +115,46 @@ class AdamOptimizerTest(tf.test.TestCase):
           self.assertAllCloseAccordingToType(var0_np, var0.eval())
           self.assertAllCloseAccordingToType(var1_np, var1.eval())
 
+  def testGroupDenseUpdates(self):
+    for dtype in [tf.half, tf.float32, tf.float64]:
+      with self.test_session():
+        m0, v0, m1, v1 = 0.0, 0.0, 0.0, 0.0
+        var0_np = np.array([1.0, 2.0], dtype=dtype.as_numpy_dtype)
+        grads0_np = np.array([0.1, 0.1], dtype=dtype.as_numpy_dtype)
+        var1_np = np.array([[3.0], [4.0], [5.0]], dtype=dtype.as_numpy_dtype)
+        grads1_np = np.array([[0.01], [0.02], [0.03]],
+                             dtype=dtype.as_numpy_dtype)
+
+        var0 = tf.Variable(var0_np)
+        var1 = tf.Variable(var1_np)
+        var2 = tf.Variable([1.0, 2.0], dtype=dtype)
+        grads0 = tf.constant(grads0_np)
+        grads1 = tf.constant(grads1_np)
+        grads2 = tf.IndexedSlices(tf.constant([0.1], dtype=dtype),
+                                  tf.constant([0]), tf.constant([2]))
+        opt = tf.train.AdamOptimizer(group_dense_updates=True)
+        update = opt.apply_gradients(
+            zip([grads0, grads1, grads2], [var0, var1, var2]))
+        tf.global_variables_initializer().run()
+
+        op_types = [op.type for op in tf.get_default_graph().get_operations()]
+        self.assertEqual(1, op_types.count("GroupedApplyAdam"))
+        self.assertEqual(0, op_types.count("ApplyAdam"))
+        # The sparse update of var2 is not grouped.
+        self.assertTrue(isinstance(opt.get_slot(var2, "m"), tf.Variable))
+        self.assertEqual([3, 1], opt.get_slot(var1, "v").get_shape().as_list())
+
+        for t in range(1, 4):
+          update.run()
+
+          var0_np, m0, v0 = adam_update_numpy(var0_np, grads0_np, t, m0, v0)
+          var1_np, m1, v1 = adam_update_numpy(var1_np, grads1_np, t, m1, v1)
+
+          self.assertAllCloseAccordingToType(var0_np, var0.eval())
+          self.assertAllCloseAccordingToType(var1_np, var1.eval())
+          self.assertAllCloseAccordingToType(m0, opt.get_slot(var0, "m").eval())
+          self.assertAllCloseAccordingToType(v1, opt.get_slot(var1, "v").eval())
+
   def testTensorLearningRate(self):
     for dtype in [tf.half, tf.float32, tf.float64]:
       with self.test_session():
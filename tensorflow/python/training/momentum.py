@@ -31,7 +31,8 @@ class MomentumOptimizer(optimizer.Optimizer):
   """
 
   def __init__(self, learning_rate, momentum,
-               use_locking=False, name="Momentum", use_nesterov=False):
+               use_locking=False, name="Momentum", use_nesterov=False,
+               group_dense_updates=False):
     """Construct a new Momentum optimizer.
 
     Args:
@@ -43,9 +44,13 @@ class MomentumOptimizer(optimizer.Optimizer):
       use_nesterov: If `True` use Nesterov Momentum.
         See [Sutskever et. al., 2013](
         http://jmlr.org/proceedings/papers/v28/sutskever13.pdf)
+      group_dense_updates: If `True`, apply the dense updates of the variables
+        with the same type and device with one op, and store their momentum
+        slots in one flat variable.  `get_slot()` then returns views of it.
 
     """
-    super(MomentumOptimizer, self).__init__(use_locking, name)
+    super(MomentumOptimizer, self).__init__(
+        use_locking, name, group_dense_updates=group_dense_updates)
     self._learning_rate = learning_rate
     self._momentum = momentum
     self._use_nesterov = use_nesterov
@@ -70,6 +75,15 @@ class MomentumOptimizer(optimizer.Optimizer):
         use_locking=self._use_locking,
         use_nesterov=self._use_nesterov).op
 
+  def _apply_dense_group(self, grads, group):
+    return training_ops.grouped_apply_momentum(
+        group.variables, group.slots["momentum"],
+        math_ops.cast(self._learning_rate_tensor, group.dtype),
+        grads,
+        math_ops.cast(self._momentum_tensor, group.dtype),
+        use_locking=self._use_locking,
+        use_nesterov=self._use_nesterov)
+
   def _apply_sparse(self, grad, var):
     mom = self.get_slot(var, "momentum")
     return training_ops.sparse_apply_momentum(
@@ -87,6 +87,35 @@ class MomentumOptimizerTest(tf.test.TestCase):
                       3.98 - ((0.9 * 0.01 + 0.01) * 2.0)]),
             var1.eval())
 
+  def testGroupDenseUpdates(self):
+    for dtype in [tf.half, tf.float32, tf.float64]:
+      with self.test_session():
+        var0 = tf.Variable([1.0, 2.0], dtype=dtype)
+        var1 = tf.Variable([3.0, 4.0, 5.0], dtype=dtype)
+        grads0 = tf.constant([0.1, 0.1], dtype=dtype)
+        grads1 = tf.constant([0.01, 0.01, 0.01], dtype=dtype)
+        mom_opt = tf.train.MomentumOptimizer(learning_rate=2.0, momentum=0.9,
+                                             group_dense_updates=True)
+        mom_update = mom_opt.apply_gradients(
+            zip([grads0, grads1], [var0, var1]))
+        tf.global_variables_initializer().run()
+        slot1 = mom_opt.get_slot(var1, "momentum")
+        self.assertEquals(slot1.get_shape(), var1.get_shape())
+        # Step 1: the momentum accumulators were 0.
+        mom_update.run()
+        self.assertAllCloseAccordingToType(np.array([0.01, 0.01, 0.01]),
+                                           slot1.eval())
+        self.assertAllCloseAccordingToType(np.array([1.0 - (0.1 * 2.0),
+                                                     2.0 - (0.1 * 2.0)]),
+                                           var0.eval())
+        # Step 2: the momentum accumulators contain the previous update.
+        mom_update.run()
+        self.assertAllCloseAccordingToType(
+            np.array([(0.9 * 0.01 + 0.01)] * 3), slot1.eval())
+        self.assertAllCloseAccordingToType(
+            np.array([3.0, 4.0, 5.0]) - (0.01 * 2.0) -
+            ((0.9 * 0.01 + 0.01) * 2.0), var1.eval())
+
   def testNesterovMomentum(self):
     for dtype in [tf.float32, tf.float64]:
       with self.test_session():
@@ -20,7 +20,9 @@ from __future__ import division
 from __future__ import print_function
 
 import abc
+import time
 
+from tensorflow.core.framework import summary_pb2
 from tensorflow.core.protobuf import config_pb2
 from tensorflow.core.protobuf import saver_pb2
 from tensorflow.python.framework import errors
@@ -399,10 +401,99 @@ class WorkerSessionCreator(SessionCreator):
         self._master, config=self._config)
 
 
+class HookStats(object):
+  """Wall time spent in the `SessionRunHook`s of a monitored session.
+
+  Records, for each hook, the time spent in `before_run()` and `after_run()`,
+  and for each step the time spent in the wrapped `Session.run()` call and the
+  overhead around it (hooks, merging of fetches, feeds and options).
+
+  Example usage:
+  ```python
+  with MonitoredSession(hooks=hooks, collect_hook_stats=True) as sess:
+    while not sess.should_stop():
+      sess.run(train_op)
+    logging.info('%s', sess.hook_stats.as_dict())
+  ```
+  """
+
+  def __init__(self, hooks):
+    """Creates a `HookStats` for the given hooks.
+
+    Args:
+      hooks: A list of `SessionRunHook` objects.
+    """
+    names = [type(hook).__name__ for hook in hooks]
+    self._hook_names = [
+        name if names.count(name) == 1 else '%s_%d' % (name, i)
+        for i, name in enumerate(names)]
+    self.reset()
+
+  def reset(self):
+    """Clears the recorded times."""
+    self._before_run_secs = [0.0] * len(self._hook_names)
+    self._after_run_secs = [0.0] * len(self._hook_names)
+    self._num_steps = 0
+    self._step_secs = 0.0
+    self._session_run_secs = 0.0
+
+  def record_before_run(self, hook_index, secs):
+    self._before_run_secs[hook_index] += secs
+
+  def record_after_run(self, hook_index, secs):
+    self._after_run_secs[hook_index] += secs
+
+  def record_step(self, step_secs, session_run_secs):
+    self._num_steps += 1
+    self._step_secs += step_secs
+    self._session_run_secs += session_run_secs
+
+  @property
+  def num_steps(self):
+    """The number of steps recorded."""
+    return self._num_steps
+
+  def as_dict(self):
+    """Returns the average times per step in seconds, keyed by name.
+
+    Returns:
+      A `dict` with the keys `session_run_secs`, `overhead_secs` (the step time
+      not spent in `Session.run()`), and `<hook>/before_run_secs` and
+      `<hook>/after_run_secs` for each hook, where `<hook>` is the class name
+      of the hook, suffixed with its index if several hooks share a class.
+    """
+    num_steps = max(self._num_steps, 1)
+    result = {
+        'session_run_secs': self._session_run_secs / num_steps,
+        'overhead_secs': (
+            self._step_secs - self._session_run_secs) / num_steps,
+    }
+    for name, before_run_secs, after_run_secs in zip(
+        self._hook_names, self._before_run_secs, self._after_run_secs):
+      result[name + '/before_run_secs'] = before_run_secs / num_steps
+      result[name + '/after_run_secs'] = after_run_secs / num_steps
+    return result
+
+  def to_summary(self, prefix='hook_stats'):
+    """Returns the values of `as_dict()` as a `Summary` protocol buffer.
+
+    Args:
+      prefix: A string prepended to the summary tags.
+
+    Returns:
+      A `Summary` protocol buffer with one simple value per entry.
+    """
+    result = summary_pb2.Summary()
+    for name, value in sorted(self.as_dict().items()):
+      result.value.add(tag='%s/%s' % (prefix, name), simple_value=value)
+    return result
+
+
 class _MonitoredSession(object):
   """See `MonitoredSession` or `SingularMonitoredSession`."""
 
-  def __init__(self, session_creator, hooks, should_recover):
+  def __init__(self, session_creator, hooks, should_recover,
+               collect_hook_stats=False):
     """Sets up a Monitored or Hooked Session.
 
     Args:
@@ -411,15 +502,19 @@ class _MonitoredSession(object):
       hooks: An iterable of `SessionRunHook' objects.
       should_recover: A bool. Indicates whether to recover from `AbortedError`
         or not.
+      collect_hook_stats: A bool. If `True`, the time spent in each hook is
+        recorded in `hook_stats`.
     """
     self._graph_was_finalized = ops.get_default_graph().finalized
     self._hooks = hooks or []
+    self._hook_stats = HookStats(self._hooks) if collect_hook_stats else None
     for h in self._hooks:
       h.begin()
     # Create the session.
     self._coordinated_creator = self._CoordinatedSessionCreator(
         session_creator=session_creator or ChiefSessionCreator(),
-        hooks=self._hooks)
+        hooks=self._hooks,
+        hook_stats=self._hook_stats)
     if should_recover:
       self._sess = _RecoverableSession(self._coordinated_creator)
     else:
@@ -432,6 +527,11 @@ class _MonitoredSession(object):
       return None
     return self._tf_sess().graph
 
+  @property
+  def hook_stats(self):
+    """The `HookStats` of this session, or `None` if not collected."""
+    return self._hook_stats
+
   def run(self, fetches, feed_dict=None, options=None, run_metadata=None):
     """Run ops in the monitored session.
 
@@ -472,9 +572,10 @@ class _MonitoredSession(object):
   class _CoordinatedSessionCreator(object):
     """Factory for the _RecoverableSession."""
 
-    def __init__(self, session_creator, hooks):
+    def __init__(self, session_creator, hooks, hook_stats=None):
       self._session_creator = session_creator
       self._hooks = hooks
+      self._hook_stats = hook_stats
       self.coord = None
       self.tf_sess = None
 
@@ -486,7 +587,8 @@ class _MonitoredSession(object):
       self.coord = coordinator.Coordinator(clean_stop_exception_types=[])
       queue_runner.start_queue_runners(sess=self.tf_sess, coord=self.coord)
       return _CoordinatedSession(
-          _HookedSession(self.tf_sess, self._hooks), self.coord)
+          _HookedSession(self.tf_sess, self._hooks, self._hook_stats),
+          self.coord)
 
   def _close_internal(self, exception_type=None):
     try:
@@ -572,14 +674,18 @@ class MonitoredSession(_MonitoredSession):
     session_creator: A factory object to create session. Typically a
       `ChiefSessionCreator` which is the default one.
     hooks: An iterable of `SessionRunHook' objects.
+    collect_hook_stats: A bool. If `True`, the time spent in each hook and in
+      `session.run()` is recorded in a `HookStats` available as `hook_stats`.
 
   Returns:
     A MonitoredSession object.
   """
 
-  def __init__(self, session_creator=None, hooks=None):
+  def __init__(self, session_creator=None, hooks=None,
+               collect_hook_stats=False):
     super(MonitoredSession, self).__init__(
-        session_creator, hooks, should_recover=True)
+        session_creator, hooks, should_recover=True,
+        collect_hook_stats=collect_hook_stats)
 
 
 class SingularMonitoredSession(_MonitoredSession):
@@ -638,7 +744,8 @@ class SingularMonitoredSession(_MonitoredSession):
                scaffold=None,
                master='',
                config=None,
-               checkpoint_dir=None):
+               checkpoint_dir=None,
+               collect_hook_stats=False):
     """Creates a SingularMonitoredSession.
 
     Args:
@@ -649,6 +756,8 @@ class SingularMonitoredSession(_MonitoredSession):
       config: `ConfigProto` proto used to configure the session.
       checkpoint_dir: A string.  Optional path to a directory where to restore
         variables.
+      collect_hook_stats: A bool. If `True`, the time spent in each hook and in
+        `session.run()` is recorded in a `HookStats` available as `hook_stats`.
     """
     session_creator = ChiefSessionCreator(
         scaffold=scaffold,
@@ -656,7 +765,8 @@ class SingularMonitoredSession(_MonitoredSession):
         config=config,
         checkpoint_dir=checkpoint_dir)
     super(SingularMonitoredSession, self).__init__(
-        session_creator, hooks, should_recover=False)
+        session_creator, hooks, should_recover=False,
+        collect_hook_stats=collect_hook_stats)
 
   def raw_session(self):
     """Returns underlying `TensorFlow.Session` object."""
@@ -817,18 +927,24 @@ class _HookedSession(_WrappedSession):
   If any call to the hooks, requests stop via run_context the session will be
   marked as needing to stop and its `should_stop()` method will now return
   `True`.
+
+  Steps on which no hook requests fetches or options are run without wrapping
+  the fetches, and without allocating `RunOptions` and `RunMetadata` unless the
+  caller passed them.
   """
 
-  def __init__(self, sess, hooks):
+  def __init__(self, sess, hooks, hook_stats=None):
     """Initializes a _HookedSession object.
 
     Args:
       sess: A `tf.Session` or a `_WrappedSession` object.
       hooks: An iterable of `SessionRunHook' objects.
+      hook_stats: An optional `HookStats` recording the time spent in hooks.
     """
 
     _WrappedSession.__init__(self, sess)
     self._hooks = hooks
+    self._hook_stats = hook_stats
     self._should_stop = False
 
   def _check_stop(self):
@@ -840,41 +956,74 @@ class _HookedSession(_WrappedSession):
     if self.should_stop():
       raise RuntimeError('Run called even after should_stop requested.')
 
-    actual_fetches = {'caller': fetches}
+    stats = self._hook_stats
+    if stats is not None:
+      step_start_time = time.time()
 
     run_context = session_run_hook.SessionRunContext(
         original_args=session_run_hook.SessionRunArgs(fetches, feed_dict),
         session=self._sess)
 
-    options = options or config_pb2.RunOptions()
-    feed_dict = self._call_hook_before_run(run_context, actual_fetches,
-                                           feed_dict, options)
+    hook_fetches = {}
+    feed_dict, options = self._call_hook_before_run(run_context, hook_fetches,
+                                                    feed_dict, options)
+    if options is not None and run_metadata is None:
+      run_metadata = config_pb2.RunMetadata()
 
     # Do session run.
-    run_metadata = run_metadata or config_pb2.RunMetadata()
-    outputs = _WrappedSession.run(self,
-                                  fetches=actual_fetches,
-                                  feed_dict=feed_dict,
-                                  options=options,
-                                  run_metadata=run_metadata)
-
-    for hook in self._hooks:
+    if stats is not None:
+      run_start_time = time.time()
+    if hook_fetches:
+      hook_fetches['caller'] = fetches
+      outputs = _WrappedSession.run(self,
+                                    fetches=hook_fetches,
+                                    feed_dict=feed_dict,
+                                    options=options,
+                                    run_metadata=run_metadata)
+      caller_outputs = outputs['caller']
+    else:
+      outputs = hook_fetches
+      caller_outputs = _WrappedSession.run(self,
+                                           fetches=fetches,
+                                           feed_dict=feed_dict,
+                                           options=options,
+                                           run_metadata=run_metadata)
+    if stats is not None:
+      session_run_secs = time.time() - run_start_time
+
+    for i, hook in enumerate(self._hooks):
+      if stats is not None:
+        hook_start_time = time.time()
       hook.after_run(
           run_context,
           session_run_hook.SessionRunValues(
               results=outputs[hook] if hook in outputs else None,
               options=options,
               run_metadata=run_metadata))
+      if stats is not None:
+        stats.record_after_run(i, time.time() - hook_start_time)
     self._should_stop = self._should_stop or run_context.stop_requested
 
-    return outputs['caller']
+    if stats is not None:
+      stats.record_step(time.time() - step_start_time, session_run_secs)
+    return caller_outputs
 
   def _call_hook_before_run(self, run_context, fetch_dict, user_feed_dict,
                             options):
-    """Calls hooks.before_run and handles requests from hooks."""
+    """Calls hooks.before_run and handles requests from hooks.
+
+    Returns:
+      A tuple `(feed_dict, options)` of the merged feeds and options. `options`
+      is `None` if neither the caller nor any hook requested `RunOptions`.
+    """
+    stats = self._hook_stats
     hook_feeds = {}
-    for hook in self._hooks:
+    for i, hook in enumerate(self._hooks):
+      if stats is not None:
+        hook_start_time = time.time()
       request = hook.before_run(run_context)
+      if stats is not None:
+        stats.record_before_run(i, time.time() - hook_start_time)
       if request is not None:
         if request.fetches is not None:
           fetch_dict[hook] = request.fetches
@@ -884,19 +1033,21 @@ class _HookedSession(_WrappedSession):
               'Same tensor is fed by two hooks.')
           hook_feeds.update(request.feed_dict)
         if request.options:
+          if options is None:
+            options = config_pb2.RunOptions()
           self._merge_run_options(options, request.options)
 
     if not hook_feeds:
-      return user_feed_dict
+      return user_feed_dict, options
 
     if not user_feed_dict:
-      return hook_feeds
+      return hook_feeds, options
 
     self._raise_if_feeds_intersects(
         user_feed_dict, hook_feeds,
         'Same tensor is fed by a SessionRunHook and user.')
     hook_feeds.update(user_feed_dict)
-    return hook_feeds
+    return hook_feeds, options
 
   def _raise_if_feeds_intersects(self, feeds1, feeds2, message):
     intersection = set(feeds1.keys()) & set(feeds2.keys())
@@ -540,9 +540,7 @@ class HookedSessionTest(tf.test.TestCase):
         self.assertEqual(
             hook.last_run_values,
             tf.train.SessionRunValues(
-                results=None,
-                options=config_pb2.RunOptions(),
-                run_metadata=config_pb2.RunMetadata()))
+                results=None, options=None, run_metadata=None))
         self.assertEqual(hook.last_run_context.original_args,
                          tf.train.SessionRunArgs(a_tensor))
         self.assertEqual(hook.last_run_context.session, sess)
@@ -674,6 +672,64 @@ class HookedSessionTest(tf.test.TestCase):
       with self.assertRaisesRegexp(RuntimeError, 'Same tensor is fed'):
         mon_sess.run(fetches=add_tensor, feed_dict={b_tensor: [10]})
 
+  def testFastPathPassesCallerFetchesUnwrapped(self):
+    with tf.Graph().as_default(), tf.Session() as sess:
+      mock_run = FakeSession(sess)
+      mock_hook = FakeHook()
+      mon_sess = monitored_session._HookedSession(
+          sess=mock_run, hooks=[mock_hook])
+      a_tensor = tf.constant([0], name='a_tensor')
+      self.assertEqual(mon_sess.run(fetches=a_tensor), [0])
+      self.assertEqual(mock_run.args_called, {
+          'feed_dict': None,
+          'options': None,
+          'run_metadata': None
+      })
+
+  def testHookOptionsAllocatesRunMetadata(self):
+    with tf.Graph().as_default(), tf.Session() as sess:
+      mock_hook = FakeHook()
+      mock_hook2 = FakeHook()
+      mock_hook.request = tf.train.SessionRunArgs(
+          None, options=config_pb2.RunOptions(timeout_in_ms=1000))
+      mon_sess = monitored_session._HookedSession(
+          sess=sess, hooks=[mock_hook, mock_hook2])
+      a_tensor = tf.constant([0], name='a_tensor')
+      self.assertEqual(mon_sess.run(fetches=a_tensor), [0])
+      for hook in [mock_hook, mock_hook2]:
+        self.assertEqual(1000, hook.last_run_values.options.timeout_in_ms)
+        self.assertTrue(isinstance(hook.last_run_values.run_metadata,
+                                   config_pb2.RunMetadata))
+
+  def testHookStats(self):
+    with tf.Graph().as_default(), tf.Session() as sess:
+      mock_hook = FakeHook()
+      mock_hook2 = FakeHook()
+      other_hook = tf.train.SessionRunHook()
+      hooks = [mock_hook, mock_hook2, other_hook]
+      stats = monitored_session.HookStats(hooks)
+      mon_sess = monitored_session._HookedSession(
+          sess=sess, hooks=hooks, hook_stats=stats)
+      a_tensor = tf.constant([0], name='a_tensor')
+      mon_sess.run(a_tensor)
+      mon_sess.run(a_tensor)
+      self.assertEqual(2, stats.num_steps)
+      self.assertEqual(
+          set(['session_run_secs', 'overhead_secs',
+               'FakeHook_0/before_run_secs', 'FakeHook_0/after_run_secs',
+               'FakeHook_1/before_run_secs', 'FakeHook_1/after_run_secs',
+               'SessionRunHook/before_run_secs',
+               'SessionRunHook/after_run_secs']),
+          set(stats.as_dict()))
+      for value in stats.as_dict().values():
+        self.assertGreaterEqual(value, 0.0)
+      summary = stats.to_summary()
+      self.assertEqual(8, len(summary.value))
+      self.assertIn('hook_stats/session_run_secs',
+                    [value.tag for value in summary.value])
+      stats.reset()
+      self.assertEqual(0, stats.num_steps)
+
 
 class RaiseOnceAtCountN(tf.train.SessionRunHook):
   """Hook that raises an Exception at step N."""
@@ -1117,6 +1173,36 @@ class MonitoredSessionTest(tf.test.TestCase):
         self.assertGreater(len(hook.run_metadata_list[0].partition_graphs), 0)
 
 
+class HookStatsMonitoredSessionTest(tf.test.TestCase):
+  """Tests collecting `HookStats` from monitored sessions."""
+
+  def testNoStatsByDefault(self):
+    with tf.Graph().as_default():
+      tf.constant([0])
+      with tf.train.MonitoredSession() as session:
+        self.assertIsNone(session.hook_stats)
+
+  def testCollectHookStats(self):
+    with tf.Graph().as_default():
+      a_tensor = tf.constant([0])
+      hook = FakeHook()
+      with tf.train.MonitoredSession(
+          hooks=[hook], collect_hook_stats=True) as session:
+        session.run(a_tensor)
+        session.run(a_tensor)
+        self.assertEqual(2, session.hook_stats.num_steps)
+        self.assertIn('FakeHook/after_run_secs',
+                      session.hook_stats.as_dict())
+
+  def testCollectHookStatsSingular(self):
+    with tf.Graph().as_default():
+      a_tensor = tf.constant([0])
+      with tf.train.SingularMonitoredSession(
+          hooks=[FakeHook()], collect_hook_stats=True) as session:
+        session.run(a_tensor)
+        self.assertEqual(1, session.hook_stats.num_steps)
+
+
 class SingularMonitoredSessionTest(tf.test.TestCase):
   """Tests SingularMonitoredSession."""
 
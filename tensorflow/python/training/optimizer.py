@@ -21,13 +21,18 @@ from __future__ import division
 from __future__ import print_function
 
 import abc
+import collections
 
+from tensorflow.python import pywrap_tensorflow
+from tensorflow.python.framework import device as pydev
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
+from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import control_flow_ops
 from tensorflow.python.ops import gradients
 from tensorflow.python.ops import state_ops
 from tensorflow.python.ops import variables
+from tensorflow.python.training import saver
 from tensorflow.python.training import slot_creator
 
 
@@ -102,6 +107,96 @@ def _get_processor(v):
   raise NotImplementedError("Trying to optimize unsupported type ", v)
 
 
+# Each variable of a group starts at a multiple of this many bytes in the flat
+# slots of the group.  Must match the GroupedApply* kernels.
+_GROUPED_SLOT_ALIGNMENT_BYTES = 64
+
+
+def _is_cpu_device(device):
+  """Returns whether ops on `device` can only be placed on a CPU.
+
+  The GroupedApply* kernels are only registered for CPU. A device without a
+  type is only known to be a CPU when TensorFlow is built without GPU support.
+  """
+  device_type = pydev.DeviceSpec.from_string(device).device_type
+  if device_type:
+    return device_type == "CPU"
+  return not pywrap_tensorflow.IsGoogleCudaEnabled()
+
+
+class _DenseVariableGroup(object):
+  """Variables whose dense updates are applied by a single op.
+
+  The slots of the variables are concatenated into one flat `Variable` per
+  slot name, with the elements of each variable starting at an aligned offset.
+  """
+
+  def __init__(self, var_list):
+    self.variables = sorted(var_list, key=lambda v: v.op.name)
+    self.dtype = self.variables[0].dtype.base_dtype
+    alignment = max(1, _GROUPED_SLOT_ALIGNMENT_BYTES // self.dtype.size)
+    self.offsets = []
+    self.sizes = []
+    self.size = 0
+    for v in self.variables:
+      num_elements = v.get_shape().num_elements()
+      self.offsets.append(self.size)
+      self.sizes.append(num_elements)
+      self.size += (num_elements + alignment - 1) // alignment * alignment
+    # Initial values requested by _create_slots(), None meaning zeros:
+    #  {slot_name: (op_name, {variable: value, ...}), ...}
+    self.slot_values = collections.OrderedDict()
+    # The flat slot variables: {slot_name: flat_variable, ...}
+    self.slots = {}
+
+  def flatten(self, values):
+    """Concatenates one value per variable into a flat slot value.
+
+    Args:
+      values: A list with a `Tensor` or `None` (for zeros) per variable.
+
+    Returns:
+      A 1-D `Tensor` of `self.size` elements.
+    """
+    if all(value is None for value in values):
+      return array_ops.zeros([self.size], dtype=self.dtype)
+    pieces = []
+    end = 0
+    for value, offset, size in zip(values, self.offsets, self.sizes):
+      if offset > end:
+        pieces.append(array_ops.zeros([offset - end], dtype=self.dtype))
+      if value is None:
+        pieces.append(array_ops.zeros([size], dtype=self.dtype))
+      else:
+        pieces.append(array_ops.reshape(
+            ops.convert_to_tensor(value, dtype=self.dtype), [-1]))
+      end = offset + size
+    if self.size > end:
+      pieces.append(array_ops.zeros([self.size - end], dtype=self.dtype))
+    return array_ops.concat(0, pieces)
+
+
+class _GroupSlotSaveable(saver.BaseSaverBuilder.SaveableObject):
+  """Saves the flat slot of a group as one tensor per variable.
+
+  The tensors are saved under the names and shapes the slots would have if the
+  variables were not grouped, so checkpoints are interchangeable between
+  grouped and ungrouped optimizers.
+  """
+
+  def __init__(self, flat_slot, group, views, names):
+    specs = [saver.BaseSaverBuilder.SaveSpec(view, "", name)
+             for view, name in zip(views, names)]
+    super(_GroupSlotSaveable, self).__init__(flat_slot, specs,
+                                             flat_slot.op.name)
+    self._group = group
+
+  def restore(self, restored_tensors, restored_shapes):
+    del restored_shapes  # The shapes are those of the grouped variables.
+    with ops.colocate_with(self.op):
+      return state_ops.assign(self.op, self._group.flatten(restored_tensors))
+
+
 class Optimizer(object):
   """Base class for optimizers.
 
@@ -203,7 +298,7 @@ class Optimizer(object):
   GATE_OP = 1
   GATE_GRAPH = 2
 
-  def __init__(self, use_locking, name):
+  def __init__(self, use_locking, name, group_dense_updates=False):
     """Create a new Optimizer.
 
     This must be called by the constructors of subclasses.
@@ -213,6 +308,12 @@ class Optimizer(object):
         to variables.
       name: A non-empty string.  The name to use for accumulators created
         for the optimizer.
+      group_dense_updates: Bool. If True, the dense updates of variables with
+        the same type and device are applied by a single op per group, and
+        their slots are stored in one flat variable per slot name.  Only for
+        subclasses implementing `_apply_dense_group()`.  Only variables
+        placed on a CPU are grouped: those on a GPU, or without a device in
+        a build with GPU support, are updated one by one.
 
     Raises:
       ValueError: If name is malformed.
@@ -224,6 +325,12 @@ class Optimizer(object):
     # Dictionary of slots.
     #  {slot_name : { variable_to_train: slot_for_the_variable, ...}, ... }
     self._slots = {}
+    self._group_dense_updates = group_dense_updates
+    # Groups of the variables updated together, if group_dense_updates.
+    #  { variable: _DenseVariableGroup, ... }
+    self._var_groups = {}
+    # Groups whose slots are being created by _create_slots().
+    self._pending_var_groups = {}
 
   def get_name(self):
     return self._name
@@ -389,18 +496,34 @@ class Optimizer(object):
     if not var_list:
       raise ValueError("No gradients provided for any variable: %s." %
                        ([str(v) for _, _, v in converted_grads_and_vars],))
+    groups, new_groups = self._get_var_groups(converted_grads_and_vars)
     with ops.control_dependencies(None):
-      self._create_slots(var_list)
+      self._pending_var_groups = dict(
+          (var, group) for group in new_groups for var in group.variables)
+      try:
+        self._create_slots(var_list)
+      finally:
+        self._pending_var_groups = {}
+      for group in new_groups:
+        self._create_group_slots(group)
     update_ops = []
     with ops.name_scope(name, self._name) as name:
       self._prepare()
       for grad, var, processor in converted_grads_and_vars:
-        if grad is None:
+        if grad is None or var in self._var_groups:
           continue
         # We colocate all ops created in _apply_dense or _apply_sparse
         # on the same device as the variable.
         with ops.name_scope("update_" + var.op.name), ops.colocate_with(var):
           update_ops.append(processor.update_op(self, grad))
+      if groups:
+        var_to_grad = dict((var, grad)
+                           for grad, var, _ in converted_grads_and_vars)
+        for group in groups:
+          with ops.name_scope("update_group"), ops.colocate_with(
+              group.variables[0]):
+            update_ops.append(self._apply_dense_group(
+                [var_to_grad[var] for var in group.variables], group))
       if global_step is None:
         apply_updates = self._finish(update_ops, name)
       else:
@@ -429,7 +552,9 @@ class Optimizer(object):
       name: A string.
 
     Returns:
-      The `Variable` for the slot if it was created, `None` otherwise.
+      The `Variable` for the slot if it was created, `None` otherwise.  With
+      `group_dense_updates`, the slots of grouped variables are `Tensor` views
+      of a flat variable holding the slots of the whole group.
     """
     named_slots = self._slots.get(name, None)
     if not named_slots:
@@ -521,6 +646,20 @@ class Optimizer(object):
     """
     raise NotImplementedError()
 
+  def _apply_dense_group(self, grads, group):
+    """Add ops to apply dense gradients to a group of variables.
+
+    The slots of the group are in `group.slots`, see `_DenseVariableGroup`.
+
+    Args:
+      grads: A list of `Tensor`, the gradients of `group.variables`.
+      group: A `_DenseVariableGroup`.
+
+    Returns:
+      An `Operation`.
+    """
+    raise NotImplementedError()
+
   def _finish(self, update_ops, name_scope):
     """Do what is needed to finish the update.
 
@@ -542,6 +681,101 @@ class Optimizer(object):
   # Utility methods for subclasses.
   # --------------
 
+  def _get_var_groups(self, grads_and_vars):
+    """Returns the groups of variables to update with `_apply_dense_group()`.
+
+    Args:
+      grads_and_vars: List of (gradient, variable, processor) triples.
+
+    Returns:
+      A pair of lists of `_DenseVariableGroup`: all the groups to update, and
+      those among them whose slots must be created.
+
+    Raises:
+      ValueError: If a previously grouped variable is updated without the
+        rest of its group, or with a sparse gradient.
+    """
+    if not self._group_dense_updates:
+      return [], []
+    groups = []
+    candidates = collections.defaultdict(list)
+    # pylint: disable=protected-access
+    for grad, var, _ in grads_and_vars:
+      if grad is None:
+        continue
+      group = self._var_groups.get(var, None)
+      if group is not None:
+        if not isinstance(grad, ops.Tensor):
+          raise ValueError("Variable %s has been grouped for dense updates, "
+                           "it cannot be updated with %s." % (var.name, grad))
+        if group not in groups:
+          groups.append(group)
+      elif (isinstance(grad, ops.Tensor) and
+            isinstance(var, variables.Variable) and
+            not var._save_slice_info and
+            var.get_shape().is_fully_defined() and
+            _is_cpu_device(var.device) and
+            not any(var in slots for slots in self._slots.values())):
+        candidates[(var.dtype.base_dtype, var.device)].append(var)
+    # pylint: enable=protected-access
+    updated = set(var for grad, var, _ in grads_and_vars if grad is not None)
+    for group in groups:
+      if not updated.issuperset(group.variables):
+        raise ValueError(
+            "Variables %s have been grouped for dense updates, they must all "
+            "be updated together." % [v.name for v in group.variables])
+    new_groups = []
+    for key in sorted(candidates, key=lambda k: (k[0].name, k[1])):
+      if len(candidates[key]) > 1:
+        group = _DenseVariableGroup(candidates[key])
+        for var in group.variables:
+          self._var_groups[var] = group
+        new_groups.append(group)
+    return groups + new_groups, new_groups
+
+  def _create_group_slots(self, group):
+    """Creates the flat slots of a group and their per-variable views.
+
+    Args:
+      group: A `_DenseVariableGroup` whose slot values have been recorded
+        by `_create_slots()`.
+    """
+    first = group.variables[0]
+    # Names the slots would be saved under without grouping, see slot_creator.
+    num_slots = collections.defaultdict(int)
+    for slot_name, (op_name, values) in group.slot_values.items():
+      with ops.colocate_with(first):
+        flat_slot = variables.Variable(
+            group.flatten([values.get(var, None) for var in group.variables]),
+            name="%s/%s_group_%s" % (first.op.name, op_name, slot_name),
+            trainable=False)
+      group.slots[slot_name] = flat_slot
+      named_slots = self._slot_dict(slot_name)
+      views = []
+      names = []
+      with ops.name_scope(flat_slot.op.name + "/"), ops.colocate_with(
+          flat_slot):
+        for var, offset, size in zip(group.variables, group.offsets,
+                                     group.sizes):
+          view = array_ops.reshape(
+              array_ops.slice(flat_slot, [offset], [size]), var.get_shape())
+          named_slots[var] = view
+          views.append(view)
+          name = "%s/%s" % (var.op.name, op_name)
+          if num_slots[name]:
+            names.append("%s_%d" % (name, num_slots[name]))
+          else:
+            names.append(name)
+          num_slots[name] += 1
+      ops.add_to_collection(ops.GraphKeys.SAVEABLE_OBJECTS,
+                            _GroupSlotSaveable(flat_slot, group, views, names))
+
+  def _record_group_slot(self, var, val, slot_name, op_name):
+    """Records the initial value of the slot of a grouped variable."""
+    group = self._pending_var_groups[var]
+    _, values = group.slot_values.setdefault(slot_name, (op_name, {}))
+    values[var] = val
+
   def _slot_dict(self, slot_name):
     """Returns a dict for caching slots created under the given name.
 
@@ -569,8 +803,11 @@ class Optimizer(object):
         needs to be created for  the slot.
 
     Returns:
-      A `Variable` object.
+      A `Variable` object, or `None` if the slot of a grouped variable is
+      created later by `_create_group_slots()`.
     """
+    if var in self._pending_var_groups:
+      return self._record_group_slot(var, val, slot_name, op_name)
     named_slots = self._slot_dict(slot_name)
     if var not in named_slots:
       named_slots[var] = slot_creator.create_slot(var, val, op_name)
@@ -586,8 +823,11 @@ class Optimizer(object):
         needs to be created for  the slot.
 
     Returns:
-      A `Variable` object.
+      A `Variable` object, or `None` if the slot of a grouped variable is
+      created later by `_create_group_slots()`.
     """
+    if var in self._pending_var_groups:
+      return self._record_group_slot(var, None, slot_name, op_name)
     named_slots = self._slot_dict(slot_name)
     if var not in named_slots:
       named_slots[var] = slot_creator.create_zeros_slot(var, op_name)
@@ -16,6 +16,10 @@
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
+import os
+import time
+
+import numpy as np
 import tensorflow as tf
 
 
@@ -175,6 +179,120 @@ class OptimizerTest(tf.test.TestCase):
       opt_op = sgd_op.minimize(cost, global_step, [var0, var1])
       self.assertTrue(opt_op in tf.get_collection(tf.GraphKeys.TRAIN_OP))
 
+  def testGroupDenseUpdatesCheckpoint(self):
+    save_path = os.path.join(self.get_temp_dir(), 'group_dense_updates')
+
+    def _build(group_dense_updates):
+      var0 = tf.Variable([1.0, 2.0], name='var0')
+      var1 = tf.Variable([[3.0, 4.0, 5.0]], name='var1')
+      cost = tf.reduce_sum(var0 * var0) + tf.reduce_sum(var1 * var1)
+      opt = tf.train.AdamOptimizer(group_dense_updates=group_dense_updates)
+      opt_op = opt.minimize(cost)
+      return [var0, var1], opt, opt_op
+
+    with tf.Graph().as_default(), self.test_session() as sess:
+      var_list, opt, opt_op = _build(group_dense_updates=True)
+      tf.global_variables_initializer().run()
+      for _ in range(3):
+        opt_op.run()
+      slots = sess.run([opt.get_slot(v, name)
+                        for v in var_list for name in ('m', 'v')])
+      tf.train.Saver().save(sess, save_path)
+
+    # The checkpoint of the grouped slots restores into ungrouped slots...
+    with tf.Graph().as_default(), self.test_session() as sess:
+      var_list, opt, _ = _build(group_dense_updates=False)
+      tf.train.Saver().restore(sess, save_path)
+      for value, slot in zip(slots, [opt.get_slot(v, name)
+                                     for v in var_list for name in ('m', 'v')]):
+        self.assertTrue(isinstance(slot, tf.Variable))
+        self.assertAllClose(value, slot.eval())
+      tf.train.Saver().save(sess, save_path)
+
+    # ...and back.
+    with tf.Graph().as_default(), self.test_session() as sess:
+      var_list, opt, _ = _build(group_dense_updates=True)
+      tf.global_variables_initializer().run()
+      tf.train.Saver().restore(sess, save_path)
+      self.assertAllClose(slots, sess.run([opt.get_slot(v, name)
+                                           for v in var_list
+                                           for name in ('m', 'v')]))
+
+  def testGroupDenseUpdatesRequiresWholeGroup(self):
+    with self.test_session():
+      var0 = tf.Variable([1.0, 2.0])
+      var1 = tf.Variable([3.0, 4.0])
+      grad = tf.constant([0.1, 0.1])
+      opt = tf.train.MomentumOptimizer(1.0, 0.9, group_dense_updates=True)
+      opt.apply_gradients([(grad, var0), (grad, var1)])
+      # Applying the whole group again reuses its slots.
+      opt.apply_gradients([(grad, var1), (grad, var0)])
+      with self.assertRaisesRegexp(ValueError, 'updated together'):
+        opt.apply_gradients([(grad, var0)])
+      with self.assertRaisesRegexp(ValueError, 'grouped for dense updates'):
+        opt.apply_gradients([
+            (tf.IndexedSlices(grad, tf.constant([0, 1])), var0), (grad, var1)])
+
+
+  def testGroupDenseUpdatesOnlyOnCpu(self):
+
+    def _num_grouped_ops(device):
+      with tf.Graph().as_default() as g, g.device(device):
+        var0 = tf.Variable([1.0, 2.0])
+        var1 = tf.Variable([3.0, 4.0])
+        grad = tf.constant([0.1, 0.1])
+        opt = tf.train.MomentumOptimizer(1.0, 0.9, group_dense_updates=True)
+        opt.apply_gradients([(grad, var0), (grad, var1)])
+        return [op.type for op in g.get_operations()].count(
+            'GroupedApplyMomentum')
+
+    self.assertEqual(1, _num_grouped_ops('/cpu:0'))
+    # There are no GPU kernels for the grouped updates.
+    self.assertEqual(0, _num_grouped_ops('/gpu:0'))
+    self.assertEqual(0 if tf.test.is_built_with_cuda() else 1,
+                     _num_grouped_ops(None))
+
+class GroupDenseUpdatesBenchmark(tf.test.Benchmark):
+  """Step and graph construction time of models with many small variables."""
+
+  def _benchmark(self, optimizer_fn, group_dense_updates, num_variables=5000,
+                 iters=20):
+    with tf.Graph().as_default():
+      var_list = [tf.Variable(np.random.randn(16).astype(np.float32),
+                              name='v%d' % i)
+                  for i in range(num_variables)]
+      grads = [tf.random_normal([16]) for _ in var_list]
+      start = time.time()
+      opt = optimizer_fn(group_dense_updates)
+      train_op = opt.apply_gradients(zip(grads, var_list))
+      build_time = time.time() - start
+      with tf.Session() as sess:
+        sess.run(tf.global_variables_initializer())
+        sess.run(train_op)
+        start = time.time()
+        for _ in range(iters):
+          sess.run(train_op)
+        step_time = (time.time() - start) / iters
+    self.report_benchmark(
+        name='%s_%d_vars%s' % (opt.get_name(), num_variables,
+                               '_grouped' if group_dense_updates else ''),
+        iters=iters,
+        wall_time=step_time,
+        extras={'graph_build_time': build_time})
+
+  def benchmarkAdam(self):
+    for group_dense_updates in [False, True]:
+      self._benchmark(
+          lambda group: tf.train.AdamOptimizer(group_dense_updates=group),
+          group_dense_updates)
+
+  def benchmarkMomentum(self):
+    for group_dense_updates in [False, True]:
+      self._benchmark(
+          lambda group: tf.train.MomentumOptimizer(
+              0.1, 0.9, group_dense_updates=group),
+          group_dense_updates)
+
 
 if __name__ == '__main__':
   tf.test.main()
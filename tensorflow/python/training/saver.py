@@ -486,7 +486,8 @@ class BaseSaverBuilder(object):
     Returns:
       A dictionary of names to the operations that must be saved under
       that name.  Variables with save_slice_info are grouped together under the
-      same key in no particular order.
+      same key in no particular order.  Variables that are the `op` of a
+      SaveableObject in the list are only saved through that SaveableObject.
 
     Raises:
       TypeError: If the type of op_list or its elements is not supported.
@@ -496,11 +497,17 @@ class BaseSaverBuilder(object):
       raise TypeError("Variables to save should be passed in a dict or a "
                       "list: %s" % op_list)
     op_list = set(op_list)
+    saveable_vars = set(
+        var.op for var in op_list
+        if isinstance(var, BaseSaverBuilder.SaveableObject) and
+        isinstance(var.op, variables.Variable))
     names_to_saveables = {}
     # pylint: disable=protected-access
     for var in op_list:
       if isinstance(var, BaseSaverBuilder.SaveableObject):
         names_to_saveables[var.name] = var
+      elif var in saveable_vars:
+        continue
       elif isinstance(var, variables.PartitionedVariable):
         if var.name in names_to_saveables:
           raise ValueError("At least two variables have the same name: %s" %
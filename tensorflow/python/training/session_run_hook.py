@@ -243,6 +243,8 @@ class SessionRunValues(
         => results = [None, nparray(string), nparray(int)]
         fetches = {'step': global_step_tensor, 'summ': summary_op}
         => results = {'step': nparray(int), 'summ': nparray(string)}
-    options: `RunOptions` from the `Session.run()` call.
-    run_metadata: `RunMetadata` from the `Session.run()` call.
+    options: `RunOptions` from the `Session.run()` call, or `None` if neither
+      the caller nor any hook requested options.
+    run_metadata: `RunMetadata` from the `Session.run()` call, or `None` if
+      `options` is `None` and the caller passed no `RunMetadata`.
   """
@@ -110,6 +110,7 @@ more information about how to configure a distributed TensorFlow program.
 @@SessionCreator
 @@ChiefSessionCreator
 @@WorkerSessionCreator
+@@HookStats
 
 ## Reading Summaries from Event Files
 
@@ -198,6 +199,7 @@ from tensorflow.python.training.monitored_session import ChiefSessionCreator
 from tensorflow.python.training.monitored_session import WorkerSessionCreator
 from tensorflow.python.training.monitored_session import MonitoredSession
 from tensorflow.python.training.monitored_session import SingularMonitoredSession
+from tensorflow.python.training.monitored_session import HookStats
 from tensorflow.python.training.saver import Saver
 from tensorflow.python.training.saver import checkpoint_exists
 from tensorflow.python.training.saver import generate_checkpoint_state_proto